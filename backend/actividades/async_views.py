@@ -0,0 +1,117 @@
+"""
+Vistas asíncronas de actividades (se montan con ASYNC_VIEWS=True).
+
+estimate, alta y edición esperan a Open-Meteo: aquí la consulta se hace con
+WeatherService.aget_weather_data en el event loop y el resultado se pasa al
+serializer (context['weather_data']) para que el guardado, que sí corre en
+un hilo con sync_to_async, no vuelva a consultar. El resto de métodos del
+recurso se delegan en ActividadViewSet.
+"""
+import logging
+
+from asgiref.sync import sync_to_async
+from django.utils import timezone
+from rest_framework import exceptions, status
+from rest_framework.response import Response
+
+from hydrotracker.async_views import AsyncAPIView
+from .models import Actividad
+from .serializers import ActividadCreateSerializer, ActividadSerializer
+from .services.estimate_service import (
+    EstimateParamsError, afetch_estimate_weather, build_estimate, parse_estimate_params
+)
+from .services.weather_service import WeatherService
+from .views import ActividadViewSet
+
+logger = logging.getLogger(__name__)
+
+
+async def fetch_activity_weather(data, activity_datetime):
+    """
+    Clima de la actividad a partir del body (latitude, longitude, tz), o None.
+    """
+    latitude = data.get('latitude')
+    longitude = data.get('longitude')
+    if not (latitude and longitude and activity_datetime):
+        return None
+    try:
+        return await WeatherService().aget_weather_data(
+            float(latitude),
+            float(longitude),
+            activity_datetime,
+            user_timezone=data.get('tz') or data.get('timezone')
+        )
+    except Exception as e:
+        logger.warning(f'Error al obtener datos climáticos: {str(e)}')
+        return None
+
+
+@sync_to_async
+def _save(serializer, **kwargs):
+    serializer.save(**kwargs)
+    return serializer.data
+
+
+class ActividadEstimateAsyncView(AsyncAPIView):
+    """
+    POST /actividades/estimate/ sin bloquear un worker mientras responde
+    Open-Meteo.
+    """
+
+    async def post(self, request):
+        try:
+            params = parse_estimate_params(request.data, request.query_params)
+        except EstimateParamsError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        weather_data, weather_error = await afetch_estimate_weather(params)
+        return Response(build_estimate(request.user, params, weather_data, weather_error))
+
+
+class ActividadListAsyncView(AsyncAPIView):
+    """
+    POST /actividades/ async; GET (listado) lo atiende ActividadViewSet.
+    """
+    fallback_view = ActividadViewSet.as_view({'get': 'list', 'post': 'create'})
+
+    async def post(self, request):
+        context = {'request': request, 'view': self, 'format': None}
+        serializer = ActividadCreateSerializer(data=request.data, context=context)
+        serializer.is_valid(raise_exception=True)
+
+        # Mismo valor por defecto que ActividadCreateSerializer.create
+        fecha_hora = serializer.validated_data.get('fecha_hora') or timezone.now()
+        context['weather_data'] = await fetch_activity_weather(request.data, fecha_hora)
+
+        data = await _save(serializer, usuario=request.user, fecha_hora=fecha_hora)
+        return Response(data, status=status.HTTP_201_CREATED)
+
+
+class ActividadDetailAsyncView(AsyncAPIView):
+    """
+    PUT/PATCH /actividades/<pk>/ async; GET y DELETE los atiende
+    ActividadViewSet.
+    """
+    fallback_view = ActividadViewSet.as_view({
+        'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'
+    })
+
+    async def put(self, request, pk):
+        return await self._update(request, pk, partial=False)
+
+    async def patch(self, request, pk):
+        return await self._update(request, pk, partial=True)
+
+    async def _update(self, request, pk, partial):
+        instance = await Actividad.objects.filter(usuario=request.user, pk=pk).afirst()
+        if instance is None:
+            raise exceptions.NotFound()
+
+        context = {'request': request, 'view': self, 'format': None}
+        serializer = ActividadSerializer(instance, data=request.data, partial=partial, context=context)
+        serializer.is_valid(raise_exception=True)
+
+        fecha_hora = serializer.validated_data.get('fecha_hora', instance.fecha_hora)
+        context['weather_data'] = await fetch_activity_weather(request.data, fecha_hora)
+
+        return Response(await _save(serializer))
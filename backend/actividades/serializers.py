@@ -1,8 +1,48 @@
+import logging
 from rest_framework import serializers
 from .models import Actividad
 from django.utils import timezone
 from datetime import date
 from .services.weather_service import WeatherService
+from consumos.config.constants import TIPO_ACTIVIDAD_CODES, INTENSIDAD_CODES
+from consumos.serializers.fast_serializers import (
+    ValuesSerializer, RAW, DATETIME, CHOICE, CONSTANT
+)
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_weather(context, latitude, longitude, activity_datetime, user_timezone):
+    """
+    (temperature, humidity, weather_message) para calcular el PSE.
+
+    Las vistas async (actividades.async_views) consultan Open-Meteo sin
+    bloquear antes de guardar y pasan el resultado en context['weather_data'];
+    en ese caso no se vuelve a consultar desde el hilo del ORM.
+    """
+    if 'weather_data' in context:
+        weather_data = context['weather_data']
+    elif latitude and longitude and activity_datetime:
+        try:
+            weather_data = WeatherService().get_weather_data(
+                float(latitude),
+                float(longitude),
+                activity_datetime,
+                user_timezone=user_timezone
+            )
+        except Exception as e:
+            logger.warning(f'Error al obtener datos climáticos: {str(e)}')
+            weather_data = None
+    else:
+        weather_data = None
+    
+    if weather_data and weather_data.get('success'):
+        return (
+            weather_data.get('temperature'),
+            weather_data.get('humidity'),
+            weather_data.get('weather_message', ''),
+        )
+    return None, None, None
 
 
 class ActividadSerializer(serializers.ModelSerializer):
@@ -71,31 +111,10 @@ class ActividadSerializer(serializers.ModelSerializer):
             if user_timezone is None:
                 user_timezone = request.data.get('tz') or request.data.get('timezone')
         
-        temperature = None
-        humidity = None
-        weather_message = None
-        
         # Si hay coordenadas y fecha_hora, consultar clima
-        if latitude and longitude and 'fecha_hora' in validated_data:
-            try:
-                weather_service = WeatherService()
-                activity_datetime = validated_data['fecha_hora']
-                
-                weather_data = weather_service.get_weather_data(
-                    float(latitude),
-                    float(longitude),
-                    activity_datetime,
-                    user_timezone=user_timezone
-                )
-                
-                if weather_data.get('success'):
-                    temperature = weather_data.get('temperature')
-                    humidity = weather_data.get('humidity')
-                    weather_message = weather_data.get('weather_message', '')
-            except Exception as e:
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.warning(f'Error al obtener datos climáticos: {str(e)}')
+        temperature, humidity, weather_message = resolve_weather(
+            self.context, latitude, longitude, validated_data.get('fecha_hora'), user_timezone
+        )
         
         # Crear la actividad
         actividad = Actividad(**validated_data)
@@ -125,31 +144,11 @@ class ActividadSerializer(serializers.ModelSerializer):
         longitude = request.data.get('longitude')
         user_timezone = request.data.get('tz') or request.data.get('timezone')
         
-        temperature = None
-        humidity = None
-        weather_message = None
-        
         # Si hay coordenadas y fecha_hora, consultar clima
         fecha_hora = validated_data.get('fecha_hora', instance.fecha_hora)
-        if latitude and longitude and fecha_hora:
-            try:
-                weather_service = WeatherService()
-                
-                weather_data = weather_service.get_weather_data(
-                    float(latitude),
-                    float(longitude),
-                    fecha_hora,
-                    user_timezone=user_timezone
-                )
-                
-                if weather_data.get('success'):
-                    temperature = weather_data.get('temperature')
-                    humidity = weather_data.get('humidity')
-                    weather_message = weather_data.get('weather_message', '')
-            except Exception as e:
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.warning(f'Error al obtener datos climáticos: {str(e)}')
+        temperature, humidity, weather_message = resolve_weather(
+            self.context, latitude, longitude, fecha_hora, user_timezone
+        )
         
         # Actualizar campos
         for attr, value in validated_data.items():
@@ -215,31 +214,10 @@ class ActividadCreateSerializer(serializers.ModelSerializer):
             if user_timezone is None:
                 user_timezone = request.data.get('tz') or request.data.get('timezone')
         
-        temperature = None
-        humidity = None
-        weather_message = None
-        
         # Si hay coordenadas y fecha_hora, consultar clima
-        if latitude and longitude and 'fecha_hora' in validated_data:
-            try:
-                weather_service = WeatherService()
-                activity_datetime = validated_data['fecha_hora']
-                
-                weather_data = weather_service.get_weather_data(
-                    float(latitude),
-                    float(longitude),
-                    activity_datetime,
-                    user_timezone=user_timezone
-                )
-                
-                if weather_data.get('success'):
-                    temperature = weather_data.get('temperature')
-                    humidity = weather_data.get('humidity')
-                    weather_message = weather_data.get('weather_message', '')
-            except Exception as e:
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.warning(f'Error al obtener datos climáticos: {str(e)}')
+        temperature, humidity, weather_message = resolve_weather(
+            self.context, latitude, longitude, validated_data.get('fecha_hora'), user_timezone
+        )
         
         # Crear la actividad
         actividad = Actividad(**validated_data)
@@ -260,3 +238,33 @@ class ActividadCreateSerializer(serializers.ModelSerializer):
         
         return actividad
 
+
+
+class ActividadFastSerializer(ValuesSerializer):
+    """
+    Equivalente de solo lectura de ActividadSerializer para listados.
+    weather_message y climate_adjustment solo existen justo después de
+    crear o actualizar, por lo que en los listados siempre son nulos.
+    """
+    fields = (
+        ('id', 'id', RAW),
+        ('usuario', 'usuario_id', RAW),
+        ('tipo_actividad', 'tipo_actividad', RAW),
+        ('tipo_actividad_display', 'tipo_actividad', CHOICE, Actividad.TIPO_ACTIVIDAD_CHOICES),
+        ('duracion_minutos', 'duracion_minutos', RAW),
+        ('intensidad', 'intensidad', RAW),
+        ('intensidad_display', 'intensidad', CHOICE, Actividad.INTENSIDAD_CHOICES),
+        ('fecha_hora', 'fecha_hora', DATETIME),
+        ('pse_calculado', 'pse_calculado', RAW),
+        ('fecha_creacion', 'fecha_creacion', DATETIME),
+        ('fecha_actualizacion', 'fecha_actualizacion', DATETIME),
+        ('weather_message', None, CONSTANT, None),
+        ('climate_adjustment', None, CONSTANT, None),
+    )
+    compact_enums = {
+        'tipo_actividad': TIPO_ACTIVIDAD_CODES,
+        'intensidad': INTENSIDAD_CODES,
+    }
+    compact_exclude = (
+        'tipo_actividad_display', 'intensidad_display', 'weather_message', 'climate_adjustment'
+    )
@@ -0,0 +1,144 @@
+"""
+Estimación de PSE sin guardar la actividad (POST /actividades/estimate/).
+
+Compartido por la vista síncrona (ActividadViewSet.estimate) y la asíncrona
+(actividades.async_views): ambas validan con parse_estimate_params, consultan
+el clima con fetch_estimate_weather o afetch_estimate_weather y calculan el
+resultado con build_estimate.
+"""
+import logging
+from datetime import datetime as dt
+
+from django.utils import timezone
+
+from ..models import Actividad
+from .weather_service import WeatherService
+
+logger = logging.getLogger(__name__)
+
+
+class EstimateParamsError(ValueError):
+    """Parámetros de estimación inválidos; el mensaje va en la respuesta 400."""
+
+
+def parse_estimate_params(data, query_params):
+    """
+    Valida el body de la estimación.
+
+    Retorna un dict con tipo, duracion, intensidad, fecha_hora (aware) y las
+    coordenadas/zona horaria opcionales. Lanza EstimateParamsError.
+    """
+    tipo = data.get('tipo_actividad')
+    duracion = data.get('duracion_minutos')
+    intensidad = data.get('intensidad')
+    fecha_hora_str = data.get('fecha_hora')
+
+    if not all([tipo, duracion is not None, intensidad, fecha_hora_str]):
+        raise EstimateParamsError('Faltan tipo_actividad, duracion_minutos, intensidad o fecha_hora')
+    try:
+        duracion = int(duracion)
+    except (TypeError, ValueError):
+        raise EstimateParamsError('duracion_minutos inválido')
+    if duracion < 1 or duracion > 1440:
+        raise EstimateParamsError('duracion_minutos debe estar entre 1 y 1440')
+
+    try:
+        # Aceptar ISO con o sin Z
+        s = fecha_hora_str.replace('Z', '+00:00').strip()
+        if len(s) == 19:
+            s += '+00:00'
+        activity_dt = dt.fromisoformat(s)
+        if activity_dt.tzinfo is None:
+            activity_dt = timezone.make_aware(activity_dt)
+    except (ValueError, TypeError, AttributeError):
+        raise EstimateParamsError('fecha_hora inválido (use formato ISO)')
+
+    # Zona horaria del usuario (ej. "America/Argentina/Buenos_Aires") para mostrar la hora del clima correcta
+    user_tz = (
+        data.get('tz') or data.get('timezone')
+        or query_params.get('tz') or query_params.get('timezone') or ''
+    ).strip() or None
+
+    return {
+        'tipo_actividad': tipo,
+        'duracion_minutos': duracion,
+        'intensidad': intensidad,
+        'fecha_hora': activity_dt,
+        'latitude': data.get('latitude'),
+        'longitude': data.get('longitude'),
+        'tz': user_tz,
+    }
+
+
+def fetch_estimate_weather(params):
+    """
+    Clima para la estimación: (weather_data, weather_error). Sin coordenadas
+    retorna (None, False).
+    """
+    if params['latitude'] is None or params['longitude'] is None:
+        return None, False
+    try:
+        return WeatherService().get_weather_data(
+            float(params['latitude']), float(params['longitude']),
+            params['fecha_hora'], user_timezone=params['tz']
+        ), False
+    except Exception as e:
+        logger.warning('Estimate weather error: %s', e)
+        return None, True
+
+
+async def afetch_estimate_weather(params):
+    """
+    Versión asíncrona de fetch_estimate_weather.
+    """
+    if params['latitude'] is None or params['longitude'] is None:
+        return None, False
+    try:
+        return await WeatherService().aget_weather_data(
+            float(params['latitude']), float(params['longitude']),
+            params['fecha_hora'], user_timezone=params['tz']
+        ), False
+    except Exception as e:
+        logger.warning('Estimate weather error: %s', e)
+        return None, True
+
+
+def build_estimate(user, params, weather_data=None, weather_error=False):
+    """
+    Calcula el PSE estimado y el ajuste climático.
+
+    ``weather_data`` es el resultado de WeatherService (None si no hubo
+    coordenadas); ``weather_error`` indica que la consulta falló.
+    """
+    temperature = None
+    humidity = None
+    weather_message = None
+
+    if weather_error:
+        weather_message = 'No se pudo obtener el clima para la estimación.'
+    elif weather_data is not None:
+        if weather_data.get('success'):
+            temperature = weather_data.get('temperature')
+            humidity = weather_data.get('humidity')
+            weather_message = weather_data.get('weather_message')
+        else:
+            weather_message = weather_data.get('weather_message') or 'Clima no disponible para esta ubicación.'
+
+    # Calcular PSE sin guardar (usuario solo para instancia mínima)
+    dummy = Actividad(
+        usuario=user,
+        tipo_actividad=params['tipo_actividad'],
+        duracion_minutos=params['duracion_minutos'],
+        intensidad=params['intensidad'],
+        fecha_hora=params['fecha_hora'],
+        pse_calculado=0,
+    )
+    estimated_pse = dummy.calcular_pse(temperature, humidity)
+    factor = dummy._calcular_factor_climatico(temperature, humidity)
+    climate_adjustment = f"{((factor - 1.0) * 100):+.0f}%" if factor != 1.0 else None
+
+    return {
+        'estimated_pse_ml': estimated_pse,
+        'weather_message': weather_message,
+        'climate_adjustment': climate_adjustment,
+    }
@@ -8,6 +8,9 @@ from typing import Optional, Dict, Tuple
 from zoneinfo import ZoneInfo
 from django.utils import timezone
 from django.core.cache import cache
+from asgiref.sync import sync_to_async
+
+from hydrotracker.async_http import get_async_client, httpx
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +21,8 @@ class WeatherService:
     """
     
     BASE_URL = "https://api.open-meteo.com/v1/forecast"
+    TIMEOUT = 10
+    CACHE_TIMEOUT = 1800
     
     def get_weather_data(
         self,
@@ -44,160 +49,240 @@ class WeatherService:
             - success: Boolean indicando si se obtuvo datos válidos
         """
         try:
-            # Convertir activity_datetime a UTC si tiene timezone
-            if activity_datetime.tzinfo:
-                activity_datetime_utc = activity_datetime.astimezone(timezone.utc)
-            else:
-                # Si no tiene timezone, asumir que es UTC
-                activity_datetime_utc = activity_datetime.replace(tzinfo=timezone.utc)
+            prepared = self._prepare_request(latitude, longitude, activity_datetime, user_timezone)
+            if 'success' in prepared:
+                return prepared
             
-            # Para buscar en la API y mostrar al usuario: usar hora en zona del usuario si se proporciona
-            if user_timezone:
+            data = cache.get(prepared['cache_key'])
+            if data is not None:
+                logger.debug(f"WeatherService cache HIT: {prepared['cache_key']}")
+            else:
+                logger.info(f'Consultando Open-Meteo: lat={latitude}, lon={longitude}, fecha={prepared["date_str"]}')
+                
+                # Hacer petición a la API
+                response = requests.get(self.BASE_URL, params=prepared['params'], timeout=self.TIMEOUT)
+                response.raise_for_status()
+                
+                data = response.json()
+                # Cachear por ~30 minutos para evitar 429 y mejorar performance
                 try:
-                    tz = ZoneInfo(user_timezone)
-                    activity_datetime_local = activity_datetime_utc.astimezone(tz)
+                    cache.set(prepared['cache_key'], data, timeout=self.CACHE_TIMEOUT)
+                    logger.debug(f"WeatherService cache SET: {prepared['cache_key']}")
                 except Exception:
-                    # Fallback: nombres comunes que pueden venir del cliente (ej. America/Buenos_Aires)
-                    _tz_fallback = {
-                        "America/Buenos_Aires": "America/Argentina/Buenos_Aires",
-                        "America/Mexico_City": "America/Mexico_City",
-                    }
-                    tz_name = _tz_fallback.get(user_timezone) or user_timezone
-                    try:
-                        tz = ZoneInfo(tz_name)
-                        activity_datetime_local = activity_datetime_utc.astimezone(tz)
-                    except Exception:
-                        activity_datetime_local = activity_datetime_utc
-            else:
-                activity_datetime_local = activity_datetime_utc
+                    logger.debug(f"No se pudo cachear respuesta de Open-Meteo para {prepared['cache_key']}")
             
-            # Verificar si la fecha es muy antigua (más de 7 días)
-            now_utc = timezone.now()
-            days_diff = (now_utc - activity_datetime_utc).days
+            return self._parse_response(data, prepared['local_datetime'])
             
-            if days_diff > 7:
-                logger.warning(
-                    f'Fecha de actividad muy antigua ({days_diff} días). '
-                    f'Usando valores neutros sin penalización climática.'
-                )
-                return {
-                    'temperature': None,
-                    'humidity': None,
-                    'weather_message': 'Datos climáticos no disponibles para fechas anteriores a 7 días. Sin ajuste climático.',
-                    'success': False
-                }
-            
-            # Formatear fecha para la API (YYYY-MM-DD). Usar fecha local si hay timezone
-            # para que la respuesta horaria coincida con el día del usuario.
-            date_str = activity_datetime_local.strftime('%Y-%m-%d')
+        except requests.exceptions.RequestException as e:
+            logger.error(f'Error al consultar Open-Meteo API: {str(e)}')
+            return self._request_error()
+        except Exception as e:
+            logger.exception(f'Error inesperado en WeatherService: {str(e)}')
+            return self._unexpected_error()
+    
+    async def aget_weather_data(
+        self,
+        latitude: float,
+        longitude: float,
+        activity_datetime: datetime,
+        user_timezone: Optional[str] = None
+    ) -> Dict[str, any]:
+        """
+        Versión asíncrona de get_weather_data para las vistas ASGI.
+        
+        Usa el cliente httpx compartido (hydrotracker.async_http), de modo que
+        la espera a Open-Meteo no ocupa un hilo. Sin httpx instalado delega en
+        get_weather_data en un hilo.
+        """
+        if httpx is None:
+            return await sync_to_async(self.get_weather_data, thread_sensitive=False)(
+                latitude, longitude, activity_datetime, user_timezone
+            )
+        try:
+            prepared = self._prepare_request(latitude, longitude, activity_datetime, user_timezone)
+            if 'success' in prepared:
+                return prepared
             
-            # Clave de caché por lat/lon/fecha para reducir llamadas a Open-Meteo
-            cache_key = f"weather:{round(latitude, 4)}:{round(longitude, 4)}:{date_str}"
-            data = cache.get(cache_key)
+            data = await cache.aget(prepared['cache_key'])
             if data is not None:
-                logger.debug(f"WeatherService cache HIT: {cache_key}")
+                logger.debug(f"WeatherService cache HIT: {prepared['cache_key']}")
             else:
-                # Construir URL de la API
-                url = f"{self.BASE_URL}"
-                params = {
-                    'latitude': latitude,
-                    'longitude': longitude,
-                    'hourly': 'temperature_2m,relative_humidity_2m',
-                    'timezone': 'auto',
-                    'start_date': date_str,
-                    'end_date': date_str
-                }
-                
-                logger.info(f'Consultando Open-Meteo: lat={latitude}, lon={longitude}, fecha={date_str}')
+                logger.info(f'Consultando Open-Meteo: lat={latitude}, lon={longitude}, fecha={prepared["date_str"]}')
                 
-                # Hacer petición a la API
-                response = requests.get(url, params=params, timeout=10)
+                response = await get_async_client().get(
+                    self.BASE_URL, params=prepared['params'], timeout=self.TIMEOUT
+                )
                 response.raise_for_status()
                 
                 data = response.json()
-                # Cachear por ~30 minutos para evitar 429 y mejorar performance
                 try:
-                    cache.set(cache_key, data, timeout=1800)
-                    logger.debug(f"WeatherService cache SET: {cache_key}")
+                    await cache.aset(prepared['cache_key'], data, timeout=self.CACHE_TIMEOUT)
+                    logger.debug(f"WeatherService cache SET: {prepared['cache_key']}")
                 except Exception:
-                    logger.debug(f"No se pudo cachear respuesta de Open-Meteo para {cache_key}")
-            
-            # Extraer arrays de datos horarios
-            hourly = data.get('hourly', {})
-            times = hourly.get('time', [])
-            temperatures = hourly.get('temperature_2m', [])
-            humidities = hourly.get('relative_humidity_2m', [])
-            
-            if not times or not temperatures or not humidities:
-                logger.warning('Open-Meteo no devolvió datos horarios válidos')
-                return {
-                    'temperature': None,
-                    'humidity': None,
-                    'weather_message': 'No se pudieron obtener datos climáticos. Sin ajuste climático.',
-                    'success': False
-                }
+                    logger.debug(f"No se pudo cachear respuesta de Open-Meteo para {prepared['cache_key']}")
             
-            # Encontrar el índice correspondiente a la hora de la actividad.
-            # Open-Meteo con timezone='auto' devuelve las horas en la zona local de la ubicación;
-            # usamos la hora local del usuario para coincidir con ese formato.
-            activity_hour = activity_datetime_local.strftime('%Y-%m-%dT%H:00')
+            return self._parse_response(data, prepared['local_datetime'])
             
+        except httpx.HTTPError as e:
+            logger.error(f'Error al consultar Open-Meteo API: {str(e)}')
+            return self._request_error()
+        except Exception as e:
+            logger.exception(f'Error inesperado en WeatherService: {str(e)}')
+            return self._unexpected_error()
+    
+    def _prepare_request(
+        self,
+        latitude: float,
+        longitude: float,
+        activity_datetime: datetime,
+        user_timezone: Optional[str]
+    ) -> Dict[str, any]:
+        """
+        Resuelve la hora local, la clave de caché y los parámetros de la
+        consulta. Si no corresponde consultar (fecha antigua) retorna
+        directamente el resultado, reconocible por la clave 'success'.
+        """
+        # Convertir activity_datetime a UTC si tiene timezone
+        if activity_datetime.tzinfo:
+            activity_datetime_utc = activity_datetime.astimezone(timezone.utc)
+        else:
+            # Si no tiene timezone, asumir que es UTC
+            activity_datetime_utc = activity_datetime.replace(tzinfo=timezone.utc)
+        
+        # Para buscar en la API y mostrar al usuario: usar hora en zona del usuario si se proporciona
+        if user_timezone:
             try:
-                # Buscar el índice exacto
-                index = times.index(activity_hour)
-            except ValueError:
-                # Si no se encuentra la hora exacta, buscar la más cercana
-                logger.warning(f'Hora exacta {activity_hour} no encontrada, buscando la más cercana')
-                index = self._find_closest_hour_index(times, activity_datetime_local)
-            
-            if index is None or index >= len(temperatures) or index >= len(humidities):
-                logger.warning('Índice de hora no válido')
-                return {
-                    'temperature': None,
-                    'humidity': None,
-                    'weather_message': 'No se encontró la hora correspondiente en los datos climáticos. Sin ajuste climático.',
-                    'success': False
+                tz = ZoneInfo(user_timezone)
+                activity_datetime_local = activity_datetime_utc.astimezone(tz)
+            except Exception:
+                # Fallback: nombres comunes que pueden venir del cliente (ej. America/Buenos_Aires)
+                _tz_fallback = {
+                    "America/Buenos_Aires": "America/Argentina/Buenos_Aires",
+                    "America/Mexico_City": "America/Mexico_City",
                 }
-            
-            temperature = temperatures[index]
-            humidity = humidities[index]
-            
-            # Formatear hora para el mensaje en la zona del usuario
-            hora_formateada = activity_datetime_local.strftime('%H:%M')
-            
-            weather_message = (
-                f'El clima a las {hora_formateada} era de {temperature:.1f}°C '
-                f'con {humidity:.0f}% de humedad.'
-            )
-            
-            logger.info(
-                f'Datos climáticos obtenidos: T={temperature}°C, H={humidity}%, '
-                f'hora_local={activity_hour}'
+                tz_name = _tz_fallback.get(user_timezone) or user_timezone
+                try:
+                    tz = ZoneInfo(tz_name)
+                    activity_datetime_local = activity_datetime_utc.astimezone(tz)
+                except Exception:
+                    activity_datetime_local = activity_datetime_utc
+        else:
+            activity_datetime_local = activity_datetime_utc
+        
+        # Verificar si la fecha es muy antigua (más de 7 días)
+        now_utc = timezone.now()
+        days_diff = (now_utc - activity_datetime_utc).days
+        
+        if days_diff > 7:
+            logger.warning(
+                f'Fecha de actividad muy antigua ({days_diff} días). '
+                f'Usando valores neutros sin penalización climática.'
             )
-            
             return {
-                'temperature': float(temperature),
-                'humidity': float(humidity),
-                'weather_message': weather_message,
-                'success': True
+                'temperature': None,
+                'humidity': None,
+                'weather_message': 'Datos climáticos no disponibles para fechas anteriores a 7 días. Sin ajuste climático.',
+                'success': False
             }
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f'Error al consultar Open-Meteo API: {str(e)}')
+        
+        # Formatear fecha para la API (YYYY-MM-DD). Usar fecha local si hay timezone
+        # para que la respuesta horaria coincida con el día del usuario.
+        date_str = activity_datetime_local.strftime('%Y-%m-%d')
+        
+        return {
+            'local_datetime': activity_datetime_local,
+            'date_str': date_str,
+            # Clave de caché por lat/lon/fecha para reducir llamadas a Open-Meteo
+            'cache_key': f"weather:{round(latitude, 4)}:{round(longitude, 4)}:{date_str}",
+            'params': {
+                'latitude': latitude,
+                'longitude': longitude,
+                'hourly': 'temperature_2m,relative_humidity_2m',
+                'timezone': 'auto',
+                'start_date': date_str,
+                'end_date': date_str
+            },
+        }
+    
+    def _parse_response(self, data: dict, activity_datetime_local: datetime) -> Dict[str, any]:
+        """
+        Extrae temperatura y humedad de la hora de la actividad.
+        """
+        # Extraer arrays de datos horarios
+        hourly = data.get('hourly', {})
+        times = hourly.get('time', [])
+        temperatures = hourly.get('temperature_2m', [])
+        humidities = hourly.get('relative_humidity_2m', [])
+        
+        if not times or not temperatures or not humidities:
+            logger.warning('Open-Meteo no devolvió datos horarios válidos')
             return {
                 'temperature': None,
                 'humidity': None,
-                'weather_message': 'Error al consultar datos climáticos. Sin ajuste climático.',
+                'weather_message': 'No se pudieron obtener datos climáticos. Sin ajuste climático.',
                 'success': False
             }
-        except Exception as e:
-            logger.exception(f'Error inesperado en WeatherService: {str(e)}')
+        
+        # Encontrar el índice correspondiente a la hora de la actividad.
+        # Open-Meteo con timezone='auto' devuelve las horas en la zona local de la ubicación;
+        # usamos la hora local del usuario para coincidir con ese formato.
+        activity_hour = activity_datetime_local.strftime('%Y-%m-%dT%H:00')
+        
+        try:
+            # Buscar el índice exacto
+            index = times.index(activity_hour)
+        except ValueError:
+            # Si no se encuentra la hora exacta, buscar la más cercana
+            logger.warning(f'Hora exacta {activity_hour} no encontrada, buscando la más cercana')
+            index = self._find_closest_hour_index(times, activity_datetime_local)
+        
+        if index is None or index >= len(temperatures) or index >= len(humidities):
+            logger.warning('Índice de hora no válido')
             return {
                 'temperature': None,
                 'humidity': None,
-                'weather_message': 'Error al procesar datos climáticos. Sin ajuste climático.',
+                'weather_message': 'No se encontró la hora correspondiente en los datos climáticos. Sin ajuste climático.',
                 'success': False
             }
+        
+        temperature = temperatures[index]
+        humidity = humidities[index]
+        
+        # Formatear hora para el mensaje en la zona del usuario
+        hora_formateada = activity_datetime_local.strftime('%H:%M')
+        
+        weather_message = (
+            f'El clima a las {hora_formateada} era de {temperature:.1f}°C '
+            f'con {humidity:.0f}% de humedad.'
+        )
+        
+        logger.info(
+            f'Datos climáticos obtenidos: T={temperature}°C, H={humidity}%, '
+            f'hora_local={activity_hour}'
+        )
+        
+        return {
+            'temperature': float(temperature),
+            'humidity': float(humidity),
+            'weather_message': weather_message,
+            'success': True
+        }
+    
+    def _request_error(self) -> Dict[str, any]:
+        return {
+            'temperature': None,
+            'humidity': None,
+            'weather_message': 'Error al consultar datos climáticos. Sin ajuste climático.',
+            'success': False
+        }
+    
+    def _unexpected_error(self) -> Dict[str, any]:
+        return {
+            'temperature': None,
+            'humidity': None,
+            'weather_message': 'Error al procesar datos climáticos. Sin ajuste climático.',
+            'success': False
+        }
     
     def _find_closest_hour_index(self, times: list, target_datetime: datetime) -> Optional[int]:
         """
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import ActividadViewSet
@@ -5,7 +6,20 @@ from .views import ActividadViewSet
 router = DefaultRouter()
 router.register(r'actividades', ActividadViewSet, basename='actividad')
 
-urlpatterns = [
+urlpatterns = []
+
+if settings.ASYNC_VIEWS:
+    # Antes del router: atienden las mismas URLs y delegan el resto de métodos
+    from .async_views import (
+        ActividadDetailAsyncView, ActividadEstimateAsyncView, ActividadListAsyncView
+    )
+
+    urlpatterns += [
+        path('actividades/', ActividadListAsyncView.as_view(), name='actividad-list-async'),
+        path('actividades/estimate/', ActividadEstimateAsyncView.as_view(), name='actividad-estimate-async'),
+        path('actividades/<int:pk>/', ActividadDetailAsyncView.as_view(), name='actividad-detail-async'),
+    ]
+
+urlpatterns += [
     path('', include(router.urls)),
 ]
-
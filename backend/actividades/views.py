@@ -8,18 +8,33 @@ from django.db import transaction
 from django.db.models import Q
 from datetime import date, timedelta, datetime as dt
 from .models import Actividad
-from .serializers import ActividadSerializer, ActividadCreateSerializer
-from .services.weather_service import WeatherService
+from .serializers import ActividadSerializer, ActividadCreateSerializer, ActividadFastSerializer
+from .services.estimate_service import (
+    EstimateParamsError, build_estimate, fetch_estimate_weather, parse_estimate_params
+)
+from consumos.views.base_views import FastListMixin, SparseFieldsMixin
 
 logger = logging.getLogger(__name__)
 
 
-class ActividadViewSet(viewsets.ModelViewSet):
+class ActividadViewSet(SparseFieldsMixin, FastListMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar actividades físicas del usuario.
+    Los listados usan la ruta rápida de solo lectura (ActividadFastSerializer);
+    list y retrieve admiten proyección con ?fields=.
     """
     permission_classes = [IsAuthenticated]
     serializer_class = ActividadSerializer
+    fast_serializer_class = ActividadFastSerializer
+    # El listado ya proyecta en ActividadFastSerializer
+    sparse_actions = ('retrieve',)
+    sparse_field_sources = {
+        'tipo_actividad_display': ('tipo_actividad',),
+        'intensidad_display': ('intensidad',),
+        # Solo existen tras crear/actualizar
+        'weather_message': (),
+        'climate_adjustment': (),
+    }
     
     def get_queryset(self):
         """Retorna solo las actividades del usuario autenticado."""
@@ -74,8 +89,7 @@ class ActividadViewSet(viewsets.ModelViewSet):
             fecha_hora__range=[inicio_dia, fin_dia]
         ).order_by('-fecha_hora')
         
-        serializer = self.get_serializer(actividades, many=True)
-        return Response(serializer.data)
+        return Response(self.get_fast_serializer().serialize_queryset(actividades))
     
     @action(detail=False, methods=['get'])
     def resumen_dia(self, request):
@@ -100,16 +114,13 @@ class ActividadViewSet(viewsets.ModelViewSet):
             fecha_hora__range=[inicio_dia, fin_dia]
         )
         
-        pse_total = sum(actividad.pse_calculado for actividad in actividades)
-        cantidad_actividades = actividades.count()
-        
-        serializer = self.get_serializer(actividades, many=True)
+        data = self.get_fast_serializer().serialize_queryset(actividades)
         
         return Response({
             'fecha': fecha.isoformat(),
-            'cantidad_actividades': cantidad_actividades,
-            'pse_total': pse_total,
-            'actividades': serializer.data
+            'cantidad_actividades': len(data),
+            'pse_total': sum(actividad['pse_calculado'] for actividad in data),
+            'actividades': data
         })
 
     @action(detail=False, methods=['post'], url_path='estimate')
@@ -118,82 +129,13 @@ class ActividadViewSet(viewsets.ModelViewSet):
         Estima el PSE (ml) y ajuste climático sin guardar la actividad.
         Body: tipo_actividad, duracion_minutos, intensidad, fecha_hora (ISO), latitude, longitude.
         """
-        tipo = request.data.get('tipo_actividad')
-        duracion = request.data.get('duracion_minutos')
-        intensidad = request.data.get('intensidad')
-        fecha_hora_str = request.data.get('fecha_hora')
-        latitude = request.data.get('latitude')
-        longitude = request.data.get('longitude')
-
-        if not all([tipo, duracion is not None, intensidad, fecha_hora_str]):
-            return Response(
-                {'error': 'Faltan tipo_actividad, duracion_minutos, intensidad o fecha_hora'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        try:
-            duracion = int(duracion)
-            if duracion < 1 or duracion > 1440:
-                return Response(
-                    {'error': 'duracion_minutos debe estar entre 1 y 1440'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-        except (TypeError, ValueError):
-            return Response({'error': 'duracion_minutos inválido'}, status=status.HTTP_400_BAD_REQUEST)
-
         try:
-            # Aceptar ISO con o sin Z
-            s = fecha_hora_str.replace('Z', '+00:00').strip()
-            if len(s) == 19:
-                s += '+00:00'
-            activity_dt = dt.fromisoformat(s)
-            if activity_dt.tzinfo is None:
-                activity_dt = timezone.make_aware(activity_dt)
-        except (ValueError, TypeError, AttributeError):
-            return Response({'error': 'fecha_hora inválido (use formato ISO)'}, status=status.HTTP_400_BAD_REQUEST)
-
-        temperature = None
-        humidity = None
-        weather_message = None
+            params = parse_estimate_params(request.data, request.query_params)
+        except EstimateParamsError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Zona horaria del usuario (ej. "America/Argentina/Buenos_Aires") para mostrar la hora del clima correcta
-        user_tz = (request.data.get('tz') or request.data.get('timezone') or request.query_params.get('tz') or request.query_params.get('timezone') or '').strip() or None
-
-        if latitude is not None and longitude is not None:
-            try:
-                lat_f = float(latitude)
-                lon_f = float(longitude)
-                weather_service = WeatherService()
-                weather_data = weather_service.get_weather_data(
-                    lat_f, lon_f, activity_dt, user_timezone=user_tz
-                )
-                if weather_data.get('success'):
-                    temperature = weather_data.get('temperature')
-                    humidity = weather_data.get('humidity')
-                    weather_message = weather_data.get('weather_message')
-                else:
-                    weather_message = weather_data.get('weather_message') or 'Clima no disponible para esta ubicación.'
-            except Exception as e:
-                logger.warning('Estimate weather error: %s', e)
-                weather_message = 'No se pudo obtener el clima para la estimación.'
-
-        # Calcular PSE sin guardar (usuario solo para instancia mínima)
-        dummy = Actividad(
-            usuario=request.user,
-            tipo_actividad=tipo,
-            duracion_minutos=duracion,
-            intensidad=intensidad,
-            fecha_hora=activity_dt,
-            pse_calculado=0,
-        )
-        estimated_pse = dummy.calcular_pse(temperature, humidity)
-        factor = dummy._calcular_factor_climatico(temperature, humidity)
-        climate_adjustment = f"{((factor - 1.0) * 100):+.0f}%" if factor != 1.0 else None
-
-        return Response({
-            'estimated_pse_ml': estimated_pse,
-            'weather_message': weather_message,
-            'climate_adjustment': climate_adjustment,
-        })
+        weather_data, weather_error = fetch_estimate_weather(params)
+        return Response(build_estimate(request.user, params, weather_data, weather_error))
 
     @action(detail=False, methods=['post'], url_path='bulk')
     def bulk(self, request):
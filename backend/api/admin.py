@@ -0,0 +1,14 @@
+from django.contrib import admin
+from .models import EventoWebhook
+
+
+@admin.register(EventoWebhook)
+class EventoWebhookAdmin(admin.ModelAdmin):
+    list_display = [
+        'topic', 'resource_id', 'estado', 'intentos', 'recibido_veces',
+        'resultado', 'fecha_recepcion', 'fecha_procesado'
+    ]
+    list_filter = ['estado', 'topic', 'live_mode']
+    search_fields = ['resource_id']
+    ordering = ['-fecha_recepcion']
+    readonly_fields = ['fecha_recepcion', 'fecha_procesado', 'ultimo_error']
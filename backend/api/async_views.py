@@ -0,0 +1,154 @@
+"""
+Vistas asíncronas de suscripción (se montan con ASYNC_VIEWS=True).
+
+Misma lógica que api.views pero la llamada a Mercado Pago se hace con
+AsyncMercadoPagoClient y no ocupa un hilo; solo el guardado del usuario pasa
+por sync_to_async.
+"""
+
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from hydrotracker.async_views import AsyncAPIView
+from .subscriptions import (
+    REACTIVATION_BODY, AsyncMercadoPagoClient, InvalidPlanError, build_checkout,
+    cancellation_body, cancellation_precheck, checkout_result, is_test_subscription,
+    reactivation_precheck, set_auto_renewal
+)
+
+logger = logging.getLogger(__name__)
+
+
+@sync_to_async
+def _save_auto_renewal(user, value):
+    with transaction.atomic():
+        set_auto_renewal(user, value)
+
+
+def _mp_client():
+    mp_access_token = getattr(settings, 'MP_ACCESS_TOKEN', None)
+    if not mp_access_token:
+        logger.error('MP_ACCESS_TOKEN no está configurado en settings')
+        return None
+    return AsyncMercadoPagoClient(mp_access_token)
+
+
+class AsyncCreateSubscriptionView(AsyncAPIView):
+    """
+    Equivalente async de CreateSubscriptionView.
+    """
+
+    async def post(self, request):
+        try:
+            client = _mp_client()
+            if client is None:
+                return Response(
+                    {'error': 'Configuración de pago no disponible'},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                )
+            try:
+                resource, payload = build_checkout(request.data.get('planType'), request.user)
+            except InvalidPlanError:
+                return Response({"error": "Plan inválido"}, status=status.HTTP_400_BAD_REQUEST)
+
+            if resource == 'preference':
+                response = await client.create_preference(payload)
+            else:
+                response = await client.create_preapproval(payload)
+
+            body, status_code = checkout_result(response)
+            if status_code != status.HTTP_200_OK:
+                logger.warning("Error MP %s: %s", resource, response.get("response", {}))
+            return Response(body, status=status_code)
+        except Exception as e:
+            logger.exception(f'Error al crear suscripción: {str(e)}')
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class AsyncCancelSubscriptionView(AsyncAPIView):
+    """
+    Equivalente async de CancelSubscriptionView.
+    """
+
+    async def post(self, request):
+        try:
+            user = request.user
+            rejection = cancellation_precheck(user)
+            if rejection:
+                body, status_code = rejection
+                return Response(body, status=status_code)
+
+            if not is_test_subscription(user):
+                client = _mp_client()
+                if client is None:
+                    return Response(
+                        {'error': 'Configuración de pago no disponible'},
+                        status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                    )
+                logger.info(f'Cancelando preapproval {user.preapproval_id} para usuario {user.id}')
+                response = await client.update_preapproval(user.preapproval_id, {"status": "cancelled"})
+                if response.get('status') not in (200, 201):
+                    error_msg = response.get('response', {}).get('message', 'Error desconocido de Mercado Pago')
+                    logger.error(f'Error al cancelar preapproval {user.preapproval_id}: {response}')
+                    return Response(
+                        {'error': f'Error al cancelar en Mercado Pago: {error_msg}'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+
+            # NO quitamos es_premium: el usuario mantiene acceso hasta subscription_end_date
+            await _save_auto_renewal(user, False)
+            logger.info(f'Usuario {user.id}: suscripción cancelada (preapproval_id={user.preapproval_id})')
+            return Response(cancellation_body(user), status=status.HTTP_200_OK)
+        except Exception as e:
+            logger.exception(f'Error al cancelar suscripción: {str(e)}')
+            return Response(
+                {'error': 'Error al procesar la cancelación. Por favor, intenta nuevamente o contacta con soporte.'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class AsyncReactivateSubscriptionView(AsyncAPIView):
+    """
+    Equivalente async de ReactivateSubscriptionView.
+    """
+
+    async def post(self, request):
+        try:
+            user = request.user
+            rejection = reactivation_precheck(user)
+            if rejection:
+                body, status_code = rejection
+                return Response(body, status=status_code)
+
+            if not is_test_subscription(user):
+                client = _mp_client()
+                if client is None:
+                    return Response(
+                        {'error': 'Configuración de pago no disponible.'},
+                        status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                    )
+                response = await client.update_preapproval(user.preapproval_id, {"status": "authorized"})
+                if response.get('status') not in (200, 201):
+                    logger.warning(f'MP no permitió reactivar preapproval {user.preapproval_id}: {response}')
+                    return Response(
+                        {
+                            'error': 'No es posible reactivar esta suscripción en la pasarela de pagos. '
+                                     'Puedes volver a suscribirte cuando finalice tu período actual.'
+                        },
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+
+            await _save_auto_renewal(user, True)
+            logger.info(f'Usuario {user.id}: suscripción reactivada (preapproval_id={user.preapproval_id})')
+            return Response(REACTIVATION_BODY, status=status.HTTP_200_OK)
+        except Exception as e:
+            logger.exception(f'Error al reactivar suscripción: {str(e)}')
+            return Response(
+                {'error': 'Error al procesar la reactivación. Intenta de nuevo o contacta con soporte.'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
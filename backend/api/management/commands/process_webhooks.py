@@ -0,0 +1,46 @@
+"""
+Comando de Django para procesar la cola de webhooks de Mercado Pago
+(EventoWebhook). Con --loop queda corriendo como worker.
+"""
+from django.core.management.base import BaseCommand
+
+from api.services import WebhookWorker
+
+
+class Command(BaseCommand):
+    help = 'Procesa los eventos de webhook de Mercado Pago pendientes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Eventos reservados por lote',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Consultas simultáneas a Mercado Pago',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Ejecutar de forma continua (worker)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Segundos de espera cuando la cola está vacía (con --loop)',
+        )
+
+    def handle(self, *args, **options):
+        worker = WebhookWorker(batch_size=options['batch_size'], max_workers=options['workers'])
+        if options['loop']:
+            self.stdout.write('Worker de webhooks iniciado')
+            worker.run(interval=options['interval'])
+            return
+
+        procesados = worker.drain()
+        self.stdout.write(self.style.SUCCESS(f'Eventos procesados: {procesados}'))
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.16 on 2026-10-19 01:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoWebhook',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic', models.CharField(help_text='Tipo de notificación (preapproval, payment)', max_length=50, verbose_name='Tópico')),
+                ('resource_id', models.CharField(help_text='preapproval_id o payment_id en Mercado Pago', max_length=100, verbose_name='ID del recurso')),
+                ('live_mode', models.BooleanField(default=False, verbose_name='Modo live')),
+                ('payload', models.JSONField(blank=True, default=dict, help_text='Cuerpo y query params de la última notificación recibida', verbose_name='Payload')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('procesando', 'Procesando'), ('procesado', 'Procesado'), ('error', 'Error')], default='pendiente', max_length=20, verbose_name='Estado')),
+                ('intentos', models.PositiveSmallIntegerField(default=0, verbose_name='Intentos')),
+                ('recibido_veces', models.PositiveIntegerField(default=1, verbose_name='Veces recibido')),
+                ('proximo_intento', models.DateTimeField(help_text='Cuándo puede tomarlo un worker (también vence la reserva de uno caído)', verbose_name='Próximo intento')),
+                ('resultado', models.CharField(blank=True, max_length=100, verbose_name='Resultado')),
+                ('ultimo_error', models.TextField(blank=True, verbose_name='Último error')),
+                ('fecha_recepcion', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de recepción')),
+                ('fecha_procesado', models.DateTimeField(blank=True, null=True, verbose_name='Fecha de procesado')),
+            ],
+            options={
+                'verbose_name': 'Evento de webhook',
+                'verbose_name_plural': 'Eventos de webhook',
+                'ordering': ['-fecha_recepcion'],
+                'indexes': [models.Index(fields=['estado', 'proximo_intento'], name='api_eventow_estado_df7cf4_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='eventowebhook',
+            constraint=models.UniqueConstraint(fields=('topic', 'resource_id'), name='evento_webhook_unico'),
+        ),
+    ]
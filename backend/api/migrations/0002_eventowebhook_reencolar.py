@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-19 03:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventowebhook',
+            name='reencolar',
+            field=models.BooleanField(default=False, help_text='Llegó otra notificación mientras se procesaba: volver a procesar al terminar', verbose_name='Reencolar'),
+        ),
+    ]
@@ -0,0 +1,107 @@
+"""
+Modelos de la API de suscripciones.
+"""
+
+from django.db import models
+
+
+class EventoWebhook(models.Model):
+    """
+    Notificación de Mercado Pago pendiente de procesar.
+
+    El webhook solo inserta la fila y responde 200; el worker
+    (api.services.WebhookWorker) consulta el recurso en Mercado Pago y aplica
+    el cambio. La clave única (topic, resource_id) deduplica los reenvíos:
+    una notificación repetida mientras la anterior está pendiente no crea
+    trabajo nuevo, y una que llega después de procesada vuelve a encolar el
+    mismo evento (el recurso puede haber cambiado de estado). Si llega
+    mientras un worker lo procesa, se marca ``reencolar`` y el evento vuelve
+    a la cola al terminar, porque el worker pudo leer el estado anterior.
+    """
+    ESTADO_PENDIENTE = 'pendiente'
+    ESTADO_PROCESANDO = 'procesando'
+    ESTADO_PROCESADO = 'procesado'
+    ESTADO_ERROR = 'error'
+
+    ESTADO_CHOICES = [
+        (ESTADO_PENDIENTE, 'Pendiente'),
+        (ESTADO_PROCESANDO, 'Procesando'),
+        (ESTADO_PROCESADO, 'Procesado'),
+        (ESTADO_ERROR, 'Error'),
+    ]
+
+    topic = models.CharField(
+        max_length=50,
+        verbose_name='Tópico',
+        help_text='Tipo de notificación (preapproval, payment)'
+    )
+    resource_id = models.CharField(
+        max_length=100,
+        verbose_name='ID del recurso',
+        help_text='preapproval_id o payment_id en Mercado Pago'
+    )
+    live_mode = models.BooleanField(
+        default=False,
+        verbose_name='Modo live'
+    )
+    payload = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Payload',
+        help_text='Cuerpo y query params de la última notificación recibida'
+    )
+    estado = models.CharField(
+        max_length=20,
+        choices=ESTADO_CHOICES,
+        default=ESTADO_PENDIENTE,
+        verbose_name='Estado'
+    )
+    intentos = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Intentos'
+    )
+    recibido_veces = models.PositiveIntegerField(
+        default=1,
+        verbose_name='Veces recibido'
+    )
+    reencolar = models.BooleanField(
+        default=False,
+        verbose_name='Reencolar',
+        help_text='Llegó otra notificación mientras se procesaba: volver a procesar al terminar'
+    )
+    proximo_intento = models.DateTimeField(
+        verbose_name='Próximo intento',
+        help_text='Cuándo puede tomarlo un worker (también vence la reserva de uno caído)'
+    )
+    resultado = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name='Resultado'
+    )
+    ultimo_error = models.TextField(
+        blank=True,
+        verbose_name='Último error'
+    )
+    fecha_recepcion = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha de recepción'
+    )
+    fecha_procesado = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Fecha de procesado'
+    )
+
+    class Meta:
+        verbose_name = 'Evento de webhook'
+        verbose_name_plural = 'Eventos de webhook'
+        ordering = ['-fecha_recepcion']
+        constraints = [
+            models.UniqueConstraint(fields=['topic', 'resource_id'], name='evento_webhook_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['estado', 'proximo_intento']),
+        ]
+
+    def __str__(self):
+        return f"{self.topic}:{self.resource_id} ({self.estado})"
@@ -0,0 +1,435 @@
+"""
+Procesamiento asíncrono de los webhooks de Mercado Pago.
+
+MercadoPagoWebhookView solo registra la notificación (enqueue_webhook) y
+responde 200. WebhookWorker toma lotes de eventos con SKIP LOCKED, consulta
+los recursos en Mercado Pago con concurrencia acotada (hilos, solo HTTP) y
+aplica los cambios desde el hilo principal. Los errores transitorios se
+reintentan con backoff exponencial; tras MP_WEBHOOK_MAX_ATTEMPTS el evento
+queda en estado error.
+
+La activación es idempotente: el estado del usuario (plan, renovación y
+fecha de fin) se deriva del recurso de Mercado Pago, y solo se escribe si
+difiere de lo guardado. Reprocesar la misma notificación no cambia nada; una
+renovación (nuevo next_payment_date) mueve la fecha de fin.
+"""
+
+import logging
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import mercadopago
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from mercadopago.http import HttpClient
+
+from consumos.utils.cache_utils import ResourceVersion
+from users.models import User
+from .models import EventoWebhook
+
+logger = logging.getLogger(__name__)
+
+MP_DEFAULT_BASE_URL = 'https://api.mercadopago.com'
+
+# Tópicos equivalentes: se guardan con el mismo nombre para deduplicar
+TOPIC_ALIASES = {'subscription_preapproval': 'preapproval'}
+SUPPORTED_TOPICS = frozenset({'preapproval', 'payment'})
+
+# Reserva de un evento tomado por un worker; si el worker muere, vence y
+# otro lo retoma
+CLAIM_LEASE = timedelta(minutes=5)
+
+
+class RetryableWebhookError(Exception):
+    """
+    Error transitorio (red, 5xx, 429): el evento se reintenta más tarde.
+    """
+
+
+class BaseUrlHttpClient(HttpClient):
+    """
+    HttpClient del SDK que redirige las llamadas a MP_API_BASE_URL (por
+    ejemplo, a un servidor falso en los tests).
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, url, maxretries=None, **kwargs):
+        if url.startswith(MP_DEFAULT_BASE_URL):
+            url = self.base_url + url[len(MP_DEFAULT_BASE_URL):]
+        return super().request(method, url, maxretries=maxretries, **kwargs)
+
+
+def get_mp_sdk(access_token=None):
+    """
+    SDK de Mercado Pago con el token y la URL base de settings.
+    """
+    access_token = access_token or settings.MP_ACCESS_TOKEN
+    base_url = getattr(settings, 'MP_API_BASE_URL', MP_DEFAULT_BASE_URL)
+    http_client = None if base_url == MP_DEFAULT_BASE_URL else BaseUrlHttpClient(base_url)
+    return mercadopago.SDK(access_token, http_client=http_client)
+
+
+def enqueue_webhook(topic, resource_id, payload=None, live_mode=False, now=None):
+    """
+    Registra una notificación. Retorna (evento, creado).
+
+    Si ya existe un evento con la misma clave, se suma la recepción; si ya
+    estaba procesado (o en error) se vuelve a encolar sin duplicar la fila, y
+    si un worker lo está procesando se marca para reencolarlo al terminar.
+    """
+    now = now or timezone.now()
+    topic = TOPIC_ALIASES.get(topic, topic)
+    resource_id = str(resource_id)
+    try:
+        with transaction.atomic():
+            evento = EventoWebhook.objects.create(
+                topic=topic, resource_id=resource_id, payload=payload or {},
+                live_mode=bool(live_mode), proximo_intento=now
+            )
+        return evento, True
+    except IntegrityError:
+        pass
+
+    finalizado = Q(estado__in=[EventoWebhook.ESTADO_PROCESADO, EventoWebhook.ESTADO_ERROR])
+
+    def reiniciar(field, value):
+        # Solo los eventos finalizados vuelven a la cola
+        return Case(
+            When(finalizado, then=Value(value)), default=F(field),
+            output_field=EventoWebhook._meta.get_field(field)
+        )
+
+    EventoWebhook.objects.filter(topic=topic, resource_id=resource_id).update(
+        recibido_veces=F('recibido_veces') + 1,
+        payload=payload or {},
+        intentos=reiniciar('intentos', 0),
+        proximo_intento=reiniciar('proximo_intento', now),
+        estado=reiniciar('estado', EventoWebhook.ESTADO_PENDIENTE),
+        # El worker pudo consultar el recurso antes del cambio notificado
+        reencolar=Case(
+            When(estado=EventoWebhook.ESTADO_PROCESANDO, then=Value(True)), default=F('reencolar'),
+            output_field=EventoWebhook._meta.get_field('reencolar')
+        ),
+    )
+    return EventoWebhook.objects.get(topic=topic, resource_id=resource_id), False
+
+
+def backoff_delay(intentos, base=None, maximo=None):
+    """
+    Espera antes del siguiente intento: exponencial con jitter.
+    """
+    base = base if base is not None else settings.MP_WEBHOOK_RETRY_BASE_SECONDS
+    maximo = maximo if maximo is not None else settings.MP_WEBHOOK_RETRY_MAX_SECONDS
+    delay = min(base * (2 ** max(intentos - 1, 0)), maximo)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+# Aplicación de los recursos
+
+def _parse_user_id(external_reference):
+    try:
+        return int(external_reference)
+    except (TypeError, ValueError):
+        return None
+
+
+def _fecha_mp(value):
+    """
+    Día local de una fecha ISO de Mercado Pago, o None.
+    """
+    fecha = parse_datetime(value) if isinstance(value, str) else None
+    if fecha is None:
+        return None
+    if timezone.is_naive(fecha):
+        fecha = timezone.make_aware(fecha)
+    return timezone.localdate(fecha)
+
+
+def _fin_suscripcion(data, days, user, preapproval_id, plan_type):
+    """
+    Fecha de fin de una suscripción según el preapproval: el próximo cobro o,
+    si no viene, el último cobro más el periodo. Sin fechas en el recurso se
+    conserva la fecha vigente de la misma suscripción, o se calcula desde hoy.
+    """
+    proximo = _fecha_mp(data.get('next_payment_date'))
+    if proximo:
+        return proximo
+    ultimo_cobro = _fecha_mp((data.get('summarized') or {}).get('last_charged_date'))
+    if ultimo_cobro:
+        return ultimo_cobro + timedelta(days=days)
+    hoy = timezone.localdate()
+    if (
+        user.preapproval_id == preapproval_id and user.plan_type == plan_type
+        and user.subscription_end_date and user.subscription_end_date >= hoy
+    ):
+        return user.subscription_end_date
+    return hoy + timedelta(days=days)
+
+
+def activate_premium(external_reference, data):
+    """
+    Activa o renueva el premium del usuario a partir de un preapproval
+    autorizado o un pago aprobado. Retorna el resultado como texto.
+    """
+    user_id = _parse_user_id(external_reference)
+    if user_id is None:
+        logger.error(f'external_reference inválido: {external_reference}')
+        return 'referencia_invalida'
+
+    recurrente = 'auto_recurring' in data
+    if recurrente:
+        # Suscripción recurrente (monthly o annual)
+        frequency = data['auto_recurring'].get('frequency', 1)
+        frequency_type = data['auto_recurring'].get('frequency_type', 'months')
+        preapproval_id = data.get('id')
+        if frequency_type == 'months':
+            plan_type = 'annual' if frequency == 12 else 'monthly'
+            days = frequency * 30
+        else:
+            plan_type = 'monthly'
+            days = 30
+    else:
+        # Pago único (lifetime), sin fecha de fin
+        plan_type = 'lifetime'
+        preapproval_id = None
+
+    with transaction.atomic():
+        user = User.objects.select_for_update().filter(id=user_id).first()
+        if user is None:
+            logger.error(f'Usuario con id {user_id} no encontrado')
+            return 'usuario_no_encontrado'
+
+        # Un lifetime no pasa a suscripción
+        if user.es_premium and user.plan_type == 'lifetime':
+            return 'ya_activo'
+
+        estado = {
+            'es_premium': True,
+            'plan_type': plan_type,
+            'preapproval_id': preapproval_id,
+            # Autorizado en Mercado Pago: se renueva (también tras reactivar allí)
+            'auto_renewal': True,
+        }
+        if recurrente:
+            estado['subscription_end_date'] = _fin_suscripcion(data, days, user, preapproval_id, plan_type)
+        update_fields = [campo for campo, valor in estado.items() if getattr(user, campo) != valor]
+        if not update_fields:
+            return 'ya_activo'
+        renovacion = user.es_premium and user.preapproval_id == preapproval_id
+        for campo in update_fields:
+            setattr(user, campo, estado[campo])
+        user.save(update_fields=update_fields)
+
+    logger.info(
+        f'Usuario {user_id} {"renovado" if renovacion else "activado como premium"}. Plan: {plan_type}, '
+        f'Preapproval ID: {preapproval_id}, Fecha fin: {estado.get("subscription_end_date")}'
+    )
+    return 'renovado' if renovacion else 'activado'
+
+
+def handle_cancellation(external_reference, data):
+    """
+    Desactiva la renovación automática. El usuario mantiene el premium hasta
+    subscription_end_date (lo desactiva users.services.expire_subscriptions).
+    """
+    user_id = _parse_user_id(external_reference)
+    if user_id is None:
+        logger.error(f'external_reference inválido: {external_reference}')
+        return 'referencia_invalida'
+
+    actualizados = User.objects.filter(id=user_id, auto_renewal=True).update(auto_renewal=False)
+    if not actualizados:
+        return 'ya_cancelado' if User.objects.filter(id=user_id).exists() else 'usuario_no_encontrado'
+    # update() no dispara post_save: se invalida la versión del perfil a mano
+    ResourceVersion.bump('perfil', user_id)
+    logger.info(f'Usuario {user_id}: Renovación automática desactivada por cancelación')
+    return 'cancelado'
+
+
+def fetch_resource(sdk, evento):
+    """
+    Consulta el recurso del evento en Mercado Pago (solo HTTP, apto para
+    hilos). Retorna la respuesta del SDK o lanza RetryableWebhookError.
+    """
+    try:
+        if evento.topic == 'preapproval':
+            response = sdk.preapproval().get(evento.resource_id)
+        else:
+            response = sdk.payment().get(evento.resource_id)
+    except Exception as e:
+        raise RetryableWebhookError(f'Error de red consultando {evento}: {e}') from e
+    if response.get('status') == 429 or response.get('status', 500) >= 500:
+        raise RetryableWebhookError(f'Mercado Pago respondió {response.get("status")} para {evento}')
+    return response
+
+
+def apply_resource(evento, response):
+    """
+    Aplica la respuesta de Mercado Pago. Retorna el resultado como texto.
+    """
+    http_status = response.get('status')
+    if evento.topic == 'payment' and http_status == 404:
+        # Puede haber sido rechazado/cancelado antes de procesarse
+        return 'pago_no_encontrado'
+    if http_status != 200:
+        return f'respuesta_{http_status}'
+
+    data = response.get('response') or {}
+    external_reference = data.get('external_reference')
+    estado_mp = data.get('status')
+    logger.info(f'Webhook {evento.topic}: id={evento.resource_id}, status={estado_mp}, user_id={external_reference}')
+
+    if evento.topic == 'preapproval':
+        if estado_mp == 'authorized':
+            data['id'] = evento.resource_id
+            return activate_premium(external_reference, data)
+        if estado_mp == 'cancelled':
+            return handle_cancellation(external_reference, data)
+    elif estado_mp == 'approved':
+        return activate_premium(external_reference, data)
+    return f'ignorado_{estado_mp}'
+
+
+class WebhookWorker:
+    """
+    Vacía la cola de EventoWebhook con concurrencia acotada y reintentos.
+    """
+
+    def __init__(self, sdk=None, batch_size=50, max_workers=4, max_attempts=None):
+        self.sdk = sdk
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts or settings.MP_WEBHOOK_MAX_ATTEMPTS
+
+    def get_sdk(self):
+        if self.sdk is None:
+            self.sdk = get_mp_sdk()
+        return self.sdk
+
+    def claim_batch(self, now=None):
+        """
+        Reserva hasta batch_size eventos vencidos (pendientes o con la
+        reserva de otro worker expirada).
+        """
+        now = now or timezone.now()
+        with transaction.atomic():
+            eventos = list(
+                EventoWebhook.objects.filter(
+                    estado__in=[EventoWebhook.ESTADO_PENDIENTE, EventoWebhook.ESTADO_PROCESANDO],
+                    proximo_intento__lte=now,
+                )
+                .select_for_update(skip_locked=True)
+                .order_by('proximo_intento')[:self.batch_size]
+            )
+            if eventos:
+                EventoWebhook.objects.filter(id__in=[evento.id for evento in eventos]).update(
+                    estado=EventoWebhook.ESTADO_PROCESANDO,
+                    intentos=F('intentos') + 1,
+                    proximo_intento=now + CLAIM_LEASE,
+                    # La consulta que sigue ya verá las notificaciones anteriores
+                    reencolar=False,
+                )
+                for evento in eventos:
+                    evento.intentos += 1
+        return eventos
+
+    def _fetch(self, evento):
+        try:
+            return evento, fetch_resource(self.get_sdk(), evento), None
+        except RetryableWebhookError as e:
+            return evento, None, e
+
+    @staticmethod
+    def _si_reencolar(field, value, default=None):
+        """
+        ``value`` si llegó otra notificación durante el proceso; si no
+        ``default`` (o el valor actual del campo).
+        """
+        return Case(
+            When(reencolar=True, then=Value(value)),
+            default=F(field) if default is None else Value(default),
+            output_field=EventoWebhook._meta.get_field(field)
+        )
+
+    def _finish(self, evento, resultado, now):
+        # Con reencolar vuelve a la cola en el mismo UPDATE (sin carrera con
+        # enqueue_webhook)
+        EventoWebhook.objects.filter(id=evento.id).update(
+            estado=self._si_reencolar('estado', EventoWebhook.ESTADO_PENDIENTE, EventoWebhook.ESTADO_PROCESADO),
+            intentos=self._si_reencolar('intentos', 0),
+            proximo_intento=self._si_reencolar('proximo_intento', now),
+            reencolar=False,
+            resultado=resultado[:100], ultimo_error='', fecha_procesado=now,
+        )
+
+    def _fail(self, evento, error, now):
+        if evento.intentos >= self.max_attempts:
+            logger.error(f'Evento {evento} descartado tras {evento.intentos} intentos: {error}')
+            cambios = {
+                'estado': self._si_reencolar('estado', EventoWebhook.ESTADO_PENDIENTE, EventoWebhook.ESTADO_ERROR),
+                'intentos': self._si_reencolar('intentos', 0),
+                'proximo_intento': self._si_reencolar('proximo_intento', now),
+                'reencolar': False,
+                'fecha_procesado': now,
+            }
+        else:
+            cambios = {
+                'estado': EventoWebhook.ESTADO_PENDIENTE,
+                'proximo_intento': now + backoff_delay(evento.intentos),
+            }
+        EventoWebhook.objects.filter(id=evento.id).update(ultimo_error=str(error), **cambios)
+
+    def process_batch(self, now=None, executor=None):
+        """
+        Procesa un lote. Retorna cuántos eventos tomó.
+        """
+        eventos = self.claim_batch(now)
+        if not eventos:
+            return 0
+        if executor is None:
+            results = map(self._fetch, eventos)
+        else:
+            results = executor.map(self._fetch, eventos)
+        # La base solo se toca desde el hilo principal
+        for evento, response, error in results:
+            now = timezone.now()
+            if error is not None:
+                self._fail(evento, error, now)
+                continue
+            try:
+                self._finish(evento, apply_resource(evento, response), now)
+            except Exception as e:
+                logger.exception(f'Error aplicando evento {evento}')
+                self._fail(evento, e, now)
+        return len(eventos)
+
+    def drain(self, now=None, executor=None):
+        """
+        Procesa lotes hasta que no queden eventos vencidos.
+        """
+        total = 0
+        while True:
+            procesados = self.process_batch(now, executor)
+            total += procesados
+            if procesados < self.batch_size:
+                return total
+
+    def run(self, interval=1.0, stop_event=None):
+        """
+        Bucle principal del worker.
+        """
+        stop_event = stop_event or threading.Event()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while not stop_event.is_set():
+                try:
+                    self.drain(executor=executor)
+                except Exception:
+                    logger.exception('Error procesando la cola de webhooks')
+                stop_event.wait(interval)
@@ -0,0 +1,213 @@
+"""
+Lógica compartida por las vistas de suscripción síncronas (api.views) y
+asíncronas (api.async_views): armado de los pagos en Mercado Pago,
+validaciones previas a cancelar/reactivar y el cliente HTTP asíncrono.
+"""
+
+import logging
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework import status
+
+from hydrotracker.async_http import get_async_client, httpx
+from .services import MP_DEFAULT_BASE_URL, get_mp_sdk
+
+logger = logging.getLogger(__name__)
+
+MP_GENERIC_ERROR = (
+    "Error de Mercado Pago. En entorno local verifica MP_ACCESS_TOKEN y las URLs (FRONTEND_URL, BACKEND_URL)."
+)
+
+# planType -> (frecuencia en meses, monto, título)
+SUBSCRIPTION_PLANS = {
+    'monthly': (1, 2000.00, "Dosis Vital - Plan Mensual"),
+    'annual': (12, 18000.00, "Dosis Vital - Plan Anual"),
+}
+
+
+class InvalidPlanError(ValueError):
+    """planType desconocido."""
+
+
+def build_checkout(plan_type, user):
+    """
+    Retorna (recurso, payload) para crear el pago: ('preference', ...) para
+    el plan vitalicio y ('preapproval', ...) para las suscripciones.
+    """
+    back_url = settings.FRONTEND_URL.rstrip('/')
+    notification_url = f"{settings.BACKEND_URL.rstrip('/')}/api/webhooks/mercadopago/"
+
+    if plan_type == 'lifetime':
+        return 'preference', {
+            "items": [
+                {
+                    "title": "Dosis Vital - Plan De por vida",
+                    "quantity": 1,
+                    "currency_id": "ARS",
+                    "unit_price": 100000.00
+                }
+            ],
+            "payer": {"email": user.email},
+            "external_reference": str(user.id),
+            "back_urls": {
+                "success": f"{back_url}/premium",
+                "failure": f"{back_url}/premium",
+                "pending": f"{back_url}/premium"
+            },
+            "notification_url": notification_url,
+            "auto_return": "approved"
+        }
+
+    if plan_type not in SUBSCRIPTION_PLANS:
+        raise InvalidPlanError(plan_type)
+    frequency, transaction_amount, reason = SUBSCRIPTION_PLANS[plan_type]
+    # PAYLOAD LIMPIO: Sin status, sin fechas
+    return 'preapproval', {
+        "reason": reason,
+        "external_reference": str(user.id),
+        "payer_email": user.email,
+        "auto_recurring": {
+            "frequency": frequency,
+            "frequency_type": "months",
+            "transaction_amount": transaction_amount,
+            "currency_id": "ARS"
+        },
+        "back_url": f"{back_url}/premium",
+        "notification_url": notification_url
+    }
+
+
+def checkout_result(response):
+    """
+    (body, status) de la respuesta de Mercado Pago al crear el pago.
+    """
+    # MP suele devolver 201 Created
+    if response["status"] == 201:
+        return {"init_point": response["response"]["init_point"]}, status.HTTP_200_OK
+    mp_resp = response.get("response", {})
+    err_msg = (
+        mp_resp.get("message")
+        or (mp_resp.get("cause", [{}])[0].get("description") if isinstance(mp_resp.get("cause"), list) else None)
+        or MP_GENERIC_ERROR
+    )
+    return {"error": err_msg}, status.HTTP_400_BAD_REQUEST
+
+
+def is_test_subscription(user):
+    """
+    Suscripciones de prueba (preapproval_id que empieza por "test_"): solo
+    se actualiza el estado local.
+    """
+    return user.preapproval_id.strip().lower().startswith('test_')
+
+
+def cancellation_precheck(user):
+    """
+    (body, status) si la cancelación no procede; None si puede seguir.
+    """
+    # Validar que el usuario sea premium
+    if not user.es_premium:
+        return {'error': 'El usuario no tiene una suscripción activa'}, status.HTTP_400_BAD_REQUEST
+    # Validar que NO sea un plan lifetime
+    if user.plan_type == 'lifetime':
+        return (
+            {'error': 'Los planes vitalicios no necesitan cancelación. Disfruta de Dosis Vital para siempre.'},
+            status.HTTP_400_BAD_REQUEST
+        )
+    # Validar que tenga un preapproval_id
+    if not user.preapproval_id:
+        logger.warning(f'Usuario {user.id} intentó cancelar pero no tiene preapproval_id')
+        return (
+            {'error': 'No se encontró información de suscripción. Contacta con soporte.'},
+            status.HTTP_400_BAD_REQUEST
+        )
+    return None
+
+
+def cancellation_body(user):
+    return {
+        'message': 'Suscripción cancelada exitosamente. Mantendrás acceso Premium hasta el final de tu período pagado.',
+        'subscription_end_date': user.subscription_end_date.isoformat() if user.subscription_end_date else None
+    }
+
+
+def reactivation_precheck(user):
+    """
+    (body, status) si la reactivación no procede o ya está activa; None si
+    puede seguir.
+    """
+    if not user.es_premium:
+        return {'error': 'No tienes una suscripción activa.'}, status.HTTP_400_BAD_REQUEST
+    if user.plan_type == 'lifetime':
+        return {'error': 'Los planes vitalicios no tienen renovación.'}, status.HTTP_400_BAD_REQUEST
+    if not user.preapproval_id:
+        return (
+            {'error': 'No se encontró información de suscripción para reactivar.'},
+            status.HTTP_400_BAD_REQUEST
+        )
+    if user.auto_renewal:
+        return (
+            {'message': 'Tu suscripción ya está activa y se renovará automáticamente.'},
+            status.HTTP_200_OK
+        )
+    return None
+
+
+REACTIVATION_BODY = {'message': 'Has vuelto a activar tu suscripción. Se renovará automáticamente.'}
+
+
+def set_auto_renewal(user, value):
+    user.auto_renewal = value
+    user.save(update_fields=['auto_renewal'])
+
+
+class AsyncMercadoPagoClient:
+    """
+    Cliente mínimo de la API de Mercado Pago sobre el AsyncClient compartido
+    (hydrotracker.async_http) para las vistas async. Retorna
+    ``{'status', 'response'}`` como el SDK, de modo que checkout_result y las
+    vistas tratan igual ambas respuestas. Sin httpx instalado delega en el
+    SDK desde un hilo.
+    """
+
+    def __init__(self, access_token=None, base_url=None, timeout=None):
+        self.access_token = access_token or settings.MP_ACCESS_TOKEN
+        self.base_url = (base_url or getattr(settings, 'MP_API_BASE_URL', MP_DEFAULT_BASE_URL)).rstrip('/')
+        self.timeout = timeout or 30
+
+    async def _request(self, method, path, data):
+        headers = {
+            'Authorization': f'Bearer {self.access_token}',
+            'x-idempotency-key': str(uuid.uuid4().int),
+            'Accept': 'application/json',
+        }
+        response = await get_async_client().request(
+            method, self.base_url + path, json=data, headers=headers, timeout=self.timeout
+        )
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        return {'status': response.status_code, 'response': body}
+
+    async def _sdk_call(self, resource, method, *args):
+        sdk = get_mp_sdk(self.access_token)
+        call = getattr(getattr(sdk, resource)(), method)
+        return await sync_to_async(call, thread_sensitive=False)(*args)
+
+    async def create_preference(self, data):
+        if httpx is None:
+            return await self._sdk_call('preference', 'create', data)
+        return await self._request('POST', '/checkout/preferences', data)
+
+    async def create_preapproval(self, data):
+        if httpx is None:
+            return await self._sdk_call('preapproval', 'create', data)
+        return await self._request('POST', '/preapproval', data)
+
+    async def update_preapproval(self, preapproval_id, data):
+        if httpx is None:
+            return await self._sdk_call('preapproval', 'update', preapproval_id, data)
+        return await self._request('PUT', f'/preapproval/{preapproval_id}', data)
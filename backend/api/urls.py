@@ -2,11 +2,20 @@
 URLs para la API de suscripciones y webhooks.
 """
 
+from django.conf import settings
 from django.urls import path
 from .views import CreateSubscriptionView, MercadoPagoWebhookView, CancelSubscriptionView, ReactivateSubscriptionView
 
 app_name = 'api'
 
+# Con ASYNC_VIEWS las mismas rutas usan las vistas async equivalentes
+if settings.ASYNC_VIEWS:
+    from .async_views import (
+        AsyncCancelSubscriptionView as CancelSubscriptionView,
+        AsyncCreateSubscriptionView as CreateSubscriptionView,
+        AsyncReactivateSubscriptionView as ReactivateSubscriptionView,
+    )
+
 urlpatterns = [
     path('premium/subscribe/', CreateSubscriptionView.as_view(), name='create-subscription'),
     path('premium/cancel/', CancelSubscriptionView.as_view(), name='cancel-subscription'),
@@ -9,11 +9,13 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework import status
 from django.conf import settings
 from django.db import transaction
-from django.utils import timezone
-from datetime import timedelta
-import mercadopago
 
-from users.models import User
+from .services import SUPPORTED_TOPICS, TOPIC_ALIASES, enqueue_webhook, get_mp_sdk
+from .subscriptions import (
+    REACTIVATION_BODY, InvalidPlanError, build_checkout, cancellation_body,
+    cancellation_precheck, checkout_result, is_test_subscription,
+    reactivation_precheck, set_auto_renewal
+)
 
 
 class CancelSubscriptionView(APIView):
@@ -39,43 +41,17 @@ class CancelSubscriptionView(APIView):
         try:
             user = request.user
             
-            # Validar que el usuario sea premium
-            if not user.es_premium:
-                return Response(
-                    {'error': 'El usuario no tiene una suscripción activa'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Validar que NO sea un plan lifetime
-            if user.plan_type == 'lifetime':
-                return Response(
-                    {
-                        'error': 'Los planes vitalicios no necesitan cancelación. Disfruta de Dosis Vital para siempre.'
-                    },
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            # Validar que tenga un preapproval_id
-            if not user.preapproval_id:
-                logger.warning(f'Usuario {user.id} intentó cancelar pero no tiene preapproval_id')
-                return Response(
-                    {'error': 'No se encontró información de suscripción. Contacta con soporte.'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+            rejection = cancellation_precheck(user)
+            if rejection:
+                body, status_code = rejection
+                return Response(body, status=status_code)
             
             # Suscripciones de prueba (preapproval_id que empieza por "test_"): solo actualizar estado local
-            if user.preapproval_id.strip().lower().startswith('test_'):
+            if is_test_subscription(user):
                 with transaction.atomic():
-                    user.auto_renewal = False
-                    user.save(update_fields=['auto_renewal'])
+                    set_auto_renewal(user, False)
                 logger.info(f'Usuario {user.id}: suscripción de prueba cancelada (preapproval_id={user.preapproval_id})')
-                return Response(
-                    {
-                        'message': 'Suscripción cancelada exitosamente. Mantendrás acceso Premium hasta el final de tu período pagado.',
-                        'subscription_end_date': user.subscription_end_date.isoformat() if user.subscription_end_date else None
-                    },
-                    status=status.HTTP_200_OK
-                )
+                return Response(cancellation_body(user), status=status.HTTP_200_OK)
             
             # Obtener configuración de Mercado Pago
             mp_access_token = getattr(settings, 'MP_ACCESS_TOKEN', None)
@@ -86,7 +62,7 @@ class CancelSubscriptionView(APIView):
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR
                 )
             
-            sdk = mercadopago.SDK(mp_access_token)
+            sdk = get_mp_sdk(mp_access_token)
             
             # Cancelar el preapproval en Mercado Pago
             logger.info(f'Cancelando preapproval {user.preapproval_id} para usuario {user.id}')
@@ -110,18 +86,11 @@ class CancelSubscriptionView(APIView):
             # Si MP confirma la cancelación, actualizar el estado local
             # NO quitamos es_premium inmediatamente - el usuario mantiene acceso hasta subscription_end_date
             with transaction.atomic():
-                user.auto_renewal = False
-                user.save(update_fields=['auto_renewal'])
+                set_auto_renewal(user, False)
             
             logger.info(f'Preapproval {user.preapproval_id} cancelado exitosamente para usuario {user.id}. Auto_renewal desactivado.')
             
-            return Response(
-                {
-                    'message': 'Suscripción cancelada exitosamente. Mantendrás acceso Premium hasta el final de tu período pagado.',
-                    'subscription_end_date': user.subscription_end_date.isoformat() if user.subscription_end_date else None
-                },
-                status=status.HTTP_200_OK
-            )
+            return Response(cancellation_body(user), status=status.HTTP_200_OK)
             
         except Exception as e:
             logger.exception(f'Error al cancelar suscripción: {str(e)}')
@@ -149,37 +118,17 @@ class ReactivateSubscriptionView(APIView):
         try:
             user = request.user
 
-            if not user.es_premium:
-                return Response(
-                    {'error': 'No tienes una suscripción activa.'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            if user.plan_type == 'lifetime':
-                return Response(
-                    {'error': 'Los planes vitalicios no tienen renovación.'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            if not user.preapproval_id:
-                return Response(
-                    {'error': 'No se encontró información de suscripción para reactivar.'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            if user.auto_renewal:
-                return Response(
-                    {'message': 'Tu suscripción ya está activa y se renovará automáticamente.'},
-                    status=status.HTTP_200_OK
-                )
+            rejection = reactivation_precheck(user)
+            if rejection:
+                body, status_code = rejection
+                return Response(body, status=status_code)
 
             # Suscripciones de prueba: solo reactivar localmente
-            if user.preapproval_id.strip().lower().startswith('test_'):
+            if is_test_subscription(user):
                 with transaction.atomic():
-                    user.auto_renewal = True
-                    user.save(update_fields=['auto_renewal'])
+                    set_auto_renewal(user, True)
                 logger.info(f'Usuario {user.id}: suscripción de prueba reactivada (preapproval_id={user.preapproval_id})')
-                return Response(
-                    {'message': 'Has vuelto a activar tu suscripción. Se renovará automáticamente.'},
-                    status=status.HTTP_200_OK
-                )
+                return Response(REACTIVATION_BODY, status=status.HTTP_200_OK)
 
             # Mercado Pago: intentar reactivar el preapproval (status authorized)
             mp_access_token = getattr(settings, 'MP_ACCESS_TOKEN', None)
@@ -188,7 +137,7 @@ class ReactivateSubscriptionView(APIView):
                     {'error': 'Configuración de pago no disponible.'},
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR
                 )
-            sdk = mercadopago.SDK(mp_access_token)
+            sdk = get_mp_sdk(mp_access_token)
             update_data = {"status": "authorized"}
             response = sdk.preapproval().update(user.preapproval_id, update_data)
 
@@ -204,13 +153,9 @@ class ReactivateSubscriptionView(APIView):
                 )
 
             with transaction.atomic():
-                user.auto_renewal = True
-                user.save(update_fields=['auto_renewal'])
+                set_auto_renewal(user, True)
             logger.info(f'Preapproval {user.preapproval_id} reactivado para usuario {user.id}')
-            return Response(
-                {'message': 'Has vuelto a activar tu suscripción. Se renovará automáticamente.'},
-                status=status.HTTP_200_OK
-            )
+            return Response(REACTIVATION_BODY, status=status.HTTP_200_OK)
         except Exception as e:
             logger.exception(f'Error al reactivar suscripción: {str(e)}')
             return Response(
@@ -243,7 +188,6 @@ class CreateSubscriptionView(APIView):
             # 1. Obtener datos
             plan_type = request.data.get('planType')
             user_email = request.user.email
-            user_id = request.user.id
             
             print(f"--- Intento FINAL suscripción para: {user_email}, Plan: {plan_type} ---")
 
@@ -264,94 +208,24 @@ class CreateSubscriptionView(APIView):
             if not is_test_token:
                 logger.warning(f"⚠️ ADVERTENCIA: El token NO empieza con TEST-. Esto causará que los pagos usen modo LIVE.")
             
-            sdk = mercadopago.SDK(mp_access_token)
+            sdk = get_mp_sdk(mp_access_token)
             
-            # URL de retorno
-            back_url = settings.FRONTEND_URL.rstrip('/')
-            notification_url = f"{settings.BACKEND_URL.rstrip('/')}/api/webhooks/mercadopago/"
-
-            # ----------------------------------------
-            # CASO A: PAGO ÚNICO (LIFETIME)
-            # ----------------------------------------
-            if plan_type == 'lifetime':
-                preference_data = {
-                    "items": [
-                        {
-                            "title": "Dosis Vital - Plan De por vida",
-                            "quantity": 1,
-                            "currency_id": "ARS",
-                            "unit_price": 100000.00
-                        }
-                    ],
-                    "payer": { "email": user_email },
-                    "external_reference": str(user_id),
-                    "back_urls": {
-                        "success": f"{back_url}/premium",
-                        "failure": f"{back_url}/premium",
-                        "pending": f"{back_url}/premium"
-                    },
-                    "notification_url": notification_url,
-                    "auto_return": "approved"
-                }
-                
-                response = sdk.preference().create(preference_data)
-                
-                if response["status"] == 201:
-                    return Response({"init_point": response["response"]["init_point"]})
-                else:
-                    mp_resp = response.get("response", {})
-                    err_msg = (
-                        mp_resp.get("message")
-                        or (mp_resp.get("cause", [{}])[0].get("description") if isinstance(mp_resp.get("cause"), list) else None)
-                        or "Error de Mercado Pago. En entorno local verifica MP_ACCESS_TOKEN y las URLs (FRONTEND_URL, BACKEND_URL)."
-                    )
-                    return Response({"error": err_msg}, status=status.HTTP_400_BAD_REQUEST)
-
-            # ----------------------------------------
-            # CASO B: SUSCRIPCIÓN (MENSUAL/ANUAL)
-            # ----------------------------------------
+            # Pago único (lifetime) => preference; mensual/anual => preapproval
+            try:
+                resource, payload = build_checkout(plan_type, request.user)
+            except InvalidPlanError:
+                return Response({"error": "Plan inválido"}, status=status.HTTP_400_BAD_REQUEST)
+            
+            if resource == 'preference':
+                response = sdk.preference().create(payload)
             else:
-                if plan_type == 'monthly':
-                    frequency = 1
-                    transaction_amount = 2000.00
-                    reason = "Dosis Vital - Plan Mensual"
-                elif plan_type == 'annual':
-                    frequency = 12
-                    transaction_amount = 18000.00
-                    reason = "Dosis Vital - Plan Anual"
-                else:
-                    return Response({"error": "Plan inválido"}, status=status.HTTP_400_BAD_REQUEST)
-
-                # PAYLOAD LIMPIO: Sin status, sin fechas, sin notification_url (por ahora)
-                preapproval_data = {
-                    "reason": reason,
-                    "external_reference": str(user_id),
-                    "payer_email": user_email,
-                    "auto_recurring": {
-                        "frequency": frequency,
-                        "frequency_type": "months",
-                        "transaction_amount": transaction_amount,
-                        "currency_id": "ARS"
-                    },
-                    "back_url": f"{back_url}/premium",
-                    "notification_url": notification_url
-                }
-
-                print(f"Enviando data LIMPIA a MP: {preapproval_data}") 
-                response = sdk.preapproval().create(preapproval_data)
-
-                # MP suele devolver 201 Created
-                if response["status"] == 201:
-                    return Response({"init_point": response["response"]["init_point"]})
-                else:
-                    mp_resp = response.get("response", {})
-                    err_msg = (
-                        mp_resp.get("message")
-                        or (mp_resp.get("cause", [{}])[0].get("description") if isinstance(mp_resp.get("cause"), list) else None)
-                        or "Error de Mercado Pago. En entorno local verifica MP_ACCESS_TOKEN y las URLs (FRONTEND_URL, BACKEND_URL)."
-                    )
-                    logger.warning("Error MP Preapproval: %s", mp_resp)
-                    return Response({"error": err_msg}, status=status.HTTP_400_BAD_REQUEST)
+                print(f"Enviando data LIMPIA a MP: {payload}") 
+                response = sdk.preapproval().create(payload)
+            
+            body, status_code = checkout_result(response)
+            if status_code != status.HTTP_200_OK and resource == 'preapproval':
+                logger.warning("Error MP Preapproval: %s", response.get("response", {}))
+            return Response(body, status=status_code)
 
         except Exception as e:
             print("Error Servidor:", str(e))
@@ -362,12 +236,14 @@ class MercadoPagoWebhookView(APIView):
     """
     Vista para recibir notificaciones de webhook de Mercado Pago.
     Esta vista debe ser pública (sin autenticación) ya que Mercado Pago la llama directamente.
+    Solo registra el evento (api.models.EventoWebhook) y responde 200; el
+    procesamiento lo hace el comando process_webhooks.
     """
     permission_classes = [AllowAny]
 
     def post(self, request):
         """
-        Procesa las notificaciones de webhook de Mercado Pago.
+        Encola las notificaciones de webhook de Mercado Pago.
         
         Mercado Pago envía notificaciones con:
         - type/topic: tipo de notificación (preapproval, payment, subscription_preapproval, etc.)
@@ -382,206 +258,26 @@ class MercadoPagoWebhookView(APIView):
                 request.data.get('data', {}).get('id') or 
                 request.data.get('id')
             )
-            
-            # Detectar modo live desde el webhook
             live_mode = request.data.get('live_mode', False)
             
-            logger.info(f'Webhook recibido - topic: {topic}, resource_id: {resource_id}, live_mode: {live_mode}, query_params: {dict(request.GET)}, body: {request.data}')
+            logger.info(f'Webhook recibido - topic: {topic}, resource_id: {resource_id}, live_mode: {live_mode}')
             
             if not topic or not resource_id:
                 logger.warning(f'Webhook recibido sin topic o resource_id. Query: {dict(request.GET)}, Body: {request.data}')
                 return Response({'status': 'ignored'}, status=status.HTTP_200_OK)
             
-            # Obtener configuración de Mercado Pago
-            mp_access_token = getattr(settings, 'MP_ACCESS_TOKEN', None)
-            if not mp_access_token:
-                logger.error('MP_ACCESS_TOKEN no está configurado en settings')
-                return Response({'status': 'error'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-            
-            # Verificar token y modo live
-            is_test_token = mp_access_token.startswith('TEST-')
-            if live_mode and is_test_token:
-                logger.warning(f'⚠️ CONTRADICCIÓN: El webhook viene en modo LIVE pero el token empieza con TEST-. '
-                              f'Esto puede indicar que el token TEST- está asociado a una cuenta diferente o '
-                              f'que hay un problema con la configuración. Token: {mp_access_token[:15]}...')
-            elif live_mode and not is_test_token:
-                logger.error(f'❌ ERROR: Webhook en modo LIVE y token NO es de prueba. '
-                            f'Las tarjetas de prueba NO funcionarán. Token: {mp_access_token[:15]}...')
-            
-            sdk = mercadopago.SDK(mp_access_token)
-            
-            # Procesar según el tipo de notificación
-            if topic in ('preapproval', 'subscription_preapproval'):
-                # Notificación de suscripción (preapproval)
-                preapproval_response = sdk.preapproval().get(resource_id)
-                
-                if preapproval_response.get('status') != 200:
-                    logger.error(f'Error al obtener preapproval {resource_id}: {preapproval_response}')
-                    return Response({'status': 'error'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-                
-                preapproval = preapproval_response.get('response')
-                external_reference = preapproval.get('external_reference')
-                status_preapproval = preapproval.get('status')
-                
-                logger.info(f'Webhook preapproval: id={resource_id}, status={status_preapproval}, user_id={external_reference}')
-                
-                # Activar cuenta premium si está autorizada
-                # Estados válidos: 'pending', 'authorized', 'paused', 'cancelled'
-                if status_preapproval == 'authorized':
-                    # Pasar el resource_id como preapproval_id
-                    preapproval['id'] = resource_id
-                    self._activate_premium_user(external_reference, preapproval)
-                elif status_preapproval == 'cancelled':
-                    # Manejar cancelación desde webhook
-                    self._handle_cancellation(external_reference, preapproval)
-                else:
-                    logger.info(f'Preapproval {resource_id} en estado {status_preapproval}, no se activa premium')
-                
-            elif topic == 'payment':
-                # Notificación de pago (para lifetime o pagos únicos)
-                payment_response = sdk.payment().get(resource_id)
-                
-                # Manejar caso cuando el payment no existe (404) - puede ser rechazado/cancelado
-                if payment_response.get('status') == 404:
-                    logger.warning(f'Payment {resource_id} no encontrado (404). Puede haber sido rechazado/cancelado antes de procesarse.')
-                    return Response({'status': 'ignored', 'reason': 'payment_not_found'}, status=status.HTTP_200_OK)
-                
-                if payment_response.get('status') != 200:
-                    logger.error(f'Error al obtener payment {resource_id}: {payment_response}')
-                    return Response({'status': 'error'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-                
-                payment = payment_response.get('response')
-                external_reference = payment.get('external_reference')
-                status_payment = payment.get('status')
-                
-                logger.info(f'Webhook payment: id={resource_id}, status={status_payment}, user_id={external_reference}')
-                
-                # Activar cuenta premium si el pago está aprobado
-                if status_payment == 'approved':
-                    self._activate_premium_user(external_reference, payment)
-                else:
-                    logger.info(f'Payment {resource_id} en estado {status_payment}, no se activa premium')
+            topic = TOPIC_ALIASES.get(topic, topic)
+            if topic not in SUPPORTED_TOPICS:
+                return Response({'status': 'ignored'}, status=status.HTTP_200_OK)
             
-            return Response({'status': 'ok'}, status=status.HTTP_200_OK)
+            payload = {'query': dict(request.GET), 'body': request.data if isinstance(request.data, dict) else {}}
+            evento, creado = enqueue_webhook(topic, resource_id, payload, live_mode)
+            return Response(
+                {'status': 'queued' if creado else 'duplicate', 'event_id': evento.id},
+                status=status.HTTP_200_OK
+            )
             
         except Exception as e:
-            logger.exception(f'Error al procesar webhook: {str(e)}')
+            # Sin 200, Mercado Pago reintenta la notificación más tarde
+            logger.exception(f'Error al encolar webhook: {str(e)}')
             return Response({'status': 'error'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-    
-    def _activate_premium_user(self, external_reference, payment_data):
-        """
-        Activa la cuenta premium del usuario.
-        
-        Args:
-            external_reference: ID del usuario (string)
-            payment_data: Datos del pago/preapproval de Mercado Pago
-        """
-        try:
-            if not external_reference:
-                logger.warning('external_reference vacío, no se puede activar usuario')
-                return
-            
-            user_id = int(external_reference)
-            
-            with transaction.atomic():
-                try:
-                    user = User.objects.get(id=user_id)
-                    
-                    # Activar premium
-                    user.es_premium = True
-                    
-                    # Determinar tipo de plan y calcular fecha de fin de suscripción
-                    plan_type = None
-                    end_date = None
-                    preapproval_id = None
-                    
-                    if 'auto_recurring' in payment_data:
-                        # Es una suscripción recurrente (monthly o annual)
-                        frequency = payment_data['auto_recurring'].get('frequency', 1)
-                        frequency_type = payment_data['auto_recurring'].get('frequency_type', 'months')
-                        
-                        # Obtener el ID del preapproval
-                        preapproval_id = payment_data.get('id')
-                        
-                        if frequency_type == 'months':
-                            # Determinar si es monthly (1 mes) o annual (12 meses)
-                            if frequency == 1:
-                                plan_type = 'monthly'
-                            elif frequency == 12:
-                                plan_type = 'annual'
-                            else:
-                                # Por defecto, si es otro valor, usar monthly
-                                plan_type = 'monthly'
-                            
-                            # Calcular fecha de fin
-                            end_date = timezone.now() + timedelta(days=frequency * 30)
-                        else:
-                            # Para otros tipos, usar 1 mes por defecto
-                            plan_type = 'monthly'
-                            end_date = timezone.now() + timedelta(days=30)
-                    else:
-                        # Es un pago único (lifetime), no tiene fecha de fin
-                        plan_type = 'lifetime'
-                        end_date = None
-                        preapproval_id = None
-                    
-                    # Guardar cambios
-                    user.plan_type = plan_type
-                    user.preapproval_id = preapproval_id
-                    user.auto_renewal = True  # Por defecto, las suscripciones se renuevan automáticamente
-                    if end_date:
-                        user.subscription_end_date = end_date.date()
-                    user.save(update_fields=['es_premium', 'plan_type', 'preapproval_id', 'auto_renewal', 'subscription_end_date'])
-                    
-                    logger.info(f'Usuario {user_id} activado como premium. Plan: {plan_type}, Preapproval ID: {preapproval_id}, Fecha fin: {end_date}')
-                    
-                except User.DoesNotExist:
-                    logger.error(f'Usuario con id {user_id} no encontrado')
-                except Exception as e:
-                    logger.exception(f'Error al activar usuario premium {user_id}: {str(e)}')
-                    raise
-                    
-        except ValueError:
-            logger.error(f'external_reference inválido: {external_reference}')
-        except Exception as e:
-            logger.exception(f'Error inesperado al activar usuario premium: {str(e)}')
-    
-    def _handle_cancellation(self, external_reference, preapproval_data):
-        """
-        Maneja la cancelación de una suscripción desde el webhook.
-        
-        Args:
-            external_reference: ID del usuario (string)
-            preapproval_data: Datos del preapproval de Mercado Pago
-        """
-        try:
-            if not external_reference:
-                logger.warning('external_reference vacío, no se puede procesar cancelación')
-                return
-            
-            user_id = int(external_reference)
-            
-            with transaction.atomic():
-                try:
-                    user = User.objects.get(id=user_id)
-                    
-                    # Desactivar renovación automática
-                    user.auto_renewal = False
-                    user.save(update_fields=['auto_renewal'])
-                    
-                    logger.info(f'Usuario {user_id}: Renovación automática desactivada por cancelación. Mantiene acceso hasta {user.subscription_end_date}')
-                    
-                    # NO quitamos es_premium aquí - el usuario mantiene acceso hasta subscription_end_date
-                    # El es_premium se desactivará cuando expire la suscripción (puede hacerse con un task periódico)
-                    
-                except User.DoesNotExist:
-                    logger.error(f'Usuario con id {user_id} no encontrado')
-                except Exception as e:
-                    logger.exception(f'Error al procesar cancelación para usuario {user_id}: {str(e)}')
-                    raise
-                    
-        except ValueError:
-            logger.error(f'external_reference inválido: {external_reference}')
-        except Exception as e:
-            logger.exception(f'Error inesperado al procesar cancelación: {str(e)}')
-
@@ -0,0 +1,146 @@
+"""
+Benchmark: throughput de las vistas síncronas vs async con un upstream lento.
+
+Simula el despliegue actual (``--workers`` workers síncronos, cada uno
+atiende una petición a la vez y se bloquea esperando a Open-Meteo o Mercado
+Pago) contra un único worker ASGI que atiende hasta ``--concurrency``
+peticiones en el mismo event loop. El upstream es un servidor falso que
+demora cada respuesta ``--delay`` segundos:
+
+    python benchmarks/bench_async_views.py --requests 100 --delay 0.5
+    python benchmarks/bench_async_views.py --endpoint subscribe --delay 1
+
+Cada petición usa coordenadas distintas para que la caché de clima no
+responda en lugar del upstream.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from common import report, setup_django, test_database
+
+
+def summarize(latencies, elapsed):
+    latencies = sorted(latencies)
+    return {
+        'peticiones': len(latencies),
+        'segundos': f'{elapsed:.2f}',
+        'req/s': f'{len(latencies) / elapsed:.1f}',
+        'p50 ms': f'{statistics.median(latencies) * 1000:.0f}',
+        'p95 ms': f'{latencies[int(len(latencies) * 0.95) - 1] * 1000:.0f}',
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--endpoint', choices=('estimate', 'subscribe'), default='estimate')
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--delay', type=float, default=0.5, help='Demora del upstream (s)')
+    parser.add_argument('--workers', type=int, default=2, help='Workers síncronos (gunicorn --workers)')
+    parser.add_argument('--concurrency', type=int, default=50, help='Peticiones simultáneas (clientes)')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.core.cache import cache
+    from django.test import AsyncRequestFactory, RequestFactory
+    from django.utils import timezone
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from actividades.async_views import ActividadEstimateAsyncView
+    from actividades.services.weather_service import WeatherService
+    from actividades.views import ActividadViewSet
+    from api.async_views import AsyncCreateSubscriptionView
+    from api.views import CreateSubscriptionView
+    from tests.fake_mercadopago import FakeMercadoPago
+    from tests.fake_open_meteo import FakeOpenMeteo
+
+    if args.endpoint == 'estimate':
+        upstream = FakeOpenMeteo(delay=args.delay).start()
+        WeatherService.BASE_URL = upstream.url
+        path = '/api/actividades/estimate/'
+        sync_view = ActividadViewSet.as_view({'post': 'estimate'})
+        async_view = ActividadEstimateAsyncView.as_view()
+        fecha_hora = (timezone.now() - timedelta(hours=1)).isoformat()
+
+        def body(i):
+            return {
+                'tipo_actividad': 'correr', 'duracion_minutos': 45, 'intensidad': 'media',
+                'fecha_hora': fecha_hora, 'latitude': -30 - i * 0.01, 'longitude': -58.4,
+            }
+    else:
+        upstream = FakeMercadoPago().start()
+        upstream.delay = args.delay
+        settings.MP_API_BASE_URL = upstream.url
+        settings.MP_ACCESS_TOKEN = 'TEST-bench'
+        path = '/api/premium/subscribe/'
+        sync_view = CreateSubscriptionView.as_view()
+        async_view = AsyncCreateSubscriptionView.as_view()
+
+        def body(i):
+            return {'planType': 'monthly'}
+
+    try:
+        with test_database():
+            user = get_user_model().objects.create_user(
+                username='bench', email='bench@example.com', password='bench-pass-123',
+                peso=70, fecha_nacimiento='1990-01-01'
+            )
+            token = f'Bearer {RefreshToken.for_user(user).access_token}'
+
+            def run_sync():
+                factory = RequestFactory()
+
+                def one(i):
+                    request = factory.post(
+                        path, body(i), content_type='application/json', HTTP_AUTHORIZATION=token
+                    )
+                    start = time.perf_counter()
+                    response = sync_view(request)
+                    assert response.status_code == 200, response.data
+                    return time.perf_counter() - start
+
+                start = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=args.workers) as pool:
+                    latencies = list(pool.map(one, range(args.requests)))
+                return summarize(latencies, time.perf_counter() - start)
+
+            async def run_async():
+                factory = AsyncRequestFactory()
+                semaphore = asyncio.Semaphore(args.concurrency)
+
+                async def one(i):
+                    request = factory.post(
+                        path, body(i), content_type='application/json', headers={'Authorization': token}
+                    )
+                    async with semaphore:
+                        start = time.perf_counter()
+                        response = await async_view(request)
+                        assert response.status_code == 200, response.data
+                        return time.perf_counter() - start
+
+                start = time.perf_counter()
+                latencies = await asyncio.gather(*(one(i) for i in range(args.requests)))
+                return summarize(latencies, time.perf_counter() - start)
+
+            cache.clear()
+            sync_result = run_sync()
+            cache.clear()
+            async_result = asyncio.run(run_async())
+            report(
+                f'{args.endpoint}: {args.requests} peticiones, upstream {args.delay:.2f}s',
+                [
+                    (f'WSGI ({args.workers} workers sync)', sync_result),
+                    (f'ASGI (1 worker, {args.concurrency} concurrentes)', async_result),
+                ]
+            )
+    finally:
+        upstream.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+"""
+Benchmark: barrido de configuraciones de gunicorn (gunicorn.conf.py).
+
+Arranca gunicorn con cada configuración contra una base SQLite temporal y
+un Mercado Pago falso con latencia, y mide throughput, latencias y memoria
+(PSS de master + workers, que refleja lo compartido con preload_app):
+
+    python benchmarks/bench_gunicorn.py
+    python benchmarks/bench_gunicorn.py --configs sync:3 gthread:2x4 gthread:2x16 asgi:2 \\
+        --workload mixed --clients 32 --duration 15 --preload both
+
+Formato de configuración: ``modo:workers[xhilos]`` con modo sync, gthread o
+asgi. Cargas: ``cpu`` (listado de actividades), ``io`` (alta de suscripción,
+espera al upstream) o ``mixed`` (3 listados por cada alta).
+
+El generador de carga corre en este mismo proceso con hilos; en máquinas
+pequeñas conviene comparar configuraciones entre sí más que leer cifras
+absolutas.
+"""
+
+import argparse
+import itertools
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import timedelta
+
+import requests
+
+from common import BACKEND_DIR, report, setup_django
+
+WORKLOADS = {
+    'cpu': ('list',),
+    'io': ('subscribe',),
+    'mixed': ('list', 'list', 'list', 'subscribe'),
+}
+
+
+def parse_config(spec):
+    mode, _, sizing = spec.partition(':')
+    workers, _, threads = sizing.partition('x')
+    if mode not in ('sync', 'gthread', 'asgi') or not workers.isdigit():
+        raise argparse.ArgumentTypeError(f'Configuración inválida: {spec}')
+    return {
+        'name': spec,
+        'mode': mode,
+        'workers': int(workers),
+        'threads': int(threads or (4 if mode == 'gthread' else 1)),
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def pss_mb(pid):
+    """
+    PSS total (MB) del proceso y sus hijos directos.
+    """
+    total = 0
+    pids = [pid]
+    children = f'/proc/{pid}/task/{pid}/children'
+    if os.path.exists(children):
+        with open(children) as f:
+            pids += [int(child) for child in f.read().split()]
+    for current in pids:
+        try:
+            with open(f'/proc/{current}/smaps_rollup') as f:
+                for line in f:
+                    if line.startswith('Pss:'):
+                        total += int(line.split()[1])
+        except OSError:
+            continue
+    return f'{total / 1024:.0f}' if total else '-'
+
+
+def seed(rows):
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.utils import timezone
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from actividades.models import Actividad
+
+    call_command('migrate', verbosity=0)
+    user = get_user_model().objects.create_user(
+        username='bench', email='bench@example.com', password='bench-pass-123',
+        peso=70, fecha_nacimiento='1990-01-01'
+    )
+    now = timezone.now()
+    Actividad.objects.bulk_create([
+        Actividad(
+            usuario=user, tipo_actividad='correr', duracion_minutos=30 + i % 60,
+            intensidad='media', fecha_hora=now - timedelta(hours=i), pse_calculado=300
+        )
+        for i in range(rows)
+    ])
+    return f'Bearer {RefreshToken.for_user(user).access_token}'
+
+
+def wait_ready(base_url, process, log_path, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'gunicorn terminó antes de estar listo (ver {log_path})')
+        try:
+            if requests.get(f'{base_url}/api/health/', timeout=1).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f'gunicorn no respondió a tiempo (ver {log_path})')
+
+
+def load(base_url, token, workload, clients, duration):
+    """
+    ``clients`` hilos enviando peticiones durante ``duration`` segundos.
+    """
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(offset):
+        session = requests.Session()
+        session.headers['Authorization'] = token
+        for kind in itertools.islice(itertools.cycle(WORKLOADS[workload]), offset, None):
+            if time.perf_counter() >= deadline:
+                return
+            start = time.perf_counter()
+            try:
+                if kind == 'list':
+                    response = session.get(f'{base_url}/api/actividades/', timeout=30)
+                else:
+                    response = session.post(
+                        f'{base_url}/api/premium/subscribe/', json={'planType': 'monthly'}, timeout=30
+                    )
+                ok = response.status_code == 200
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0], time.perf_counter() - start
+
+
+def run_config(config, preload, env, token, args, log):
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    server_env = {
+        **env,
+        'PORT': str(port),
+        'SERVER_MODE': 'asgi' if config['mode'] == 'asgi' else 'wsgi',
+        'WEB_CONCURRENCY': str(config['workers']),
+        'GUNICORN_THREADS': str(config['threads']),
+        'GUNICORN_WORKER_CLASS': 'sync' if config['mode'] == 'sync' else '',
+        'GUNICORN_PRELOAD': 'true' if preload else 'false',
+    }
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--access-logfile', '/dev/null'],
+        cwd=BACKEND_DIR, env=server_env, stdout=log, stderr=log,
+    )
+    try:
+        wait_ready(base_url, process, log.name)
+        latencies, errors, elapsed = load(base_url, token, args.workload, args.clients, args.duration)
+        memory = pss_mb(process.pid)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+    latencies.sort()
+    return {
+        'req/s': f'{len(latencies) / elapsed:.1f}',
+        'p50 ms': f'{statistics.median(latencies) * 1000:.0f}' if latencies else '-',
+        'p95 ms': f'{latencies[int(len(latencies) * 0.95) - 1] * 1000:.0f}' if latencies else '-',
+        'errores': errors,
+        'PSS MB': memory,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        '--configs', nargs='+', type=parse_config,
+        default=[parse_config(spec) for spec in ('sync:2', 'sync:5', 'gthread:2x4', 'gthread:2x16', 'asgi:2')]
+    )
+    parser.add_argument('--workload', choices=sorted(WORKLOADS), default='mixed')
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--upstream-delay', type=float, default=0.2, help='Latencia de Mercado Pago (s)')
+    parser.add_argument('--rows', type=int, default=200, help='Actividades del listado')
+    parser.add_argument('--preload', choices=('on', 'off', 'both'), default='on')
+    args = parser.parse_args()
+
+    from tests.fake_mercadopago import FakeMercadoPago
+
+    upstream = FakeMercadoPago().start()
+    upstream.delay = args.upstream_delay
+    tmpdir = tempfile.mkdtemp(prefix='bench-gunicorn-')
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': 'hydrotracker.settings',
+        'DEBUG': 'False',
+        'SECRET_KEY': 'bench-gunicorn-secret-key-no-usar-en-produccion',
+        'ALLOWED_HOSTS': '127.0.0.1,localhost,bench',
+        'SECURE_SSL_REDIRECT': 'False',
+        'DATABASE_URL': f'sqlite:///{tmpdir}/bench.sqlite3',
+        'MP_API_BASE_URL': upstream.url,
+        'MP_ACCESS_TOKEN': 'TEST-bench',
+    }
+    os.environ.update(env)
+    setup_django()
+
+    try:
+        token = seed(args.rows)
+        preloads = {'on': (True,), 'off': (False,), 'both': (True, False)}[args.preload]
+        rows = []
+        for config, preload in itertools.product(args.configs, preloads):
+            name = config['name'] + ('' if preload else ' (sin preload)')
+            print(f'Midiendo {name}...', flush=True)
+            with open(os.path.join(tmpdir, 'gunicorn.log'), 'a') as log:
+                rows.append((name, run_config(config, preload, env, token, args, log)))
+        report(
+            f'{args.workload}: {args.clients} clientes, {args.duration:.0f}s, '
+            f'upstream {args.upstream_delay:.2f}s, CPUs {os.cpu_count()}',
+            rows
+        )
+    finally:
+        upstream.stop()
+
+
+if __name__ == '__main__':
+    main()
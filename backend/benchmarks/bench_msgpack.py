@@ -0,0 +1,58 @@
+"""
+Benchmark: tamaño y tiempo de codificación JSON vs MessagePack compacto.
+
+Compara la página de consumos tal como la sirve la API en cada formato:
+
+    python benchmarks/bench_msgpack.py --rows 5000
+"""
+
+import argparse
+import gzip
+
+from common import measure, report, setup_django, test_database
+from bench_serializers import seed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+    from consumos.models import Consumo
+    from consumos.serializers import ConsumoFastSerializer
+    from hydrotracker.renderers import MessagePackRenderer, ORJSONRenderer
+
+    with test_database():
+        user = seed(args.rows)
+        queryset = Consumo.objects.filter(usuario=user).order_by('-fecha_hora')
+
+        results = []
+        for name, renderer, query in (
+            ('JSON', ORJSONRenderer(), ''),
+            ('MessagePack', MessagePackRenderer(), ''),
+            ('MessagePack ?fields=', MessagePackRenderer(), '?fields=id,cantidad_ml,bebida,fecha_hora'),
+        ):
+            request = Request(APIRequestFactory().get(f'/api/consumos/{query}'))
+            request.accepted_renderer = renderer
+
+            def encode():
+                data = ConsumoFastSerializer(context={'request': request}).serialize_queryset(queryset.all())
+                return renderer.render(data)
+
+            payload = encode()
+            best, _ = measure(encode, repeat=args.repeat)
+            results.append((name, {
+                'bytes': len(payload),
+                'gzip': len(gzip.compress(payload)),
+                'ms': f'{best * 1000:.1f}',
+                'µs/fila': f'{best / args.rows * 1e6:.2f}',
+            }))
+        report(f'{args.rows} consumos (serialización + codificación)', results)
+
+
+if __name__ == '__main__':
+    main()
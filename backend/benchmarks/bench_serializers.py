@@ -0,0 +1,79 @@
+"""
+Benchmark: ConsumoSerializer (DRF) vs ConsumoFastSerializer (values_list).
+
+Mide el costo por fila de serializar y codificar el listado de consumos:
+
+    python benchmarks/bench_serializers.py --rows 5000
+"""
+
+import argparse
+import random
+
+from common import measure, report, setup_django, test_database
+
+
+def seed(rows):
+    from datetime import timedelta
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+    from consumos.models import Bebida, Consumo, Recipiente
+
+    user = get_user_model().objects.create_user(
+        username='bench', email='bench@example.com', password='bench-pass-123',
+        peso=70, fecha_nacimiento='1990-01-01'
+    )
+    bebida = Bebida.objects.create(nombre='Agua bench', factor_hidratacion=1.0, es_agua=True)
+    recipiente = Recipiente.objects.create(usuario=user, nombre='Vaso bench', cantidad_ml=250)
+    now = timezone.now()
+    Consumo.objects.bulk_create([
+        Consumo(
+            usuario=user, bebida=bebida, recipiente=recipiente if i % 3 else None,
+            cantidad_ml=250, cantidad_hidratacion_efectiva=250,
+            fecha_hora=now - timedelta(minutes=17 * i),
+            nivel_sed=random.randint(1, 5), estado_animo='bueno', notas='', ubicacion='',
+        )
+        for i in range(rows)
+    ], batch_size=1000)
+    return user
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+    from consumos.models import Consumo
+    from consumos.serializers import ConsumoSerializer, ConsumoFastSerializer
+    from hydrotracker.renderers import ORJSONRenderer
+
+    with test_database():
+        user = seed(args.rows)
+        context = {'request': Request(APIRequestFactory().get('/api/consumos/?tz=America/Argentina/Buenos_Aires'))}
+        queryset = Consumo.objects.select_related(
+            'usuario', 'bebida', 'recipiente'
+        ).filter(usuario=user).order_by('-fecha_hora')
+
+        def drf():
+            JSONRenderer().render(ConsumoSerializer(queryset.all(), many=True, context=context).data)
+
+        def fast():
+            ORJSONRenderer().render(ConsumoFastSerializer(context=context).serialize_queryset(queryset.all()))
+
+        rows = []
+        for name, func in (('DRF + JSONRenderer', drf), ('values_list + orjson', fast)):
+            best, median = measure(func, repeat=args.repeat)
+            rows.append((name, {
+                'mejor (ms)': f'{best * 1000:.1f}',
+                'mediana (ms)': f'{median * 1000:.1f}',
+                'µs/fila': f'{best / args.rows * 1e6:.2f}',
+            }))
+        report(f'Listado de {args.rows} consumos', rows)
+
+
+if __name__ == '__main__':
+    main()
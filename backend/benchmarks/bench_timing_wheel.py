@@ -0,0 +1,75 @@
+"""
+Benchmark: timing wheel con 1M de recordatorios en memoria.
+
+Simula el pico de las 08:00 (todos los recordatorios a la misma hora con
+jitter) y mide inserción, memoria por entrada y el drenado tick a tick:
+
+    python benchmarks/bench_timing_wheel.py --entries 1000000
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from common import report, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--entries', type=int, default=1_000_000)
+    parser.add_argument('--jitter', type=float, default=60.0)
+    parser.add_argument('--tick', type=float, default=0.1)
+    args = parser.parse_args()
+
+    setup_django()
+    from consumos.services.timing_wheel import ReminderEntry, TimingWheel
+
+    start = 1_800_000_000.0
+    rng = random.Random(42)
+    # La mitad a las 08:00, el resto repartido en el día
+    fire_times = [
+        start + 60 + rng.uniform(0, args.jitter) if i % 2 else start + rng.uniform(0, 86_400)
+        for i in range(args.entries)
+    ]
+    mensaje = '💧 ¡Hora de hidratarse! Recuerda beber agua.'
+
+    def build():
+        wheel = TimingWheel(tick=args.tick, start=start)
+        for i, fire_at in enumerate(fire_times):
+            wheel.add(ReminderEntry(fire_at, i, i, mensaje))
+        return wheel
+
+    t0 = time.perf_counter()
+    wheel = build()
+    insert = time.perf_counter() - t0
+
+    # La memoria se mide aparte: tracemalloc distorsiona los tiempos
+    tracemalloc.start()
+    measured = build()
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del measured
+
+    now = start
+    peak_tick = 0
+    drained = 0
+    t0 = time.perf_counter()
+    while drained < args.entries:
+        now += args.tick
+        expired = len(wheel.advance(now))
+        drained += expired
+        peak_tick = max(peak_tick, expired)
+    drain = time.perf_counter() - t0
+    ticks = round((now - start) / args.tick)
+
+    report(f'{args.entries} recordatorios, tick {args.tick}s, jitter {args.jitter}s', [
+        ('inserción', {'total': f'{insert:.2f} s', 'por entrada': f'{insert / args.entries * 1e6:.2f} µs'}),
+        ('drenado', {'total': f'{drain:.2f} s', 'por entrada': f'{drain / args.entries * 1e6:.2f} µs'}),
+        ('memoria', {'total': f'{memory / 2**20:.0f} MiB', 'por entrada': f'{memory / args.entries:.0f} B'}),
+        ('pico por tick', {'total': peak_tick, 'por entrada': f'{ticks} ticks'}),
+    ])
+
+
+if __name__ == '__main__':
+    main()
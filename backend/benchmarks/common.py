@@ -0,0 +1,71 @@
+"""
+Utilidades compartidas por los benchmarks.
+
+Los benchmarks se ejecutan desde backend/ contra una base de datos de test
+desechable (nunca contra db.sqlite3 ni la base de producción):
+
+    python benchmarks/bench_serializers.py
+"""
+
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hydrotracker.settings_sqlite')
+
+
+def setup_django():
+    import django
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    """
+    Crea una base de datos de test temporal y la elimina al terminar.
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(func, repeat=5, number=1):
+    """
+    Ejecuta func `number` veces por ronda y retorna (mejor, mediana) en segundos
+    por ejecución.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return min(timings), statistics.median(timings)
+
+
+def report(title, rows):
+    """
+    Imprime una tabla simple: rows es una lista de (nombre, {columna: valor}).
+    """
+    print(f'\n{title}')
+    print('-' * len(title))
+    if not rows:
+        return
+    columns = list(rows[0][1])
+    width = max(len(name) for name, _ in rows) + 2
+    print(''.ljust(width) + ''.join(column.rjust(16) for column in columns))
+    for name, values in rows:
+        print(name.ljust(width) + ''.join(str(values[column]).rjust(16) for column in columns))
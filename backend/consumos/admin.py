@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import Bebida, Recipiente, Consumo, MetaDiaria, Recordatorio
+from .models import (
+    Bebida, Recipiente, Consumo, ConsumoArchivado, ConsumoResumenDiario, MetaDiaria, Recordatorio, ContadorUso,
+    MetricaPlataforma
+)
 
 
 @admin.register(Bebida)
@@ -56,3 +59,40 @@ class RecordatorioAdmin(admin.ModelAdmin):
     def dias_semana_display(self, obj):
         return obj.get_dias_semana_display()
     dias_semana_display.short_description = 'Días de la semana'
+
+
+@admin.register(ContadorUso)
+class ContadorUsoAdmin(admin.ModelAdmin):
+    list_display = [
+        'usuario', 'recordatorios', 'recipientes', 'consumos_dia',
+        'consumos_hoy', 'fecha_reconciliacion'
+    ]
+    search_fields = ['usuario__username']
+    readonly_fields = ['fecha_reconciliacion']
+
+
+@admin.register(MetricaPlataforma)
+class MetricaPlataformaAdmin(admin.ModelAdmin):
+    list_display = [
+        'fecha_calculo', 'total_usuarios', 'usuarios_premium', 'nuevos_usuarios',
+        'total_consumos', 'consumos_30d', 'completo'
+    ]
+    list_filter = ['completo']
+    ordering = ['-fecha_calculo']
+    date_hierarchy = 'fecha_calculo'
+
+
+@admin.register(ConsumoArchivado)
+class ConsumoArchivadoAdmin(admin.ModelAdmin):
+    list_display = ['usuario', 'mes', 'cantidad', 'total_ml', 'fecha_archivo']
+    search_fields = ['usuario__username']
+    exclude = ['datos']
+    ordering = ['-mes']
+
+
+@admin.register(ConsumoResumenDiario)
+class ConsumoResumenDiarioAdmin(admin.ModelAdmin):
+    list_display = ['usuario', 'fecha', 'cantidad_consumos', 'total_ml', 'total_hidratacion_ml']
+    search_fields = ['usuario__username']
+    date_hierarchy = 'fecha'
+    ordering = ['-fecha']
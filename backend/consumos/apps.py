@@ -5,3 +5,8 @@ class ConsumosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'consumos'
     verbose_name = 'Consumos'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from hydrotracker.db_pool import connect_signals
+        connect_signals()
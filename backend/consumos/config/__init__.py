@@ -4,10 +4,12 @@ Configuración para la aplicación de consumos.
 
 from .constants import (
     HYDRATION_GOALS, ACTIVITY_LEVELS, CLIMATE_TYPES,
-    SED_LEVELS, MOOD_LEVELS, PREMIUM_FEATURES
+    SED_LEVELS, MOOD_LEVELS, PREMIUM_FEATURES,
+    ESTADO_ANIMO_CODES, TIPO_ACTIVIDAD_CODES, INTENSIDAD_CODES
 )
 
 __all__ = [
     'HYDRATION_GOALS', 'ACTIVITY_LEVELS', 'CLIMATE_TYPES',
-    'SED_LEVELS', 'MOOD_LEVELS', 'PREMIUM_FEATURES'
+    'SED_LEVELS', 'MOOD_LEVELS', 'PREMIUM_FEATURES',
+    'ESTADO_ANIMO_CODES', 'TIPO_ACTIVIDAD_CODES', 'INTENSIDAD_CODES'
 ]
@@ -214,3 +214,37 @@ UI_ICONS = {
     'energy': '⚡',
     'health': '💚'
 }
+
+# Códigos enteros para la codificación compacta (MessagePack).
+# Son parte del contrato con los clientes: solo se agregan valores nuevos al
+# final, nunca se reordenan ni se reutilizan.
+ESTADO_ANIMO_CODES = {
+    'excelente': 1,
+    'bueno': 2,
+    'regular': 3,
+    'malo': 4,
+    'terrible': 5,
+}
+
+TIPO_ACTIVIDAD_CODES = {
+    'correr': 1,
+    'ciclismo': 2,
+    'natacion': 3,
+    'futbol_rugby': 4,
+    'baloncesto_voley': 5,
+    'gimnasio': 6,
+    'crossfit_hiit': 7,
+    'padel_tenis': 8,
+    'baile_aerobico': 9,
+    'caminata_rapida': 10,
+    'pilates': 11,
+    'caminata': 12,
+    'yoga_hatha': 13,
+    'yoga_bikram': 14,
+}
+
+INTENSIDAD_CODES = {
+    'baja': 1,
+    'media': 2,
+    'alta': 3,
+}
@@ -4,6 +4,8 @@ from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
 import json
 
+from hydrotracker.db_pool import metrics as db_metrics
+
 @csrf_exempt
 @require_http_methods(["GET"])
 def health_check(request):
@@ -20,6 +22,7 @@ def health_check(request):
             "status": "healthy",
             "service": "Dosis vital: Tu aplicación de hidratación personal API",
             "database": "connected",
+            "database_connections": db_metrics(),
             "timestamp": timezone.now().isoformat()
         })
     except Exception as e:
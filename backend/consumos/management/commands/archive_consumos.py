@@ -0,0 +1,46 @@
+"""
+Comando de Django para archivar los consumos antiguos (ConsumoArchivado).
+Debe ejecutarse periódicamente (ej: con cron) o de forma continua con --loop.
+"""
+from django.core.management.base import BaseCommand
+
+from consumos.services.consumo_archive import archive_consumos, run_archive_worker
+
+
+class Command(BaseCommand):
+    help = 'Mueve los consumos de los meses antiguos al archivo comprimido por usuario'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=None,
+            help='Meses que se mantienen en la tabla de consumos (por defecto CONSUMO_HOT_MONTHS)',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Ejecutar de forma continua (worker)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=86400,
+            help='Segundos entre ejecuciones con --loop',
+        )
+
+    def handle(self, *args, **options):
+        if options['loop']:
+            self.stdout.write('Worker de archivo de consumos iniciado')
+            run_archive_worker(interval=options['interval'], months=options['months'])
+            return
+
+        resultados = archive_consumos(months=options['months'])
+        for resultado in resultados:
+            self.stdout.write(
+                f'{resultado["mes"]:%Y-%m}: {resultado["consumos"]} consumos de '
+                f'{resultado["usuarios"]} usuarios'
+                + (' (partición desprendida)' if resultado['particion'] else '')
+            )
+        total = sum(resultado['consumos'] for resultado in resultados)
+        self.stdout.write(self.style.SUCCESS(f'Consumos archivados: {total}.'))
@@ -0,0 +1,67 @@
+"""
+Comando de Django para compactar los consumos antiguos en resúmenes diarios
+(ConsumoResumenDiario). Debe ejecutarse periódicamente (ej: con cron), antes
+de archive_consumos, o de forma continua con --loop.
+"""
+from django.core.management.base import BaseCommand
+
+from consumos.services.consumo_compaction import compact_consumos, run_compaction_worker
+
+
+class Command(BaseCommand):
+    help = 'Resume por día los consumos antiguos de usuarios gratuitos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='Antigüedad en días a partir de la cual se compacta (por defecto CONSUMO_COMPACT_AFTER_DAYS)',
+        )
+        parser.add_argument(
+            '--include-premium',
+            action='store_true',
+            help='Compactar también los consumos de usuarios premium',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Usuarios por bloque',
+        )
+        parser.add_argument(
+            '--start-after',
+            type=int,
+            default=0,
+            help='Retomar a partir del usuario con id mayor que este',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Ejecutar de forma continua (worker)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=86400,
+            help='Segundos entre ejecuciones con --loop',
+        )
+
+    def handle(self, *args, **options):
+        if options['loop']:
+            self.stdout.write('Worker de compactación de consumos iniciado')
+            run_compaction_worker(interval=options['interval'], chunk_size=options['chunk_size'])
+            return
+
+        resultado = compact_consumos(
+            days=options['days'],
+            keep_premium=False if options['include_premium'] else None,
+            chunk_size=options['chunk_size'],
+            start_after=options['start_after'],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Consumos compactados: {resultado["consumos"]} en {resultado["dias"]} días '
+                f'de {resultado["usuarios"]} usuarios (último usuario {resultado["ultimo_usuario_id"]}).'
+            )
+        )
@@ -0,0 +1,44 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from consumos.services.reminder_scheduler import ReminderScheduler
+
+
+class Command(BaseCommand):
+    help = "Despacha los recordatorios vencidos. Con --loop queda corriendo como worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Ejecutar ticks de forma continua')
+        parser.add_argument('--interval', type=float, default=30.0, help='Segundos entre ticks con --loop')
+        parser.add_argument('--batch-size', type=int, default=None, help='Recordatorios por lote')
+        parser.add_argument(
+            '--wheel', action='store_true',
+            help='Usar el motor en memoria (timing wheel) con precisión de subsegundos'
+        )
+        parser.add_argument('--horizon', type=int, default=120, help='Segundos cargados por adelantado (--wheel)')
+        parser.add_argument('--jitter', type=float, default=30.0, help='Jitter máximo en segundos (--wheel)')
+        parser.add_argument('--workers', type=int, default=8, help='Envíos concurrentes (--wheel)')
+
+    def handle(self, *args, **options):
+        if options['wheel']:
+            from consumos.services.timing_wheel import ReminderWheelEngine
+
+            engine = ReminderWheelEngine(
+                horizon=timedelta(seconds=options['horizon']),
+                jitter=options['jitter'],
+                max_workers=options['workers'],
+                batch_size=options['batch_size'] or 200,
+            )
+            self.stdout.write("Motor de recordatorios (timing wheel) iniciado")
+            engine.run()
+            return
+
+        scheduler = ReminderScheduler(batch_size=options['batch_size'])
+        while True:
+            procesados = scheduler.tick()
+            self.stdout.write(f"Recordatorios despachados: {procesados}")
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
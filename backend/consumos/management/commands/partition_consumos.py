@@ -0,0 +1,56 @@
+"""
+Comando de Django para mantener el particionado mensual de consumos en
+PostgreSQL: crea las particiones de los próximos meses y archiva los meses
+antiguos, desprendiendo sus particiones. Debe ejecutarse periódicamente
+(ej: con cron), al menos una vez al mes.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from consumos.services import partitioning
+from consumos.services.consumo_archive import archive_consumos
+
+
+class Command(BaseCommand):
+    help = 'Crea las particiones mensuales de consumos y retira las antiguas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--convert',
+            action='store_true',
+            help='Convertir la tabla en particionada si todavía no lo es (bloquea la tabla)',
+        )
+        parser.add_argument(
+            '--ahead',
+            type=int,
+            default=None,
+            help='Meses futuros con partición (por defecto CONSUMO_PARTITIONS_AHEAD)',
+        )
+        parser.add_argument(
+            '--skip-archive',
+            action='store_true',
+            help='No archivar ni desprender las particiones antiguas',
+        )
+
+    def handle(self, *args, **options):
+        if not partitioning.is_postgres():
+            raise CommandError('El particionado de consumos requiere PostgreSQL')
+
+        ahead = settings.CONSUMO_PARTITIONS_AHEAD if options['ahead'] is None else options['ahead']
+        if not partitioning.is_partitioned():
+            if not options['convert']:
+                raise CommandError('La tabla de consumos no está particionada; use --convert')
+            partitioning.convert_to_partitioned(ahead)
+            self.stdout.write('Tabla de consumos convertida en particionada')
+
+        creadas = partitioning.ensure_partitions(ahead)
+        self.stdout.write(f'Particiones creadas: {", ".join(creadas) or "ninguna"}')
+
+        if not options['skip_archive']:
+            resultados = archive_consumos()
+            desprendidas = [f'{r["mes"]:%Y-%m}' for r in resultados if r['particion']]
+            self.stdout.write(
+                f'Meses archivados: {len(resultados)}; '
+                f'particiones desprendidas: {", ".join(desprendidas) or "ninguna"}'
+            )
+        self.stdout.write(self.style.SUCCESS('Particionado de consumos al día.'))
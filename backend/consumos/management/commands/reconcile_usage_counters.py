@@ -0,0 +1,49 @@
+"""
+Comando de Django para reconciliar los contadores de uso (ContadorUso) con
+las tablas. Debe ejecutarse periódicamente (ej: con cron) o de forma continua
+con --loop, para corregir lo que no pasa por señales (bulk_create, update()).
+"""
+from django.core.management.base import BaseCommand
+
+from consumos.services.usage_counters import reconcile, run_reconcile_worker
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los contadores de uso por usuario desde las tablas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help='Reconciliar solo este usuario (repetible)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Usuarios recontados por consulta',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Ejecutar de forma continua (worker)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=3600,
+            help='Segundos entre ejecuciones con --loop',
+        )
+
+    def handle(self, *args, **options):
+        if options['loop']:
+            self.stdout.write('Worker de reconciliación de contadores iniciado')
+            run_reconcile_worker(interval=options['interval'], chunk_size=options['chunk_size'])
+            return
+
+        corregidos = reconcile(options['user_ids'], chunk_size=options['chunk_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Contadores reconciliados: {corregidos} desajustado(s) corregido(s).')
+        )
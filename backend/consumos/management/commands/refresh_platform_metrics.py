@@ -0,0 +1,56 @@
+"""
+Comando de Django para generar el snapshot de métricas de la plataforma
+(MetricaPlataforma) que lee MonetizationStatsView. Debe ejecutarse
+periódicamente (ej: con cron) o de forma continua con --loop.
+"""
+from django.core.management.base import BaseCommand
+
+from consumos.services.platform_metrics import (
+    prune_snapshots, refresh_platform_metrics, run_metrics_worker
+)
+
+
+class Command(BaseCommand):
+    help = 'Actualiza de forma incremental las métricas globales de la plataforma'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Recalcular desde cero en lugar de partir del último snapshot',
+        )
+        parser.add_argument(
+            '--keep-days',
+            type=int,
+            default=None,
+            help='Borrar los snapshots con más de estos días',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Ejecutar de forma continua (worker)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=900,
+            help='Segundos entre ejecuciones con --loop',
+        )
+
+    def handle(self, *args, **options):
+        if options['loop']:
+            self.stdout.write('Worker de métricas de plataforma iniciado')
+            run_metrics_worker(interval=options['interval'])
+            return
+
+        snapshot = refresh_platform_metrics(full=options['full'])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Snapshot {"completo" if snapshot.completo else "incremental"}: '
+                f'{snapshot.total_usuarios} usuarios, {snapshot.total_consumos} consumos, '
+                f'{snapshot.consumos_30d} en 30 días.'
+            )
+        )
+        if options['keep_days'] is not None:
+            borrados = prune_snapshots(options['keep_days'])
+            self.stdout.write(f'Snapshots antiguos borrados: {borrados}')
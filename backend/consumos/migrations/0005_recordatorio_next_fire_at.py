@@ -0,0 +1,62 @@
+# Generated by Django 4.2.16 on 2026-10-19 01:08
+
+from datetime import datetime, timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def proxima_ocurrencia(hora, dias_semana, desde):
+    """
+    Copia congelada de DateUtils.get_next_occurrence al crear esta migración
+    (las migraciones no importan código de la aplicación, que puede cambiar).
+    """
+    if dias_semana:
+        dias_validos = {dia for dia in dias_semana if isinstance(dia, int) and 0 <= dia <= 6}
+        if not dias_validos:
+            return None
+    else:
+        dias_validos = None
+
+    desde_local = timezone.localtime(desde)
+    fecha = desde_local.date()
+    if datetime.combine(fecha, hora) <= desde_local.replace(tzinfo=None):
+        fecha += timedelta(days=1)
+    if dias_validos is not None:
+        fecha += timedelta(days=min((dia - fecha.weekday()) % 7 for dia in dias_validos))
+    return timezone.make_aware(datetime.combine(fecha, hora))
+
+
+def backfill_next_fire_at(apps, schema_editor):
+    """
+    Calcula next_fire_at para los recordatorios activos existentes.
+    """
+    Recordatorio = apps.get_model('consumos', 'Recordatorio')
+    ahora = timezone.now()
+    pendientes = []
+    for recordatorio in Recordatorio.objects.filter(activo=True).only('id', 'hora', 'dias_semana').iterator():
+        recordatorio.next_fire_at = proxima_ocurrencia(
+            recordatorio.hora, recordatorio.dias_semana, ahora
+        )
+        pendientes.append(recordatorio)
+        if len(pendientes) >= 1000:
+            Recordatorio.objects.bulk_update(pendientes, ['next_fire_at'])
+            pendientes = []
+    if pendientes:
+        Recordatorio.objects.bulk_update(pendientes, ['next_fire_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consumos', '0004_update_bebidas_data'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recordatorio',
+            name='next_fire_at',
+            field=models.DateTimeField(blank=True, db_index=True, help_text='Próximo envío precalculado (nulo si está inactivo o sin días válidos)', null=True, verbose_name='Próximo envío'),
+        ),
+        migrations.RunPython(backfill_next_fire_at, migrations.RunPython.noop),
+    ]
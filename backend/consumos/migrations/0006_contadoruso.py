@@ -0,0 +1,31 @@
+# Generated by Django 4.2.16 on 2026-10-19 01:33
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0012_user_subscription_fields'),
+        ('consumos', '0005_recordatorio_next_fire_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadorUso',
+            fields=[
+                ('usuario', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='contador_uso', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+                ('recordatorios', models.PositiveIntegerField(default=0, verbose_name='Recordatorios')),
+                ('recipientes', models.PositiveIntegerField(default=0, verbose_name='Recipientes')),
+                ('consumos_dia', models.DateField(blank=True, help_text='Día local al que corresponde consumos_hoy', null=True, verbose_name='Día de consumos')),
+                ('consumos_hoy', models.PositiveIntegerField(default=0, verbose_name='Consumos del día')),
+                ('fecha_reconciliacion', models.DateTimeField(blank=True, null=True, verbose_name='Última reconciliación')),
+            ],
+            options={
+                'verbose_name': 'Contador de uso',
+                'verbose_name_plural': 'Contadores de uso',
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.16 on 2026-10-19 01:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consumos', '0006_contadoruso'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MetricaPlataforma',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha_calculo', models.DateTimeField(db_index=True, verbose_name='Fecha de cálculo')),
+                ('total_usuarios', models.PositiveIntegerField(default=0, verbose_name='Usuarios')),
+                ('usuarios_premium', models.PositiveIntegerField(default=0, verbose_name='Usuarios premium')),
+                ('usuarios_activos_30d', models.PositiveIntegerField(default=0, verbose_name='Usuarios activos (30 días)')),
+                ('nuevos_usuarios', models.PositiveIntegerField(default=0, help_text='Altas desde el snapshot anterior', verbose_name='Nuevos usuarios')),
+                ('total_consumos', models.PositiveBigIntegerField(default=0, verbose_name='Consumos')),
+                ('consumos_30d', models.PositiveIntegerField(default=0, verbose_name='Consumos (30 días)')),
+                ('consumos_por_dia', models.JSONField(default=dict, help_text='Conteo por día local (YYYY-MM-DD) de los últimos 30 días', verbose_name='Consumos por día')),
+                ('ultimo_usuario_id', models.PositiveBigIntegerField(default=0, verbose_name='Último usuario contado')),
+                ('ultimo_consumo_id', models.PositiveBigIntegerField(default=0, verbose_name='Último consumo contado')),
+                ('completo', models.BooleanField(default=False, help_text='Indica si el snapshot se calculó desde cero y no de forma incremental', verbose_name='Recuento completo')),
+            ],
+            options={
+                'verbose_name': 'Métrica de plataforma',
+                'verbose_name_plural': 'Métricas de plataforma',
+                'ordering': ['-fecha_calculo'],
+                'get_latest_by': 'fecha_calculo',
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.16 on 2026-10-19 02:17
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('consumos', '0007_metricaplataforma'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConsumoArchivado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField(help_text='Primer día del mes (UTC) de los consumos archivados', verbose_name='Mes')),
+                ('cantidad', models.PositiveIntegerField(default=0, verbose_name='Consumos')),
+                ('total_ml', models.PositiveBigIntegerField(default=0, verbose_name='Total (ml)')),
+                ('total_hidratacion_ml', models.PositiveBigIntegerField(default=0, verbose_name='Hidratación efectiva (ml)')),
+                ('datos', models.BinaryField(help_text='Filas del mes comprimidas (JSON + zlib)', verbose_name='Datos')),
+                ('fecha_archivo', models.DateTimeField(auto_now=True, verbose_name='Fecha de archivo')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='consumos_archivados', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Consumo archivado',
+                'verbose_name_plural': 'Consumos archivados',
+                'ordering': ['-mes'],
+                'unique_together': {('usuario', 'mes')},
+            },
+        ),
+    ]
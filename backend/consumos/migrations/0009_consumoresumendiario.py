@@ -0,0 +1,33 @@
+# Generated by Django 4.2.16 on 2026-10-19 02:25
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('consumos', '0008_consumoarchivado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConsumoResumenDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(verbose_name='Fecha')),
+                ('cantidad_consumos', models.PositiveIntegerField(default=0, verbose_name='Consumos')),
+                ('total_ml', models.PositiveIntegerField(default=0, verbose_name='Total (ml)')),
+                ('total_hidratacion_ml', models.PositiveIntegerField(default=0, verbose_name='Hidratación efectiva (ml)')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_diarios', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Resumen diario de consumos',
+                'verbose_name_plural': 'Resúmenes diarios de consumos',
+                'ordering': ['-fecha'],
+                'unique_together': {('usuario', 'fecha')},
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated manually - Data migration for legacy container names
+
+from django.db import migrations
+
+NOMBRES_ANTIGUOS = {
+    'Taza/Vaso': 'Vaso',
+    'Botella/Termo pequeño': 'Botella',
+}
+
+
+def renombrar_recipientes(apps, schema_editor):
+    """
+    Renombra los recipientes por defecto con nombres antiguos (Taza/Vaso,
+    Botella/Termo pequeño) a Vaso/Botella. Antes se hacía en cada listado
+    de RecipienteViewSet.
+
+    No toca la caché para no depender del código actual de la aplicación:
+    los listados cacheados caducan solos, y un cliente con un ETag anterior
+    recibe los nombres nuevos tras la siguiente escritura sobre sus
+    recipientes.
+
+    (usuario, nombre) es único: a los usuarios que ya tienen un recipiente
+    con el nombre nuevo se les deja el antiguo tal cual (sus consumos pueden
+    apuntar a cualquiera de los dos).
+    """
+    Recipiente = apps.get_model('consumos', 'Recipiente')
+    for antiguo, nuevo in NOMBRES_ANTIGUOS.items():
+        Recipiente.objects.filter(nombre=antiguo).exclude(
+            usuario__in=Recipiente.objects.filter(nombre=nuevo).values('usuario')
+        ).update(nombre=nuevo)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('consumos', '0009_consumoresumendiario'),
+    ]
+
+    operations = [
+        migrations.RunPython(renombrar_recipientes, migrations.RunPython.noop),
+    ]
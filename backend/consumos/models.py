@@ -264,6 +264,80 @@ class Consumo(models.Model):
         return 0
 
 
+class ConsumoArchivado(models.Model):
+    """
+    Consumos de un usuario en un mes (UTC) retirados de la tabla Consumo por
+    el comando archive_consumos. Las filas se guardan comprimidas en
+    ``datos`` (consumos.services.consumo_archive) y el historial y la
+    exportación las leen junto con las de Consumo.
+    """
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='consumos_archivados',
+        verbose_name='Usuario'
+    )
+    mes = models.DateField(
+        verbose_name='Mes',
+        help_text='Primer día del mes (UTC) de los consumos archivados'
+    )
+    cantidad = models.PositiveIntegerField(default=0, verbose_name='Consumos')
+    total_ml = models.PositiveBigIntegerField(default=0, verbose_name='Total (ml)')
+    total_hidratacion_ml = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Hidratación efectiva (ml)'
+    )
+    datos = models.BinaryField(
+        verbose_name='Datos',
+        help_text='Filas del mes comprimidas (JSON + zlib)'
+    )
+    fecha_archivo = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Fecha de archivo'
+    )
+
+    class Meta:
+        verbose_name = 'Consumo archivado'
+        verbose_name_plural = 'Consumos archivados'
+        ordering = ['-mes']
+        unique_together = ['usuario', 'mes']
+
+    def __str__(self):
+        return f"{self.usuario_id} - {self.mes:%Y-%m} ({self.cantidad} consumos)"
+
+
+class ConsumoResumenDiario(models.Model):
+    """
+    Totales por día de consumos ya compactados.
+
+    El comando compact_consumos reemplaza los consumos antiguos de usuarios
+    gratuitos por una fila por día (local, TIME_ZONE); los resúmenes y
+    tendencias suman estas filas a las de Consumo.
+    """
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='resumenes_diarios',
+        verbose_name='Usuario'
+    )
+    fecha = models.DateField(verbose_name='Fecha')
+    cantidad_consumos = models.PositiveIntegerField(default=0, verbose_name='Consumos')
+    total_ml = models.PositiveIntegerField(default=0, verbose_name='Total (ml)')
+    total_hidratacion_ml = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Hidratación efectiva (ml)'
+    )
+
+    class Meta:
+        verbose_name = 'Resumen diario de consumos'
+        verbose_name_plural = 'Resúmenes diarios de consumos'
+        ordering = ['-fecha']
+        unique_together = ['usuario', 'fecha']
+
+    def __str__(self):
+        return f"{self.usuario_id} - {self.fecha} ({self.cantidad_consumos} consumos)"
+
+
 class MetaDiaria(models.Model):
     """
     Modelo para registrar las metas diarias de hidratación del usuario.
@@ -441,6 +515,16 @@ class Recordatorio(models.Model):
         verbose_name='Último enviado',
         help_text='Fecha y hora del último envío del recordatorio'
     )
+    next_fire_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        db_index=True,
+        verbose_name='Próximo envío',
+        help_text='Próximo envío precalculado (nulo si está inactivo o sin días válidos)'
+    )
+
+    # Campos de los que depende next_fire_at
+    SCHEDULE_FIELDS = frozenset({'hora', 'dias_semana', 'activo'})
 
     class Meta:
         verbose_name = 'Recordatorio'
@@ -483,31 +567,27 @@ class Recordatorio(models.Model):
         
         return dia_semana in self.dias_semana
 
-    def get_proximo_envio(self):
+    def get_proximo_envio(self, desde=None):
         """
-        Calcula el próximo envío del recordatorio.
+        Calcula el próximo envío del recordatorio posterior a ``desde``
+        (por defecto, ahora).
         """
-        from django.utils import timezone
-        from datetime import datetime, timedelta
-        
-        ahora = timezone.now()
-        hoy = ahora.date()
-        
-        # Crear datetime con la hora del recordatorio para hoy
-        proximo_envio = datetime.combine(hoy, self.hora)
-        proximo_envio = timezone.make_aware(proximo_envio)
-        
-        # Si ya pasó la hora de hoy, programar para mañana
-        if proximo_envio <= ahora:
-            proximo_envio += timedelta(days=1)
-        
-        # Verificar que el próximo envío sea en un día válido
-        intentos = 0
-        while not self.es_dia_valido(proximo_envio.date()) and intentos < 7:
-            proximo_envio += timedelta(days=1)
-            intentos += 1
-        
-        return proximo_envio if intentos < 7 else None
+        from .utils.date_utils import DateUtils
+
+        # hora puede llegar como 'HH:MM' si el objeto aún no pasó por la base
+        hora = self._meta.get_field('hora').to_python(self.hora)
+        return DateUtils.get_next_occurrence(hora, self.dias_semana, desde)
+
+    def save(self, *args, **kwargs):
+        """
+        Mantiene next_fire_at al día cuando cambian hora, días o estado.
+        """
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or self.SCHEDULE_FIELDS & set(update_fields):
+            self.next_fire_at = self.get_proximo_envio() if self.activo else None
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'next_fire_at'}
+        super().save(*args, **kwargs)
 
     def marcar_enviado(self):
         """
@@ -531,3 +611,111 @@ class Recordatorio(models.Model):
         }
         
         return mensajes_por_tipo.get(self.tipo_recordatorio, "⏰ Recordatorio de hidratación")
+
+
+class ContadorUso(models.Model):
+    """
+    Contadores de uso desnormalizados por usuario para los límites del plan.
+
+    Se mantienen con UPDATE ... SET campo = campo ± 1 desde las señales de
+    alta y baja (consumos.services.usage_counters) y se reconcilian con el
+    comando reconcile_usage_counters. consumos_hoy cuenta los consumos del
+    día local consumos_dia; en otro día se lee como 0.
+    """
+    usuario = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='contador_uso',
+        verbose_name='Usuario'
+    )
+    recordatorios = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Recordatorios'
+    )
+    recipientes = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Recipientes'
+    )
+    consumos_dia = models.DateField(
+        null=True,
+        blank=True,
+        verbose_name='Día de consumos',
+        help_text='Día local al que corresponde consumos_hoy'
+    )
+    consumos_hoy = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Consumos del día'
+    )
+    fecha_reconciliacion = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Última reconciliación'
+    )
+
+    class Meta:
+        verbose_name = 'Contador de uso'
+        verbose_name_plural = 'Contadores de uso'
+
+    def __str__(self):
+        return f"{self.usuario_id} - {self.recordatorios} recordatorios, {self.recipientes} recipientes"
+
+    def consumos_en(self, fecha):
+        """
+        Consumos registrados en el día local ``fecha``.
+        """
+        return self.consumos_hoy if self.consumos_dia == fecha else 0
+
+
+class MetricaPlataforma(models.Model):
+    """
+    Snapshot de métricas globales de la plataforma para el panel de
+    administración. Lo genera el comando refresh_platform_metrics; cada
+    snapshot vuelve a contar la ventana de 30 días y arrastra del anterior el
+    total de los días más antiguos. La serie de snapshots es el histórico.
+    """
+    fecha_calculo = models.DateTimeField(
+        db_index=True,
+        verbose_name='Fecha de cálculo'
+    )
+    total_usuarios = models.PositiveIntegerField(default=0, verbose_name='Usuarios')
+    usuarios_premium = models.PositiveIntegerField(default=0, verbose_name='Usuarios premium')
+    usuarios_activos_30d = models.PositiveIntegerField(default=0, verbose_name='Usuarios activos (30 días)')
+    nuevos_usuarios = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Nuevos usuarios',
+        help_text='Altas desde el snapshot anterior'
+    )
+    total_consumos = models.PositiveBigIntegerField(default=0, verbose_name='Consumos')
+    consumos_30d = models.PositiveIntegerField(default=0, verbose_name='Consumos (30 días)')
+    consumos_por_dia = models.JSONField(
+        default=dict,
+        verbose_name='Consumos por día',
+        help_text='Conteo por día local (YYYY-MM-DD) de los últimos 30 días'
+    )
+    ultimo_usuario_id = models.PositiveBigIntegerField(default=0, verbose_name='Último usuario contado')
+    ultimo_consumo_id = models.PositiveBigIntegerField(default=0, verbose_name='Último consumo contado')
+    completo = models.BooleanField(
+        default=False,
+        verbose_name='Recuento completo',
+        help_text='Indica si el snapshot se calculó desde cero y no de forma incremental'
+    )
+
+    class Meta:
+        verbose_name = 'Métrica de plataforma'
+        verbose_name_plural = 'Métricas de plataforma'
+        ordering = ['-fecha_calculo']
+        get_latest_by = 'fecha_calculo'
+
+    def __str__(self):
+        return f"{self.fecha_calculo:%Y-%m-%d %H:%M} - {self.total_usuarios} usuarios, {self.total_consumos} consumos"
+
+    @property
+    def usuarios_gratuitos(self):
+        return self.total_usuarios - self.usuarios_premium
+
+    @property
+    def tasa_conversion(self):
+        if self.total_usuarios > 0:
+            return self.usuarios_premium / self.total_usuarios * 100
+        return 0
@@ -5,6 +5,8 @@ Permisos personalizados para la aplicación de consumos.
 import logging
 from rest_framework.permissions import BasePermission
 
+from .services.entitlements import get_entitlements
+
 logger = logging.getLogger('users.security')
 
 
@@ -15,15 +17,12 @@ class IsPremiumUser(BasePermission):
     
     def has_permission(self, request, view):
         """
-        Retorna True si el usuario está autenticado y es premium.
+        Retorna True si el usuario está autenticado y su premium está vigente.
         """
         if not (request.user and request.user.is_authenticated):
             return False
         
-        is_premium = (
-            hasattr(request.user, 'es_premium') and 
-            request.user.es_premium
-        )
+        is_premium = get_entitlements(request).is_premium
         
         # Log de intento de acceso a recurso premium sin permisos
         if not is_premium:
@@ -70,8 +69,7 @@ class IsOwnerOrPremium(BasePermission):
             return False
         
         # Si el usuario es premium, puede acceder a cualquier objeto
-        if (hasattr(request.user, 'es_premium') and 
-            request.user.es_premium):
+        if get_entitlements(request).is_premium:
             return True
         
         # Si no es premium, solo puede acceder a sus propios objetos
@@ -126,7 +124,4 @@ class IsPremiumOrReadOnly(BasePermission):
             return True
         
         # Para métodos de escritura, requiere ser premium
-        return (
-            hasattr(request.user, 'es_premium') and 
-            request.user.es_premium
-        )
+        return get_entitlements(request).is_premium
@@ -20,6 +20,9 @@ from .premium_serializers import (
     PremiumGoalSerializer, PremiumBeverageSerializer, PremiumReminderSerializer,
     PremiumReminderCreateSerializer
 )
+from .fast_serializers import (
+    ValuesSerializer, ConsumoFastSerializer, ConsumoHistoryFastSerializer
+)
 from .stats_serializers import (
     ConsumoHistorySerializer, ConsumoSummarySerializer, ConsumoDailySummarySerializer,
     ConsumoWeeklySummarySerializer, ConsumoMonthlySummarySerializer, ConsumoTrendSerializer,
@@ -40,6 +43,9 @@ __all__ = [
     'PremiumGoalSerializer', 'PremiumBeverageSerializer', 'PremiumReminderSerializer',
     'PremiumReminderCreateSerializer',
     
+    # Serializers rápidos de solo lectura
+    'ValuesSerializer', 'ConsumoFastSerializer', 'ConsumoHistoryFastSerializer',
+    
     # Serializers de estadísticas
     'ConsumoHistorySerializer', 'ConsumoSummarySerializer', 'ConsumoDailySummarySerializer',
     'ConsumoWeeklySummarySerializer', 'ConsumoMonthlySummarySerializer', 'ConsumoTrendSerializer',
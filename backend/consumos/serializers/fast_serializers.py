@@ -0,0 +1,255 @@
+"""
+Serializers rápidos de solo lectura para listados grandes.
+
+Trabajan sobre tuplas de ``values_list()`` con un plan de campos precalculado
+en lugar de instanciar modelos y recorrer los campos DRF fila por fila. La
+salida es idéntica a la del serializer DRF equivalente, que sigue siendo el
+usado para escrituras y para el detalle.
+"""
+
+from zoneinfo import ZoneInfo
+
+from django.utils import timezone
+
+from ..config.constants import ESTADO_ANIMO_CODES
+
+
+# Tipos de campo del plan
+RAW = 'raw'                # valor tal cual sale de la base de datos
+DATETIME = 'datetime'      # DateTimeField de DRF (ISO 8601 en la zona actual)
+LOCAL_DATE = 'local_date'  # YYYY-MM-DD en la zona del usuario
+LOCAL_TIME = 'local_time'  # HH:MM en la zona del usuario
+CHOICE = 'choice'          # get_FOO_display() del modelo
+CONSTANT = 'constant'      # valor fijo (campos que solo existen tras escribir)
+
+
+def drf_isoformat(value):
+    """
+    Equivalente a DateTimeField.to_representation con formato ISO 8601.
+    Espera un datetime ya convertido a la zona de salida.
+    """
+    representation = value.isoformat()
+    if representation.endswith('+00:00'):
+        representation = representation[:-6] + 'Z'
+    return representation
+
+
+class ValuesSerializer:
+    """
+    Serializer de solo lectura basado en values_list().
+
+    Las subclases declaran ``fields`` como tuplas
+    ``(nombre, columna, tipo[, extra])``. El plan (columnas a leer, índices y
+    conversores) se construye una vez por petición; por fila solo se leen
+    posiciones de la tupla y, como mucho, se hace una conversión de zona
+    horaria (la de ``local_column``).
+
+    Admite proyección con ``?fields=a,b`` (solo se leen las columnas
+    necesarias) y una variante compacta para renderers con
+    ``compact_encoding = True`` (MessagePack): fechas como epoch en segundos,
+    choices como enteros (``compact_enums``) y sin los campos derivados de
+    ``compact_exclude``.
+    """
+
+    fields = ()
+    # Columna cuya hora local se calcula una sola vez por fila
+    local_column = None
+    # Campos que se omiten de la salida cuando son nulos (SkipField en DRF)
+    skip_if_null = ()
+    # Codificación compacta: {campo: {valor: código}} y campos derivados a omitir
+    compact_enums = {}
+    compact_exclude = ()
+
+    def __init__(self, context=None):
+        self.context = context or {}
+        self._specs = None
+
+    def get_local_timezone(self):
+        """
+        Zona horaria del usuario (?tz=), igual que ConsumoSerializer.
+        """
+        request = self.context.get('request')
+        if request is not None:
+            tz_name = request.query_params.get('tz')
+            if tz_name:
+                try:
+                    return ZoneInfo(tz_name)
+                except (ValueError, KeyError):
+                    pass
+        return timezone.get_current_timezone()
+
+    def is_compact(self):
+        """
+        True si la respuesta se va a codificar con un renderer compacto.
+        """
+        request = self.context.get('request')
+        renderer = getattr(request, 'accepted_renderer', None)
+        return bool(getattr(renderer, 'compact_encoding', False))
+
+    def get_requested_fields(self):
+        """
+        Campos pedidos con ?fields=a,b (None si no se pidió proyección).
+        Los nombres desconocidos se ignoran.
+        """
+        request = self.context.get('request')
+        if request is None:
+            return None
+        raw = request.query_params.get('fields')
+        if not raw:
+            return None
+        known = {spec[0] for spec in self.fields}
+        requested = {name.strip() for name in raw.split(',')} & known
+        return requested or None
+
+    def get_field_specs(self):
+        if self._specs is None:
+            specs = self.fields
+            requested = self.get_requested_fields()
+            if requested is not None:
+                specs = [spec for spec in specs if spec[0] in requested]
+            if self.is_compact():
+                specs = [spec for spec in specs if spec[0] not in self.compact_exclude]
+            self._specs = tuple(specs)
+        return self._specs
+
+    def _needs_local(self):
+        return any(spec[2] in (LOCAL_DATE, LOCAL_TIME) for spec in self.get_field_specs())
+
+    def get_columns(self):
+        """
+        Columnas de base de datos necesarias para el plan, sin repetir.
+        """
+        columns = []
+        for spec in self.get_field_specs():
+            column = spec[1]
+            if column is not None and column not in columns:
+                columns.append(column)
+        if self._needs_local() and self.local_column not in columns:
+            columns.append(self.local_column)
+        # values_list() sin columnas devolvería todas
+        return columns or ['id']
+
+    def values(self, queryset):
+        """
+        Reduce el queryset a las columnas del plan.
+        """
+        return queryset.values_list(*self.get_columns())
+
+    def _compile(self, columns):
+        compact = self.is_compact()
+        current_tz = timezone.get_current_timezone()
+        local_tz = self.get_local_timezone()
+        same_tz = local_tz == current_tz
+        index_of = {column: position for position, column in enumerate(columns)}
+        local_index = index_of.get(self.local_column) if self._needs_local() else None
+
+        steps = []
+        for spec in self.get_field_specs():
+            name, column, kind = spec[:3]
+            index = index_of.get(column)
+            skip_null = name in self.skip_if_null
+
+            if kind == RAW:
+                codes = self.compact_enums.get(name) if compact else None
+                if codes:
+                    convert = lambda value, local, codes=codes: codes.get(value, value)
+                else:
+                    convert = None
+            elif kind == DATETIME:
+                if compact:
+                    convert = lambda value, local: int(value.timestamp()) if value else None
+                elif same_tz and local_index is not None and index == local_index:
+                    convert = lambda value, local: drf_isoformat(local) if value else None
+                else:
+                    convert = (
+                        lambda value, local, tz=current_tz:
+                        drf_isoformat(value.astimezone(tz)) if value else None
+                    )
+            elif kind == LOCAL_DATE:
+                convert = lambda value, local: local.date().isoformat()
+            elif kind == LOCAL_TIME:
+                convert = lambda value, local: local.strftime('%H:%M')
+            elif kind == CHOICE:
+                labels = {key: str(label) for key, label in spec[3]}
+                convert = lambda value, local, labels=labels: labels.get(value, value)
+            elif kind == CONSTANT:
+                constant = spec[3]
+                index = 0
+                convert = lambda value, local, constant=constant: constant
+            else:
+                raise ValueError(f'Tipo de campo desconocido: {kind}')
+
+            steps.append((name, index, convert, skip_null))
+        return steps, local_index, local_tz
+
+    def serialize(self, rows, columns=None):
+        """
+        Convierte filas de values_list() en la lista de diccionarios de salida.
+        """
+        steps, local_index, local_tz = self._compile(columns or self.get_columns())
+        data = []
+        append = data.append
+        for row in rows:
+            local = row[local_index].astimezone(local_tz) if local_index is not None else None
+            item = {}
+            for name, index, convert, skip_null in steps:
+                value = row[index]
+                if convert is not None:
+                    value = convert(value, local)
+                if value is None and skip_null:
+                    continue
+                item[name] = value
+            append(item)
+        return data
+
+    def serialize_queryset(self, queryset):
+        return self.serialize(self.values(queryset))
+
+
+class ConsumoFastSerializer(ValuesSerializer):
+    """
+    Equivalente de solo lectura de ConsumoSerializer.
+    """
+    fields = (
+        ('id', 'id', RAW),
+        ('cantidad_ml', 'cantidad_ml', RAW),
+        ('bebida', 'bebida_id', RAW),
+        ('bebida_nombre', 'bebida__nombre', RAW),
+        ('recipiente', 'recipiente_id', RAW),
+        ('recipiente_nombre', 'recipiente__nombre', RAW),
+        ('hidratacion_efectiva_ml', 'cantidad_hidratacion_efectiva', RAW),
+        ('deshidratacion_neta_ml', 'deshidratacion_neta_ml', RAW),
+        ('agua_compensacion_recomendada_ml', 'agua_compensacion_recomendada_ml', RAW),
+        ('fecha_hora', 'fecha_hora', DATETIME),
+        ('fecha_formateada', 'fecha_hora', LOCAL_DATE),
+        ('hora_formateada', 'fecha_hora', LOCAL_TIME),
+        ('nivel_sed', 'nivel_sed', RAW),
+        ('estado_animo', 'estado_animo', RAW),
+        ('notas', 'notas', RAW),
+        ('ubicacion', 'ubicacion', RAW),
+        ('fecha_creacion', 'fecha_creacion', DATETIME),
+    )
+    local_column = 'fecha_hora'
+    # CharField(source='recipiente.nombre') sin recipiente se omite en DRF
+    skip_if_null = ('recipiente_nombre',)
+    compact_enums = {'estado_animo': ESTADO_ANIMO_CODES}
+    compact_exclude = ('fecha_formateada', 'hora_formateada')
+
+
+class ConsumoHistoryFastSerializer(ValuesSerializer):
+    """
+    Filas del historial premium con el formato de ConsumoHistorySerializer.
+    """
+    fields = (
+        ('id', 'id', RAW),
+        ('cantidad_ml', 'cantidad_ml', RAW),
+        ('bebida_nombre', 'bebida__nombre', RAW),
+        ('recipiente_nombre', 'recipiente__nombre', RAW),
+        ('hidratacion_efectiva_ml', 'cantidad_hidratacion_efectiva', RAW),
+        ('fecha_hora', 'fecha_hora', DATETIME),
+        ('nivel_sed', 'nivel_sed', RAW),
+        ('estado_animo', 'estado_animo', RAW),
+        ('notas', 'notas', RAW),
+        ('ubicacion', 'ubicacion', RAW),
+    )
+    compact_enums = {'estado_animo': ESTADO_ANIMO_CODES}
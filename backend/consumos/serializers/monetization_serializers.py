@@ -42,6 +42,8 @@ class MonetizationStatsSerializer(serializers.Serializer):
     usuarios = serializers.DictField()
     conversion = serializers.DictField()
     actividad = serializers.DictField()
+    fecha_calculo = serializers.DateTimeField()
+    historial = serializers.ListField(child=serializers.DictField(), required=False)
 
 
 class UpgradePromptSerializer(serializers.Serializer):
@@ -4,6 +4,7 @@ Serializers para el modelo Recordatorio.
 
 from rest_framework import serializers
 from ..models import Recordatorio
+from ..services.entitlements import get_entitlements
 
 
 class RecordatorioSerializer(serializers.ModelSerializer):
@@ -69,18 +70,11 @@ class RecordatorioCreateSerializer(serializers.ModelSerializer):
         """
         Validaciones adicionales para la creación de recordatorios.
         """
-        # Validar que no se exceda el límite de recordatorios
-        user = self.context['request'].user
-        current_count = Recordatorio.objects.filter(usuario=user).count()
+        # Validar que no se exceda el límite de recordatorios del plan
+        entitlements = get_entitlements(self.context['request'])
+        max_reminders = entitlements.max_recordatorios
         
-        # Obtener límite según el plan del usuario
-        from django.conf import settings
-        if user.es_premium:
-            max_reminders = settings.META_MAX_RECORDATORIOS_PREMIUM
-        else:
-            max_reminders = settings.META_MAX_RECORDATORIOS_GRATUITOS
-        
-        if current_count >= max_reminders:
+        if not entitlements.can_create_recordatorio():
             raise serializers.ValidationError(
                 f"Has alcanzado el límite de {max_reminders} recordatorios. "
                 "Actualiza a Premium para recordatorios ilimitados."
@@ -12,13 +12,13 @@ class ConsumoHistorySerializer(serializers.Serializer):
     id = serializers.IntegerField()
     cantidad_ml = serializers.IntegerField()
     bebida_nombre = serializers.CharField()
-    recipiente_nombre = serializers.CharField()
+    recipiente_nombre = serializers.CharField(allow_null=True)
     hidratacion_efectiva_ml = serializers.IntegerField()
     fecha_hora = serializers.DateTimeField()
-    nivel_sed = serializers.IntegerField()
-    estado_animo = serializers.IntegerField()
-    notas = serializers.CharField(allow_blank=True)
-    ubicacion = serializers.CharField(allow_blank=True)
+    nivel_sed = serializers.IntegerField(allow_null=True)
+    estado_animo = serializers.CharField(allow_null=True)
+    notas = serializers.CharField(allow_blank=True, allow_null=True)
+    ubicacion = serializers.CharField(allow_blank=True, allow_null=True)
 
 
 class ConsumoSummarySerializer(serializers.Serializer):
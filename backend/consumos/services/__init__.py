@@ -7,7 +7,13 @@ from .consumo_service import ConsumoService
 from .monetization_service import MonetizationService
 from .stats_service import StatsService
 from .premium_service import PremiumService
+from .reminder_progress import DailyProgressLookup
+from .reminder_scheduler import ReminderScheduler, LoggingReminderSender
+from .notification_schedule import NotificationScheduleCompiler, ScheduleIndex
+from .entitlements import Entitlements, get_entitlements
 
 __all__ = [
-    'ConsumoService', 'MonetizationService', 'StatsService', 'PremiumService'
+    'ConsumoService', 'MonetizationService', 'StatsService', 'PremiumService',
+    'ReminderScheduler', 'LoggingReminderSender', 'NotificationScheduleCompiler',
+    'ScheduleIndex', 'DailyProgressLookup', 'Entitlements', 'get_entitlements'
 ]
@@ -0,0 +1,418 @@
+"""
+Archivo frío de consumos (ConsumoArchivado) y lectura conjunta con Consumo.
+
+archive_consumos retira de la tabla Consumo los meses (UTC) anteriores a
+CONSUMO_HOT_MONTHS: guarda un registro comprimido por usuario y mes y borra
+las filas calientes (con PostgreSQL particionado, desprendiendo la partición
+del mes; ver consumos.services.partitioning).
+
+ConsumoTimeline presenta los consumos calientes y los archivados como una
+sola secuencia ordenada por -fecha_hora, con la interfaz que usan los
+serializers rápidos y la paginación (values_list, count e índices), de modo
+que el historial y la exportación no distinguen dónde está cada fila.
+"""
+import json
+import logging
+from functools import partial
+import zlib
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Count, Max, Min, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from hydrotracker.periodic import run_periodic
+from ..models import Bebida, Consumo, ConsumoArchivado, Recipiente
+from ..utils.cache_utils import ResourceVersion
+from . import partitioning
+from .consumo_compaction import daily_totals
+from .partitioning import add_months, month_bounds, month_start
+
+logger = logging.getLogger(__name__)
+
+# Columnas de Consumo que se guardan por fila (sin usuario_id, que va en el registro)
+ARCHIVE_COLUMNS = (
+    'id', 'bebida_id', 'recipiente_id', 'cantidad_ml', 'cantidad_hidratacion_efectiva',
+    'deshidratacion_neta_ml', 'agua_compensacion_recomendada_ml', 'fecha_hora', 'notas',
+    'ubicacion', 'temperatura_ambiente', 'nivel_sed', 'estado_animo', 'fecha_creacion',
+)
+DATETIME_COLUMNS = frozenset({'fecha_hora', 'fecha_creacion'})
+# Columnas de relaciones que piden los serializers: columna -> (clave, modelo)
+RELATED_COLUMNS = {
+    'bebida__nombre': ('bebida_id', Bebida),
+    'recipiente__nombre': ('recipiente_id', Recipiente),
+}
+
+
+def encode_rows(rows):
+    """
+    Comprime una lista de filas (dicts con ARCHIVE_COLUMNS).
+    """
+    payload = {
+        'columns': ARCHIVE_COLUMNS,
+        'rows': [
+            [
+                row[column].astimezone(dt_timezone.utc).isoformat()
+                if column in DATETIME_COLUMNS and row[column] is not None else row[column]
+                for column in ARCHIVE_COLUMNS
+            ]
+            for row in rows
+        ],
+    }
+    return zlib.compress(json.dumps(payload, separators=(',', ':')).encode(), 6)
+
+
+def decode_rows(blob):
+    """
+    Filas de ``ConsumoArchivado.datos`` como dicts, con las fechas como
+    datetimes UTC.
+    """
+    payload = json.loads(zlib.decompress(bytes(blob)))
+    columns = payload['columns']
+    rows = []
+    for values in payload['rows']:
+        row = dict(zip(columns, values))
+        for column in DATETIME_COLUMNS:
+            if row.get(column):
+                row[column] = parse_datetime(row[column]).astimezone(dt_timezone.utc)
+        rows.append(row)
+    return rows
+
+
+def _store(usuario_id, mes, rows):
+    archivo = ConsumoArchivado.objects.select_for_update().filter(usuario_id=usuario_id, mes=mes).first()
+    if archivo is not None:
+        # Mes ya archivado: altas posteriores con fecha atrasada
+        merged = {row['id']: row for row in decode_rows(archivo.datos)}
+        merged.update((row['id'], row) for row in rows)
+        rows = list(merged.values())
+    rows.sort(key=lambda row: row['fecha_hora'], reverse=True)
+    ConsumoArchivado.objects.update_or_create(
+        usuario_id=usuario_id,
+        mes=mes,
+        defaults={
+            'cantidad': len(rows),
+            'total_ml': sum(row['cantidad_ml'] for row in rows),
+            'total_hidratacion_ml': sum(row['cantidad_hidratacion_efectiva'] for row in rows),
+            'datos': encode_rows(rows),
+        },
+    )
+
+
+def _delete_hot_rows(start, end, max_id):
+    """
+    Borra las filas archivadas del mes sin pasar por las señales por fila.
+    """
+    connection = connections[Consumo.objects.db]
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {qn(Consumo._meta.db_table)} '
+            f'WHERE {qn("fecha_hora")} >= %s AND {qn("fecha_hora")} < %s AND {qn("id")} <= %s',
+            [start, end, max_id],
+        )
+        return cursor.rowcount
+
+
+def archive_month(mes):
+    """
+    Archiva los consumos del mes ``mes`` (UTC) y los retira de Consumo.
+    """
+    start, end = month_bounds(mes)
+    hot = Consumo.objects.filter(fecha_hora__gte=start, fecha_hora__lt=end)
+    result = {'mes': mes, 'usuarios': 0, 'consumos': 0, 'particion': False}
+
+    with transaction.atomic():
+        max_id = hot.aggregate(max_id=Max('id'))['max_id']
+        usuario_actual, rows = None, []
+        if max_id is not None:
+            values = hot.filter(id__lte=max_id).order_by('usuario_id', 'fecha_hora').values_list(
+                'usuario_id', *ARCHIVE_COLUMNS
+            )
+            for item in values.iterator(chunk_size=2000):
+                if item[0] != usuario_actual and rows:
+                    _store(usuario_actual, mes, rows)
+                    result['usuarios'] += 1
+                    rows = []
+                usuario_actual = item[0]
+                rows.append(dict(zip(ARCHIVE_COLUMNS, item[1:])))
+                result['consumos'] += 1
+            if rows:
+                _store(usuario_actual, mes, rows)
+                result['usuarios'] += 1
+
+        # Con la partición del mes completa archivada, se desprende entera
+        if partitioning.drop_partition(mes, expected_rows=result['consumos']):
+            result['particion'] = True
+        elif max_id is not None:
+            _delete_hot_rows(start, end, max_id)
+
+    if result['consumos']:
+        ResourceVersion.bump_many(
+            'consumos', ConsumoArchivado.objects.filter(mes=mes).values_list('usuario_id', flat=True)
+        )
+    return result
+
+
+def archive_consumos(months=None, now=None):
+    """
+    Archiva los meses anteriores a los ``months`` más recientes
+    (CONSUMO_HOT_MONTHS por defecto). Retorna el resultado por mes.
+    """
+    months = settings.CONSUMO_HOT_MONTHS if months is None else months
+    cutoff = add_months(month_start(now or timezone.now()), -months)
+    oldest = Consumo.objects.filter(fecha_hora__lt=month_bounds(cutoff)[0]).aggregate(
+        oldest=Min('fecha_hora')
+    )['oldest']
+    results = []
+    mes = month_start(oldest) if oldest else cutoff
+    while mes < cutoff:
+        result = archive_month(mes)
+        logger.info('Consumos archivados %s: %s', mes.strftime('%Y-%m'), result)
+        results.append(result)
+        mes = add_months(mes, 1)
+    return results
+
+
+def run_archive_worker(interval=86400, months=None, stop_event=None):
+    """
+    Ejecuta archive_consumos cada ``interval`` segundos hasta que se active
+    ``stop_event`` (o indefinidamente).
+    """
+    run_periodic(
+        partial(archive_consumos, months=months), interval,
+        'Error archivando consumos', stop_event, logger
+    )
+
+
+class ConsumoTimeline:
+    """
+    Consumos calientes de ``queryset`` (ordenado por -fecha_hora) y los
+    archivados del usuario entre ``date_from`` y ``date_to`` (días locales,
+    inclusive), como una sola secuencia.
+
+    Los meses archivados son anteriores a las filas calientes salvo altas
+    con fecha atrasada; esas se intercalan con el mes archivado que les
+    corresponde. Paginar no descomprime los meses que quedan antes de la
+    página pedida.
+    """
+
+    def __init__(self, user, queryset, date_from=None, date_to=None, columns=None, archives=None):
+        self.user = user
+        self.queryset = queryset
+        self.date_from = date_from
+        self.date_to = date_to
+        self.columns = tuple(columns or ARCHIVE_COLUMNS)
+        self._archives = archives
+        self._decoded = {}
+        self._count = None
+        self._new_count = None
+        self._resumenes = None
+
+    @classmethod
+    def for_queryset(cls, user, queryset, date_from=None, date_to=None):
+        """
+        La secuencia conjunta, o el queryset tal cual si el usuario no tiene
+        consumos archivados en el rango.
+        """
+        timeline = cls(user, queryset, date_from, date_to)
+        return timeline if timeline.archives else queryset
+
+    # -- rango ------------------------------------------------------------
+
+    def _range(self):
+        tz = timezone.get_current_timezone()
+        start = datetime.combine(self.date_from, time.min, tzinfo=tz) if self.date_from else None
+        end = (
+            datetime.combine(self.date_to + timedelta(days=1), time.min, tzinfo=tz)
+            if self.date_to else None
+        )
+        return start, end
+
+    def _in_range(self, value):
+        start, end = self._range()
+        return (start is None or value >= start) and (end is None or value < end)
+
+    def _fully_in_range(self, archivo):
+        start, end = self._range()
+        month_start_utc, month_end_utc = month_bounds(archivo.mes)
+        return (start is None or start <= month_start_utc) and (end is None or month_end_utc <= end)
+
+    @property
+    def archives(self):
+        if self._archives is None:
+            queryset = ConsumoArchivado.objects.filter(usuario=self.user).defer('datos').order_by('-mes')
+            start, end = self._range()
+            if start is not None:
+                queryset = queryset.filter(mes__gte=month_start(start))
+            if end is not None:
+                queryset = queryset.filter(mes__lte=month_start(end))
+            self._archives = [archivo for archivo in queryset if self._overlaps(archivo)]
+        return self._archives
+
+    def _overlaps(self, archivo):
+        start, end = self._range()
+        month_start_utc, month_end_utc = month_bounds(archivo.mes)
+        return (start is None or month_end_utc > start) and (end is None or month_start_utc < end)
+
+    @property
+    def boundary(self):
+        """
+        Fin del mes archivado más reciente: las filas calientes posteriores
+        van antes que todo lo archivado.
+        """
+        return month_bounds(self.archives[0].mes)[1] if self.archives else None
+
+    def _archive_rows(self, archivo):
+        if archivo.pk not in self._decoded:
+            blob = ConsumoArchivado.objects.filter(pk=archivo.pk).values_list('datos', flat=True).first()
+            rows = decode_rows(blob) if blob is not None else []
+            if not self._fully_in_range(archivo):
+                rows = [row for row in rows if self._in_range(row['fecha_hora'])]
+            self._decoded[archivo.pk] = rows
+        return self._decoded[archivo.pk]
+
+    def _archive_size(self, archivo):
+        if self._fully_in_range(archivo):
+            return archivo.cantidad
+        return len(self._archive_rows(archivo))
+
+    # -- interfaz de queryset ---------------------------------------------
+
+    def values_list(self, *columns):
+        return type(self)(
+            self.user, self.queryset, self.date_from, self.date_to, columns or None, self._archives
+        )
+
+    def count(self):
+        if self._count is None:
+            self._count = self.queryset.count() + sum(self._archive_size(a) for a in self.archives)
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __iter__(self):
+        if not self.archives:
+            return iter(self.queryset.values_list(*self.columns))
+        return iter(self[0:self.count()])
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            rows = self[key:key + 1]
+            if not rows:
+                raise IndexError(key)
+            return rows[0]
+        start, stop, _ = key.indices(self.count())
+        if start >= stop:
+            return []
+        if not self.archives:
+            return list(self.queryset.values_list(*self.columns)[start:stop])
+
+        newer = self.queryset.filter(fecha_hora__gte=self.boundary)
+        if self._new_count is None:
+            self._new_count = newer.count()
+        rows = []
+        if start < self._new_count:
+            rows.extend(newer.values_list(*self.columns)[start:min(stop, self._new_count)])
+        if stop > self._new_count:
+            rows.extend(self._older(max(start - self._new_count, 0), stop - self._new_count))
+        return rows
+
+    def resumenes(self):
+        """
+        {fecha: (cantidad, total_ml, total_hidratacion_ml)} de los días del
+        rango compactados en ConsumoResumenDiario (sin filas individuales).
+        """
+        if self._resumenes is None:
+            self._resumenes = daily_totals(self.user, self.date_from, self.date_to)
+        return self._resumenes
+
+    def totals(self):
+        """
+        Totales del rango (ml, hidratación efectiva, cantidad y promedio por
+        consumo), con los consumos archivados y los días compactados.
+        """
+        stats = self.queryset.aggregate(
+            total_ml=Sum('cantidad_ml'),
+            total_hidratacion=Sum('cantidad_hidratacion_efectiva'),
+            cantidad=Count('id'),
+        )
+        total_ml = stats['total_ml'] or 0
+        total_hidratacion = stats['total_hidratacion'] or 0
+        cantidad = stats['cantidad'] or 0
+        for archivo in self.archives:
+            if self._fully_in_range(archivo):
+                total_ml += archivo.total_ml
+                total_hidratacion += archivo.total_hidratacion_ml
+                cantidad += archivo.cantidad
+            else:
+                rows = self._archive_rows(archivo)
+                total_ml += sum(row['cantidad_ml'] for row in rows)
+                total_hidratacion += sum(row['cantidad_hidratacion_efectiva'] for row in rows)
+                cantidad += len(rows)
+        for cantidad_dia, ml_dia, hidratacion_dia in self.resumenes().values():
+            total_ml += ml_dia
+            total_hidratacion += hidratacion_dia
+            cantidad += cantidad_dia
+        return {
+            'total_ml': total_ml,
+            'total_hidratacion': total_hidratacion,
+            'cantidad_consumos': cantidad,
+            'promedio_ml': total_ml / cantidad if cantidad else 0,
+            'dias_resumidos': len(self.resumenes()),
+        }
+
+    # -- filas anteriores al límite ---------------------------------------
+
+    def _older(self, start, stop):
+        """
+        Filas [start, stop) de la parte archivada, mes a mes.
+        """
+        # Filas calientes con fecha atrasada (normalmente ninguna)
+        late = {}
+        for item in self.queryset.filter(fecha_hora__lt=self.boundary).values_list('fecha_hora', *self.columns):
+            late.setdefault(month_start(item[0]), []).append((item[0], tuple(item[1:])))
+
+        archives = {archivo.mes: archivo for archivo in self.archives}
+        rows, offset = [], 0
+        for mes in sorted(set(archives) | set(late), reverse=True):
+            archivo = archives.get(mes)
+            size = len(late.get(mes, ())) + (self._archive_size(archivo) if archivo else 0)
+            if offset + size <= start:
+                offset += size
+                continue
+            segment = list(late.get(mes, ()))
+            if archivo:
+                segment.extend(self._as_tuples(self._archive_rows(archivo)))
+            segment.sort(key=lambda item: item[0], reverse=True)
+            rows.extend(item[1] for item in segment[max(start - offset, 0):stop - offset])
+            offset += size
+            if offset >= stop:
+                break
+        return rows
+
+    def _as_tuples(self, rows):
+        """
+        (fecha_hora, tupla con self.columns) de filas archivadas.
+        """
+        lookups = {}
+        for column, (key, model) in RELATED_COLUMNS.items():
+            if column in self.columns or key in self.columns:
+                ids = {row[key] for row in rows if row[key] is not None}
+                lookups[key] = dict(model.objects.filter(id__in=ids).values_list('id', 'nombre'))
+
+        result = []
+        for row in rows:
+            values = dict(row)
+            for key, names in lookups.items():
+                # Recipiente borrado después de archivar: como SET_NULL
+                if values[key] not in names:
+                    values[key] = None
+            for column, (key, _) in RELATED_COLUMNS.items():
+                if column in self.columns:
+                    values[column] = lookups[key].get(values[key])
+            result.append((row['fecha_hora'], tuple(values[column] for column in self.columns)))
+        return result
@@ -0,0 +1,164 @@
+"""
+Compactación de consumos antiguos en resúmenes diarios (ConsumoResumenDiario).
+
+compact_consumos reemplaza los consumos anteriores a CONSUMO_COMPACT_AFTER_DAYS
+por una fila por usuario y día local (TIME_ZONE, el mismo día que usa
+``fecha_hora__date``) con la cantidad de consumos y los totales. Por defecto
+los usuarios premium conservan el detalle (CONSUMO_COMPACT_KEEP_PREMIUM).
+
+Cada usuario se compacta en su propia transacción (resumen y borrado juntos)
+y los usuarios se recorren por id ascendente en bloques, de modo que una
+ejecución interrumpida se retoma sin duplicar totales: los usuarios ya
+compactados no tienen consumos antiguos, o se indica ``start_after``.
+
+daily_totals da los totales resumidos de un rango de días para que
+ConsumoService, StatsService, ConsumoTimeline (exportación) y el resumen de
+estadísticas los sumen a los de Consumo. Los listados fila a fila (historial)
+no pueden mostrarlos y lo indican con la cabecera X-Consumos-Resumidos-Hasta.
+"""
+import logging
+from functools import partial
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from hydrotracker.periodic import run_periodic
+from ..models import Consumo, ConsumoResumenDiario
+from ..utils.cache_utils import ResourceVersion
+
+logger = logging.getLogger(__name__)
+
+
+def compaction_cutoff(days=None, now=None):
+    """
+    Inicio (medianoche local) del primer día que se conserva con detalle.
+    """
+    days = settings.CONSUMO_COMPACT_AFTER_DAYS if days is None else days
+    dia = timezone.localdate(now or timezone.now()) - timedelta(days=days)
+    return timezone.make_aware(datetime.combine(dia, datetime.min.time()))
+
+
+def _compact_user(usuario_id, cutoff):
+    """
+    Resume y borra los consumos del usuario anteriores a ``cutoff``.
+    Retorna (consumos, días).
+    """
+    with transaction.atomic():
+        antiguos = Consumo.objects.filter(usuario_id=usuario_id, fecha_hora__lt=cutoff)
+        max_id = antiguos.aggregate(max_id=Max('id'))['max_id']
+        if max_id is None:
+            return 0, 0
+        antiguos = antiguos.filter(id__lte=max_id)
+        por_dia = {
+            fila['dia']: fila
+            for fila in antiguos.annotate(dia=TruncDate('fecha_hora')).values('dia').annotate(
+                cantidad=Count('id'),
+                total_ml=Sum('cantidad_ml'),
+                total_hidratacion=Sum('cantidad_hidratacion_efectiva'),
+            ).order_by()
+        }
+        existentes = {
+            resumen.fecha: resumen
+            for resumen in ConsumoResumenDiario.objects.select_for_update().filter(
+                usuario_id=usuario_id, fecha__in=list(por_dia)
+            )
+        }
+        nuevos, actualizados = [], []
+        for dia, fila in por_dia.items():
+            resumen = existentes.get(dia)
+            if resumen is None:
+                nuevos.append(ConsumoResumenDiario(usuario_id=usuario_id, fecha=dia))
+                resumen = nuevos[-1]
+            else:
+                actualizados.append(resumen)
+            resumen.cantidad_consumos += fila['cantidad']
+            resumen.total_ml += fila['total_ml']
+            resumen.total_hidratacion_ml += fila['total_hidratacion']
+        ConsumoResumenDiario.objects.bulk_create(nuevos)
+        ConsumoResumenDiario.objects.bulk_update(
+            actualizados, ['cantidad_consumos', 'total_ml', 'total_hidratacion_ml']
+        )
+        # Sin señales por fila: los contadores de uso solo siguen el día actual
+        consumos = antiguos._raw_delete(antiguos.db)
+    return consumos, len(por_dia)
+
+
+def compact_consumos(days=None, keep_premium=None, chunk_size=500, start_after=0, now=None):
+    """
+    Compacta los consumos antiguos usuario por usuario, en bloques de
+    ``chunk_size`` usuarios a partir del id ``start_after``.
+    """
+    if keep_premium is None:
+        keep_premium = settings.CONSUMO_COMPACT_KEEP_PREMIUM
+    cutoff = compaction_cutoff(days, now)
+    antiguos = Consumo.objects.filter(fecha_hora__lt=cutoff)
+    if keep_premium:
+        antiguos = antiguos.exclude(usuario__es_premium=True)
+
+    resultado = {'usuarios': 0, 'consumos': 0, 'dias': 0, 'ultimo_usuario_id': start_after}
+    while True:
+        usuarios = list(
+            antiguos.filter(usuario_id__gt=resultado['ultimo_usuario_id'])
+            .order_by('usuario_id')
+            .values_list('usuario_id', flat=True)
+            .distinct()[:chunk_size]
+        )
+        if not usuarios:
+            break
+        for usuario_id in usuarios:
+            consumos, dias = _compact_user(usuario_id, cutoff)
+            resultado['usuarios'] += 1
+            resultado['consumos'] += consumos
+            resultado['dias'] += dias
+        ResourceVersion.bump_many('consumos', usuarios)
+        resultado['ultimo_usuario_id'] = usuarios[-1]
+        logger.info(f'Compactación de consumos: hasta el usuario {usuarios[-1]} ({resultado})')
+    return resultado
+
+
+def run_compaction_worker(interval=86400, chunk_size=500, stop_event=None):
+    """
+    Ejecuta compact_consumos cada ``interval`` segundos hasta que se active
+    ``stop_event`` (o indefinidamente).
+    """
+    run_periodic(
+        partial(compact_consumos, chunk_size=chunk_size), interval,
+        'Error compactando consumos', stop_event, logger
+    )
+
+
+def daily_totals(user, fecha_inicio=None, fecha_fin=None):
+    """
+    {fecha: (cantidad, total_ml, total_hidratacion_ml)} de los días
+    compactados del usuario entre ``fecha_inicio`` y ``fecha_fin`` (inclusive,
+    sin límite si son None).
+    """
+    resumenes = ConsumoResumenDiario.objects.filter(usuario=user)
+    if fecha_inicio is not None:
+        resumenes = resumenes.filter(fecha__gte=fecha_inicio)
+    if fecha_fin is not None:
+        resumenes = resumenes.filter(fecha__lte=fecha_fin)
+    return {
+        fecha: (cantidad, total_ml, total_hidratacion)
+        for fecha, cantidad, total_ml, total_hidratacion in resumenes.values_list(
+            'fecha', 'cantidad_consumos', 'total_ml', 'total_hidratacion_ml'
+        )
+    }
+
+
+def sum_totals(totals, fecha_inicio=None, fecha_fin=None):
+    """
+    (cantidad, total_ml, total_hidratacion_ml) sumados de ``daily_totals``,
+    opcionalmente solo entre dos fechas.
+    """
+    cantidad = total_ml = total_hidratacion = 0
+    for fecha, valores in totals.items():
+        if (fecha_inicio is None or fecha >= fecha_inicio) and (fecha_fin is None or fecha <= fecha_fin):
+            cantidad += valores[0]
+            total_ml += valores[1]
+            total_hidratacion += valores[2]
+    return cantidad, total_ml, total_hidratacion
@@ -12,7 +12,9 @@ from zoneinfo import ZoneInfo
 from typing import Optional
 from collections import defaultdict
 
+from hydrotracker.db_router import use_replica
 from ..models import Consumo
+from .consumo_compaction import daily_totals, sum_totals
 from ..utils.cache_utils import CacheManager, cache_user_data
 
 logger = logging.getLogger(__name__)
@@ -47,6 +49,7 @@ class ConsumoService:
         """
         self.user = user
     
+    @use_replica
     def get_daily_summary(self, fecha=None, tz_name: Optional[str] = None):
         """
         Obtiene un resumen diario de consumos con caché.
@@ -146,6 +149,7 @@ class ConsumoService:
             'completada': total_hidratacion >= meta_ml
         }
     
+    @use_replica
     def get_weekly_summary(self, fecha_inicio=None):
         """
         Obtiene un resumen semanal de consumos.
@@ -165,6 +169,13 @@ class ConsumoService:
         total_hidratacion = consumos_semana.aggregate(total=Sum('cantidad_hidratacion_efectiva'))['total'] or 0
         cantidad_consumos = consumos_semana.count()
         
+        # Días compactados (compact_consumos)
+        resumidos = daily_totals(self.user, fecha_inicio, fecha_fin)
+        cantidad_resumida, ml_resumido, hidratacion_resumida = sum_totals(resumidos)
+        total_ml += ml_resumido
+        total_hidratacion += hidratacion_resumida
+        cantidad_consumos += cantidad_resumida
+        
         # Estadísticas por día
         dias_detalle = []
         for i in range(7):
@@ -173,12 +184,13 @@ class ConsumoService:
             
             total_dia = consumos_dia.aggregate(total=Sum('cantidad_ml'))['total'] or 0
             hidratacion_dia = consumos_dia.aggregate(total=Sum('cantidad_hidratacion_efectiva'))['total'] or 0
+            cantidad_dia, ml_dia, hidratacion_resumida_dia = resumidos.get(dia, (0, 0, 0))
             
             dias_detalle.append({
                 'fecha': dia,
-                'total_ml': total_dia,
-                'total_hidratacion_ml': hidratacion_dia,
-                'cantidad_consumos': consumos_dia.count()
+                'total_ml': total_dia + ml_dia,
+                'total_hidratacion_ml': hidratacion_dia + hidratacion_resumida_dia,
+                'cantidad_consumos': consumos_dia.count() + cantidad_dia
             })
         
         return {
@@ -191,6 +203,7 @@ class ConsumoService:
             'dias_detalle': dias_detalle
         }
     
+    @use_replica
     def get_monthly_summary(self, fecha_inicio=None):
         """
         Obtiene un resumen mensual de consumos.
@@ -214,6 +227,13 @@ class ConsumoService:
         total_hidratacion = consumos_mes.aggregate(total=Sum('cantidad_hidratacion_efectiva'))['total'] or 0
         cantidad_consumos = consumos_mes.count()
         
+        # Días compactados (compact_consumos)
+        resumidos = daily_totals(self.user, fecha_inicio, fecha_fin)
+        cantidad_resumida, ml_resumido, hidratacion_resumida = sum_totals(resumidos)
+        total_ml += ml_resumido
+        total_hidratacion += hidratacion_resumida
+        cantidad_consumos += cantidad_resumida
+        
         # Estadísticas por semana
         semanas_detalle = []
         current_date = fecha_inicio
@@ -228,14 +248,17 @@ class ConsumoService:
             
             total_semana = consumos_semana.aggregate(total=Sum('cantidad_ml'))['total'] or 0
             hidratacion_semana = consumos_semana.aggregate(total=Sum('cantidad_hidratacion_efectiva'))['total'] or 0
+            cantidad_semana, ml_semana, hidratacion_resumida_semana = sum_totals(
+                resumidos, current_date, semana_fin
+            )
             
             semanas_detalle.append({
                 'semana': semana_num,
                 'inicio': current_date,
                 'fin': semana_fin,
-                'total_ml': total_semana,
-                'total_hidratacion_ml': hidratacion_semana,
-                'cantidad_consumos': consumos_semana.count()
+                'total_ml': total_semana + ml_semana,
+                'total_hidratacion_ml': hidratacion_semana + hidratacion_resumida_semana,
+                'cantidad_consumos': consumos_semana.count() + cantidad_semana
             })
             
             current_date = semana_fin + timedelta(days=1)
@@ -251,6 +274,7 @@ class ConsumoService:
             'semanas_detalle': semanas_detalle
         }
     
+    @use_replica
     def get_trends(self, period='weekly', tz_name: Optional[str] = None):
         """
         Obtiene tendencias de consumo.
@@ -300,6 +324,8 @@ class ConsumoService:
             )
             
             # Para daily, usar las variables ya definidas
+            curr_start_local = curr_end_local = hoy_local
+            prev_start_local = prev_end_local = ayer_local
             start_curr_utc = start_hoy_utc
             end_curr_utc = end_hoy_utc
             start_prev_utc = start_ayer_utc
@@ -346,6 +372,11 @@ class ConsumoService:
         total_actual = consumos_actual.aggregate(total=Sum('cantidad_ml'))['total'] or 0
         total_anterior = consumos_anterior.aggregate(total=Sum('cantidad_ml'))['total'] or 0
         
+        # Días compactados (resumidos por día en TIME_ZONE)
+        resumidos = daily_totals(self.user, prev_start_local, curr_end_local)
+        total_actual += sum_totals(resumidos, curr_start_local, curr_end_local)[1]
+        total_anterior += sum_totals(resumidos, prev_start_local, prev_end_local)[1]
+        
         # Calcular cambios
         cambio_ml = total_actual - total_anterior
         if total_anterior > 0:
@@ -380,6 +411,7 @@ class ConsumoService:
             'total_actual': total_actual
         }
     
+    @use_replica
     def get_insights(self, days=30):
         """
         Obtiene insights y análisis de consumos.
@@ -0,0 +1,103 @@
+"""
+Derechos (entitlements) del usuario para la petición en curso.
+
+Los permisos premium, el throttle de exportación, el límite de recipientes y
+las vistas de monetización consultan un único objeto Entitlements que se
+calcula una vez por petición a partir de la fila del usuario (ya cargada por
+la autenticación). Los contadores de uso (recordatorios, recipientes y
+consumos de hoy) se leen de ContadorUso solo cuando algún gate los necesita.
+"""
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from .usage_counters import get_counters
+
+# Límites del plan gratuito que no tienen setting propio
+MAX_RECIPIENTES_GRATUITOS = 2
+MAX_CONSUMOS_DIARIOS_GRATUITOS = 50
+
+
+class Entitlements:
+    """
+    Plan y límites de uso de un usuario, memoizados.
+    """
+
+    def __init__(self, user, now=None):
+        self.user = user
+        self.now = now or timezone.now()
+
+    @cached_property
+    def is_authenticated(self):
+        return bool(self.user and self.user.is_authenticated)
+
+    @cached_property
+    def is_premium(self):
+        """
+        Premium vigente: es_premium y subscription_end_date no vencida.
+        """
+        if not self.is_authenticated:
+            return False
+        return self.user.tiene_premium_vigente(self.now.date())
+
+    @property
+    def export_throttle_scope(self):
+        return 'export_premium' if self.is_premium else 'export'
+
+    @property
+    def max_recordatorios(self):
+        if self.is_premium:
+            return settings.META_MAX_RECORDATORIOS_PREMIUM
+        return settings.META_MAX_RECORDATORIOS_GRATUITOS
+
+    @property
+    def max_recipientes(self):
+        return None if self.is_premium else MAX_RECIPIENTES_GRATUITOS
+
+    @property
+    def max_consumos_diarios(self):
+        return None if self.is_premium else MAX_CONSUMOS_DIARIOS_GRATUITOS
+
+    @cached_property
+    def counters(self):
+        """
+        {'recordatorios', 'recipientes', 'consumos_hoy'} del usuario, leídos
+        de ContadorUso por clave primaria.
+        """
+        if not self.is_authenticated:
+            return {'recordatorios': 0, 'recipientes': 0, 'consumos_hoy': 0}
+        return get_counters(self.user.pk, timezone.localdate(self.now))
+
+    @property
+    def recordatorios_count(self):
+        return self.counters['recordatorios']
+
+    @property
+    def recipientes_count(self):
+        return self.counters['recipientes']
+
+    @property
+    def consumos_hoy_count(self):
+        return self.counters['consumos_hoy']
+
+    def can_create_recordatorio(self):
+        return self.recordatorios_count < self.max_recordatorios
+
+    def can_create_recipiente(self):
+        return self.max_recipientes is None or self.recipientes_count < self.max_recipientes
+
+
+def get_entitlements(request):
+    """
+    Entitlements de la petición, calculados una sola vez. Se guardan en el
+    HttpRequest subyacente para compartirlos entre permisos, throttles,
+    vistas y serializers.
+    """
+    target = getattr(request, '_request', request)
+    user = request.user
+    entitlements = getattr(target, '_entitlements', None)
+    if entitlements is None or entitlements.user is not user:
+        entitlements = Entitlements(user)
+        target._entitlements = entitlements
+    return entitlements
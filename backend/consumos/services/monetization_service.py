@@ -6,7 +6,9 @@ from django.db.models import Count, Sum
 from django.utils import timezone
 from datetime import timedelta
 
-from ..models import Consumo, Recordatorio, MetaDiaria
+from ..models import Consumo, MetaDiaria
+from .platform_metrics import get_latest_snapshot, refresh_platform_metrics
+from .usage_counters import get_counters
 
 
 class MonetizationService:
@@ -25,12 +27,10 @@ class MonetizationService:
         max_recordatorios_gratuitos = 3
         max_consumos_diarios = 10
         
-        # Contar uso actual
-        recordatorios_actuales = Recordatorio.objects.filter(usuario=self.user).count()
-        consumos_hoy = Consumo.objects.filter(
-            usuario=self.user,
-            fecha_hora__date=timezone.now().date()
-        ).count()
+        # Uso actual desde los contadores desnormalizados
+        contadores = get_counters(self.user.pk)
+        recordatorios_actuales = contadores['recordatorios']
+        consumos_hoy = contadores['consumos_hoy']
         
         return {
             'recordatorios': {
@@ -53,25 +53,15 @@ class MonetizationService:
         if not self.user.is_staff:
             return None
         
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        
-        total_usuarios = User.objects.count()
-        usuarios_premium = User.objects.filter(es_premium=True).count()
-        usuarios_gratuitos = total_usuarios - usuarios_premium
-        
-        # Consumos de los últimos 30 días
-        fecha_inicio = timezone.now().date() - timedelta(days=30)
-        consumos_recientes = Consumo.objects.filter(
-            fecha_hora__date__gte=fecha_inicio
-        ).count()
+        # Último snapshot precalculado (MetricaPlataforma)
+        snapshot = get_latest_snapshot() or refresh_platform_metrics()
         
         return {
-            'total_usuarios': total_usuarios,
-            'usuarios_premium': usuarios_premium,
-            'usuarios_gratuitos': usuarios_gratuitos,
-            'tasa_conversion': (usuarios_premium / total_usuarios * 100) if total_usuarios > 0 else 0,
-            'consumos_ultimos_30_dias': consumos_recientes
+            'total_usuarios': snapshot.total_usuarios,
+            'usuarios_premium': snapshot.usuarios_premium,
+            'usuarios_gratuitos': snapshot.usuarios_gratuitos,
+            'tasa_conversion': snapshot.tasa_conversion,
+            'consumos_ultimos_30_dias': snapshot.consumos_30d
         }
     
     def get_upgrade_prompt(self):
@@ -87,7 +77,7 @@ class MonetizationService:
             fecha_hora__date__gte=timezone.now().date() - timedelta(days=7)
         ).count()
         
-        recordatorios_actuales = Recordatorio.objects.filter(usuario=self.user).count()
+        recordatorios_actuales = get_counters(self.user.pk)['recordatorios']
         
         # Generar sugerencias basadas en el uso
         sugerencias = []
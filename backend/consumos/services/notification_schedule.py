@@ -0,0 +1,227 @@
+"""
+Compilación de ventanas de notificación a bitmaps semanales por usuario.
+
+La configuración del usuario (recordar_notificaciones, hora_inicio, hora_fin,
+intervalo_notificaciones) y sus Recordatorio activos se compilan a un bitmap
+de 7 × 1440 minutos (1260 bytes): el bit ``dia * 1440 + minuto`` indica que el
+usuario tiene una notificación en ese minuto de la semana (hora local del
+servidor, igual que Recordatorio.hora).
+
+Los bitmaps se guardan en caché con las versiones 'perfil' y 'recordatorios'
+de ResourceVersion en la clave, así que solo se recompilan cuando cambia la
+configuración. En caché van en base64 (texto): el serializador JSON de
+django_redis no acepta bytes. ScheduleIndex apila los bitmaps para responder qué usuarios
+tienen notificación en un minuto dado con una operación vectorizada (numpy si
+está instalado, bucle sobre bytes si no).
+"""
+
+import base64
+import binascii
+import logging
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.utils import timezone
+
+from ..models import Recordatorio
+from ..utils.cache_utils import CacheManager, ResourceVersion
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy es opcional
+    np = None
+
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_DAY = 24 * 60
+WEEK_SLOTS = 7 * MINUTES_PER_DAY
+BITMAP_BYTES = WEEK_SLOTS // 8
+
+USER_SCHEDULE_FIELDS = (
+    'id', 'recordar_notificaciones', 'hora_inicio', 'hora_fin', 'intervalo_notificaciones'
+)
+
+
+def slot_for(weekday, minute_of_day):
+    """
+    Posición del bit para un día de la semana (0=Lunes) y minuto del día.
+    """
+    return (weekday * MINUTES_PER_DAY + minute_of_day) % WEEK_SLOTS
+
+
+def _minute_of_day(value):
+    return value.hour * 60 + value.minute
+
+
+def compile_schedule(user, recordatorios=()):
+    """
+    Compila la configuración de un usuario a su bitmap semanal (bytes).
+
+    ``recordatorios`` son tuplas (hora, dias_semana) de los recordatorios
+    activos. Con recordar_notificaciones desactivado el bitmap queda vacío.
+    """
+    bitmap = bytearray(BITMAP_BYTES)
+    if not user.recordar_notificaciones:
+        return bytes(bitmap)
+
+    def mark(slot):
+        bitmap[slot >> 3] |= 1 << (slot & 7)
+
+    # Avisos periódicos dentro de la ventana; si hora_fin < hora_inicio la
+    # ventana cruza la medianoche y sigue en el día siguiente
+    inicio = _minute_of_day(user.hora_inicio)
+    fin = _minute_of_day(user.hora_fin)
+    if fin < inicio:
+        fin += MINUTES_PER_DAY
+    intervalo = max(int(user.intervalo_notificaciones or 0), 1)
+    for weekday in range(7):
+        for minute in range(inicio, fin + 1, intervalo):
+            mark(slot_for(weekday, minute))
+
+    # Recordatorios explícitos
+    for hora, dias_semana in recordatorios:
+        dias = [dia for dia in (dias_semana or range(7)) if isinstance(dia, int) and 0 <= dia <= 6]
+        for weekday in dias:
+            mark(slot_for(weekday, _minute_of_day(hora)))
+    return bytes(bitmap)
+
+
+def encode_bitmap(bitmap):
+    """
+    Bitmap como texto base64, serializable en cualquier caché.
+    """
+    return base64.b64encode(bitmap).decode('ascii')
+
+
+def decode_bitmap(value):
+    """
+    Bitmap leído de caché, o None si no es un valor válido (por ejemplo un
+    formato anterior).
+    """
+    if not isinstance(value, str):
+        return None
+    try:
+        bitmap = base64.b64decode(value, validate=True)
+    except (binascii.Error, ValueError):
+        return None
+    return bitmap if len(bitmap) == BITMAP_BYTES else None
+
+
+class NotificationScheduleCompiler:
+    """
+    Obtiene los bitmaps de varios usuarios, compilando solo los que cambiaron.
+    """
+
+    CACHE_ALIAS = 'default'
+    CACHE_TIMEOUT = 7 * 24 * 3600
+
+    def _get_cache(self):
+        return caches[self.CACHE_ALIAS]
+
+    def get_key(self, user_id, perfil_version, recordatorios_version):
+        return CacheManager.get_cache_key(
+            'schedule', user_id, perfil_version, recordatorios_version
+        )
+
+    def get_schedules(self, user_ids):
+        """
+        Retorna {user_id: bitmap} leyendo de caché y compilando los ausentes
+        con dos consultas en total.
+        """
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+        perfil = ResourceVersion.get_for_users('perfil', user_ids)
+        recordatorios = ResourceVersion.get_for_users('recordatorios', user_ids)
+        keys = {
+            user_id: self.get_key(user_id, perfil[user_id], recordatorios[user_id])
+            for user_id in user_ids
+        }
+
+        try:
+            found = self._get_cache().get_many(list(keys.values()))
+        except Exception as e:
+            logger.error(f'Error leyendo bitmaps de notificaciones: {e}')
+            found = {}
+        schedules = {}
+        for user_id, key in keys.items():
+            bitmap = decode_bitmap(found.get(key))
+            if bitmap is not None:
+                schedules[user_id] = bitmap
+
+        missing = [user_id for user_id in user_ids if user_id not in schedules]
+        if missing:
+            compiled = self.compile_many(missing)
+            schedules.update(compiled)
+            try:
+                self._get_cache().set_many(
+                    {keys[user_id]: encode_bitmap(bitmap) for user_id, bitmap in compiled.items()},
+                    timeout=self.CACHE_TIMEOUT
+                )
+            except Exception as e:
+                logger.error(f'Error guardando bitmaps de notificaciones: {e}')
+        return schedules
+
+    def get_schedule(self, user_id):
+        return self.get_schedules([user_id]).get(user_id)
+
+    def compile_many(self, user_ids):
+        """
+        Compila desde la base de datos los bitmaps de los usuarios indicados.
+        """
+        User = get_user_model()
+        por_usuario = {}
+        for usuario_id, hora, dias_semana in Recordatorio.objects.filter(
+            usuario_id__in=user_ids, activo=True
+        ).values_list('usuario_id', 'hora', 'dias_semana'):
+            por_usuario.setdefault(usuario_id, []).append((hora, dias_semana))
+
+        return {
+            user.id: compile_schedule(user, por_usuario.get(user.id, ()))
+            for user in User.objects.filter(id__in=user_ids).only(*USER_SCHEDULE_FIELDS)
+        }
+
+
+class ScheduleIndex:
+    """
+    Bitmaps de muchos usuarios apilados para consultar un minuto de una vez.
+    """
+
+    def __init__(self, schedules):
+        self.user_ids = list(schedules)
+        bitmaps = [schedules[user_id] for user_id in self.user_ids]
+        if np is not None:
+            self._ids = np.asarray(self.user_ids)
+            self.matrix = (
+                np.frombuffer(b''.join(bitmaps), dtype=np.uint8).reshape(len(bitmaps), BITMAP_BYTES)
+                if bitmaps else np.zeros((0, BITMAP_BYTES), dtype=np.uint8)
+            )
+        else:
+            self.matrix = bitmaps
+
+    @classmethod
+    def build(cls, user_ids, compiler=None):
+        return cls((compiler or NotificationScheduleCompiler()).get_schedules(user_ids))
+
+    def __len__(self):
+        return len(self.user_ids)
+
+    def due_at_slot(self, slot):
+        """
+        Usuarios con notificación en la posición ``slot`` de la semana.
+        """
+        byte, mask = slot >> 3, 1 << (slot & 7)
+        if np is not None:
+            return self._ids[np.nonzero(self.matrix[:, byte] & mask)[0]].tolist()
+        return [
+            user_id for user_id, bitmap in zip(self.user_ids, self.matrix)
+            if bitmap[byte] & mask
+        ]
+
+    def due_at(self, moment=None):
+        """
+        Usuarios con notificación en el minuto de ``moment`` (aware, por
+        defecto ahora) en la zona horaria actual.
+        """
+        local = timezone.localtime(moment or timezone.now())
+        return self.due_at_slot(slot_for(local.weekday(), _minute_of_day(local)))
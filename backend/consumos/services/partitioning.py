@@ -0,0 +1,243 @@
+"""
+Particionado mensual de la tabla de consumos en PostgreSQL.
+
+La tabla se convierte una vez (convert_to_partitioned) en una tabla
+particionada por rango de fecha_hora, con una partición por mes UTC
+(consumos_consumo_pAAAAMM) y una partición DEFAULT de respaldo. Después,
+partition_consumos crea las particiones de los meses siguientes y
+archive_consumos desprende y borra las de los meses ya archivados.
+
+Los modelos y migraciones no cambian: la conversión es propia de
+PostgreSQL y en el resto de motores todas las funciones no hacen nada.
+"""
+import logging
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.db import connections, transaction
+from django.utils import timezone
+
+from ..models import Consumo
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PREFIX = 'p'
+
+
+def _connection():
+    return connections[Consumo.objects.db]
+
+
+def _table():
+    return Consumo._meta.db_table
+
+
+def month_bounds(mes):
+    """
+    [inicio, fin) del mes en UTC.
+    """
+    start = datetime(mes.year, mes.month, 1, tzinfo=dt_timezone.utc)
+    next_month = date(mes.year + mes.month // 12, mes.month % 12 + 1, 1)
+    return start, datetime(next_month.year, next_month.month, 1, tzinfo=dt_timezone.utc)
+
+
+def month_start(value):
+    """
+    Primer día del mes (UTC) de una fecha o datetime.
+    """
+    if isinstance(value, datetime):
+        value = value.astimezone(dt_timezone.utc).date()
+    return value.replace(day=1)
+
+
+def add_months(mes, months):
+    index = mes.year * 12 + mes.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def is_postgres():
+    return _connection().vendor == 'postgresql'
+
+
+def partition_name(mes):
+    return f'{_table()}_{PARTITION_PREFIX}{mes.year:04d}{mes.month:02d}'
+
+
+def is_partitioned():
+    """
+    True si la tabla de consumos ya es una tabla particionada.
+    """
+    if not is_postgres():
+        return False
+    with _connection().cursor() as cursor:
+        cursor.execute(
+            "SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [_table()]
+        )
+        row = cursor.fetchone()
+    return bool(row) and row[0] == 'p'
+
+
+def list_partitions():
+    """
+    {mes: nombre} de las particiones mensuales existentes.
+    """
+    if not is_partitioned():
+        return {}
+    prefix = f'{_table()}_{PARTITION_PREFIX}'
+    with _connection().cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(%s)",
+            [_table()],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    partitions = {}
+    for name in names:
+        suffix = name[len(prefix):]
+        if name.startswith(prefix) and len(suffix) == 6 and suffix.isdigit():
+            partitions[date(int(suffix[:4]), int(suffix[4:]), 1)] = name
+    return partitions
+
+
+def create_partition(mes, cursor):
+    """
+    Crea la partición del mes si no existe.
+    """
+    qn = _connection().ops.quote_name
+    start, end = month_bounds(mes)
+    cursor.execute(
+        f'CREATE TABLE IF NOT EXISTS {qn(partition_name(mes))} PARTITION OF {qn(_table())} '
+        f'FOR VALUES FROM (%s) TO (%s)',
+        [start, end],
+    )
+
+
+def ensure_partitions(months_ahead, now=None):
+    """
+    Crea las particiones desde el mes actual hasta ``months_ahead`` meses
+    después. Retorna los nombres de las creadas.
+    """
+    if not is_partitioned():
+        return []
+    current = month_start(now or timezone.now())
+    existing = list_partitions()
+    created = []
+    with transaction.atomic(using=Consumo.objects.db), _connection().cursor() as cursor:
+        for offset in range(months_ahead + 1):
+            mes = add_months(current, offset)
+            if mes not in existing:
+                create_partition(mes, cursor)
+                created.append(partition_name(mes))
+    return created
+
+
+def drop_partition(mes, expected_rows=None):
+    """
+    Desprende y borra la partición del mes. Con ``expected_rows`` solo lo
+    hace si la partición tiene exactamente esas filas (las ya archivadas);
+    si no, retorna False y el llamador borra por rango.
+    """
+    name = list_partitions().get(mes)
+    if name is None:
+        return False
+    qn = _connection().ops.quote_name
+    with transaction.atomic(using=Consumo.objects.db), _connection().cursor() as cursor:
+        cursor.execute(f'LOCK TABLE {qn(name)} IN ACCESS EXCLUSIVE MODE')
+        if expected_rows is not None:
+            cursor.execute(f'SELECT COUNT(*) FROM {qn(name)}')
+            if cursor.fetchone()[0] != expected_rows:
+                return False
+        cursor.execute(f'ALTER TABLE {qn(_table())} DETACH PARTITION {qn(name)}')
+        cursor.execute(f'DROP TABLE {qn(name)}')
+    logger.info('Partición %s desprendida y borrada', name)
+    return True
+
+
+def convert_to_partitioned(months_ahead, now=None):
+    """
+    Convierte la tabla de consumos en una tabla particionada por mes.
+
+    Copia las filas dentro de una transacción con la tabla bloqueada, por lo
+    que conviene ejecutarla en una ventana de mantenimiento. La clave
+    primaria pasa a ser (id, fecha_hora), como exige PostgreSQL; los índices
+    y claves foráneas se recrean con sus nombres originales.
+    """
+    if not is_postgres():
+        raise ValueError('El particionado solo está disponible en PostgreSQL')
+    if is_partitioned():
+        return False
+
+    connection = _connection()
+    qn = connection.ops.quote_name
+    table = _table()
+    legacy = f'{table}_legacy'
+    current = month_start(now or timezone.now())
+
+    with transaction.atomic(using=Consumo.objects.db), connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE {qn(table)} IN ACCESS EXCLUSIVE MODE')
+        cursor.execute(
+            "SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype = 'p'",
+            [table],
+        )
+        pk_name = cursor.fetchone()[0]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = to_regclass(%s) AND contype = 'f'",
+            [table],
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(
+            "SELECT i.indexrelid::regclass::text, pg_get_indexdef(i.indexrelid), i.indisunique "
+            "FROM pg_index i WHERE i.indrelid = to_regclass(%s) AND NOT i.indisprimary",
+            [table],
+        )
+        indexes = cursor.fetchall()
+        cursor.execute(
+            "SELECT attidentity FROM pg_attribute WHERE attrelid = to_regclass(%s) AND attname = 'id'",
+            [table],
+        )
+        identity = bool(cursor.fetchone()[0])
+        cursor.execute(f'SELECT MIN({qn("fecha_hora")}) FROM {qn(table)}')
+        oldest = cursor.fetchone()[0]
+
+        cursor.execute(f'ALTER TABLE {qn(table)} RENAME TO {qn(legacy)}')
+        cursor.execute(
+            f'CREATE TABLE {qn(table)} (LIKE {qn(legacy)} INCLUDING DEFAULTS INCLUDING IDENTITY '
+            f'INCLUDING CONSTRAINTS) PARTITION BY RANGE ({qn("fecha_hora")})'
+        )
+
+        mes = month_start(oldest) if oldest else current
+        while mes <= add_months(current, months_ahead):
+            create_partition(mes, cursor)
+            mes = add_months(mes, 1)
+        cursor.execute(f'CREATE TABLE {qn(table + "_default")} PARTITION OF {qn(table)} DEFAULT')
+
+        overriding = 'OVERRIDING SYSTEM VALUE ' if identity else ''
+        cursor.execute(f'INSERT INTO {qn(table)} {overriding}SELECT * FROM {qn(legacy)}')
+        if identity:
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX({qn('id')}), 1)) "
+                f"FROM {qn(table)}",
+                [table],
+            )
+        else:
+            # Columna serial: la secuencia pasa a la tabla nueva antes de borrar la vieja
+            cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [legacy])
+            sequence = cursor.fetchone()[0]
+            cursor.execute(f'ALTER SEQUENCE {sequence} OWNED BY {qn(table)}.{qn("id")}')
+
+        cursor.execute(f'DROP TABLE {qn(legacy)}')
+        cursor.execute(
+            f'ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(pk_name)} '
+            f'PRIMARY KEY ({qn("id")}, {qn("fecha_hora")})'
+        )
+        for name, definition, unique in indexes:
+            if unique and 'fecha_hora' not in definition:
+                logger.warning('Índice único %s omitido: no incluye fecha_hora', name)
+                continue
+            # Las definiciones se leyeron antes del renombrado: apuntan a la tabla nueva
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(f'ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(name)} {definition}')
+
+    logger.info('Tabla %s convertida en tabla particionada por mes', table)
+    return True
@@ -0,0 +1,192 @@
+"""
+Snapshots de métricas de la plataforma (MetricaPlataforma).
+
+El panel de administración lee el último snapshot en lugar de contar las
+tablas completas en cada petición. Cada refresco parte del snapshot anterior:
+
+- Consumos: la ventana de 30 días se vuelve a contar entera en cada
+  refresco (rango sobre el índice de fecha_hora, agrupado por día local), así
+  que recoge los consumos que se confirmaron tarde con un id menor que el
+  último visto y descuenta los borrados. Del total histórico se arrastra lo
+  que ya quedó fuera de la ventana, más los consumos nuevos (id mayor que
+  ultimo_consumo_id) con fecha anterior a ella.
+- Usuarios: un único aggregate con conteos filtrados (total, premium,
+  activos y altas desde el último id visto). La tabla de usuarios es órdenes
+  de magnitud menor que la de consumos y no guarda historial de cambios de
+  plan, así que las transiciones premium se obtienen como diferencia entre
+  snapshots.
+
+Los borrados de consumos anteriores a la ventana no se descuentan en el modo
+incremental; un refresco con ``full=True`` recalcula todo desde cero.
+"""
+
+import logging
+from datetime import datetime, time as dt_time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from hydrotracker.periodic import run_periodic
+from ..models import Consumo, ConsumoArchivado, ConsumoResumenDiario, MetricaPlataforma
+
+logger = logging.getLogger(__name__)
+
+METRICS_WINDOW_DAYS = 30
+MAX_HISTORY = 365
+
+
+def _consumos_por_dia(queryset):
+    """
+    {YYYY-MM-DD: conteo} agrupando por día local.
+    """
+    filas = (
+        queryset.annotate(dia=TruncDate('fecha_hora'))
+        .values('dia')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    return {fila['dia'].isoformat(): fila['total'] for fila in filas}
+
+
+def get_latest_snapshot():
+    return MetricaPlataforma.objects.order_by('-fecha_calculo', '-id').first()
+
+
+def get_history(limit):
+    """
+    Los ``limit`` snapshots más recientes, del más nuevo al más antiguo.
+    """
+    limit = max(1, min(int(limit), MAX_HISTORY))
+    return list(MetricaPlataforma.objects.order_by('-fecha_calculo', '-id')[:limit])
+
+
+def refresh_platform_metrics(now=None, full=False):
+    """
+    Calcula y guarda un snapshot nuevo, incremental respecto al último salvo
+    que no exista o se pida ``full``.
+    """
+    now = now or timezone.now()
+    hoy = timezone.localdate(now)
+    primer_dia = hoy - timedelta(days=METRICS_WINDOW_DAYS - 1)
+    desde = primer_dia.isoformat()
+    inicio = timezone.make_aware(datetime.combine(primer_dia, dt_time.min))
+    previo = None if full else get_latest_snapshot()
+
+    # Watermark fijado antes de contar: lo que llegue después entra en el siguiente
+    ultimo_consumo_id = Consumo.objects.aggregate(ultimo=Max('id'))['ultimo'] or 0
+
+    User = get_user_model()
+    ultimo_usuario_visto = previo.ultimo_usuario_id if previo else 0
+    usuarios = User.objects.aggregate(
+        total=Count('id'),
+        premium=Count('id', filter=Q(es_premium=True)),
+        activos=Count('id', filter=Q(last_login__gte=now - timedelta(days=30))),
+        nuevos=Count('id', filter=Q(id__gt=ultimo_usuario_visto)),
+        ultimo=Max('id'),
+    )
+
+    # La ventana se recuenta siempre: no depende del orden de confirmación
+    por_dia = _consumos_por_dia(
+        Consumo.objects.filter(fecha_hora__gte=inicio, id__lte=ultimo_consumo_id)
+    )
+    anteriores = Consumo.objects.filter(fecha_hora__lt=inicio, id__lte=ultimo_consumo_id)
+    if previo is None:
+        # Los consumos archivados o compactados ya no están en la tabla
+        total_consumos = (
+            (ConsumoArchivado.objects.aggregate(total=Sum('cantidad'))['total'] or 0)
+            + (ConsumoResumenDiario.objects.aggregate(total=Sum('cantidad_consumos'))['total'] or 0)
+            + anteriores.count()
+        )
+    else:
+        # Las fechas ISO se comparan bien como texto
+        recontados = sum(total for dia, total in previo.consumos_por_dia.items() if dia >= desde)
+        total_consumos = (
+            previo.total_consumos - recontados
+            + anteriores.filter(id__gt=previo.ultimo_consumo_id).count()
+        )
+    total_consumos += sum(por_dia.values())
+    consumos_30d = sum(total for dia, total in por_dia.items() if dia <= hoy.isoformat())
+
+    snapshot = MetricaPlataforma.objects.create(
+        fecha_calculo=now,
+        total_usuarios=usuarios['total'],
+        usuarios_premium=usuarios['premium'],
+        usuarios_activos_30d=usuarios['activos'],
+        nuevos_usuarios=usuarios['nuevos'] if previo else 0,
+        total_consumos=total_consumos,
+        consumos_30d=consumos_30d,
+        consumos_por_dia=por_dia,
+        ultimo_usuario_id=usuarios['ultimo'] or 0,
+        ultimo_consumo_id=ultimo_consumo_id,
+        completo=previo is None,
+    )
+    logger.info(
+        f'Métricas de plataforma actualizadas ({"completo" if snapshot.completo else "incremental"}): '
+        f'{snapshot.total_usuarios} usuarios, {snapshot.total_consumos} consumos'
+    )
+    return snapshot
+
+
+def prune_snapshots(keep_days, now=None):
+    """
+    Borra los snapshots más antiguos que ``keep_days`` días (nunca el último).
+    """
+    limite = (now or timezone.now()) - timedelta(days=keep_days)
+    ultimo = get_latest_snapshot()
+    queryset = MetricaPlataforma.objects.filter(fecha_calculo__lt=limite)
+    if ultimo is not None:
+        queryset = queryset.exclude(pk=ultimo.pk)
+    return queryset.delete()[0]
+
+
+def snapshot_stats(snapshot):
+    """
+    Datos de MonetizationStatsView a partir de un snapshot.
+    """
+    return {
+        'usuarios': {
+            'total': snapshot.total_usuarios,
+            'premium': snapshot.usuarios_premium,
+            'gratuitos': snapshot.usuarios_gratuitos,
+            'activos_30d': snapshot.usuarios_activos_30d
+        },
+        'conversion': {
+            'tasa_conversion': round(snapshot.tasa_conversion, 2),
+            'usuarios_premium': snapshot.usuarios_premium,
+            'usuarios_totales': snapshot.total_usuarios
+        },
+        'actividad': {
+            'consumos_totales': snapshot.total_consumos,
+            'consumos_30d': snapshot.consumos_30d,
+            'usuarios_activos_30d': snapshot.usuarios_activos_30d
+        },
+        'fecha_calculo': snapshot.fecha_calculo,
+    }
+
+
+def history_point(snapshot):
+    """
+    Punto de la serie temporal de ?history=N.
+    """
+    return {
+        'fecha_calculo': snapshot.fecha_calculo,
+        'usuarios_totales': snapshot.total_usuarios,
+        'usuarios_premium': snapshot.usuarios_premium,
+        'nuevos_usuarios': snapshot.nuevos_usuarios,
+        'usuarios_activos_30d': snapshot.usuarios_activos_30d,
+        'consumos_totales': snapshot.total_consumos,
+        'consumos_30d': snapshot.consumos_30d,
+    }
+
+
+def run_metrics_worker(interval=900, stop_event=None):
+    """
+    Ejecuta refresh_platform_metrics cada ``interval`` segundos hasta que se
+    active ``stop_event`` (o indefinidamente).
+    """
+    run_periodic(
+        refresh_platform_metrics, interval,
+        'Error actualizando métricas de plataforma', stop_event, logger
+    )
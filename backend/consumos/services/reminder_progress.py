@@ -0,0 +1,130 @@
+"""
+Supresión de recordatorios para usuarios que ya van al día con su meta.
+
+En lugar de ejecutar ConsumoService.get_daily_summary por usuario, el
+progreso de todos los usuarios de un tick se obtiene con una sola consulta:
+los usuarios con su hidratación efectiva y el PSE de actividades del día
+anotados como subconsultas agregadas. La meta se prorratea según la parte
+transcurrida de la ventana hora_inicio-hora_fin del usuario.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db.models import IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from ..models import Consumo
+
+# Tipos de recordatorio que dependen del progreso del día
+SUPPRESSIBLE_TYPES = frozenset({'agua', 'meta'})
+
+# Campos que usa User.calcular_meta_hidratacion() más la ventana de avisos
+PROGRESS_USER_FIELDS = (
+    'id', 'peso', 'edad', 'fecha_nacimiento', 'es_fragil_o_insuficiencia_cardiaca',
+    'meta_diaria_ml', 'hora_inicio', 'hora_fin',
+)
+
+
+def _sum_subquery(queryset, column):
+    """
+    Subconsulta escalar con la suma de ``column`` por usuario.
+    """
+    total = (
+        queryset.filter(usuario=OuterRef('pk'))
+        .order_by()
+        .values('usuario')
+        .annotate(total=Sum(column))
+        .values('total')
+    )
+    return Coalesce(Subquery(total, output_field=IntegerField()), Value(0))
+
+
+def window_fraction(hora_inicio, hora_fin, now_local):
+    """
+    Fracción (0-1) transcurrida de la ventana diaria del usuario.
+    """
+    inicio = datetime.combine(now_local.date(), hora_inicio)
+    fin = datetime.combine(now_local.date(), hora_fin)
+    if fin <= inicio:
+        fin += timedelta(days=1)
+    actual = now_local.replace(tzinfo=None)
+    if actual <= inicio:
+        return 0.0
+    if actual >= fin:
+        return 1.0
+    return (actual - inicio) / (fin - inicio)
+
+
+class DailyProgressLookup:
+    """
+    Progreso del día para muchos usuarios con una sola consulta.
+    """
+
+    def __init__(self, now=None):
+        self.now = now or timezone.now()
+        self.now_local = timezone.localtime(self.now)
+
+    def day_bounds(self):
+        inicio = timezone.make_aware(datetime.combine(self.now_local.date(), time.min))
+        return inicio, inicio + timedelta(days=1)
+
+    def get_progress(self, user_ids):
+        """
+        Retorna {user_id: (hidratacion_efectiva_ml, meta_ml, meta_prorrateada_ml)}.
+        """
+        from actividades.models import Actividad
+
+        inicio, fin = self.day_bounds()
+        consumos = Consumo.objects.filter(fecha_hora__gte=inicio, fecha_hora__lt=fin)
+        actividades = Actividad.objects.filter(fecha_hora__gte=inicio, fecha_hora__lt=fin)
+        users = (
+            get_user_model().objects.filter(id__in=user_ids)
+            .only(*PROGRESS_USER_FIELDS)
+            .annotate(
+                hidratacion_hoy=_sum_subquery(consumos, 'cantidad_hidratacion_efectiva'),
+                pse_hoy=_sum_subquery(actividades, 'pse_calculado'),
+            )
+        )
+
+        progress = {}
+        for user in users:
+            # Misma meta que ConsumoService.get_daily_summary
+            meta_base = user.calcular_meta_hidratacion()
+            if not meta_base or meta_base <= 0:
+                meta_base = user.meta_diaria_ml or 2000
+            meta = meta_base + user.pse_hoy
+            esperado = meta * window_fraction(user.hora_inicio, user.hora_fin, self.now_local)
+            progress[user.id] = (user.hidratacion_hoy, meta, esperado)
+        return progress
+
+    def on_track_users(self, user_ids):
+        """
+        Usuarios que ya cumplieron la meta o van al día con la prorrateada.
+        Antes del inicio de la ventana nadie se considera al día.
+        """
+        on_track = set()
+        for user_id, (hidratacion, meta, esperado) in self.get_progress(user_ids).items():
+            if hidratacion >= meta or (esperado > 0 and hidratacion >= esperado):
+                on_track.add(user_id)
+        return on_track
+
+    def split(self, recordatorios):
+        """
+        Separa los recordatorios en (a_enviar, suprimidos). Solo se suprimen
+        los de tipo agua o meta; el resto se envía siempre.
+        """
+        candidatos = {
+            r.usuario_id for r in recordatorios if r.tipo_recordatorio in SUPPRESSIBLE_TYPES
+        }
+        if not candidatos:
+            return list(recordatorios), []
+        on_track = self.on_track_users(candidatos)
+        enviar, suprimidos = [], []
+        for recordatorio in recordatorios:
+            if recordatorio.tipo_recordatorio in SUPPRESSIBLE_TYPES and recordatorio.usuario_id in on_track:
+                suprimidos.append(recordatorio)
+            else:
+                enviar.append(recordatorio)
+        return enviar, suprimidos
@@ -0,0 +1,135 @@
+"""
+Despacho de recordatorios basado en el índice de next_fire_at.
+
+Cada tick solo lee los recordatorios vencidos (``next_fire_at <= ahora``)
+usando el índice, en lotes bloqueados con ``SELECT ... FOR UPDATE SKIP
+LOCKED`` para que varios workers puedan correr en paralelo sin repartir el
+mismo recordatorio. El costo de un tick depende de cuántos recordatorios
+vencen, no del tamaño de la tabla.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from ..models import Recordatorio
+from .reminder_progress import DailyProgressLookup
+
+logger = logging.getLogger(__name__)
+
+
+class LoggingReminderSender:
+    """
+    Sender local: registra los envíos en el log (desarrollo y pruebas).
+    Un sender real (push, email) implementa la misma interfaz.
+    """
+
+    def send_batch(self, recordatorios):
+        """
+        Envía el lote y retorna los recordatorios enviados con éxito.
+        """
+        for recordatorio in recordatorios:
+            logger.info(
+                'Recordatorio %s para usuario %s: %s',
+                recordatorio.id, recordatorio.usuario_id, recordatorio.get_mensaje_completo()
+            )
+        return recordatorios
+
+
+def get_reminder_sender():
+    """
+    Instancia el sender configurado en settings.REMINDER_SENDER.
+    """
+    return import_string(settings.REMINDER_SENDER)()
+
+
+class ReminderScheduler:
+    """
+    Servicio que despacha los recordatorios vencidos y adelanta su next_fire_at.
+    """
+
+    def __init__(self, sender=None, batch_size=None, skip_on_track=None, retry_seconds=None):
+        self.sender = sender or get_reminder_sender()
+        self.batch_size = batch_size or settings.REMINDER_BATCH_SIZE
+        if retry_seconds is None:
+            retry_seconds = settings.REMINDER_RETRY_SECONDS
+        self.retry_delay = timedelta(seconds=retry_seconds)
+        if skip_on_track is None:
+            skip_on_track = settings.REMINDER_SKIP_ON_TRACK
+        self.skip_on_track = skip_on_track
+
+    def due_queryset(self, now):
+        """
+        Recordatorios vencidos; los inactivos tienen next_fire_at nulo.
+        """
+        return Recordatorio.objects.filter(next_fire_at__lte=now).order_by('next_fire_at')
+
+    def dispatch_batch(self, now=None):
+        """
+        Despacha un lote de recordatorios vencidos. Retorna cuántos se tomaron.
+
+        El envío ocurre dentro de la transacción: si el proceso falla antes
+        del commit, el lote vuelve a estar vencido en el próximo tick. Los
+        recordatorios que el sender no envió se reintentan tras
+        ``retry_delay`` (sin pasar de su próximo envío normal).
+        """
+        now = now or timezone.now()
+        with transaction.atomic():
+            batch = list(
+                self.due_queryset(now)
+                .select_for_update(skip_locked=True)
+                .only(
+                    'id', 'usuario', 'hora', 'dias_semana', 'mensaje',
+                    'tipo_recordatorio', 'next_fire_at', 'ultimo_enviado'
+                )
+                [:self.batch_size]
+            )
+            if not batch:
+                return 0
+
+            a_enviar = batch
+            if self.skip_on_track:
+                # Una sola consulta de progreso para todos los usuarios del lote
+                a_enviar, suprimidos = DailyProgressLookup(now).split(batch)
+                if suprimidos:
+                    logger.debug('%s recordatorios suprimidos (usuarios al día)', len(suprimidos))
+
+            enviados = set()
+            if a_enviar:
+                try:
+                    enviados = {recordatorio.id for recordatorio in self.sender.send_batch(a_enviar)}
+                except Exception:
+                    logger.exception('Error enviando lote de %s recordatorios', len(a_enviar))
+            fallidos = {recordatorio.id for recordatorio in a_enviar} - enviados
+            if fallidos:
+                logger.warning('%s recordatorios no enviados, se reintentan', len(fallidos))
+
+            for recordatorio in batch:
+                # Se calcula desde ahora: los envíos perdidos no se acumulan
+                proximo = recordatorio.get_proximo_envio(desde=now)
+                if recordatorio.id in fallidos:
+                    reintento = now + self.retry_delay
+                    recordatorio.next_fire_at = min(reintento, proximo) if proximo else reintento
+                else:
+                    recordatorio.next_fire_at = proximo
+                if recordatorio.id in enviados:
+                    recordatorio.ultimo_enviado = now
+            Recordatorio.objects.bulk_update(batch, ['next_fire_at', 'ultimo_enviado'])
+        return len(batch)
+
+    def tick(self, now=None):
+        """
+        Despacha todos los recordatorios vencidos hasta ``now``.
+        Retorna el total de recordatorios procesados.
+        """
+        now = now or timezone.now()
+        total = 0
+        while True:
+            procesados = self.dispatch_batch(now)
+            total += procesados
+            if procesados < self.batch_size:
+                return total
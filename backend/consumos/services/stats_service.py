@@ -7,7 +7,39 @@ from django.db.models.functions import TruncDay, TruncWeek, TruncMonth
 from django.utils import timezone
 from datetime import timedelta
 
+from hydrotracker.db_router import use_replica
 from ..models import Consumo
+from .consumo_compaction import daily_totals, sum_totals
+
+
+def _con_resumidos(stats, resumidos):
+    """
+    Suma a los agregados de Consumo (total_ml, total_hidratacion, cantidad)
+    los días compactados de ``resumidos`` (ver daily_totals).
+    """
+    cantidad, total_ml, total_hidratacion = sum_totals(resumidos)
+    stats['total_ml'] = (stats['total_ml'] or 0) + total_ml
+    stats['total_hidratacion'] = (stats['total_hidratacion'] or 0) + total_hidratacion
+    stats['cantidad'] = (stats['cantidad'] or 0) + cantidad
+    return stats
+
+
+def _tendencia_con_resumidos(filas, clave, resumidos, clave_de_fecha):
+    """
+    Agrega los días compactados a las filas de una tendencia agrupadas por
+    ``clave`` (la fecha del grupo como 'YYYY-MM-DD').
+    """
+    if not resumidos:
+        return filas
+    por_clave = {str(fila[clave]): fila for fila in filas}
+    for fecha, (_, total_ml, total_hidratacion) in resumidos.items():
+        fila = por_clave.setdefault(
+            clave_de_fecha(fecha).isoformat(),
+            {clave: clave_de_fecha(fecha).isoformat(), 'total_ml': 0, 'total_hidratacion': 0},
+        )
+        fila['total_ml'] = (fila['total_ml'] or 0) + total_ml
+        fila['total_hidratacion'] = (fila['total_hidratacion'] or 0) + total_hidratacion
+    return [por_clave[k] for k in sorted(por_clave)]
 
 
 class StatsService:
@@ -18,6 +50,7 @@ class StatsService:
     def __init__(self, user):
         self.user = user
     
+    @use_replica
     def get_daily_stats(self, fecha=None):
         """
         Obtiene estadísticas diarias.
@@ -38,6 +71,11 @@ class StatsService:
             max_ml=Max('cantidad_ml'),
             min_ml=Min('cantidad_ml')
         )
+        # Día compactado: totales sí, máximo y mínimo por consumo no
+        resumidos = daily_totals(self.user, fecha, fecha)
+        if resumidos:
+            _con_resumidos(stats, resumidos)
+            stats['promedio_ml'] = stats['total_ml'] / stats['cantidad'] if stats['cantidad'] else 0
         
         return {
             'fecha': fecha,
@@ -46,9 +84,11 @@ class StatsService:
             'cantidad_consumos': stats['cantidad'] or 0,
             'promedio_ml': round(stats['promedio_ml'] or 0, 2),
             'max_ml': stats['max_ml'] or 0,
-            'min_ml': stats['min_ml'] or 0
+            'min_ml': stats['min_ml'] or 0,
+            'dias_resumidos': len(resumidos)
         }
     
+    @use_replica
     def get_weekly_stats(self, fecha_inicio=None):
         """
         Obtiene estadísticas semanales.
@@ -70,6 +110,10 @@ class StatsService:
             cantidad=Count('id'),
             promedio_diario=Avg('cantidad_ml')
         )
+        resumidos = daily_totals(self.user, fecha_inicio, fecha_fin)
+        if resumidos:
+            _con_resumidos(stats, resumidos)
+            stats['promedio_diario'] = stats['total_ml'] / stats['cantidad'] if stats['cantidad'] else 0
         
         return {
             'fecha_inicio': fecha_inicio,
@@ -77,9 +121,11 @@ class StatsService:
             'total_ml': stats['total_ml'] or 0,
             'total_hidratacion_efectiva_ml': stats['total_hidratacion'] or 0,
             'cantidad_consumos': stats['cantidad'] or 0,
-            'promedio_diario_ml': round(stats['promedio_diario'] or 0, 2)
+            'promedio_diario_ml': round(stats['promedio_diario'] or 0, 2),
+            'dias_resumidos': len(resumidos)
         }
     
+    @use_replica
     def get_monthly_stats(self, fecha_inicio=None):
         """
         Obtiene estadísticas mensuales.
@@ -105,6 +151,10 @@ class StatsService:
             cantidad=Count('id'),
             promedio_diario=Avg('cantidad_ml')
         )
+        resumidos = daily_totals(self.user, fecha_inicio, fecha_fin)
+        if resumidos:
+            _con_resumidos(stats, resumidos)
+            stats['promedio_diario'] = stats['total_ml'] / stats['cantidad'] if stats['cantidad'] else 0
         
         return {
             'fecha_inicio': fecha_inicio,
@@ -112,9 +162,11 @@ class StatsService:
             'total_ml': stats['total_ml'] or 0,
             'total_hidratacion_efectiva_ml': stats['total_hidratacion'] or 0,
             'cantidad_consumos': stats['cantidad'] or 0,
-            'promedio_diario_ml': round(stats['promedio_diario'] or 0, 2)
+            'promedio_diario_ml': round(stats['promedio_diario'] or 0, 2),
+            'dias_resumidos': len(resumidos)
         }
     
+    @use_replica
     def get_trends(self, period='weekly'):
         """
         Obtiene tendencias de consumo.
@@ -146,7 +198,9 @@ class StatsService:
             total_hidratacion=Sum('cantidad_hidratacion_efectiva')
         ).order_by('fecha')
         
-        return list(consumos)
+        return _tendencia_con_resumidos(
+            list(consumos), 'fecha', daily_totals(self.user, fecha_inicio, fecha_fin), lambda fecha: fecha
+        )
     
     def _get_weekly_trends(self):
         """
@@ -167,7 +221,11 @@ class StatsService:
             total_hidratacion=Sum('cantidad_hidratacion_efectiva')
         ).order_by('semana')
         
-        return list(consumos)
+        # Mismo agrupamiento que la consulta: lunes de la semana
+        return _tendencia_con_resumidos(
+            list(consumos), 'semana', daily_totals(self.user, fecha_inicio, fecha_fin),
+            lambda fecha: fecha - timedelta(days=fecha.weekday())
+        )
     
     def _get_monthly_trends(self):
         """
@@ -188,4 +246,7 @@ class StatsService:
             total_hidratacion=Sum('cantidad_hidratacion_efectiva')
         ).order_by('mes')
         
-        return list(consumos)
+        return _tendencia_con_resumidos(
+            list(consumos), 'mes', daily_totals(self.user, fecha_inicio, fecha_fin),
+            lambda fecha: fecha.replace(day=1)
+        )
@@ -0,0 +1,241 @@
+"""
+Motor de recordatorios en memoria basado en un timing wheel jerárquico.
+
+Alternativa opcional al ReminderScheduler para despachar con precisión de
+fracciones de segundo. Carga de la base los recordatorios que vencen en los
+próximos minutos, los reparte en el wheel con un jitter aleatorio (para no
+concentrar en el mismo instante a todos los usuarios de las 08:00) y los envía
+con concurrencia acotada.
+
+Al cargar un recordatorio se adelanta su next_fire_at en la base dentro de la
+misma transacción (SKIP LOCKED): ese es el checkpoint. Un reinicio nunca
+vuelve a enviar lo ya cargado; a cambio, si el proceso muere se pierden como
+mucho los envíos del horizonte cargado (entrega como máximo una vez).
+"""
+
+import logging
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Recordatorio
+from .reminder_progress import DailyProgressLookup
+from .reminder_scheduler import get_reminder_sender
+
+logger = logging.getLogger(__name__)
+
+
+class ReminderEntry:
+    """
+    Entrada del wheel. Con __slots__ ocupa una fracción de un Recordatorio y
+    expone lo que usan los senders (id, usuario_id, get_mensaje_completo) y
+    la supresión por progreso (tipo_recordatorio).
+    """
+    __slots__ = ('fire_at', 'id', 'usuario_id', 'mensaje', 'tipo_recordatorio')
+
+    def __init__(self, fire_at, id, usuario_id, mensaje, tipo_recordatorio='personalizado'):
+        self.fire_at = fire_at
+        self.id = id
+        self.usuario_id = usuario_id
+        self.mensaje = mensaje
+        self.tipo_recordatorio = tipo_recordatorio
+
+    def get_mensaje_completo(self):
+        return self.mensaje
+
+
+class TimingWheel:
+    """
+    Timing wheel jerárquico (estilo Varghese & Lauck).
+
+    El nivel 0 tiene ``slots[0]`` ranuras de ``tick`` segundos; cada nivel
+    superior tiene ranuras del tamaño de una vuelta completa del anterior.
+    Agregar una entrada es O(1) y avanzar un tick cuesta O(1) más las
+    entradas que vencen o bajan de nivel. Las entradas más allá del último
+    nivel esperan en una lista de desborde.
+    """
+
+    def __init__(self, tick=0.1, slots=(600, 60, 24), start=None):
+        self.tick = tick
+        self.slots = tuple(slots)
+        # Ancho de una ranura de cada nivel, en ticks
+        self.widths = [1]
+        for size in self.slots:
+            self.widths.append(self.widths[-1] * size)
+        self.levels = [[[] for _ in range(size)] for size in self.slots]
+        self.overflow = []
+        self.ready = []
+        self.current = int((time.time() if start is None else start) / tick)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, entry):
+        self._size += 1
+        self._place(entry, self._target(entry))
+
+    def _target(self, entry):
+        # Primer tick que no es anterior a fire_at
+        return math.ceil(entry.fire_at / self.tick)
+
+    def _place(self, entry, target):
+        if target <= self.current:
+            self.ready.append(entry)
+            return
+        # Primer nivel en el que el objetivo comparte la vuelta del nivel superior
+        for level, size in enumerate(self.slots):
+            parent = self.widths[level + 1]
+            if target // parent == self.current // parent:
+                width = self.widths[level]
+                self.levels[level][(target // width) % size].append(entry)
+                return
+        self.overflow.append(entry)
+
+    def advance(self, now):
+        """
+        Avanza el wheel hasta ``now`` (epoch en segundos) y retorna las
+        entradas vencidas.
+        """
+        target = int(now / self.tick)
+        while self.current < target:
+            self.current += 1
+            self._cascade()
+            bucket = self.levels[0][self.current % self.slots[0]]
+            if bucket:
+                self.ready.extend(bucket)
+                bucket.clear()
+        expired, self.ready = self.ready, []
+        self._size -= len(expired)
+        return expired
+
+    def _cascade(self):
+        """
+        Al entrar en una nueva ranura de un nivel superior, redistribuye sus
+        entradas en los niveles inferiores (de arriba hacia abajo).
+        """
+        if self.current % self.widths[-1] == 0 and self.overflow:
+            pending, self.overflow = self.overflow, []
+            for entry in pending:
+                self._place(entry, self._target(entry))
+        for level in range(len(self.slots) - 1, 0, -1):
+            width = self.widths[level]
+            if self.current % width:
+                continue
+            bucket = self.levels[level][(self.current // width) % self.slots[level]]
+            if bucket:
+                pending = list(bucket)
+                bucket.clear()
+                for entry in pending:
+                    self._place(entry, self._target(entry))
+
+    def next_deadline(self):
+        """
+        Epoch del próximo tick (para dormir hasta entonces).
+        """
+        return (self.current + 1) * self.tick
+
+
+class ReminderWheelEngine:
+    """
+    Carga recordatorios próximos en un TimingWheel y los despacha.
+    """
+
+    def __init__(self, sender=None, horizon=timedelta(minutes=2), jitter=30.0,
+                 max_workers=8, batch_size=200, tick=0.1, now=None, skip_on_track=None):
+        self.sender = sender or get_reminder_sender()
+        if skip_on_track is None:
+            skip_on_track = settings.REMINDER_SKIP_ON_TRACK
+        self.skip_on_track = skip_on_track
+        self.horizon = horizon
+        self.jitter = jitter
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        start = (now or timezone.now()).timestamp()
+        self.wheel = TimingWheel(tick=tick, start=start)
+        self.loaded_until = None
+
+    def load(self, now=None):
+        """
+        Reclama los recordatorios que vencen antes de now + horizon, adelanta
+        su next_fire_at en la base y los agrega al wheel. Retorna cuántos cargó.
+        """
+        now = now or timezone.now()
+        until = now + self.horizon
+        total = 0
+        while True:
+            with transaction.atomic():
+                batch = list(
+                    Recordatorio.objects.filter(next_fire_at__lte=until)
+                    .select_for_update(skip_locked=True)
+                    .only('id', 'usuario', 'hora', 'dias_semana', 'mensaje',
+                          'tipo_recordatorio', 'next_fire_at')
+                    .order_by('next_fire_at')[:self.batch_size]
+                )
+                entries = []
+                for recordatorio in batch:
+                    fire_at = max(recordatorio.next_fire_at, now)
+                    entries.append(ReminderEntry(
+                        fire_at.timestamp() + random.uniform(0, self.jitter),
+                        recordatorio.id, recordatorio.usuario_id,
+                        recordatorio.get_mensaje_completo(), recordatorio.tipo_recordatorio
+                    ))
+                    recordatorio.next_fire_at = recordatorio.get_proximo_envio(desde=fire_at)
+                Recordatorio.objects.bulk_update(batch, ['next_fire_at'])
+            for entry in entries:
+                self.wheel.add(entry)
+            total += len(batch)
+            if len(batch) < self.batch_size:
+                break
+        self.loaded_until = until
+        return total
+
+    def _send_chunk(self, chunk):
+        try:
+            return [entry.id for entry in self.sender.send_batch(chunk)]
+        except Exception:
+            logger.exception('Error enviando lote de %s recordatorios', len(chunk))
+            return []
+
+    def run_pending(self, now=None, executor=None):
+        """
+        Despacha las entradas vencidas hasta ``now``. Retorna cuántas envió.
+        """
+        now = now or timezone.now()
+        expired = self.wheel.advance(now.timestamp())
+        if expired and self.skip_on_track:
+            expired, _ = DailyProgressLookup(now).split(expired)
+        if not expired:
+            return 0
+        chunks = [
+            expired[i:i + self.batch_size] for i in range(0, len(expired), self.batch_size)
+        ]
+        if executor is None:
+            results = map(self._send_chunk, chunks)
+        else:
+            results = executor.map(self._send_chunk, chunks)
+        enviados = [entry_id for ids in results for entry_id in ids]
+        # La base solo se toca desde el hilo principal
+        if enviados:
+            Recordatorio.objects.filter(id__in=enviados).update(ultimo_enviado=now)
+        return len(enviados)
+
+    def run(self, stop_event=None):
+        """
+        Bucle principal: recarga a mitad de horizonte y avanza tick a tick.
+        """
+        stop_event = stop_event or threading.Event()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while not stop_event.is_set():
+                now = timezone.now()
+                if self.loaded_until is None or now >= self.loaded_until - self.horizon / 2:
+                    self.load(now)
+                self.run_pending(now, executor)
+                stop_event.wait(max(0.0, self.wheel.next_deadline() - time.time()))
@@ -0,0 +1,201 @@
+"""
+Contadores de uso desnormalizados (ContadorUso).
+
+Las altas y bajas de recordatorios, recipientes y consumos ajustan la fila
+del usuario con un UPDATE atómico (``F('campo') + 1``), sin leerla antes.
+consumos_hoy se reinicia solo: el incremento de un consumo de un día más
+reciente que consumos_dia vuelve a empezar en 1 dentro del mismo UPDATE.
+
+Lo que no pasa por señales (bulk_create, update() de fecha_hora) se corrige
+con reconcile(), que recuenta desde las tablas y es lo que ejecuta el comando
+reconcile_usage_counters. Un usuario sin fila se reconcilia en su primer
+incremento (o en la siguiente ejecución del comando); mientras tanto las
+lecturas recuentan desde las tablas sin escribir.
+"""
+
+import logging
+from functools import partial
+from datetime import datetime, time as dt_time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from hydrotracker.periodic import run_periodic
+from ..models import Consumo, ContadorUso, Recipiente, Recordatorio
+
+logger = logging.getLogger(__name__)
+
+# Campos de ContadorUso con total simple (sin día)
+TOTAL_FIELDS = frozenset({'recordatorios', 'recipientes'})
+
+
+def local_date(value):
+    """
+    Día local (TIME_ZONE) de un datetime.
+    """
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return timezone.localtime(value).date()
+
+
+def day_bounds(fecha):
+    inicio = timezone.make_aware(datetime.combine(fecha, dt_time.min))
+    return inicio, inicio + timedelta(days=1)
+
+
+def _count_subquery(queryset):
+    """
+    Subconsulta escalar con el número de filas del usuario.
+    """
+    total = (
+        queryset.filter(usuario=OuterRef('pk'))
+        .order_by()
+        .values('usuario')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    return Coalesce(Subquery(total, output_field=IntegerField()), Value(0))
+
+
+def user_created(usuario_id):
+    """
+    Crea la fila a cero de un usuario nuevo, para que sus lecturas no tengan
+    que recontar.
+    """
+    ContadorUso.objects.get_or_create(usuario_id=usuario_id)
+
+
+def adjust_total(usuario_id, field, delta):
+    """
+    Suma ``delta`` al total ``field`` del usuario (nunca por debajo de 0).
+    """
+    if field not in TOTAL_FIELDS:
+        raise ValueError(f'Contador desconocido: {field}')
+    updated = ContadorUso.objects.filter(pk=usuario_id).update(
+        **{field: Greatest(F(field) + delta, 0)}
+    )
+    # Sin fila: el recuento ya incluye la fila recién creada. En las bajas no
+    # se crea (puede ser el borrado en cascada del propio usuario)
+    if not updated and delta > 0:
+        reconcile([usuario_id])
+
+
+def consumo_added(usuario_id, fecha):
+    """
+    Cuenta un consumo del día local ``fecha``. Los consumos de días
+    anteriores a consumos_dia no afectan al contador del día.
+    """
+    # consumos_hoy va antes que consumos_dia: el CASE compara el día anterior
+    updated = ContadorUso.objects.filter(
+        Q(consumos_dia__isnull=True) | Q(consumos_dia__lte=fecha), pk=usuario_id
+    ).update(
+        consumos_hoy=Case(When(consumos_dia=fecha, then=F('consumos_hoy') + 1), default=Value(1)),
+        consumos_dia=fecha,
+    )
+    if not updated and not ContadorUso.objects.filter(pk=usuario_id).exists():
+        reconcile([usuario_id])
+
+
+def consumo_removed(usuario_id, fecha):
+    """
+    Descuenta un consumo del día local ``fecha`` si es el día del contador.
+    """
+    ContadorUso.objects.filter(pk=usuario_id, consumos_dia=fecha).update(
+        consumos_hoy=Greatest(F('consumos_hoy') - 1, 0)
+    )
+
+
+def get_counters(usuario_id, fecha=None):
+    """
+    {'recordatorios', 'recipientes', 'consumos_hoy'} del usuario con una
+    lectura por clave primaria. ``fecha`` es el día local (por defecto hoy).
+
+    Sin fila se recuenta desde las tablas sin guardar nada: las lecturas
+    (p. ej. los GET) no escriben; la fila la crean las señales o reconcile().
+    """
+    fecha = fecha or timezone.localdate()
+    contador = ContadorUso.objects.filter(pk=usuario_id).first()
+    if contador is None:
+        fila = _recount([usuario_id], fecha).first()
+        if fila is None:
+            return {'recordatorios': 0, 'recipientes': 0, 'consumos_hoy': 0}
+        _, recordatorios, recipientes, consumos_hoy = fila
+        return {'recordatorios': recordatorios, 'recipientes': recipientes, 'consumos_hoy': consumos_hoy}
+    return {
+        'recordatorios': contador.recordatorios,
+        'recipientes': contador.recipientes,
+        'consumos_hoy': contador.consumos_en(fecha),
+    }
+
+
+def _recount(user_ids, fecha):
+    inicio, fin = day_bounds(fecha)
+    return (
+        get_user_model().objects.filter(pk__in=user_ids)
+        .values_list(
+            'pk',
+            _count_subquery(Recordatorio.objects.all()),
+            _count_subquery(Recipiente.objects.all()),
+            _count_subquery(Consumo.objects.filter(fecha_hora__gte=inicio, fecha_hora__lt=fin)),
+        )
+    )
+
+
+def reconcile(user_ids=None, fecha=None, chunk_size=1000):
+    """
+    Recalcula desde las tablas los contadores de los usuarios indicados (por
+    defecto todos) y los guarda con un upsert por lote. Retorna cuántas filas
+    estaban desajustadas o faltaban.
+    """
+    fecha = fecha or timezone.localdate()
+    now = timezone.now()
+    if user_ids is None:
+        users = get_user_model().objects.order_by('pk').values_list('pk', flat=True)
+        user_ids = users.iterator(chunk_size=chunk_size)
+    corregidos = 0
+    chunk = []
+
+    def flush(chunk):
+        actuales = {
+            contador.pk: (contador.recordatorios, contador.recipientes, contador.consumos_en(fecha))
+            for contador in ContadorUso.objects.filter(pk__in=chunk)
+        }
+        filas = []
+        desajustados = 0
+        for usuario_id, recordatorios, recipientes, consumos_hoy in _recount(chunk, fecha):
+            if actuales.get(usuario_id) != (recordatorios, recipientes, consumos_hoy):
+                desajustados += 1
+            filas.append(ContadorUso(
+                usuario_id=usuario_id, recordatorios=recordatorios, recipientes=recipientes,
+                consumos_dia=fecha, consumos_hoy=consumos_hoy, fecha_reconciliacion=now
+            ))
+        ContadorUso.objects.bulk_create(
+            filas, update_conflicts=True, unique_fields=['usuario'],
+            update_fields=['recordatorios', 'recipientes', 'consumos_dia',
+                           'consumos_hoy', 'fecha_reconciliacion']
+        )
+        return desajustados
+
+    for usuario_id in user_ids:
+        chunk.append(usuario_id)
+        if len(chunk) >= chunk_size:
+            corregidos += flush(chunk)
+            chunk = []
+    if chunk:
+        corregidos += flush(chunk)
+    if corregidos:
+        logger.info(f'Contadores de uso reconciliados: {corregidos} desajustados')
+    return corregidos
+
+
+def run_reconcile_worker(interval=3600, chunk_size=1000, stop_event=None):
+    """
+    Ejecuta reconcile cada ``interval`` segundos hasta que se active
+    ``stop_event`` (o indefinidamente).
+    """
+    run_periodic(
+        partial(reconcile, chunk_size=chunk_size), interval,
+        'Error reconciliando contadores de uso', stop_event, logger
+    )
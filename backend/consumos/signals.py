@@ -0,0 +1,97 @@
+"""
+Señales de la aplicación de consumos.
+Mantienen al día las versiones de recursos usadas por los GET condicionales
+y los contadores de uso (ContadorUso).
+"""
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from actividades.models import Actividad
+from .models import Bebida, Consumo, Recipiente, Recordatorio
+from .services import usage_counters
+from .utils.cache_utils import ResourceVersion
+
+User = get_user_model()
+
+# Campos del usuario que no afectan a ninguna representación versionada
+USER_FIELDS_SIN_VERSION = frozenset({'ultimo_acceso', 'last_login'})
+
+# Campo de ContadorUso que cuenta cada modelo
+COUNTER_FIELDS = {Recipiente: 'recipientes', Recordatorio: 'recordatorios'}
+
+
+@receiver([post_save, post_delete], sender=Consumo)
+def consumo_modificado(sender, instance, **kwargs):
+    ResourceVersion.bump('consumos', instance.usuario_id)
+
+
+@receiver([post_save, post_delete], sender=Recipiente)
+def recipiente_modificado(sender, instance, **kwargs):
+    ResourceVersion.bump('recipientes', instance.usuario_id)
+
+
+@receiver(post_delete, sender=Recipiente)
+def recipiente_por_defecto_eliminado(sender, instance, **kwargs):
+    # El próximo listado vuelve a comprobar los recipientes por defecto
+    from users.utils import RECIPIENTES_POR_DEFECTO, olvidar_recipientes_por_defecto
+
+    if instance.nombre in {data['nombre'] for data in RECIPIENTES_POR_DEFECTO}:
+        olvidar_recipientes_por_defecto(instance.usuario_id)
+
+
+@receiver([post_save, post_delete], sender=Recordatorio)
+def recordatorio_modificado(sender, instance, **kwargs):
+    ResourceVersion.bump('recordatorios', instance.usuario_id)
+
+
+@receiver([post_save, post_delete], sender=Bebida)
+def bebida_modificada(sender, instance, **kwargs):
+    ResourceVersion.bump('bebidas')
+
+
+@receiver([post_save, post_delete], sender=Actividad)
+def actividad_modificada(sender, instance, **kwargs):
+    ResourceVersion.bump('actividades', instance.usuario_id)
+
+
+@receiver([post_save, post_delete])
+def perfil_modificado(sender, instance, update_fields=None, **kwargs):
+    # Sin filtro por sender: los proxies (CachedUser de la autenticación)
+    # envían las señales con su propia clase
+    if sender._meta.concrete_model is not User:
+        return
+    if update_fields and set(update_fields) <= USER_FIELDS_SIN_VERSION:
+        return
+    ResourceVersion.bump('perfil', instance.pk)
+
+
+@receiver(post_save, sender=User)
+def crear_contador(sender, instance, created, **kwargs):
+    if created:
+        usage_counters.user_created(instance.pk)
+
+
+@receiver(post_save, sender=Consumo)
+def contar_consumo(sender, instance, created, **kwargs):
+    if created:
+        usage_counters.consumo_added(instance.usuario_id, usage_counters.local_date(instance.fecha_hora))
+
+
+@receiver(post_delete, sender=Consumo)
+def descontar_consumo(sender, instance, **kwargs):
+    usage_counters.consumo_removed(instance.usuario_id, usage_counters.local_date(instance.fecha_hora))
+
+
+@receiver(post_save, sender=Recipiente)
+@receiver(post_save, sender=Recordatorio)
+def contar_alta(sender, instance, created, **kwargs):
+    if created:
+        usage_counters.adjust_total(instance.usuario_id, COUNTER_FIELDS[sender], 1)
+
+
+@receiver(post_delete, sender=Recipiente)
+@receiver(post_delete, sender=Recordatorio)
+def contar_baja(sender, instance, **kwargs):
+    usage_counters.adjust_total(instance.usuario_id, COUNTER_FIELDS[sender], -1)
@@ -9,6 +9,7 @@ from functools import wraps
 import hashlib
 import json
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -293,6 +294,111 @@ class CacheInvalidation:
         CacheManager.invalidate_pattern("hydrotracker:consumos:*")
 
 
+class ResourceVersion:
+    """
+    Contador de generación por usuario y recurso.
+
+    Cada escritura sobre un recurso (consumos, recipientes, recordatorios...)
+    reemplaza la versión almacenada en caché. Las lecturas condicionales la
+    comparan sin tocar la base de datos. La versión es un timestamp en
+    nanosegundos, por lo que también sirve para construir Last-Modified.
+    """
+
+    CACHE_ALIAS = 'default'
+
+    # Recursos compartidos por todos los usuarios
+    GLOBAL_SCOPES = frozenset({'bebidas'})
+
+    @classmethod
+    def get_cache(cls):
+        """
+        Caché de las versiones. También la usan las marcas e instantáneas que
+        deben invalidarse junto con ellas (usuario autenticado, recipientes
+        por defecto).
+        """
+        try:
+            return caches[cls.CACHE_ALIAS]
+        except (KeyError, ValueError) as e:
+            logger.debug(f'Error seleccionando caché alias {cls.CACHE_ALIAS}, usando default: {e}')
+            return cache
+
+    @classmethod
+    def get_key(cls, scope, user_id=None):
+        """
+        Clave de la versión de un recurso para un usuario (o global).
+        """
+        owner = 'global' if scope in cls.GLOBAL_SCOPES or user_id is None else user_id
+        return CacheManager.get_cache_key('version', scope, owner)
+
+    @classmethod
+    def get_many(cls, scopes, user_id=None):
+        """
+        Retorna {scope: versión} para los recursos indicados.
+        Las versiones ausentes se inicializan con el instante actual, de modo
+        que una caché vacía o deshabilitada nunca produce un 304 incorrecto.
+        """
+        keys = {cls.get_key(scope, user_id): scope for scope in scopes}
+        now = time.time_ns()
+        try:
+            selected_cache = cls.get_cache()
+            found = selected_cache.get_many(list(keys))
+            versions = {}
+            for key, scope in keys.items():
+                version = found.get(key)
+                if version is None:
+                    version = now
+                    if not selected_cache.add(key, version, timeout=None):
+                        version = selected_cache.get(key) or now
+                versions[scope] = version
+            return versions
+        except Exception as e:
+            logger.error(f'Error leyendo versiones {list(keys)}: {e}')
+            return {scope: now for scope in scopes}
+
+    @classmethod
+    def get_for_users(cls, scope, user_ids):
+        """
+        Retorna {user_id: versión} de un recurso para varios usuarios con una
+        sola lectura de caché. Mismas reglas que get_many para las ausentes.
+        """
+        keys = {cls.get_key(scope, user_id): user_id for user_id in user_ids}
+        now = time.time_ns()
+        try:
+            selected_cache = cls.get_cache()
+            found = selected_cache.get_many(list(keys))
+            missing = {key: now for key in keys if found.get(key) is None}
+            if missing:
+                selected_cache.set_many(missing, timeout=None)
+            return {user_id: found.get(key) or now for key, user_id in keys.items()}
+        except Exception as e:
+            logger.error(f'Error leyendo versiones de {scope}: {e}')
+            return {user_id: now for user_id in user_ids}
+
+    @classmethod
+    def bump(cls, scope, user_id=None):
+        """
+        Marca un recurso como modificado.
+        """
+        try:
+            cls.get_cache().set(cls.get_key(scope, user_id), time.time_ns(), timeout=None)
+        except Exception as e:
+            logger.error(f'Error actualizando versión {scope}:{user_id}: {e}')
+
+    @classmethod
+    def bump_many(cls, scope, user_ids):
+        """
+        Marca un recurso como modificado para varios usuarios en una sola operación.
+        """
+        now = time.time_ns()
+        try:
+            cls.get_cache().set_many(
+                {cls.get_key(scope, user_id): now for user_id in user_ids},
+                timeout=None
+            )
+        except Exception as e:
+            logger.error(f'Error actualizando versiones de {scope}: {e}')
+
+
 # Configuración de logging para caché
 logging.basicConfig(level=logging.INFO)
 cache_logger = logging.getLogger('hydrotracker.cache')
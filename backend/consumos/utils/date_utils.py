@@ -129,3 +129,27 @@ class DateUtils:
             'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre'
         ]
         return months[date_obj.month - 1]
+    
+    @staticmethod
+    def get_next_occurrence(hora, dias_semana=None, desde=None):
+        """
+        Próximo instante (aware, zona actual) posterior a ``desde`` con la hora
+        dada en alguno de los días de la semana indicados (0=Lunes, 6=Domingo;
+        vacío = todos los días). Retorna None si no hay ningún día válido.
+        """
+        if desde is None:
+            desde = timezone.now()
+        if dias_semana:
+            dias_validos = {dia for dia in dias_semana if isinstance(dia, int) and 0 <= dia <= 6}
+            if not dias_validos:
+                return None
+        else:
+            dias_validos = None
+
+        desde_local = timezone.localtime(desde)
+        fecha = desde_local.date()
+        if datetime.combine(fecha, hora) <= desde_local.replace(tzinfo=None):
+            fecha += timedelta(days=1)
+        if dias_validos is not None:
+            fecha += timedelta(days=min((dia - fecha.weekday()) % 7 for dia in dias_validos))
+        return timezone.make_aware(datetime.combine(fecha, hora))
@@ -3,13 +3,29 @@ Vistas base y mixins para la aplicación de consumos.
 Contiene funcionalidad común reutilizable.
 """
 
-from rest_framework import viewsets, status
+from rest_framework import serializers, viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import APIException
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from django.core.exceptions import FieldDoesNotExist
 from django.db.models import Sum, Count
 from django.utils import timezone
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
 from datetime import timedelta
+import hashlib
+
+from ..utils.cache_utils import ResourceVersion
+
+
+class NotModified(APIException):
+    """
+    Señal interna para cortar la petición con 304 antes de serializar.
+    """
+    status_code = status.HTTP_304_NOT_MODIFIED
+    default_detail = ''
+    default_code = 'not_modified'
 
 
 class BaseViewSet(viewsets.ModelViewSet):
@@ -31,6 +47,213 @@ class BaseViewSet(viewsets.ModelViewSet):
         serializer.save(usuario=self.request.user)
 
 
+class ConditionalGetMixin:
+    """
+    Mixin para GET condicionales (ETag / Last-Modified).
+
+    El validador se construye con las versiones de ResourceVersion de los
+    recursos de los que depende la respuesta, sin consultar la base de datos.
+    Si el cliente ya tiene la representación vigente se responde 304 antes de
+    ejecutar el queryset o el serializer.
+    """
+    # Recursos de los que depende la respuesta (ver ResourceVersion)
+    etag_scopes = ()
+    # La respuesta depende además del día actual (resúmenes). En ViewSets se
+    # puede limitar a algunas acciones con etag_daily_actions.
+    etag_daily = False
+    etag_daily_actions = ()
+
+    def get_etag_scopes(self):
+        """
+        Recursos de los que depende la acción actual. Vacío desactiva el mecanismo.
+        """
+        return self.etag_scopes
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._conditional_validators = None
+        if request.method not in ('GET', 'HEAD'):
+            return
+
+        scopes = self.get_etag_scopes()
+        if not scopes:
+            return
+
+        etag, last_modified = self._build_validators(request, scopes)
+        self._conditional_validators = (etag, last_modified)
+        if self._is_not_modified(request, etag, last_modified):
+            raise NotModified()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        validators = getattr(self, '_conditional_validators', None)
+        if validators and response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            etag, last_modified = validators
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+            response['Cache-Control'] = 'private, no-cache'
+            patch_vary_headers(response, ('Accept', 'Authorization'))
+        return response
+
+    def _build_validators(self, request, scopes):
+        versions = ResourceVersion.get_many(scopes, request.user.id)
+        last_modified = max(versions.values()) // 1_000_000_000
+
+        parts = [
+            str(request.user.id),
+            request.get_full_path(),
+            request.META.get('HTTP_ACCEPT', ''),
+        ]
+        parts.extend(f'{scope}={versions[scope]}' for scope in sorted(versions))
+
+        if self.etag_daily or getattr(self, 'action', None) in self.etag_daily_actions:
+            # Los resúmenes cambian al cambiar el día aunque no haya escrituras
+            today = timezone.localdate()
+            parts.append(today.isoformat())
+            start_of_day = timezone.make_aware(
+                timezone.datetime.combine(today, timezone.datetime.min.time())
+            )
+            last_modified = max(last_modified, int(start_of_day.timestamp()))
+
+        digest = hashlib.md5('|'.join(parts).encode()).hexdigest()
+        return f'"{digest}"', last_modified
+
+    @staticmethod
+    def _is_not_modified(request, etag, last_modified):
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            # Comparación débil (RFC 9110 §13.1.2)
+            client_etags = {
+                tag[2:] if tag.startswith('W/') else tag
+                for tag in parse_etags(if_none_match)
+            }
+            return '*' in client_etags or etag in client_etags
+
+        if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+        return if_modified_since is not None and last_modified <= if_modified_since
+
+
+class FastListMixin:
+    """
+    Mixin que sirve list() por la ruta rápida de solo lectura: values_list()
+    con las columnas del plan de ``fast_serializer_class``. Filtros, orden y
+    paginación se aplican igual que en DRF.
+    """
+    fast_serializer_class = None
+
+    def get_fast_serializer(self):
+        return self.fast_serializer_class(context=self.get_serializer_context())
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = self.get_fast_serializer()
+        rows = serializer.values(queryset)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize(rows))
+
+
+class SparseFieldsMixin:
+    """
+    Mixin para proyección ``?fields=a,b`` en las lecturas servidas por
+    serializers DRF (por defecto list y retrieve).
+
+    El serializer se reduce a los campos pedidos y el queryset se limita con
+    ``only()`` a las columnas que esos campos leen, con select_related solo
+    para las relaciones que se renderizan. Los campos calculados declaran sus
+    columnas en ``sparse_field_sources``; si un campo pedido no se puede
+    resolver a columnas, solo se reduce el serializer.
+    """
+    sparse_actions = ('list', 'retrieve')
+    # {campo: (columnas del modelo que lee)} para campos calculados
+    sparse_field_sources = {}
+
+    def get_sparse_fields(self):
+        """
+        Campos pedidos con ?fields= (None si no aplica a la acción actual).
+        """
+        if getattr(self, 'action', None) not in self.sparse_actions:
+            return None
+        raw = self.request.query_params.get('fields')
+        if not raw:
+            return None
+        requested = {name.strip() for name in raw.split(',')} - {''}
+        return requested or None
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        requested = self.get_sparse_fields()
+        if requested:
+            fields = getattr(serializer, 'child', serializer).fields
+            # Como en ValuesSerializer, los nombres desconocidos se ignoran
+            if requested & set(fields):
+                for name in set(fields) - requested:
+                    fields.pop(name)
+        return serializer
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        requested = self.get_sparse_fields()
+        if requested:
+            queryset = self.project_queryset(queryset, requested)
+        return queryset
+
+    def project_queryset(self, queryset, requested):
+        """
+        Aplica only()/select_related() con las columnas de los campos pedidos.
+        """
+        fields = self.get_serializer_class()(context=self.get_serializer_context()).fields
+        requested = requested & set(fields)
+        if not requested:
+            return queryset
+
+        opts = queryset.model._meta
+        columns = {'pk'}
+        relations = set()
+        for name in requested:
+            if name in self.sparse_field_sources:
+                columns.update(self.sparse_field_sources[name])
+                continue
+            field = fields[name]
+            if isinstance(field, serializers.SerializerMethodField) or field.source == '*':
+                return queryset
+            attrs = field.source_attrs
+            try:
+                model_field = opts.get_field(attrs[0])
+            except FieldDoesNotExist:
+                # Propiedad o método del modelo: no se sabe qué columnas lee
+                return queryset
+            if model_field.many_to_many or model_field.one_to_many:
+                return queryset
+            if not model_field.is_relation:
+                columns.add(attrs[0])
+            elif len(attrs) > 1:
+                # bebida.nombre -> bebida__nombre con select_related('bebida')
+                relations.add(attrs[0])
+                try:
+                    model_field.related_model._meta.get_field(attrs[1])
+                    columns.add('__'.join(attrs[:2]))
+                except FieldDoesNotExist:
+                    columns.add(attrs[0])
+            else:
+                columns.add(attrs[0])
+                # PrimaryKeyRelatedField solo lee el id de la FK
+                if not isinstance(field, serializers.PrimaryKeyRelatedField):
+                    relations.add(attrs[0])
+
+        queryset = queryset.select_related(None)
+        if relations:
+            queryset = queryset.select_related(*relations)
+        return queryset.only(*columns)
+
+
 class StatsMixin:
     """
     Mixin para agregar funcionalidad de estadísticas a los ViewSets.
@@ -9,14 +9,17 @@ from django.views.decorators.cache import cache_page
 
 from ..models import Bebida
 from ..serializers.bebida_serializers import BebidaSerializer
-from .base_views import BaseViewSet, StatsMixin, FilterMixin
+from .base_views import (
+    BaseViewSet, StatsMixin, FilterMixin, ConditionalGetMixin, SparseFieldsMixin
+)
 
 
-class BebidaViewSet(BaseViewSet, StatsMixin, FilterMixin):
+class BebidaViewSet(ConditionalGetMixin, SparseFieldsMixin, BaseViewSet, StatsMixin, FilterMixin):
     """
     ViewSet para gestionar bebidas.
     """
     queryset = Bebida.objects.all()
+    etag_scopes = ('bebidas',)
     serializer_class = BebidaSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['es_agua', 'es_premium', 'activa']
@@ -21,23 +21,38 @@ from ..models import Consumo
 from ..serializers.consumo_serializers import (
     ConsumoSerializer, ConsumoCreateSerializer
 )
-from .base_views import BaseViewSet, StatsMixin, FilterMixin
+from ..serializers.fast_serializers import ConsumoFastSerializer
+from .base_views import (
+    BaseViewSet, StatsMixin, FilterMixin, ConditionalGetMixin, FastListMixin,
+    SparseFieldsMixin
+)
 from ..utils.cache_utils import CacheManager, cache_result, cache_user_data
 
 logger = logging.getLogger(__name__)
 
 
-class ConsumoViewSet(BaseViewSet, StatsMixin, FilterMixin):
+class ConsumoViewSet(ConditionalGetMixin, SparseFieldsMixin, FastListMixin,
+                     BaseViewSet, StatsMixin, FilterMixin):
     """
     ViewSet para gestionar consumos de hidratación.
     Permite CRUD completo con filtros por fecha y usuario.
-    Optimizado con select_related y prefetch_related.
+    El listado usa la ruta rápida de solo lectura (ConsumoFastSerializer);
+    list y retrieve admiten proyección con ?fields=.
     """
-    queryset = Consumo.objects.select_related(
-        'usuario', 'bebida', 'recipiente'
-    ).prefetch_related(
-        'recipiente__usuario'
-    ).all()
+    fast_serializer_class = ConsumoFastSerializer
+    # El listado ya proyecta en ConsumoFastSerializer
+    sparse_actions = ('retrieve',)
+    sparse_field_sources = {
+        'hidratacion_efectiva_ml': ('cantidad_hidratacion_efectiva',),
+        'fecha_formateada': ('fecha_hora',),
+        'hora_formateada': ('fecha_hora',),
+    }
+    # Los resúmenes dependen además de las actividades y del perfil (meta)
+    SUMMARY_ACTIONS = ('daily_summary', 'weekly_summary', 'trends', 'cached_stats')
+    etag_daily_actions = SUMMARY_ACTIONS + ('stats',)
+
+    # Solo las relaciones que se renderizan (bebida_nombre, recipiente_nombre)
+    queryset = Consumo.objects.select_related('bebida', 'recipiente')
     
     filter_backends = [
         DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter
@@ -61,6 +76,16 @@ class ConsumoViewSet(BaseViewSet, StatsMixin, FilterMixin):
             return ConsumoCreateSerializer
         return ConsumoSerializer
 
+    def get_etag_scopes(self):
+        """
+        Recursos de los que depende cada acción de lectura.
+        """
+        if self.action in self.SUMMARY_ACTIONS:
+            return ('consumos', 'actividades', 'perfil')
+        if self.action in ('list', 'retrieve', 'stats'):
+            return ('consumos',)
+        return ()
+
     def get_queryset(self):
         """
         Filtra los consumos del usuario autenticado con optimizaciones.
@@ -6,16 +6,21 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.throttling import ScopedRateThrottle
 from django.http import HttpResponse
-from django.db.models import Sum, Count, Avg
 from django.utils import timezone
 from datetime import datetime, timedelta
 import csv
 import io
+import logging
 
+from hydrotracker.db_router import use_replica
+from hydrotracker.throttling import ScopedTokenBucketThrottle
 from ..models import Consumo
-from ..serializers.consumo_serializers import ConsumoSerializer
+from ..serializers.fast_serializers import ConsumoFastSerializer
+from ..services.consumo_archive import ConsumoTimeline
+from ..services.entitlements import get_entitlements
+
+logger = logging.getLogger(__name__)
 
 
 class ConsumoExportView(APIView):
@@ -23,27 +28,21 @@ class ConsumoExportView(APIView):
     Vista para exportar datos de consumos en diferentes formatos.
     """
     permission_classes = [IsAuthenticated]
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [ScopedTokenBucketThrottle]
     throttle_scope = 'export'
 
     def get_throttles(self):
         """
         Aumenta el límite para usuarios premium usando un scope distinto.
         """
-        if getattr(self.request.user, 'es_premium', False):
-            self.throttle_scope = 'export_premium'
-        else:
-            self.throttle_scope = 'export'
+        self.throttle_scope = get_entitlements(self.request).export_throttle_scope
         return super().get_throttles()
 
+    @use_replica
     def get(self, request):
         """
         Exporta datos de consumos según los parámetros especificados.
         """
-        print("🔍 Export endpoint called")
-        print(f"Format: {request.query_params.get('format', 'csv')}")
-        print(f"User: {request.user}")
-        
         try:
             # Obtener parámetros
             format_type = request.query_params.get('format', 'csv')
@@ -64,59 +63,63 @@ class ConsumoExportView(APIView):
                 fecha_fin = timezone.now().date()
                 fecha_inicio = fecha_fin - timedelta(days=30)
 
-            print(f"Date range: {fecha_inicio} to {fecha_fin}")
-
             # Filtrar consumos
             consumos = Consumo.objects.filter(
                 usuario=request.user,
                 fecha_hora__date__range=[fecha_inicio, fecha_fin]
-            ).select_related('bebida', 'recipiente').order_by('-fecha_hora')
-
-            print(f"Found {consumos.count()} consumos")
+            ).order_by('-fecha_hora')
 
-            # Calcular estadísticas
-            stats = consumos.aggregate(
-                total_ml=Sum('cantidad_ml'),
-                total_hidratacion=Sum('cantidad_hidratacion_efectiva'),
-                cantidad_consumos=Count('id'),
-                promedio_diario=Avg('cantidad_ml')
-            )
+            # Incluye los consumos archivados y los días compactados del rango
+            timeline = ConsumoTimeline(request.user, consumos, fecha_inicio, fecha_fin)
+            stats = timeline.totals()
 
-            # Preparar datos
-            consumos_data = ConsumoSerializer(consumos, many=True).data
+            # Preparar datos (ruta rápida: values_list + plan precalculado)
+            consumos_data = ConsumoFastSerializer(
+                context={'request': request}
+            ).serialize_queryset(timeline)
             
             summary = {
-                'total_ml': stats['total_ml'] or 0,
-                'total_hidratacion_efectiva_ml': stats['total_hidratacion'] or 0,
-                'cantidad_consumos': stats['cantidad_consumos'] or 0,
+                'total_ml': stats['total_ml'],
+                'total_hidratacion_efectiva_ml': stats['total_hidratacion'],
+                'cantidad_consumos': stats['cantidad_consumos'],
                 'periodo': f"{fecha_inicio} a {fecha_fin}",
-                'promedio_diario_ml': round(stats['promedio_diario'] or 0, 2)
+                'promedio_diario_ml': round(stats['promedio_ml'], 2),
+                # Días compactados: cuentan en los totales pero no tienen filas
+                'dias_resumidos': stats['dias_resumidos'],
             }
+            resumenes = [
+                {
+                    'fecha': fecha,
+                    'cantidad_consumos': cantidad,
+                    'total_ml': total_ml,
+                    'total_hidratacion_efectiva_ml': total_hidratacion,
+                }
+                for fecha, (cantidad, total_ml, total_hidratacion) in sorted(
+                    timeline.resumenes().items(), reverse=True
+                )
+            ]
 
-            print(f"Summary: {summary}")
+            logger.debug(f'Export {format_type} - Usuario: {request.user.id}, {summary}')
 
             if format_type == 'csv':
-                print("Returning CSV")
-                return self._export_csv(consumos_data, summary, fecha_inicio, fecha_fin)
-            elif format_type == 'json':
-                print("Returning JSON")
+                return self._export_csv(consumos_data, summary, fecha_inicio, fecha_fin, resumenes)
+            elif format_type in ('json', 'msgpack'):
                 return Response({
                     'consumos': consumos_data,
+                    'resumenes_diarios': resumenes,
                     'summary': summary
                 })
             else:
                 return Response({
-                    'error': 'Formato no soportado. Use: csv o json'
+                    'error': 'Formato no soportado. Use: csv, json o msgpack'
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            import traceback
-            print(f"❌ Error en export view: {e}")
-            print(traceback.format_exc())
+            logger.error(f'Error en export view - Usuario: {request.user.id}, Error: {e}', exc_info=True)
             return Response({
                 'error': f'Error interno: {str(e)}'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    def _export_csv(self, consumos_data, summary, fecha_inicio, fecha_fin):
+    def _export_csv(self, consumos_data, summary, fecha_inicio, fecha_fin, resumenes=()):
         """
         Exporta datos en formato CSV.
         """
@@ -141,11 +144,10 @@ class ConsumoExportView(APIView):
 
         # Datos de consumos
         for consumo in consumos_data:
-            fecha_obj = datetime.fromisoformat(consumo['fecha_hora'].replace('Z', '+00:00'))
-            
+            # fecha_formateada/hora_formateada ya vienen en la zona horaria actual
             row = [
-                fecha_obj.strftime('%Y-%m-%d'),
-                fecha_obj.strftime('%H:%M'),
+                consumo['fecha_formateada'],
+                consumo['hora_formateada'],
                 consumo.get('bebida_nombre', 'N/A'),
                 consumo['cantidad_ml'],
                 consumo.get('hidratacion_efectiva_ml', 'N/A'),
@@ -157,6 +159,19 @@ class ConsumoExportView(APIView):
             ]
             writer.writerow(row)
 
+        # Días compactados: solo hay totales por día
+        if resumenes:
+            writer.writerow([])
+            writer.writerow(['DÍAS RESUMIDOS (sin detalle por consumo)'])
+            writer.writerow(['Fecha', 'Cantidad de Consumos', 'Cantidad (ml)', 'Hidratación Efectiva (ml)'])
+            for resumen in resumenes:
+                writer.writerow([
+                    resumen['fecha'].isoformat(),
+                    resumen['cantidad_consumos'],
+                    resumen['total_ml'],
+                    resumen['total_hidratacion_efectiva_ml'],
+                ])
+
         # Agregar resumen
         writer.writerow([])  # Línea vacía
         writer.writerow(['RESUMEN DEL PERÍODO'])
@@ -165,6 +180,8 @@ class ConsumoExportView(APIView):
         writer.writerow(['Hidratación Efectiva (ml)', summary['total_hidratacion_efectiva_ml']])
         writer.writerow(['Cantidad de Consumos', summary['cantidad_consumos']])
         writer.writerow(['Promedio Diario (ml)', summary['promedio_diario_ml']])
+        if summary['dias_resumidos']:
+            writer.writerow(['Días Resumidos', summary['dias_resumidos']])
 
         # Escribir al response
         response.write(output.getvalue())
@@ -10,6 +10,7 @@ from django_filters.rest_framework import DjangoFilterBackend
 
 from ..models import MetaDiaria
 from ..serializers.meta_serializers import MetaDiariaSerializer, MetaFijaSerializer
+from ..services.entitlements import get_entitlements
 from .base_views import BaseViewSet, StatsMixin, FilterMixin
 
 
@@ -42,7 +43,7 @@ class MetaFijaView(APIView):
         meta_fija_ml = getattr(settings, 'META_FIJA_ML', 2000)
         
         # Para usuarios premium, usar su meta personalizada
-        if request.user.es_premium:
+        if get_entitlements(request).is_premium:
             meta_ml = request.user.calcular_meta_hidratacion()
             if not meta_ml or meta_ml <= 0:
                 meta_ml = request.user.meta_diaria_ml or meta_fija_ml
@@ -6,12 +6,16 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework import status
-from django.conf import settings
 from django.db.models import Count, Q
 from django.utils import timezone
 from datetime import timedelta
 
-from ..models import Consumo, Recordatorio
+from hydrotracker.db_router import use_replica
+from ..models import Consumo
+from ..services.entitlements import get_entitlements
+from ..services.platform_metrics import (
+    get_history, get_latest_snapshot, history_point, refresh_platform_metrics, snapshot_stats
+)
 from ..serializers.monetization_serializers import (
     SubscriptionStatusSerializer, PremiumFeaturesSerializer, UsageLimitsSerializer,
     MonetizationStatsSerializer, UpgradePromptSerializer
@@ -29,7 +33,7 @@ class SubscriptionStatusView(APIView):
         Retorna el estado de suscripción del usuario autenticado.
         """
         user = request.user
-        is_premium = user.es_premium
+        is_premium = get_entitlements(request).is_premium
         
         # Obtener fecha de fin de suscripción si es premium
         subscription_end_date = None
@@ -89,26 +93,16 @@ class UsageLimitsView(APIView):
         """
         Retorna los límites de uso actuales del usuario.
         """
-        user = request.user
-        is_premium = user.es_premium
+        entitlements = get_entitlements(request)
+        is_premium = entitlements.is_premium
         
         # Límites de recordatorios
-        if is_premium:
-            max_reminders = settings.META_MAX_RECORDATORIOS_PREMIUM
-        else:
-            max_reminders = settings.META_MAX_RECORDATORIOS_GRATUITOS
-        
-        # Recordatorios actuales
-        current_reminders = Recordatorio.objects.filter(usuario=user).count()
+        max_reminders = entitlements.max_recordatorios
+        current_reminders = entitlements.recordatorios_count
         
         # Límites de consumos (si aplica)
-        max_consumos_diarios = None if is_premium else 50  # Ejemplo
-        
-        # Consumos del día actual
-        today = timezone.now().date()
-        consumos_hoy = Consumo.objects.filter(
-            usuario=user, fecha_hora__date=today
-        ).count()
+        max_consumos_diarios = entitlements.max_consumos_diarios
+        consumos_hoy = entitlements.consumos_hoy_count
         
         data = {
             'is_premium': is_premium,
@@ -131,53 +125,29 @@ class UsageLimitsView(APIView):
 class MonetizationStatsView(APIView):
     """
     Vista para estadísticas de monetización (solo administradores).
+    Lee el último snapshot de MetricaPlataforma (ver refresh_platform_metrics);
+    con ?history=N agrega la serie de los N snapshots más recientes.
     """
     permission_classes = [IsAuthenticated, IsAdminUser]
 
+    @use_replica
     def get(self, request):
         """
         Retorna estadísticas de monetización del sistema.
         """
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-        
-        # Estadísticas de usuarios
-        total_users = User.objects.count()
-        premium_users = User.objects.filter(es_premium=True).count()
-        free_users = total_users - premium_users
-        
-        # Estadísticas de conversión
-        conversion_rate = (premium_users / total_users * 100) if total_users > 0 else 0
-        
-        # Estadísticas de actividad
-        active_users_30d = User.objects.filter(
-            last_login__gte=timezone.now() - timedelta(days=30)
-        ).count()
-        
-        # Estadísticas de consumos
-        total_consumos = Consumo.objects.count()
-        consumos_30d = Consumo.objects.filter(
-            fecha_hora__gte=timezone.now() - timedelta(days=30)
-        ).count()
-        
-        data = {
-            'usuarios': {
-                'total': total_users,
-                'premium': premium_users,
-                'gratuitos': free_users,
-                'activos_30d': active_users_30d
-            },
-            'conversion': {
-                'tasa_conversion': round(conversion_rate, 2),
-                'usuarios_premium': premium_users,
-                'usuarios_totales': total_users
-            },
-            'actividad': {
-                'consumos_totales': total_consumos,
-                'consumos_30d': consumos_30d,
-                'usuarios_activos_30d': active_users_30d
-            }
-        }
+        # Sin snapshot todavía (instalación nueva): se calcula uno completo
+        snapshot = get_latest_snapshot() or refresh_platform_metrics()
+        data = snapshot_stats(snapshot)
+        
+        history = request.query_params.get('history')
+        if history:
+            try:
+                data['historial'] = [history_point(item) for item in get_history(history)]
+            except ValueError:
+                return Response(
+                    {'error': 'history debe ser un número entero'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
         
         serializer = MonetizationStatsSerializer(data)
         return Response(serializer.data)
@@ -194,8 +164,9 @@ class UpgradePromptView(APIView):
         Retorna un prompt de actualización personalizado basado en el uso del usuario.
         """
         user = request.user
+        entitlements = get_entitlements(request)
         
-        if user.es_premium:
+        if entitlements.is_premium:
             return Response({
                 'message': 'Ya eres usuario premium',
                 'is_premium': True
@@ -207,8 +178,8 @@ class UpgradePromptView(APIView):
             fecha_hora__gte=timezone.now() - timedelta(days=30)
         ).count()
         
-        recordatorios_actuales = Recordatorio.objects.filter(usuario=user).count()
-        max_reminders = settings.META_MAX_RECORDATORIOS_GRATUITOS
+        recordatorios_actuales = entitlements.recordatorios_count
+        max_reminders = entitlements.max_recordatorios
         
         # Generar prompt personalizado
         prompt = self._generate_upgrade_prompt(consumos_30d, recordatorios_actuales, max_reminders)
@@ -253,5 +224,5 @@ class NoAdsView(APIView):
         """
         Retorna el estado premium del usuario para lógica de anuncios.
         """
-        is_premium = request.user.es_premium
+        is_premium = get_entitlements(request).is_premium
         return Response({'is_premium': is_premium})
\ No newline at end of file
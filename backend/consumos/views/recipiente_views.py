@@ -7,18 +7,26 @@ from rest_framework.response import Response
 from rest_framework.decorators import action
 from django_filters.rest_framework import DjangoFilterBackend
 
+from users.utils import asegurar_recipientes_por_defecto
 from ..models import Recipiente
 from ..serializers.recipiente_serializers import RecipienteSerializer
-from .base_views import BaseViewSet, StatsMixin, FilterMixin
+from ..services.entitlements import get_entitlements
+from .base_views import (
+    BaseViewSet, StatsMixin, FilterMixin, ConditionalGetMixin, SparseFieldsMixin
+)
+from ..utils.cache_utils import CacheManager, ResourceVersion
 
 
-class RecipienteViewSet(BaseViewSet, StatsMixin, FilterMixin):
+class RecipienteViewSet(ConditionalGetMixin, SparseFieldsMixin, BaseViewSet, StatsMixin, FilterMixin):
     """
     ViewSet para gestionar recipientes de hidratación.
     Los usuarios free solo pueden tener 2 recipientes (los por defecto).
     Los usuarios premium pueden tener recipientes ilimitados.
     """
-    queryset = Recipiente.objects.all()
+    # usuario se renderiza con StringRelatedField
+    queryset = Recipiente.objects.select_related('usuario')
+    etag_scopes = ('recipientes',)
+    sparse_field_sources = {'hidratacion_efectiva_ml': ('cantidad_ml',)}
     serializer_class = RecipienteSerializer
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['es_favorito', 'cantidad_ml']
@@ -28,23 +36,25 @@ class RecipienteViewSet(BaseViewSet, StatsMixin, FilterMixin):
 
     def list(self, request, *args, **kwargs):
         """
-        Lista los recipientes del usuario, asegurando que existan los por defecto (Vaso 250ml, Botella 500ml).
-        Migra nombres antiguos (Taza/Vaso, Botella/Termo pequeño) a Vaso/Botella.
+        Lista los recipientes del usuario. Los por defecto (Vaso 250ml, Botella
+        500ml) se crean al registrarse y aquí solo se comprueban si falta la
+        marca en caché; los nombres antiguos los migró 0010_recipientes_nombres.
+        La respuesta se guarda en caché (junto a las versiones) con el ETag
+        como clave, que cambia con cada escritura sobre los recipientes.
         """
-        user = request.user
-        Recipiente.objects.filter(usuario=user, nombre='Taza/Vaso').update(nombre='Vaso')
-        Recipiente.objects.filter(usuario=user, nombre='Botella/Termo pequeño').update(nombre='Botella')
-        Recipiente.objects.get_or_create(
-            usuario=user,
-            nombre='Vaso',
-            defaults={'cantidad_ml': 250, 'color': '#3B82F6', 'icono': 'cup', 'es_favorito': True}
-        )
-        Recipiente.objects.get_or_create(
-            usuario=user,
-            nombre='Botella',
-            defaults={'cantidad_ml': 500, 'color': '#10B981', 'icono': 'bottle', 'es_favorito': True}
+        if asegurar_recipientes_por_defecto(request.user) and self._conditional_validators:
+            # Se crearon recipientes: el ETag calculado en initial() quedó viejo
+            self._conditional_validators = self._build_validators(request, self.get_etag_scopes())
+        if not self._conditional_validators:
+            return super().list(request, *args, **kwargs)
+
+        cache_key = CacheManager.get_cache_key('recipientes_list', self._conditional_validators[0])
+        data = CacheManager.get_or_set(
+            cache_key,
+            lambda: super(RecipienteViewSet, self).list(request, *args, **kwargs).data,
+            cache_alias=ResourceVersion.CACHE_ALIAS,
         )
-        return super().list(request, *args, **kwargs)
+        return Response(data)
     
     def get_queryset(self):
         """
@@ -56,16 +66,12 @@ class RecipienteViewSet(BaseViewSet, StatsMixin, FilterMixin):
         """
         Crea un nuevo recipiente validando el límite para usuarios free.
         """
-        user = request.user
-        
         # Verificar límite para usuarios free (solo 2 recipientes)
-        if not user.es_premium:
-            recipientes_count = Recipiente.objects.filter(usuario=user).count()
-            if recipientes_count >= 2:
-                return Response({
-                    'error': 'Los usuarios free solo pueden tener 2 recipientes. Actualiza a Premium para agregar más recipientes.',
-                    'detail': 'Límite de recipientes alcanzado'
-                }, status=status.HTTP_403_FORBIDDEN)
+        if not get_entitlements(request).can_create_recipiente():
+            return Response({
+                'error': 'Los usuarios free solo pueden tener 2 recipientes. Actualiza a Premium para agregar más recipientes.',
+                'detail': 'Límite de recipientes alcanzado'
+            }, status=status.HTTP_403_FORBIDDEN)
         
         # Continuar con la creación normal
         return super().create(request, *args, **kwargs)
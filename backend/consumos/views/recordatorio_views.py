@@ -9,14 +9,17 @@ from ..models import Recordatorio
 from ..serializers.recordatorio_serializers import (
     RecordatorioSerializer, RecordatorioCreateSerializer, RecordatorioStatsSerializer
 )
-from .base_views import BaseViewSet, StatsMixin, FilterMixin
+from .base_views import (
+    BaseViewSet, StatsMixin, FilterMixin, ConditionalGetMixin, SparseFieldsMixin
+)
 
 
-class RecordatorioViewSet(BaseViewSet, StatsMixin, FilterMixin):
+class RecordatorioViewSet(ConditionalGetMixin, SparseFieldsMixin, BaseViewSet, StatsMixin, FilterMixin):
     """
     ViewSet para gestionar recordatorios de hidratación.
     """
     queryset = Recordatorio.objects.all()
+    etag_scopes = ('recordatorios',)
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['activo', 'tipo_recordatorio', 'frecuencia']
     search_fields = ['mensaje']
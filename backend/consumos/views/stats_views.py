@@ -7,21 +7,32 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.generics import ListAPIView
 
-from ..models import Consumo
+from hydrotracker.db_router import use_replica
+
+from ..models import Consumo, ConsumoResumenDiario
 from ..serializers.stats_serializers import (
     ConsumoHistorySerializer, ConsumoSummarySerializer,
     ConsumoDailySummarySerializer, ConsumoWeeklySummarySerializer,
     ConsumoMonthlySummarySerializer, ConsumoTrendSerializer,
     ConsumoInsightsSerializer
 )
+from ..serializers.fast_serializers import ConsumoHistoryFastSerializer
+from ..services.consumo_archive import ConsumoTimeline
+from ..services.consumo_compaction import daily_totals, sum_totals
 from ..permissions import IsPremiumUser
+from .base_views import ConditionalGetMixin, FastListMixin
 
 
-class ConsumoHistoryView(ListAPIView):
+class ConsumoHistoryView(ConditionalGetMixin, FastListMixin, ListAPIView):
     """
     Vista para obtener el historial detallado de consumos.
     Solo accesible para usuarios premium.
+
+    Los días compactados en ConsumoResumenDiario no tienen filas; la cabecera
+    X-Consumos-Resumidos-Hasta indica el último día compactado.
     """
+    etag_scopes = ('consumos',)
+    fast_serializer_class = ConsumoHistoryFastSerializer
     serializer_class = ConsumoHistorySerializer
     permission_classes = [IsAuthenticated, IsPremiumUser]
 
@@ -31,14 +42,38 @@ class ConsumoHistoryView(ListAPIView):
         """
         return Consumo.objects.filter(usuario=self.request.user).order_by('-fecha_hora')
 
+    def filter_queryset(self, queryset):
+        """
+        Con el orden por defecto incluye también los consumos archivados.
+        """
+        queryset = super().filter_queryset(queryset)
+        if tuple(queryset.query.order_by) != ('-fecha_hora',):
+            return queryset
+        return ConsumoTimeline.for_queryset(self.request.user, queryset)
 
-class ConsumoSummaryView(APIView):
+    @use_replica
+    def get(self, request, *args, **kwargs):
+        response = super().get(request, *args, **kwargs)
+        # Los días compactados no tienen filas: se avisa hasta qué fecha faltan
+        ultimo_resumido = (
+            ConsumoResumenDiario.objects.filter(usuario=request.user)
+            .order_by('-fecha').values_list('fecha', flat=True).first()
+        )
+        if ultimo_resumido:
+            response['X-Consumos-Resumidos-Hasta'] = ultimo_resumido.isoformat()
+        return response
+
+
+class ConsumoSummaryView(ConditionalGetMixin, APIView):
     """
     Vista para obtener estadísticas agregadas de consumos.
     Solo accesible para usuarios premium.
     """
+    etag_scopes = ('consumos', 'perfil')
+    etag_daily = True
     permission_classes = [IsAuthenticated, IsPremiumUser]
 
+    @use_replica
     def get(self, request):
         """
         Retorna estadísticas agregadas según el periodo solicitado.
@@ -73,6 +108,14 @@ class ConsumoSummaryView(APIView):
         total_ml = consumos.aggregate(total=Sum('cantidad_ml'))['total'] or 0
         total_hidratacion = consumos.aggregate(total=Sum('cantidad_hidratacion_efectiva'))['total'] or 0
         cantidad_consumos = consumos.count()
+
+        # Días compactados (compact_consumos)
+        cantidad_resumida, ml_resumido, hidratacion_resumida = sum_totals(
+            daily_totals(request.user, fecha_inicio, fecha_fin)
+        )
+        total_ml += ml_resumido
+        total_hidratacion += hidratacion_resumida
+        cantidad_consumos += cantidad_resumida
         
         data = {
             'periodo': period,
@@ -88,11 +131,13 @@ class ConsumoSummaryView(APIView):
         return Response(serializer.data)
 
 
-class ConsumoTrendsView(APIView):
+class ConsumoTrendsView(ConditionalGetMixin, APIView):
     """
     Vista para obtener tendencias de consumo.
     Solo accesible para usuarios premium.
     """
+    etag_scopes = ('consumos', 'perfil')
+    etag_daily = True
     permission_classes = [IsAuthenticated, IsPremiumUser]
 
     def get(self, request):
@@ -114,11 +159,13 @@ class ConsumoTrendsView(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
 
 
-class ConsumoInsightsView(APIView):
+class ConsumoInsightsView(ConditionalGetMixin, APIView):
     """
     Vista para obtener insights y análisis avanzados de consumos.
     Solo accesible para usuarios premium.
     """
+    etag_scopes = ('consumos', 'perfil')
+    etag_daily = True
     permission_classes = [IsAuthenticated, IsPremiumUser]
 
     def get(self, request):
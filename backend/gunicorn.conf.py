@@ -0,0 +1,70 @@
+"""
+Configuración de gunicorn para producción (start.sh y Dockerfile):
+
+    gunicorn -c gunicorn.conf.py
+
+Workers e hilos se dimensionan con la CPU y la memoria del contenedor
+(hydrotracker.server_tuning); SERVER_MODE=asgi sirve hydrotracker.asgi con
+workers uvicorn y activa las vistas async. Ver las variables admitidas en
+hydrotracker/server_tuning.py y el barrido en benchmarks/bench_gunicorn.py.
+"""
+import os
+
+from hydrotracker.server_tuning import plan
+
+_plan = plan()
+
+if _plan['mode'] == 'asgi':
+    wsgi_app = 'hydrotracker.asgi:application'
+    # Antes de cargar settings: las URLs montan las vistas async
+    os.environ.setdefault('ASYNC_VIEWS', 'True')
+else:
+    wsgi_app = 'hydrotracker.wsgi:application'
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = _plan['worker_class']
+workers = _plan['workers']
+threads = _plan['threads']
+
+# Carga la app una vez en el master y la comparte con los workers (copy-on-write)
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() in ('1', 'true', 'yes')
+
+# Reciclar workers acota el crecimiento de memoria; el jitter evita que
+# todos se reinicien a la vez
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+
+# Heartbeat en memoria: en contenedores /tmp puede ser overlayfs lento
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = '-'
+errorlog = '-'
+
+
+def when_ready(server):
+    server.log.info(
+        'Plan: %s %s x%d (threads=%d, cpus=%s, memoria=%s MB, preload=%s)',
+        _plan['mode'], worker_class, workers, threads, _plan['cpus'], _plan['memory_mb'], preload_app
+    )
+    if preload_app:
+        from hydrotracker.warmup import warm_shared
+        warm_shared()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        from hydrotracker.warmup import warm_worker
+        warm_worker()
+
+
+def post_worker_init(worker):
+    # Sin preload, Django se carga en cada worker después de post_fork
+    if not preload_app:
+        from hydrotracker.warmup import warm_shared, warm_worker
+        warm_shared()
+        warm_worker()
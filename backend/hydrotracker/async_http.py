@@ -0,0 +1,30 @@
+"""
+Cliente httpx compartido para las llamadas salientes de las vistas async.
+
+Crear un httpx.AsyncClient por petición arma un contexto SSL nuevo (varias
+decenas de ms de CPU que bloquean el event loop) y descarta el pool de
+conexiones. Se mantiene uno por event loop: bajo uvicorn hay un único loop
+por worker, y en los tests cada async_to_sync obtiene el suyo.
+"""
+import asyncio
+import weakref
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - httpx es opcional (solo vistas async)
+    httpx = None
+
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client():
+    """
+    AsyncClient del event loop en curso (se crea en el primer uso). Los
+    timeouts se pasan en cada llamada.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(limits=httpx.Limits(max_connections=200, max_keepalive_connections=50))
+        _clients[loop] = client
+    return client
@@ -0,0 +1,143 @@
+"""
+Base para vistas asíncronas (ASGI) de los endpoints que pasan la mayor parte
+del tiempo esperando a servicios externos (Open-Meteo, Mercado Pago).
+
+DRF 3.14 no tiene APIView asíncrona, así que AsyncAPIView reproduce lo
+necesario de su ciclo de vida con las mismas piezas configuradas en
+REST_FRAMEWORK: autenticación, permisos, throttling y parseo del body se
+ejecutan en un único salto a hilo (sync_to_async, porque tocan la base de
+datos o la caché síncrona), el handler corre en el event loop y la respuesta
+se renderiza con la negociación de contenido habitual (JSON/MessagePack).
+
+Los handlers son ``async def get/post/put/patch/delete(self, request, ...)``
+que reciben el Request de DRF y retornan un Response de DRF. Los métodos sin
+handler propio se delegan en ``fallback_view`` (la vista síncrona
+equivalente) cuando está definida.
+
+Solo se montan con ASYNC_VIEWS=True (ver hydrotracker/urls.py); bajo WSGI
+funcionan igual pero Django las ejecuta con async_to_sync y no hay ganancia.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponseNotAllowed
+from rest_framework import exceptions
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+
+class AsyncAPIView:
+    """
+    Vista asíncrona con el ciclo de vida de APIView (auth, permisos,
+    throttling, negociación) sobre los ajustes globales de DRF.
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_scope = None
+    fallback_view = None
+    http_method_names = ('get', 'post', 'put', 'patch', 'delete')
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        async def view(request, *args, **kwargs):
+            self = cls(**initkwargs)
+            self.args = args
+            self.kwargs = kwargs
+            return await self.dispatch(request, *args, **kwargs)
+
+        view.view_class = cls
+        # Igual que APIView: la autenticación es por token, no por cookie
+        view.csrf_exempt = True
+        return view
+
+    def __init__(self, **kwargs):
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+    def allowed_methods(self):
+        return [
+            method.upper() for method in self.http_method_names
+            if hasattr(self, method)
+        ]
+
+    async def dispatch(self, request, *args, **kwargs):
+        method = request.method.lower()
+        handler = getattr(self, method, None) if method in self.http_method_names else None
+        if handler is None:
+            # Desde la clase: como atributo de instancia la vista quedaría ligada
+            fallback_view = type(self).fallback_view
+            if fallback_view is not None:
+                return await sync_to_async(fallback_view)(request, *args, **kwargs)
+            return HttpResponseNotAllowed(self.allowed_methods())
+
+        request = self.initialize_request(request)
+        self.request = request
+        try:
+            await sync_to_async(self.initial)(request)
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+        return self.finalize_response(request, response)
+
+    def initialize_request(self, request):
+        return Request(
+            request,
+            parsers=[parser() for parser in api_settings.DEFAULT_PARSER_CLASSES],
+            authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+            negotiator=api_settings.DEFAULT_CONTENT_NEGOTIATION_CLASS(),
+        )
+
+    def initial(self, request):
+        """
+        Parte síncrona del ciclo: autentica, comprueba permisos y throttles y
+        parsea el body para que el handler no toque el ORM ni el stream.
+        """
+        user = request.user  # Fuerza la autenticación (consulta el usuario)
+        deferred = user.get_deferred_fields() if hasattr(user, 'get_deferred_fields') else None
+        if deferred:
+            # El usuario de la instantánea en caché (CachedUser) trae campos
+            # diferidos que el handler no puede cargar desde el event loop
+            user.refresh_from_db(fields=deferred)
+        for permission in [permission() for permission in self.permission_classes]:
+            if not permission.has_permission(request, self):
+                if request.authenticators and not request.successful_authenticator:
+                    raise exceptions.NotAuthenticated()
+                raise exceptions.PermissionDenied(getattr(permission, 'message', None))
+        for throttle in [throttle() for throttle in api_settings.DEFAULT_THROTTLE_CLASSES]:
+            if not throttle.allow_request(request, self):
+                raise exceptions.Throttled(throttle.wait())
+        if request.method in ('POST', 'PUT', 'PATCH'):
+            request.data
+
+    def handle_exception(self, exc):
+        """
+        Misma traducción de excepciones que APIView (EXCEPTION_HANDLER).
+        """
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            authenticators = self.request.authenticators
+            if authenticators:
+                header = authenticators[0].authenticate_header(self.request)
+                if header:
+                    exc.auth_header = header
+                else:
+                    exc.status_code = 403
+        response = api_settings.EXCEPTION_HANDLER(exc, {'view': self, 'request': self.request})
+        if response is None:
+            raise exc
+        return response
+
+    def finalize_response(self, request, response):
+        renderers = [
+            renderer() for renderer in api_settings.DEFAULT_RENDERER_CLASSES
+            if renderer is not BrowsableAPIRenderer
+        ]
+        try:
+            renderer, media_type = request.negotiator.select_renderer(request, renderers)
+        except exceptions.NotAcceptable:
+            renderer, media_type = renderers[0], renderers[0].media_type
+        response.accepted_renderer = renderer
+        response.accepted_media_type = media_type
+        response.renderer_context = {
+            'view': self, 'args': self.args, 'kwargs': self.kwargs, 'request': request,
+        }
+        response['Vary'] = 'Accept'
+        return response.render()
@@ -0,0 +1,154 @@
+"""
+Conexiones a PostgreSQL (Neon): modo de pooling y métricas.
+
+configure_pooling ajusta la entrada de DATABASES según DB_POOL_MODE:
+
+- ``persistent`` (por defecto): una conexión persistente por hilo
+  (CONN_MAX_AGE) con CONN_HEALTH_CHECKS. Django valida la conexión al
+  reutilizarla en una nueva petición y la reabre si Neon cerró la sesión
+  SSL, en lugar de fallar dentro de la vista y reintentarla.
+- ``pgbouncer``: para el pooler de Neon (host con ``-pooler``) u otro
+  PgBouncer en modo transacción. Sin cursores del lado del servidor, que no
+  sobreviven entre transacciones; psycopg2 no usa prepared statements.
+- ``pool``: pool de psycopg 3 dentro del proceso (Django >= 5.1), que
+  comprueba cada conexión antes de entregarla. En versiones anteriores o sin
+  psycopg 3 se usa ``persistent``.
+
+Las métricas son por proceso (cada worker de gunicorn tiene las suyas) y se
+publican en /api/health/.
+"""
+import logging
+import threading
+
+import django
+
+logger = logging.getLogger(__name__)
+
+POOL_MODES = ('persistent', 'pgbouncer', 'pool')
+
+_lock = threading.Lock()
+_local = threading.local()
+_stats = {
+    'requests': 0,
+    'connections_created': 0,
+    'connections_in_request': 0,
+    'reconnections': 0,
+    'ssl_retries': 0,
+}
+_config = {}
+
+
+def pool_supported():
+    if django.VERSION < (5, 1):
+        return False
+    try:
+        import psycopg_pool  # noqa: F401
+        import psycopg  # noqa: F401
+    except ImportError:  # pragma: no cover - psycopg 3 es opcional
+        return False
+    return True
+
+
+def configure_pooling(db_config, mode='persistent', conn_max_age=60, min_size=2, max_size=10, timeout=10):
+    """
+    Ajusta db_config (ENGINE postgresql) para el modo indicado y retorna el
+    modo efectivo.
+    """
+    mode = (mode or 'persistent').lower()
+    if mode not in POOL_MODES:
+        raise ValueError(f'DB_POOL_MODE inválido: {mode} (opciones: {", ".join(POOL_MODES)})')
+    if mode == 'pool' and not pool_supported():
+        logger.warning('DB_POOL_MODE=pool requiere Django >= 5.1 y psycopg 3; se usa persistent')
+        mode = 'persistent'
+    if mode == 'persistent' and '-pooler' in (db_config.get('HOST') or ''):
+        mode = 'pgbouncer'
+
+    options = db_config.setdefault('OPTIONS', {})
+    if mode == 'pool':
+        from psycopg_pool import ConnectionPool
+
+        # El pool gestiona la vida de las conexiones; Django exige CONN_MAX_AGE=0
+        db_config['CONN_MAX_AGE'] = 0
+        db_config['CONN_HEALTH_CHECKS'] = False
+        options['pool'] = {
+            'min_size': min_size,
+            'max_size': max_size,
+            'timeout': timeout,
+            'check': ConnectionPool.check_connection,
+        }
+    else:
+        db_config['CONN_MAX_AGE'] = conn_max_age
+        db_config['CONN_HEALTH_CHECKS'] = True
+        if mode == 'pgbouncer':
+            db_config['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+    _config.update(mode=mode, conn_max_age=db_config['CONN_MAX_AGE'])
+    return mode
+
+
+def _request_started(**kwargs):
+    _local.in_request = True
+    with _lock:
+        _stats['requests'] += 1
+
+
+def _request_finished(**kwargs):
+    _local.in_request = False
+
+
+def _connection_created(sender, connection, **kwargs):
+    seen = getattr(_local, 'aliases', None)
+    if seen is None:
+        seen = _local.aliases = set()
+    with _lock:
+        _stats['connections_created'] += 1
+        if getattr(_local, 'in_request', False):
+            _stats['connections_in_request'] += 1
+        if connection.alias in seen:
+            _stats['reconnections'] += 1
+    seen.add(connection.alias)
+
+
+def connect_signals():
+    """
+    Registra los contadores (ConsumosConfig.ready).
+    """
+    from django.core.signals import request_finished, request_started
+    from django.db.backends.signals import connection_created
+
+    request_started.connect(_request_started, dispatch_uid='db_pool_request_started')
+    request_finished.connect(_request_finished, dispatch_uid='db_pool_request_finished')
+    connection_created.connect(_connection_created, dispatch_uid='db_pool_connection_created')
+
+
+def record_ssl_retry():
+    with _lock:
+        _stats['ssl_retries'] += 1
+
+
+def reset_metrics():
+    with _lock:
+        for key in _stats:
+            _stats[key] = 0
+
+
+def metrics():
+    """
+    Contadores del proceso y, con DB_POOL_MODE=pool, las estadísticas del pool.
+
+    connections_in_request cuenta las conexiones abiertas durante una
+    petición (coste en el camino caliente); reconnections, las que
+    reemplazan una conexión previa del mismo hilo (health check fallido o
+    CONN_MAX_AGE vencido).
+    """
+    from django.db import connection
+
+    with _lock:
+        data = dict(_stats)
+    data['mode'] = _config.get('mode', 'persistent' if connection.vendor == 'postgresql' else None)
+    data['conn_max_age'] = connection.settings_dict.get('CONN_MAX_AGE')
+    data['health_checks'] = connection.settings_dict.get('CONN_HEALTH_CHECKS', False)
+    pool = getattr(connection, 'pool', None)
+    if pool is not None:
+        data['pool'] = pool.get_stats()
+    return data
@@ -0,0 +1,104 @@
+"""
+Enrutado de lecturas a la réplica (DATABASE_REPLICA_URL).
+
+Las lecturas van a ``default`` salvo dentro de un bloque marcado con
+``use_replica`` (vistas y servicios de estadísticas, historial y
+exportación). Las escrituras siempre van a ``default``.
+
+Para leer lo recién escrito, ReplicaPinningMiddleware fija al usuario a
+``default`` durante REPLICA_PIN_SECONDS después de cada petición de
+escritura; use_replica no usa la réplica para un usuario fijado. Dentro de
+una transacción abierta en ``default`` tampoco, para no perder las
+escrituras aún no confirmadas.
+
+Sin réplica configurada use_replica no hace nada.
+"""
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_ALIAS = 'replica'
+PIN_CACHE_PREFIX = 'replica_pin'
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def replica_available():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def _pin_key(user_id):
+    return f'{PIN_CACHE_PREFIX}:{user_id}'
+
+
+def pin_to_primary(user_id, seconds=None):
+    """
+    Lecturas del usuario en ``default`` durante ``seconds`` segundos.
+    """
+    if replica_available() and user_id:
+        cache.set(_pin_key(user_id), 1, seconds or settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user_id):
+    return bool(user_id) and cache.get(_pin_key(user_id)) is not None
+
+
+@contextmanager
+def replica_reads(user=None):
+    """
+    Lecturas del bloque en la réplica, salvo que ``user`` esté fijado a
+    ``default``.
+    """
+    user_id = getattr(user, 'pk', None)
+    enabled = replica_available() and not is_pinned(user_id)
+    token = _replica_reads.set(enabled)
+    try:
+        yield enabled
+    finally:
+        _replica_reads.reset(token)
+
+
+def _user_from_args(args):
+    # Servicios (self.user) o métodos de vista (self, request)
+    for arg in args[:2]:
+        user = getattr(arg, 'user', None)
+        if user is not None:
+            return user
+    return None
+
+
+def use_replica(func):
+    """
+    Decorador para métodos de vistas (``get(self, request, ...)``) y de
+    servicios con ``self.user``: sus lecturas van a la réplica.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with replica_reads(_user_from_args(args)):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    """
+    Router de DATABASE_ROUTERS: réplica para lecturas dentro de use_replica.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and not connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return REPLICA_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Ambos alias son la misma base (la réplica es una copia)
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_ALIAS
@@ -1,8 +1,12 @@
 import logging
 
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.db import close_old_connections
 from django.db.utils import OperationalError
 
+from .db_pool import record_ssl_retry
+from .db_router import pin_to_primary, replica_available
+
 
 logger = logging.getLogger(__name__)
 
@@ -17,14 +21,28 @@ class RetryDbOperationalErrorOnSafeMethodsMiddleware:
     - ejecutamos nuevamente el request
 
     Importante: NO reintentar POST/PUT/PATCH/DELETE para evitar efectos duplicados.
+
+    Con CONN_HEALTH_CHECKS (hydrotracker/db_pool.py) la conexión caída se
+    detecta y reabre al inicio de la petición; este reintento queda para
+    cortes a mitad de petición y se cuenta en las métricas de /api/health/.
+
+    Admite también la cadena ASGI: un middleware solo síncrono obligaría a
+    Django a ejecutar las vistas async dentro de async_to_sync.
     """
 
     SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+    sync_capable = True
+    async_capable = True
 
     def __init__(self, get_response):
         self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
         if request.method not in self.SAFE_METHODS:
             return self.get_response(request)
 
@@ -35,6 +53,63 @@ class RetryDbOperationalErrorOnSafeMethodsMiddleware:
             if "SSL connection has been closed unexpectedly" not in msg:
                 raise
             logger.warning("OperationalError (SSL closed). Retrying once. path=%s", request.path)
+            record_ssl_retry()
             close_old_connections()
             return self.get_response(request)
 
+    async def __acall__(self, request):
+        if request.method not in self.SAFE_METHODS:
+            return await self.get_response(request)
+
+        try:
+            return await self.get_response(request)
+        except OperationalError as e:
+            if "SSL connection has been closed unexpectedly" not in str(e):
+                raise
+            logger.warning("OperationalError (SSL closed). Retrying once. path=%s", request.path)
+            record_ssl_retry()
+            await sync_to_async(close_old_connections)()
+            return await self.get_response(request)
+
+
+class ReplicaPinningMiddleware:
+    """
+    Tras una escritura exitosa (POST/PUT/PATCH/DELETE) fija al usuario a la
+    base principal unos segundos (hydrotracker/db_router.py), de modo que
+    sus lecturas siguientes no vean la réplica atrasada.
+
+    El usuario se lee después de la vista: con JWT lo autentica DRF, no
+    AuthenticationMiddleware.
+    """
+
+    SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        if self._should_pin(request, response):
+            pin_to_primary(request.user.pk)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if self._should_pin(request, response):
+            await sync_to_async(pin_to_primary)(request.user.pk)
+        return response
+
+    def _should_pin(self, request, response):
+        if request.method in self.SAFE_METHODS or response.status_code >= 400:
+            return False
+        if not replica_available():
+            return False
+        user = getattr(request, 'user', None)
+        return bool(user is not None and user.is_authenticated)
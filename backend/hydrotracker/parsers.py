@@ -0,0 +1,36 @@
+"""
+Parsers de la API.
+"""
+
+import codecs
+import io
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson es opcional
+    orjson = None
+
+
+class ORJSONParser(JSONParser):
+    """
+    JSONParser que decodifica con orjson.
+    Si orjson rechaza el cuerpo, no está instalado o la petición no viene en
+    UTF-8, se usa el JSONParser de DRF, que decide el resultado final; así lo
+    aceptado y los mensajes de error no cambian. Única diferencia: los
+    enteros de más de 64 bits se decodifican como float.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(io.BytesIO(body), media_type, parser_context)
@@ -0,0 +1,28 @@
+"""
+Bucle común de los workers periódicos (run_*_worker).
+
+Los comandos de mantenimiento con --loop (suscripciones expiradas,
+contadores de uso, métricas, archivo y compactación de consumos) ejecutan su
+tarea cada ``interval`` segundos; un fallo se registra y no detiene el bucle.
+"""
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def run_periodic(task, interval, error_message, stop_event=None, log=None):
+    """
+    Ejecuta ``task()`` cada ``interval`` segundos hasta que se active
+    ``stop_event`` (o indefinidamente). Los errores se registran en ``log``
+    como ``'{error_message}: {error}'``.
+    """
+    stop_event = stop_event or threading.Event()
+    log = log or logger
+    while not stop_event.is_set():
+        try:
+            task()
+        except Exception as e:
+            log.error(f'{error_message}: {e}')
+        stop_event.wait(interval)
@@ -0,0 +1,91 @@
+"""
+Renderers de la API.
+"""
+
+import datetime
+import logging
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson es opcional
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack es opcional
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer que codifica con orjson y produce los mismos bytes que el
+    JSONRenderer de DRF (separadores compactos, UTF-8 sin escapar, 'Z' para
+    UTC, U+2028/U+2029 escapados).
+
+    Los tipos que orjson no conoce (Decimal, cadenas lazy, QuerySet...) pasan
+    por el mismo encoder de DRF. Si orjson no está instalado, se pide
+    indentación o el valor no es codificable (p. ej. enteros de más de 64
+    bits), se delega en el JSONRenderer de DRF.
+
+    Diferencias conocidas: los floats en notación exponencial se escriben
+    sin signo ni ceros de relleno en el exponente (1e16 en vez de 1e+16) y
+    NaN/Infinity se codifican como null en lugar de producir un error.
+    """
+
+    OPTIONS = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+    _drf_default = staticmethod(encoders.JSONEncoder().default)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self._drf_default, option=self.OPTIONS)
+        except TypeError as e:
+            logger.debug(f'orjson no pudo codificar la respuesta, usando JSONRenderer: {e}')
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Igual que DRF: U+2028 y U+2029 son válidos en JSON pero no en JavaScript
+        if b'\xe2\x80' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renderer MessagePack para clientes que lo piden explícitamente
+    (``Accept: application/msgpack`` o ``?format=msgpack``); JSON sigue
+    siendo el formato por defecto.
+
+    Con ``compact_encoding = True`` los serializers rápidos emiten fechas
+    como epoch en segundos y choices como enteros. El resto de respuestas se codifica
+    tal cual; los datetime que aún lleguen sin serializar también se envían
+    como epoch en segundos.
+    """
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    compact_encoding = True
+
+    _drf_default = staticmethod(encoders.JSONEncoder().default)
+
+    @classmethod
+    def _default(cls, obj):
+        if isinstance(obj, datetime.datetime):
+            return int(obj.timestamp())
+        return cls._drf_default(obj)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=self._default, use_bin_type=True)
@@ -0,0 +1,136 @@
+"""
+Dimensionado de gunicorn según la CPU y la memoria disponibles.
+
+Lo usa gunicorn.conf.py al arrancar; no importa Django para poder evaluarse
+en el master antes de cargar la aplicación. Los límites se leen del cgroup
+(v2 o v1) cuando existen, porque en contenedores os.cpu_count() y
+/proc/meminfo muestran los del host.
+
+Variables de entorno:
+
+- SERVER_MODE: ``wsgi`` (por defecto) o ``asgi`` (workers uvicorn).
+- WEB_CONCURRENCY: número de workers fijo (anula el cálculo).
+- GUNICORN_THREADS: hilos por worker en modo wsgi (por defecto 4; 1 => sync).
+- GUNICORN_WORKER_CLASS: clase de worker explícita en modo wsgi.
+- GUNICORN_WORKER_MEMORY_MB: memoria estimada por worker (por defecto 160).
+"""
+import math
+import os
+
+CGROUP_ROOT = '/sys/fs/cgroup'
+MEMINFO_PATH = '/proc/meminfo'
+
+DEFAULT_THREADS = 4
+DEFAULT_WORKER_MEMORY_MB = 160
+# Fracción de la memoria que se reparte entre workers (el resto queda para
+# el master, la caché de páginas y picos)
+MEMORY_BUDGET = 0.8
+ASGI_WORKER_CLASS = 'uvicorn_worker.UvicornWorker'
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_quota(root=CGROUP_ROOT):
+    """
+    CPUs asignadas por el cgroup (puede ser fraccionario) o None sin límite.
+    """
+    cpu_max = _read(os.path.join(root, 'cpu.max'))
+    if cpu_max:
+        quota, _, period = cpu_max.partition(' ')
+        if quota != 'max' and period:
+            return int(quota) / int(period)
+        return None
+    quota = _read(os.path.join(root, 'cpu', 'cpu.cfs_quota_us'))
+    period = _read(os.path.join(root, 'cpu', 'cpu.cfs_period_us'))
+    if quota and period and int(quota) > 0:
+        return int(quota) / int(period)
+    return None
+
+
+def cpu_limit(root=CGROUP_ROOT):
+    """
+    CPUs utilizables: afinidad del proceso acotada por la cuota del cgroup.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - macOS/Windows
+        cpus = os.cpu_count() or 1
+    quota = cgroup_cpu_quota(root)
+    if quota:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+    return max(1, cpus)
+
+
+def memory_limit_mb(root=CGROUP_ROOT, meminfo=MEMINFO_PATH):
+    """
+    Memoria disponible en MB: el menor entre el límite del cgroup y
+    MemAvailable, o None si no se puede determinar.
+    """
+    limits = []
+    cgroup_max = _read(os.path.join(root, 'memory.max'))
+    if cgroup_max is None:
+        cgroup_max = _read(os.path.join(root, 'memory', 'memory.limit_in_bytes'))
+    # cgroup v1 expresa "sin límite" como un número enorme
+    if cgroup_max and cgroup_max != 'max' and int(cgroup_max) < 1 << 60:
+        limits.append(int(cgroup_max) // (1024 * 1024))
+
+    for line in (_read(meminfo) or '').splitlines():
+        if line.startswith('MemAvailable:'):
+            limits.append(int(line.split()[1]) // 1024)
+            break
+    return min(limits) if limits else None
+
+
+def plan(env=None, cpus=None, memory_mb=None):
+    """
+    Configuración recomendada: dict con mode, worker_class, workers y threads.
+
+    - sync: 2 * CPU + 1 procesos (cada uno atiende una petición).
+    - gthread: CPU + 1 procesos; los hilos cubren las esperas de E/S.
+    - asgi: un proceso por CPU (el event loop solapa las esperas).
+
+    El número de procesos se acota por la memoria disponible y se puede fijar
+    con WEB_CONCURRENCY.
+    """
+    env = os.environ if env is None else env
+    cpus = cpus or cpu_limit()
+    memory_mb = memory_mb if memory_mb is not None else memory_limit_mb()
+    mode = env.get('SERVER_MODE', 'wsgi').lower()
+
+    if mode == 'asgi':
+        worker_class = ASGI_WORKER_CLASS
+        threads = 1
+        by_cpu = cpus
+    else:
+        mode = 'wsgi'
+        threads = max(1, int(env.get('GUNICORN_THREADS', DEFAULT_THREADS)))
+        worker_class = env.get('GUNICORN_WORKER_CLASS') or ('gthread' if threads > 1 else 'sync')
+        if worker_class == 'sync':
+            threads = 1
+            by_cpu = 2 * cpus + 1
+        else:
+            by_cpu = cpus + 1
+
+    if env.get('WEB_CONCURRENCY'):
+        workers = max(1, int(env['WEB_CONCURRENCY']))
+    else:
+        workers = by_cpu
+        if memory_mb:
+            per_worker = int(env.get('GUNICORN_WORKER_MEMORY_MB', DEFAULT_WORKER_MEMORY_MB))
+            workers = min(workers, int(memory_mb * MEMORY_BUDGET // per_worker))
+        workers = max(1, workers)
+
+    return {
+        'mode': mode,
+        'worker_class': worker_class,
+        'workers': workers,
+        'threads': threads,
+        'cpus': cpus,
+        'memory_mb': memory_mb,
+    }
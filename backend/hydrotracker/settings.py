@@ -9,6 +9,8 @@ from decouple import config
 from django.core.exceptions import ImproperlyConfigured
 import dj_database_url
 
+from hydrotracker.db_pool import POOL_MODES, configure_pooling
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -85,6 +87,7 @@ MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'hydrotracker.middleware.RetryDbOperationalErrorOnSafeMethodsMiddleware',
+    'hydrotracker.middleware.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -112,11 +115,22 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'hydrotracker.wsgi.application'
+ASGI_APPLICATION = 'hydrotracker.asgi.application'
+
+# Vistas async (estimate, alta/edición de actividades y suscripciones) para
+# servir con workers ASGI (start.sh con SERVER_MODE=asgi)
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
 
 # Database - Configuración consciente del entorno
 # Prioridad: DATABASE_URL (Neon/Render/Heroku) > DB_HOST (Docker) > SQLite (local)
 DATABASE_URL = config('DATABASE_URL', default=None)
 DB_HOST = config('DB_HOST', default=None)
+# persistent | pgbouncer | pool (hydrotracker/db_pool.py)
+DB_POOL_MODE = config('DB_POOL_MODE', default='persistent')
+DB_POOL_MIN_SIZE = config('DB_POOL_MIN_SIZE', default=2, cast=int)
+DB_POOL_MAX_SIZE = config('DB_POOL_MAX_SIZE', default=10, cast=int)
+if DB_POOL_MODE.lower() not in POOL_MODES:
+    raise ImproperlyConfigured(f'DB_POOL_MODE debe ser uno de: {", ".join(POOL_MODES)}')
 
 # Validar que DATABASE_URL no esté vacío y sea válido
 if DATABASE_URL and DATABASE_URL.strip():
@@ -160,6 +174,16 @@ if DATABASE_URL and DATABASE_URL.strip():
             db_config['OPTIONS']['keepalives_idle'] = 30
             db_config['OPTIONS']['keepalives_interval'] = 10
             db_config['OPTIONS']['keepalives_count'] = 5
+
+            # Persistentes con health checks, pooler de Neon/PgBouncer o pool
+            # de psycopg (ver hydrotracker/db_pool.py)
+            configure_pooling(
+                db_config,
+                mode=DB_POOL_MODE,
+                conn_max_age=db_conn_max_age,
+                min_size=DB_POOL_MIN_SIZE,
+                max_size=DB_POOL_MAX_SIZE,
+            )
         
         DATABASES = {
             'default': db_config
@@ -200,6 +224,13 @@ if not DATABASE_URL or (isinstance(DATABASE_URL, str) and not DATABASE_URL.strip
                 'sslmode': 'require',
                 'connect_timeout': 10,
             }
+        configure_pooling(
+            db_config,
+            mode=DB_POOL_MODE,
+            conn_max_age=config('DB_CONN_MAX_AGE', default=60, cast=int),
+            min_size=DB_POOL_MIN_SIZE,
+            max_size=DB_POOL_MAX_SIZE,
+        )
         
         DATABASES = {
             'default': db_config
@@ -218,6 +249,30 @@ if not DATABASE_URL or (isinstance(DATABASE_URL, str) and not DATABASE_URL.strip
             'timeout': 20,
         }
 
+# Réplica de lectura opcional para estadísticas, historial y exportación
+# (hydrotracker/db_router.py). En tests es un espejo de default.
+DATABASE_REPLICA_URL = config('DATABASE_REPLICA_URL', default=None)
+if DATABASE_REPLICA_URL and DATABASE_REPLICA_URL.strip():
+    replica_config = dj_database_url.parse(
+        DATABASE_REPLICA_URL, conn_max_age=config('DB_CONN_MAX_AGE', default=60, cast=int)
+    )
+    if replica_config.get('ENGINE') == 'django.db.backends.postgresql':
+        replica_config.setdefault('OPTIONS', {}).setdefault('sslmode', 'require')
+        replica_config['OPTIONS']['connect_timeout'] = 10
+        configure_pooling(
+            replica_config,
+            mode=DB_POOL_MODE,
+            conn_max_age=replica_config['CONN_MAX_AGE'],
+            min_size=DB_POOL_MIN_SIZE,
+            max_size=DB_POOL_MAX_SIZE,
+        )
+    replica_config['TEST'] = {'MIRROR': 'default'}
+    DATABASES['replica'] = replica_config
+
+DATABASE_ROUTERS = ['hydrotracker.db_router.ReplicaRouter']
+# Segundos que un usuario lee de la base principal después de escribir
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=5, cast=int)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -263,14 +318,21 @@ REST_FRAMEWORK = {
     # Autenticación híbrida: JWT para apps móviles (prioridad) y Session para web/admin
     # JWT tiene prioridad porque se verifica primero y funciona mejor en entornos móviles
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',  # Prioridad: Apps móviles (Capacitor)
+        # Prioridad: Apps móviles (Capacitor); usuario desde caché (ver users/authentication.py)
+        'users.authentication.CachedJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',  # Respaldo: Web/Admin
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # orjson con salida idéntica a la de DRF (ver hydrotracker/renderers.py)
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'hydrotracker.renderers.ORJSONRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'hydrotracker.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
@@ -280,21 +342,34 @@ REST_FRAMEWORK = {
         'rest_framework.filters.OrderingFilter',
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
-    # Throttling: solo usar si Redis está disponible, de lo contrario deshabilitar
+    # Throttling por token bucket: atómico en Redis, por proceso sin Redis
+    # (ver hydrotracker/throttling.py)
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle',
-        'rest_framework.throttling.ScopedRateThrottle',
-    ] if USE_REDIS else [],
+        'hydrotracker.throttling.AnonTokenBucketThrottle',
+        'hydrotracker.throttling.UserTokenBucketThrottle',
+        'hydrotracker.throttling.ScopedTokenBucketThrottle',
+    ],
     'DEFAULT_THROTTLE_RATES': {
         'anon': '60/min',
         'user': '120/min',
         'login': '10/min',
         'export': '10/min',
         'export_premium': '60/min',
-    } if USE_REDIS else {},
+    },
+}
+
+# Ráfaga máxima por scope (capacidad del bucket); sin entrada, la tasa del periodo
+THROTTLE_BURSTS = {
+    'login': 5,
+    'export': 3,
+    'export_premium': 10,
 }
 
+# MessagePack opcional: solo se negocia si el paquete está instalado
+from importlib.util import find_spec
+if find_spec('msgpack') is not None:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('hydrotracker.renderers.MessagePackRenderer')
+
 # JWT Settings
 from datetime import timedelta
 
@@ -387,6 +462,26 @@ META_FIJA_ML = config('META_FIJA_ML', default=2000, cast=int)
 META_MAX_RECORDATORIOS_GRATUITOS = config('META_MAX_RECORDATORIOS_GRATUITOS', default=4, cast=int)
 META_MAX_RECORDATORIOS_PREMIUM = config('META_MAX_RECORDATORIOS_PREMIUM', default=10, cast=int)
 
+# Despacho de recordatorios (comando dispatch_reminders)
+REMINDER_SENDER = config(
+    'REMINDER_SENDER', default='consumos.services.reminder_scheduler.LoggingReminderSender'
+)
+REMINDER_BATCH_SIZE = config('REMINDER_BATCH_SIZE', default=500, cast=int)
+# Segundos hasta reintentar un recordatorio cuyo envío falló
+REMINDER_RETRY_SECONDS = config('REMINDER_RETRY_SECONDS', default=60, cast=int)
+# No enviar recordatorios de agua/meta a quien ya va al día con su meta
+REMINDER_SKIP_ON_TRACK = config('REMINDER_SKIP_ON_TRACK', default=True, cast=bool)
+
+# Consumos: meses que quedan en la tabla caliente antes de archivarse
+# (archive_consumos) y particiones mensuales creadas por adelantado en
+# PostgreSQL (partition_consumos)
+CONSUMO_HOT_MONTHS = config('CONSUMO_HOT_MONTHS', default=18, cast=int)
+CONSUMO_PARTITIONS_AHEAD = config('CONSUMO_PARTITIONS_AHEAD', default=3, cast=int)
+# Días tras los que compact_consumos resume por día los consumos de usuarios
+# gratuitos (antes de que se archiven); los premium conservan el detalle
+CONSUMO_COMPACT_AFTER_DAYS = config('CONSUMO_COMPACT_AFTER_DAYS', default=365, cast=int)
+CONSUMO_COMPACT_KEEP_PREMIUM = config('CONSUMO_COMPACT_KEEP_PREMIUM', default=True, cast=bool)
+
 # Logging
 LOGGING = {
     'version': 1,
@@ -625,5 +720,11 @@ if DEBUG:
 # MP_ACCESS_TOKEN y MP_PUBLIC_KEY deben provenir de la cuenta VENDEDOR (no del comprador)
 MP_ACCESS_TOKEN = config('MP_ACCESS_TOKEN', default=None)
 MP_PUBLIC_KEY = config('MP_PUBLIC_KEY', default=None)
+# URL base de la API (se puede apuntar a un servidor falso en tests o staging)
+MP_API_BASE_URL = config('MP_API_BASE_URL', default='https://api.mercadopago.com')
+# Cola de webhooks (api.services.WebhookWorker): reintentos con backoff exponencial
+MP_WEBHOOK_MAX_ATTEMPTS = config('MP_WEBHOOK_MAX_ATTEMPTS', default=8, cast=int)
+MP_WEBHOOK_RETRY_BASE_SECONDS = config('MP_WEBHOOK_RETRY_BASE_SECONDS', default=30, cast=int)
+MP_WEBHOOK_RETRY_MAX_SECONDS = config('MP_WEBHOOK_RETRY_MAX_SECONDS', default=3600, cast=int)
 BACKEND_URL = config('BACKEND_URL', default='http://localhost:8000')
 FRONTEND_URL = config('FRONTEND_URL', default='http://localhost:3000')
@@ -35,6 +35,10 @@ DATABASES['default']['OPTIONS'] = {
     'timeout': 20,
 }
 
+# Réplica de lectura sobre el mismo archivo para ejercitar el router; en
+# tests es un espejo de la base de test de default
+DATABASES['replica'] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
+
 # Configuración de caché para SQLite (opcional)
 CACHES = {
     'default': {
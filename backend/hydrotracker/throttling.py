@@ -0,0 +1,181 @@
+"""
+Throttling por token bucket.
+
+Los throttles de DRF guardan por clave la lista completa de timestamps de la
+ventana y la actualizan con lectura-modificación-escritura no atómica sobre
+la caché. Estos guardan por clave solo (fichas, último instante):
+
+- Con Redis (USE_REDIS), un script Lua consume la ficha de forma atómica con
+  el reloj de Redis, igual para todos los workers.
+- Sin Redis, o si Redis falla, un bucket en memoria por proceso sigue
+  limitando (por worker).
+
+La tasa de cada scope sale de DEFAULT_THROTTLE_RATES ("10/min" rellena una
+ficha cada 6 s) y la ráfaga máxima de THROTTLE_BURSTS (por defecto, la
+tasa completa del periodo).
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.settings import api_settings
+from rest_framework.throttling import (
+    AnonRateThrottle, ScopedRateThrottle, SimpleRateThrottle, UserRateThrottle
+)
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = 'hydrotracker:throttle:'
+
+# KEYS[1]: clave del bucket; ARGV: capacidad, fichas por segundo
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return {allowed, tostring(wait)}
+"""
+
+
+class LocalTokenBuckets:
+    """
+    Buckets en memoria del proceso, con un máximo de claves (se descartan
+    las menos usadas; un bucket descartado vuelve lleno).
+    """
+
+    def __init__(self, max_keys=50000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, rate):
+        now = time.monotonic()
+        with self._lock:
+            tokens, ts = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + max(0.0, now - ts) * rate)
+            if tokens >= 1:
+                tokens -= 1
+                allowed, wait = True, 0.0
+            else:
+                allowed, wait = False, (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, wait
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class RedisTokenBuckets:
+    """
+    Buckets en Redis (conexión de la caché ``default``) con el script Lua.
+    """
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+        self._script = None
+
+    def _get_script(self):
+        if self._script is None:
+            from django_redis import get_redis_connection
+            self._script = get_redis_connection('default').register_script(TOKEN_BUCKET_LUA)
+        return self._script
+
+    def consume(self, key, capacity, rate):
+        try:
+            allowed, wait = self._get_script()(keys=[REDIS_KEY_PREFIX + key], args=[capacity, rate])
+            return bool(allowed), float(wait)
+        except Exception as e:
+            logger.warning(f'Throttle en Redis no disponible, usando buckets locales: {e}')
+            return self.fallback.consume(key, capacity, rate)
+
+
+local_buckets = LocalTokenBuckets()
+_redis_buckets = RedisTokenBuckets(local_buckets)
+
+
+def get_buckets():
+    return _redis_buckets if getattr(settings, 'USE_REDIS', False) else local_buckets
+
+
+def reset_local_buckets():
+    """
+    Vacía los buckets en memoria (tests).
+    """
+    local_buckets.reset()
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    SimpleRateThrottle con token bucket en lugar de historial de timestamps.
+    """
+    _wait = None
+
+    def get_rate(self):
+        if not getattr(self, 'scope', None):
+            raise ImproperlyConfigured(
+                f"You must set either `.scope` or `.rate` for '{self.__class__.__name__}' throttle"
+            )
+        # Leído en cada petición (DEFAULT_THROTTLE_RATES puede cambiar en tests)
+        try:
+            return api_settings.DEFAULT_THROTTLE_RATES[self.scope]
+        except KeyError:
+            raise ImproperlyConfigured(f"No default throttle rate set for '{self.scope}' scope")
+
+    def get_burst(self):
+        return getattr(settings, 'THROTTLE_BURSTS', {}).get(self.scope) or self.num_requests
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        allowed, self._wait = get_buckets().consume(
+            self.key, self.get_burst(), self.num_requests / self.duration
+        )
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+class AnonTokenBucketThrottle(AnonRateThrottle, TokenBucketThrottle):
+    """
+    Límite por IP para peticiones anónimas (scope ``anon``).
+    """
+
+
+class UserTokenBucketThrottle(UserRateThrottle, TokenBucketThrottle):
+    """
+    Límite por usuario (o IP si es anónimo) (scope ``user``).
+    """
+
+
+class ScopedTokenBucketThrottle(ScopedRateThrottle, TokenBucketThrottle):
+    """
+    Límite por ``throttle_scope`` de la vista (login, export, export_premium...).
+    """
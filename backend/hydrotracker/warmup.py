@@ -0,0 +1,49 @@
+"""
+Precalentamiento de procesos de gunicorn (hooks de gunicorn.conf.py).
+
+warm_shared se ejecuta en el master tras cargar la aplicación con
+preload_app: lo que queda cargado (URLconf, clases de DRF, catálogos de
+traducción) se comparte con los workers por copy-on-write, y gc.freeze()
+evita que el recolector toque esas páginas y las copie en cada worker.
+
+warm_worker se ejecuta en cada worker recién creado y descarta las
+conexiones heredadas del master (no se pueden compartir entre procesos).
+No abre conexiones nuevas: las de Django son por hilo y las peticiones se
+atienden en otros hilos (gthread, sync_to_async de uvicorn), así que cada
+hilo abre la suya en su primera petición.
+"""
+import gc
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def warm_shared():
+    from django.conf import settings
+    from django.urls import get_resolver
+    from django.utils import translation
+    from rest_framework.settings import api_settings
+
+    # Resolver y vistas: se importan todas las apps de URLs
+    get_resolver().url_patterns
+    # DRF importa estas clases en el primer uso
+    for name in (
+        'DEFAULT_RENDERER_CLASSES', 'DEFAULT_PARSER_CLASSES', 'DEFAULT_AUTHENTICATION_CLASSES',
+        'DEFAULT_PERMISSION_CLASSES', 'DEFAULT_THROTTLE_CLASSES', 'DEFAULT_CONTENT_NEGOTIATION_CLASS',
+        'EXCEPTION_HANDLER',
+    ):
+        getattr(api_settings, name)
+    # Carga los catálogos de traducción (mensajes de error de DRF/Django)
+    translation.activate(settings.LANGUAGE_CODE)
+    translation.deactivate()
+
+    gc.freeze()
+    logger.info('Aplicación precargada; %d objetos congelados para los workers', gc.get_freeze_count())
+
+
+def warm_worker():
+    from django.core.cache import caches
+    from django.db import connections
+
+    connections.close_all()
+    caches.close_all()
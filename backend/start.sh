@@ -15,13 +15,9 @@ python manage.py seed_bebidas
 echo "Collecting static files..."
 python manage.py collectstatic --noinput || true
 
-# Iniciar Gunicorn
+# Iniciar Gunicorn (workers/hilos según CPU y memoria: gunicorn.conf.py)
+# SERVER_MODE=asgi: workers uvicorn sobre hydrotracker.asgi y vistas async
+# (ASYNC_VIEWS) para los endpoints que esperan a Open-Meteo/Mercado Pago
 PORT=${PORT:-8000}
-echo "Starting Gunicorn on port $PORT..."
-exec gunicorn hydrotracker.wsgi:application \
-    --bind 0.0.0.0:$PORT \
-    --workers 2 \
-    --timeout 120 \
-    --access-logfile - \
-    --error-logfile -
-
+echo "Starting Gunicorn (${SERVER_MODE:-wsgi}) on port $PORT..."
+exec gunicorn -c gunicorn.conf.py
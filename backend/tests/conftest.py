@@ -6,9 +6,18 @@ from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
 
+from hydrotracker.throttling import reset_local_buckets
+
 User = get_user_model()
 
 
+@pytest.fixture(autouse=True)
+def reset_throttles():
+    """Buckets de throttling en memoria vacíos en cada test."""
+    reset_local_buckets()
+    yield
+
+
 @pytest.fixture
 def api_client():
     """Cliente API para tests."""
@@ -0,0 +1,109 @@
+"""
+Servidor HTTP falso de Mercado Pago para los tests de webhooks.
+
+Atiende GET /preapproval/<id> y GET /v1/payments/<id> con las respuestas
+registradas y permite simular fallos transitorios. También acepta
+POST /checkout/preferences, POST /preapproval y PUT /preapproval/<id> (vistas
+de suscripción) y puede demorar cada respuesta ``delay`` segundos.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Admite ráfagas de conexiones simultáneas (benchmark de vistas async)
+    request_queue_size = 128
+
+
+class FakeMercadoPago:
+    """Servidor en un hilo con respuestas configurables por ruta."""
+
+    def __init__(self):
+        self.resources = {}
+        self.failures = {}
+        self.requests = []
+        self.bodies = []
+        self.delay = 0.0
+        self._lock = threading.Lock()
+        self.server = _Server(('127.0.0.1', 0), self._handler())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def add_preapproval(self, preapproval_id, **data):
+        self.resources[f'/preapproval/{preapproval_id}'] = (200, {'id': preapproval_id, **data})
+
+    def add_payment(self, payment_id, **data):
+        self.resources[f'/v1/payments/{payment_id}'] = (200, {'id': payment_id, **data})
+
+    def fail(self, path, times, status=500):
+        """Las próximas ``times`` consultas a ``path`` responden ``status``."""
+        self.failures[path] = [status] * times
+
+    def count(self, path):
+        return self.requests.count(path)
+
+    def _created(self, path, data):
+        """Respuesta a los POST: el recurso creado con su init_point."""
+        resource_id = f'{path.strip("/").replace("/", "-")}-{len(self.bodies)}'
+        return 201, {'id': resource_id, 'init_point': f'https://mp.test/checkout/{resource_id}', **data}
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _respond(self, method):
+                path = self.path.split('?')[0]
+                length = int(self.headers.get('Content-Length') or 0)
+                data = json.loads(self.rfile.read(length)) if length else {}
+                if fake.delay:
+                    time.sleep(fake.delay)
+                with fake._lock:
+                    fake.requests.append(path)
+                    pending = fake.failures.get(path)
+                    if pending:
+                        status, body = pending.pop(0), {'message': 'error'}
+                    elif method == 'POST':
+                        fake.bodies.append(data)
+                        status, body = fake._created(path, data)
+                    elif method == 'PUT' and path in fake.resources:
+                        fake.bodies.append(data)
+                        current = fake.resources[path][1]
+                        fake.resources[path] = (200, {**current, **data})
+                        status, body = fake.resources[path]
+                    else:
+                        status, body = fake.resources.get(path, (404, {'message': 'not found'}))
+                content = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def do_GET(self):
+                self._respond('GET')
+
+            def do_POST(self):
+                self._respond('POST')
+
+            def do_PUT(self):
+                self._respond('PUT')
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,72 @@
+"""
+Servidor HTTP falso de Open-Meteo para los tests de las vistas async y el
+benchmark de bench_async_views.
+
+Responde a GET /v1/forecast con 24 horas de temperatura y humedad fijas para
+el día pedido (start_date) y puede demorar cada respuesta ``delay`` segundos
+para simular un upstream lento.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Admite ráfagas de conexiones simultáneas (benchmark de vistas async)
+    request_queue_size = 128
+
+
+class FakeOpenMeteo:
+    """Servidor en un hilo con temperatura/humedad configurables."""
+
+    def __init__(self, temperature=30.0, humidity=60.0, delay=0.0):
+        self.temperature = temperature
+        self.humidity = humidity
+        self.delay = delay
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.server = _Server(('127.0.0.1', 0), self._handler())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f'http://{host}:{port}/v1/forecast'
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with fake._lock:
+                    fake.requests += 1
+                if fake.delay:
+                    time.sleep(fake.delay)
+                day = parse_qs(urlparse(self.path).query).get('start_date', ['2024-01-01'])[0]
+                body = {'hourly': {
+                    'time': [f'{day}T{hour:02d}:00' for hour in range(24)],
+                    'temperature_2m': [fake.temperature] * 24,
+                    'relative_humidity_2m': [fake.humidity] * 24,
+                }}
+                content = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
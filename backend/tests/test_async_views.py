@@ -0,0 +1,204 @@
+"""
+Tests para las vistas async (ASYNC_VIEWS) de actividades y suscripciones,
+contra servidores falsos de Open-Meteo y Mercado Pago.
+"""
+import asyncio
+import time
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.cache import cache
+from django.test import AsyncRequestFactory
+from django.utils import timezone
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from actividades.async_views import (
+    ActividadDetailAsyncView, ActividadEstimateAsyncView, ActividadListAsyncView
+)
+from actividades.models import Actividad
+from actividades.services.weather_service import WeatherService
+from api.async_views import AsyncCancelSubscriptionView, AsyncCreateSubscriptionView
+from hydrotracker.middleware import RetryDbOperationalErrorOnSafeMethodsMiddleware
+from tests.fake_mercadopago import FakeMercadoPago
+from tests.fake_open_meteo import FakeOpenMeteo
+
+
+@pytest.fixture
+def fake_weather(monkeypatch):
+    server = FakeOpenMeteo(temperature=32.0, humidity=70.0).start()
+    monkeypatch.setattr(WeatherService, 'BASE_URL', server.url)
+    cache.clear()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def fake_mp(settings):
+    server = FakeMercadoPago().start()
+    settings.MP_API_BASE_URL = server.url
+    settings.MP_ACCESS_TOKEN = 'TEST-token'
+    yield server
+    server.stop()
+
+
+def _headers(user):
+    return {'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'}
+
+
+def _call(view_class, method, path, user=None, data=None, **kwargs):
+    factory = AsyncRequestFactory()
+    headers = _headers(user) if user else {}
+    request = getattr(factory, method)(path, data or {}, content_type='application/json', headers=headers) \
+        if method in ('post', 'put', 'patch') else getattr(factory, method)(path, headers=headers)
+    return async_to_sync(view_class.as_view())(request, **kwargs)
+
+
+def _estimate_body(**extra):
+    return {
+        'tipo_actividad': 'correr',
+        'duracion_minutos': 60,
+        'intensidad': 'alta',
+        'fecha_hora': (timezone.now() - timedelta(hours=2)).isoformat(),
+        'latitude': -34.6,
+        'longitude': -58.4,
+        'tz': 'America/Argentina/Buenos_Aires',
+        **extra,
+    }
+
+
+@pytest.mark.django_db
+class TestAsyncActividadViews:
+    """Tests de estimate, alta y edición async de actividades."""
+
+    def test_estimate_igual_que_sincrona(self, authenticated_client, fake_weather, user):
+        """Test: La estimación async devuelve lo mismo que la vista del viewset."""
+        body = _estimate_body()
+        sync_response = authenticated_client.post('/api/actividades/estimate/', body, format='json')
+        response = _call(ActividadEstimateAsyncView, 'post', '/api/actividades/estimate/', user, body)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == sync_response.json()
+        assert response.data['climate_adjustment'] is not None
+
+    def test_estimate_requiere_autenticacion_y_valida(self, fake_weather, user):
+        """Test: Sin token responde 401 y con datos inválidos 400, sin consultar el clima."""
+        response = _call(ActividadEstimateAsyncView, 'post', '/api/actividades/estimate/', None, _estimate_body())
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+        response = _call(
+            ActividadEstimateAsyncView, 'post', '/api/actividades/estimate/', user,
+            _estimate_body(duracion_minutos=0)
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert fake_weather.requests == 0
+
+    def test_estimaciones_concurrentes_no_se_serializan(self, fake_weather, user):
+        """Test: Con un upstream lento las esperas se solapan en el event loop."""
+        fake_weather.delay = 0.3
+        factory = AsyncRequestFactory()
+        view = ActividadEstimateAsyncView.as_view()
+        headers = _headers(user)
+        requests = [
+            factory.post(
+                '/api/actividades/estimate/', _estimate_body(latitude=-30 - i),
+                content_type='application/json', headers=headers
+            )
+            for i in range(5)
+        ]
+
+        async def run():
+            return await asyncio.gather(*(view(request) for request in requests))
+
+        inicio = time.perf_counter()
+        responses = async_to_sync(run)()
+        elapsed = time.perf_counter() - inicio
+        assert all(response.status_code == 200 for response in responses)
+        assert fake_weather.requests == 5
+        assert elapsed < 5 * 0.3
+
+    def test_alta_consulta_el_clima_una_vez(self, fake_weather, user):
+        """Test: El alta async guarda con ajuste climático sin reconsultar desde el serializer."""
+        body = _estimate_body()
+        response = _call(ActividadListAsyncView, 'post', '/api/actividades/', user, body)
+        assert response.status_code == status.HTTP_201_CREATED
+        actividad = Actividad.objects.get(usuario=user)
+        sin_clima = Actividad(
+            tipo_actividad='correr', duracion_minutos=60, intensidad='alta'
+        ).calcular_pse(None, None)
+        assert actividad.pse_calculado > sin_clima
+        assert fake_weather.requests == 1
+
+    def test_edicion_y_delegacion(self, fake_weather, user, premium_user):
+        """Test: PATCH async recalcula, GET se delega en el viewset y otro usuario recibe 404."""
+        actividad = Actividad.objects.create(
+            usuario=user, tipo_actividad='correr', duracion_minutos=30, intensidad='media',
+            fecha_hora=timezone.now() - timedelta(hours=1), pse_calculado=100
+        )
+        path = f'/api/actividades/{actividad.id}/'
+        response = _call(
+            ActividadDetailAsyncView, 'patch', path, user,
+            {'duracion_minutos': 90, 'latitude': -34.6, 'longitude': -58.4}, pk=actividad.id
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['weather_message']
+        actividad.refresh_from_db()
+        assert actividad.duracion_minutos == 90
+
+        response = _call(ActividadDetailAsyncView, 'get', path, user, pk=actividad.id)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['duracion_minutos'] == 90
+
+        response = _call(
+            ActividadDetailAsyncView, 'patch', path, premium_user, {'duracion_minutos': 10}, pk=actividad.id
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+class TestAsyncSubscriptionViews:
+    """Tests de las vistas async de suscripción."""
+
+    def test_crear_suscripcion(self, fake_mp, user):
+        """Test: Crea el preapproval en Mercado Pago y devuelve el init_point."""
+        response = _call(AsyncCreateSubscriptionView, 'post', '/api/premium/subscribe/', user, {'planType': 'monthly'})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['init_point'].startswith('https://mp.test/checkout/')
+        assert fake_mp.requests == ['/preapproval']
+        assert fake_mp.bodies[0]['auto_recurring']['transaction_amount'] == 2000.0
+
+        response = _call(AsyncCreateSubscriptionView, 'post', '/api/premium/subscribe/', user, {'planType': 'x'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_cancelar_suscripcion(self, fake_mp, premium_user):
+        """Test: Cancela el preapproval y desactiva la renovación automática."""
+        premium_user.plan_type = 'monthly'
+        premium_user.preapproval_id = 'pre-9'
+        premium_user.auto_renewal = True
+        premium_user.save()
+        fake_mp.add_preapproval('pre-9', status='authorized')
+
+        response = _call(AsyncCancelSubscriptionView, 'post', '/api/premium/cancel/', premium_user)
+        assert response.status_code == status.HTTP_200_OK
+        assert fake_mp.bodies == [{'status': 'cancelled'}]
+        premium_user.refresh_from_db()
+        assert premium_user.auto_renewal is False
+
+    def test_dos_llamadas_con_instantanea_en_cache(self, fake_mp, premium_user):
+        """Test: Con el usuario ya en caché el handler no carga campos desde el event loop."""
+        premium_user.plan_type = 'monthly'
+        premium_user.auto_renewal = True
+        premium_user.save()
+
+        for _ in range(2):
+            response = _call(AsyncCancelSubscriptionView, 'post', '/api/premium/cancel/', premium_user)
+            assert response.status_code != status.HTTP_500_INTERNAL_SERVER_ERROR
+
+
+def test_middleware_admite_cadena_async():
+    """Test: El middleware de reintento no fuerza la cadena ASGI a modo síncrono."""
+    async def get_response(request):
+        return 'ok'
+
+    middleware = RetryDbOperationalErrorOnSafeMethodsMiddleware(get_response)
+    assert iscoroutinefunction(middleware)
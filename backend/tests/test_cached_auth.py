@@ -0,0 +1,72 @@
+"""
+Tests para la autenticación JWT con el usuario en caché.
+"""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from users.authentication import load_cached_user
+from users.models import CachedUser
+
+STATUS_URL = '/api/monetization/status/'
+HISTORY_URL = '/api/premium/stats/history/'
+PROFILE_URL = '/api/users/profile/'
+
+
+def _queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    return len(queries)
+
+
+@pytest.mark.django_db
+class TestCachedJWTAuthentication:
+    """Tests de CachedJWTAuthentication."""
+
+    def test_get_autenticado_ahorra_una_consulta(self, authenticated_client):
+        """Test: Con la instantánea en caché la petición no consulta el usuario."""
+        primera = _queries(authenticated_client, STATUS_URL)
+        assert _queries(authenticated_client, STATUS_URL) == primera - 1
+
+    def test_cambio_de_perfil_invalida(self, authenticated_client, user):
+        """Test: Al guardar el usuario la siguiente petición ve los datos nuevos."""
+        assert authenticated_client.get(HISTORY_URL).status_code == status.HTTP_403_FORBIDDEN
+        user.es_premium = True
+        user.save()
+        assert authenticated_client.get(HISTORY_URL).status_code == status.HTTP_200_OK
+
+    def test_cambio_de_perfil_por_la_api_invalida(self, authenticated_client):
+        """Test: Guardar el CachedUser de la petición invalida la instantánea y el ETag."""
+        primera = authenticated_client.get(PROFILE_URL)
+        antes = primera.json()
+        response = authenticated_client.patch(PROFILE_URL, {'peso': 95}, format='json')
+        assert response.status_code == status.HTTP_200_OK
+
+        despues = authenticated_client.get(PROFILE_URL, HTTP_IF_NONE_MATCH=primera.get('ETag', ''))
+        assert despues.status_code == status.HTTP_200_OK
+        assert float(despues.json()['peso']) == 95
+        assert despues.json()['meta_diaria_ml'] != antes['meta_diaria_ml']
+
+    def test_usuario_diferido_se_completa_de_una_vez(self, authenticated_client, user):
+        """Test: El primer campo fuera de la instantánea carga todos los que faltan."""
+        authenticated_client.get(STATUS_URL)
+        cached = load_cached_user(user.pk)
+        assert isinstance(cached, CachedUser)
+        assert cached.email == user.email
+        user.refresh_from_db()
+        assert cached.calcular_meta_hidratacion() == user.calcular_meta_hidratacion()
+
+        with CaptureQueriesContext(connection) as queries:
+            assert cached.first_name == user.first_name
+            assert cached.hora_inicio is not None
+            assert cached.nivel_actividad == user.nivel_actividad
+        assert len(queries) == 1
+        assert not cached.get_deferred_fields()
+
+    def test_usuario_borrado_no_autentica(self, authenticated_client, user):
+        """Test: Borrar el usuario invalida la instantánea."""
+        authenticated_client.get(STATUS_URL)
+        user.delete()
+        assert authenticated_client.get(STATUS_URL).status_code == status.HTTP_401_UNAUTHORIZED
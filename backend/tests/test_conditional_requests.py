@@ -0,0 +1,136 @@
+"""
+Tests para los GET condicionales (ETag / Last-Modified).
+"""
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from consumos.models import Bebida, Consumo, Recordatorio
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestConditionalRequests:
+    """Tests para ConditionalGetMixin."""
+
+    @pytest.fixture
+    def bebida(self, db):
+        bebida, _ = Bebida.objects.get_or_create(
+            nombre='Agua Test Conditional',
+            defaults={'factor_hidratacion': 1.0, 'es_agua': True}
+        )
+        return bebida
+
+    @pytest.fixture
+    def consumo(self, user, bebida):
+        return Consumo.objects.create(
+            usuario=user, bebida=bebida, cantidad_ml=250, fecha_hora=timezone.now()
+        )
+
+    def test_list_incluye_validadores(self, authenticated_client, consumo):
+        """Test: La lista de consumos expone ETag y Last-Modified."""
+        response = authenticated_client.get('/api/consumos/')
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'].startswith('"')
+        assert 'Last-Modified' in response
+        assert 'Accept' in response['Vary']
+
+    def test_if_none_match_responde_304(self, authenticated_client, consumo):
+        """Test: Un ETag vigente responde 304 sin cuerpo."""
+        etag = authenticated_client.get('/api/consumos/')['ETag']
+        response = authenticated_client.get('/api/consumos/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b''
+        assert response['ETag'] == etag
+
+    def test_304_no_consulta_consumos(self, authenticated_client, consumo):
+        """Test: El 304 se decide antes de ejecutar el queryset."""
+        etag = authenticated_client.get('/api/consumos/')['ETag']
+        with CaptureQueriesContext(connection) as ctx:
+            response = authenticated_client.get('/api/consumos/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert not any('consumos_consumo' in q['sql'] for q in ctx.captured_queries)
+
+    def test_escritura_invalida_etag(self, authenticated_client, user, bebida, consumo):
+        """Test: Crear un consumo cambia el ETag."""
+        etag = authenticated_client.get('/api/consumos/')['ETag']
+        Consumo.objects.create(
+            usuario=user, bebida=bebida, cantidad_ml=500, fecha_hora=timezone.now()
+        )
+        response = authenticated_client.get('/api/consumos/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] != etag
+
+    def test_query_string_forma_parte_del_etag(self, authenticated_client, consumo):
+        """Test: Filtros distintos producen ETags distintos."""
+        etag = authenticated_client.get('/api/consumos/')['ETag']
+        response = authenticated_client.get('/api/consumos/?page=1', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_etag_por_usuario(self, authenticated_client, premium_user, consumo):
+        """Test: El ETag de un usuario no sirve para otro."""
+        etag = authenticated_client.get('/api/consumos/')['ETag']
+        client = APIClient()
+        refresh = RefreshToken.for_user(premium_user)
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        response = client.get('/api/consumos/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_if_modified_since(self, authenticated_client, consumo):
+        """Test: If-Modified-Since con la fecha vigente responde 304."""
+        last_modified = authenticated_client.get('/api/recordatorios/')['Last-Modified']
+        response = authenticated_client.get(
+            '/api/recordatorios/', HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_recordatorios_invalida_al_crear(self, authenticated_client, user):
+        """Test: Crear un recordatorio invalida el ETag de la lista."""
+        etag = authenticated_client.get('/api/recordatorios/')['ETag']
+        Recordatorio.objects.create(usuario=user, hora='08:00', mensaje='Agua')
+        response = authenticated_client.get('/api/recordatorios/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_bebidas_version_global(self, authenticated_client, bebida):
+        """Test: Las bebidas usan una versión global."""
+        etag = authenticated_client.get('/api/bebidas/')['ETag']
+        assert authenticated_client.get(
+            '/api/bebidas/', HTTP_IF_NONE_MATCH=etag
+        ).status_code == status.HTTP_304_NOT_MODIFIED
+        bebida.descripcion = 'Actualizada'
+        bebida.save()
+        assert authenticated_client.get(
+            '/api/bebidas/', HTTP_IF_NONE_MATCH=etag
+        ).status_code == status.HTTP_200_OK
+
+    def test_resumen_invalida_al_cambiar_perfil(self, authenticated_client, user, consumo):
+        """Test: El resumen diario depende del perfil (meta)."""
+        etag = authenticated_client.get('/api/consumos/daily_summary/')['ETag']
+        assert authenticated_client.get(
+            '/api/consumos/daily_summary/', HTTP_IF_NONE_MATCH=etag
+        ).status_code == status.HTTP_304_NOT_MODIFIED
+        user.peso = 80
+        user.save()
+        assert authenticated_client.get(
+            '/api/consumos/daily_summary/', HTTP_IF_NONE_MATCH=etag
+        ).status_code == status.HTTP_200_OK
+
+    def test_ultimo_acceso_no_invalida(self, authenticated_client, user, consumo):
+        """Test: Registrar el último acceso no invalida los resúmenes."""
+        etag = authenticated_client.get('/api/consumos/daily_summary/')['ETag']
+        user.ultimo_acceso = timezone.now()
+        user.save(update_fields=['ultimo_acceso'])
+        assert authenticated_client.get(
+            '/api/consumos/daily_summary/', HTTP_IF_NONE_MATCH=etag
+        ).status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_sin_autenticacion_no_hay_304(self, api_client):
+        """Test: Sin autenticación se responde 401 aunque llegue un ETag."""
+        response = api_client.get('/api/consumos/', HTTP_IF_NONE_MATCH='*')
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
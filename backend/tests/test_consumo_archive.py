@@ -0,0 +1,139 @@
+"""
+Tests para el archivo frío de consumos y la lectura conjunta con los consumos calientes.
+"""
+import pytest
+from datetime import date, timedelta
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from consumos.models import Bebida, Consumo, ConsumoArchivado, Recipiente
+from consumos.services import partitioning
+from consumos.services.consumo_archive import (
+    ConsumoTimeline, archive_consumos, decode_rows, encode_rows
+)
+from consumos.services.platform_metrics import refresh_platform_metrics
+
+HISTORY_URL = '/api/premium/stats/history/'
+
+
+@pytest.fixture
+def consumos(user):
+    bebida, _ = Bebida.objects.get_or_create(
+        nombre='Agua Archivo', defaults={'factor_hidratacion': 1.0, 'es_agua': True}
+    )
+    recipiente = Recipiente.objects.create(usuario=user, nombre='Botella', cantidad_ml=500)
+    ahora = timezone.now()
+    creados = []
+    # 30 consumos repartidos en los últimos ~5 meses y uno de hoy
+    for i in range(31):
+        creados.append(Consumo.objects.create(
+            usuario=user, bebida=bebida, recipiente=recipiente if i % 2 else None,
+            cantidad_ml=100 + i, fecha_hora=ahora - timedelta(days=5 * i, minutes=i),
+            notas=f'n{i}', estado_animo='bueno',
+        ))
+    return creados
+
+
+def _history(client):
+    filas, url = [], HISTORY_URL
+    while url:
+        body = client.get(url).json()
+        filas.extend(body['results'])
+        url = body['next']
+    return filas
+
+
+@pytest.mark.django_db
+class TestConsumoArchive:
+    """Tests del archivo de consumos."""
+
+    def test_encode_decode_ida_y_vuelta(self, consumos):
+        """Test: Las filas comprimidas se recuperan con las mismas fechas y valores."""
+        consumo = consumos[3]
+        row = {
+            column: getattr(consumo, column)
+            for column in ('id', 'bebida_id', 'recipiente_id', 'cantidad_ml',
+                           'cantidad_hidratacion_efectiva', 'deshidratacion_neta_ml',
+                           'agua_compensacion_recomendada_ml', 'fecha_hora', 'notas', 'ubicacion',
+                           'temperatura_ambiente', 'nivel_sed', 'estado_animo', 'fecha_creacion')
+        }
+        assert decode_rows(encode_rows([row])) == [row]
+
+    def test_archivar_mueve_los_meses_antiguos(self, user, consumos):
+        """Test: Los meses fuera de la ventana salen de Consumo y quedan archivados."""
+        resultados = archive_consumos(months=1)
+        archivados = sum(r['consumos'] for r in resultados)
+        assert archivados > 0
+        assert Consumo.objects.filter(usuario=user).count() == len(consumos) - archivados
+        assert sum(a.cantidad for a in ConsumoArchivado.objects.filter(usuario=user)) == archivados
+        # Idempotente
+        assert sum(r['consumos'] for r in archive_consumos(months=1)) == 0
+
+    def test_historial_igual_antes_y_despues(self, user, consumos, authenticated_client):
+        """Test: El historial paginado devuelve las mismas filas con meses archivados."""
+        user.es_premium = True
+        user.save()
+        antes = _history(authenticated_client)
+        archive_consumos(months=1)
+        # Alta posterior con fecha de un mes ya archivado
+        viejo = ConsumoArchivado.objects.filter(usuario=user).order_by('mes').first()
+        tardio = Consumo.objects.create(
+            usuario=user, bebida=consumos[0].bebida, cantidad_ml=77,
+            fecha_hora=timezone.make_aware(
+                timezone.datetime(viejo.mes.year, viejo.mes.month, 20, 12)
+            ),
+        )
+        despues = _history(authenticated_client)
+        assert [f['id'] for f in despues if f['id'] != tardio.pk] == [f['id'] for f in antes]
+        assert [f for f in despues if f['id'] != tardio.pk] == antes
+        fechas = [f['fecha_hora'] for f in despues]
+        assert fechas == sorted(fechas, reverse=True)
+
+    def test_timeline_por_tramos(self, user, consumos):
+        """Test: Cualquier tramo de la secuencia coincide con la lectura completa."""
+        esperado = list(
+            Consumo.objects.filter(usuario=user).order_by('-fecha_hora').values_list('id', 'recipiente__nombre')
+        )
+        archive_consumos(months=1)
+        timeline = ConsumoTimeline(
+            user, Consumo.objects.filter(usuario=user).order_by('-fecha_hora')
+        ).values_list('id', 'recipiente__nombre')
+        assert timeline.count() == len(esperado)
+        for start, stop in [(0, 5), (3, 17), (10, 40), (29, 31)]:
+            assert timeline[start:stop] == esperado[start:stop]
+
+    def test_exportacion_incluye_archivados(self, user, consumos, authenticated_client):
+        """Test: La exportación JSON suma y lista los consumos archivados del rango."""
+        desde = (timezone.localdate() - timedelta(days=120)).isoformat()
+        url = f'/api/export/?format=json&date_from={desde}&date_to={timezone.localdate()}'
+        antes = authenticated_client.get(url).json()
+        archive_consumos(months=1)
+        despues = authenticated_client.get(url).json()
+        assert despues['summary'] == antes['summary']
+        assert despues['consumos'] == antes['consumos']
+
+    def test_metricas_completas_cuentan_archivados(self, consumos):
+        """Test: Un recálculo completo de métricas incluye los consumos archivados."""
+        archive_consumos(months=1)
+        assert refresh_platform_metrics(full=True).total_consumos == len(consumos)
+
+
+class TestPartitioning:
+    """Tests del particionado (sin PostgreSQL solo se valida la parte común)."""
+
+    def test_nombres_y_limites(self):
+        """Test: Las particiones se nombran por mes y cubren el mes UTC."""
+        assert partitioning.partition_name(date(2025, 3, 1)) == 'consumos_consumo_p202503'
+        inicio, fin = partitioning.month_bounds(date(2025, 12, 1))
+        assert (inicio.isoformat(), fin.isoformat()) == (
+            '2025-12-01T00:00:00+00:00', '2026-01-01T00:00:00+00:00'
+        )
+
+    @pytest.mark.django_db
+    def test_comando_requiere_postgres(self):
+        """Test: partition_consumos falla con claridad fuera de PostgreSQL."""
+        if partitioning.is_postgres():
+            pytest.skip('Base de datos PostgreSQL')
+        with pytest.raises(CommandError):
+            call_command('partition_consumos')
@@ -0,0 +1,143 @@
+"""
+Tests para la compactación de consumos antiguos en resúmenes diarios.
+"""
+import pytest
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+
+from consumos.models import Bebida, Consumo, ConsumoResumenDiario
+from consumos.services import ConsumoService, StatsService
+from consumos.services.consumo_compaction import compact_consumos, compaction_cutoff
+
+User = get_user_model()
+
+
+def _crear_consumos(usuario, bebida, dias=60):
+    ahora = timezone.now()
+    for i in range(dias):
+        for j in range(i % 3 + 1):
+            Consumo.objects.create(
+                usuario=usuario, bebida=bebida, cantidad_ml=150 + 10 * j,
+                fecha_hora=ahora - timedelta(days=i, hours=3 * j),
+            )
+
+
+@pytest.fixture
+def bebida(db):
+    bebida, _ = Bebida.objects.get_or_create(
+        nombre='Té Compactación', defaults={'factor_hidratacion': 0.8, 'es_agua': False}
+    )
+    return bebida
+
+
+def _resumenes(service):
+    hoy = timezone.localdate()
+    mes_anterior = (hoy.replace(day=1) - timedelta(days=1)).replace(day=1)
+    return (
+        service.get_monthly_summary(mes_anterior),
+        service.get_monthly_summary(),
+        service.get_weekly_summary(hoy - timedelta(days=20)),
+        [service.get_trends(period) for period in ('daily', 'weekly', 'monthly', 'annual')],
+    )
+
+
+@pytest.mark.django_db
+class TestConsumoCompaction:
+    """Tests de compact_consumos."""
+
+    def test_totales_iguales_antes_y_despues(self, user, bebida):
+        """Test: Resúmenes mensuales, semanales y tendencias no cambian al compactar."""
+        _crear_consumos(user, bebida)
+        service = ConsumoService(user)
+        antes = _resumenes(service)
+
+        resultado = compact_consumos(days=10)
+
+        assert resultado['consumos'] > 0
+        assert not Consumo.objects.filter(
+            usuario=user, fecha_hora__lt=compaction_cutoff(10)
+        ).exists()
+        assert ConsumoResumenDiario.objects.filter(usuario=user).count() == resultado['dias']
+        assert _resumenes(service) == antes
+
+    def test_exportacion_y_estadisticas_incluyen_resumidos(self, user, bebida, authenticated_client):
+        """Test: La exportación y StatsService suman los días compactados."""
+        _crear_consumos(user, bebida, dias=20)
+        hoy = timezone.localdate()
+        desde = hoy - timedelta(days=25)
+        url = f'/api/export/?format=json&date_from={desde}&date_to={hoy}'
+        stats = StatsService(user)
+
+        def _estado():
+            return (
+                authenticated_client.get(url).json()['summary'],
+                stats.get_daily_stats(hoy - timedelta(days=5)),
+                stats.get_weekly_stats(hoy - timedelta(days=12)),
+                stats.get_monthly_stats(hoy.replace(day=1)),
+                [
+                    sum(fila['total_ml'] for fila in stats.get_trends(period))
+                    for period in ('daily', 'weekly', 'monthly')
+                ],
+            )
+
+        antes = _estado()
+        compact_consumos(days=3)
+        despues = _estado()
+
+        claves = ('total_ml', 'total_hidratacion_efectiva_ml', 'cantidad_consumos')
+        for previo, actual in zip(antes[:4], despues[:4]):
+            assert {k: actual[k] for k in claves} == {k: previo[k] for k in claves}
+        assert despues[4] == antes[4]
+        assert despues[0]['dias_resumidos'] == ConsumoResumenDiario.objects.filter(usuario=user).count()
+
+        data = authenticated_client.get(url).json()
+        assert len(data['resumenes_diarios']) == despues[0]['dias_resumidos']
+        assert len(data['consumos']) + sum(
+            r['cantidad_consumos'] for r in data['resumenes_diarios']
+        ) == despues[0]['cantidad_consumos']
+
+    def test_historial_avisa_de_dias_resumidos(self, premium_user, bebida, authenticated_premium_client):
+        """Test: El historial indica hasta qué día hay consumos compactados."""
+        _crear_consumos(premium_user, bebida, dias=10)
+        response = authenticated_premium_client.get('/api/premium/stats/history/')
+        assert 'X-Consumos-Resumidos-Hasta' not in response
+
+        compact_consumos(days=3, keep_premium=False)
+        ultimo = ConsumoResumenDiario.objects.filter(usuario=premium_user).order_by('-fecha').first().fecha
+        response = authenticated_premium_client.get('/api/premium/stats/history/')
+        assert response['X-Consumos-Resumidos-Hasta'] == ultimo.isoformat()
+
+    def test_premium_conserva_el_detalle(self, premium_user, bebida):
+        """Test: Por defecto los consumos de usuarios premium no se compactan."""
+        _crear_consumos(premium_user, bebida, dias=20)
+        total = Consumo.objects.filter(usuario=premium_user).count()
+        assert compact_consumos(days=5)['consumos'] == 0
+        assert Consumo.objects.filter(usuario=premium_user).count() == total
+        assert compact_consumos(days=5, keep_premium=False)['consumos'] > 0
+
+    def test_reanudable_por_bloques(self, user, bebida):
+        """Test: Las ejecuciones por bloques y repetidas no duplican totales."""
+        otro = User.objects.create_user(
+            username='otro_compact', email='oc@example.com', password='testpass123',
+            peso=60.0, fecha_nacimiento='1990-01-01'
+        )
+        _crear_consumos(user, bebida, dias=15)
+        _crear_consumos(otro, bebida, dias=15)
+        antiguos = Consumo.objects.filter(fecha_hora__lt=compaction_cutoff(5))
+        total_ml = sum(antiguos.values_list('cantidad_ml', flat=True))
+
+        # Ejecución retomada después del primer usuario, luego una completa
+        primero, segundo = sorted([user.pk, otro.pk])
+        parcial = compact_consumos(days=5, chunk_size=1, start_after=primero)
+        assert parcial['usuarios'] == 1 and parcial['ultimo_usuario_id'] == segundo
+        assert compact_consumos(days=5, chunk_size=1)['usuarios'] == 1
+        assert compact_consumos(days=5, chunk_size=1)['consumos'] == 0
+        assert sum(ConsumoResumenDiario.objects.values_list('total_ml', flat=True)) == total_ml
+
+    def test_comando(self, user, bebida):
+        """Test: compact_consumos acepta los días por parámetro."""
+        _crear_consumos(user, bebida, dias=10)
+        call_command('compact_consumos', days=3, chunk_size=10)
+        assert ConsumoResumenDiario.objects.filter(usuario=user).exists()
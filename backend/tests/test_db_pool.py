@@ -0,0 +1,63 @@
+"""
+Tests para el modo de pooling de conexiones y sus métricas.
+"""
+import pytest
+from django.test import Client
+
+from hydrotracker import db_pool
+from hydrotracker.db_pool import configure_pooling
+
+
+def _pg_config(host='ep-example.us-east-2.aws.neon.tech'):
+    return {'ENGINE': 'django.db.backends.postgresql', 'HOST': host, 'OPTIONS': {'sslmode': 'require'}}
+
+
+class TestConfigurePooling:
+    """Tests de configure_pooling."""
+
+    def test_persistent_con_health_checks(self):
+        """Test: El modo por defecto mantiene la conexión y la valida al reutilizarla."""
+        db_config = _pg_config()
+        assert configure_pooling(db_config, conn_max_age=120) == 'persistent'
+        assert db_config['CONN_MAX_AGE'] == 120
+        assert db_config['CONN_HEALTH_CHECKS'] is True
+        assert 'DISABLE_SERVER_SIDE_CURSORS' not in db_config
+
+    def test_pooler_de_neon_usa_modo_pgbouncer(self):
+        """Test: Un host -pooler desactiva los cursores del lado del servidor."""
+        db_config = _pg_config('ep-example-pooler.us-east-2.aws.neon.tech')
+        assert configure_pooling(db_config) == 'pgbouncer'
+        assert db_config['DISABLE_SERVER_SIDE_CURSORS'] is True
+        assert db_config['CONN_HEALTH_CHECKS'] is True
+
+    def test_pool_sin_soporte_vuelve_a_persistent(self, monkeypatch):
+        """Test: Sin Django 5.1/psycopg 3 el modo pool cae en persistent."""
+        monkeypatch.setattr(db_pool, 'pool_supported', lambda: False)
+        db_config = _pg_config()
+        assert configure_pooling(db_config, mode='pool') == 'persistent'
+        assert 'pool' not in db_config['OPTIONS']
+
+    def test_modo_invalido(self):
+        """Test: Un modo desconocido es un error de configuración."""
+        with pytest.raises(ValueError):
+            configure_pooling(_pg_config(), mode='transaction')
+
+
+@pytest.mark.django_db
+class TestMetricas:
+    """Tests de las métricas publicadas en /api/health/."""
+
+    def test_health_publica_metricas(self):
+        """Test: El health check incluye los contadores de conexiones."""
+        db_pool.reset_metrics()
+        response = Client().get('/api/health/')
+        assert response.status_code == 200
+        data = response.json()['database_connections']
+        assert data['requests'] == 1
+        assert {'connections_created', 'connections_in_request', 'reconnections', 'ssl_retries'} <= set(data)
+
+    def test_reintento_ssl_se_cuenta(self):
+        """Test: El reintento del middleware queda registrado."""
+        db_pool.reset_metrics()
+        db_pool.record_ssl_retry()
+        assert db_pool.metrics()['ssl_retries'] == 1
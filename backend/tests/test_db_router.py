@@ -0,0 +1,107 @@
+"""
+Tests para el enrutado de lecturas a la réplica y el pinning tras escrituras.
+"""
+import pytest
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from consumos.models import Consumo
+from consumos.services import StatsService
+from hydrotracker.db_router import is_pinned, pin_to_primary, replica_reads, use_replica
+from hydrotracker.middleware import ReplicaPinningMiddleware
+
+REPLICA_DBS = ['default', 'replica']
+
+
+@pytest.fixture(autouse=True)
+def clear_pins():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+class TestReplicaRouter:
+    """Tests del router."""
+
+    @pytest.mark.django_db(transaction=True, databases=REPLICA_DBS)
+    def test_lecturas_en_replica_solo_dentro_del_bloque(self, user):
+        """Test: use_replica manda las lecturas a la réplica y las escrituras a default."""
+        assert Consumo.objects.all().db == 'default'
+        with replica_reads(user) as enabled:
+            assert enabled
+            assert Consumo.objects.all().db == 'replica'
+        assert Consumo.objects.all().db == 'default'
+
+    @pytest.mark.django_db(transaction=True, databases=REPLICA_DBS)
+    def test_usuario_fijado_lee_de_default(self, user):
+        """Test: Tras escribir, el usuario no lee de la réplica."""
+        pin_to_primary(user.pk)
+        with replica_reads(user) as enabled:
+            assert not enabled
+            assert Consumo.objects.all().db == 'default'
+
+    @pytest.mark.django_db
+    def test_transaccion_abierta_lee_de_default(self, user):
+        """Test: Dentro de una transacción en default no se usa la réplica."""
+        with replica_reads(user):
+            assert Consumo.objects.all().db == 'default'
+
+    @pytest.mark.django_db(transaction=True, databases=REPLICA_DBS)
+    def test_servicio_decorado_consulta_la_replica(self, user):
+        """Test: Los métodos de StatsService leen de la réplica."""
+        with CaptureQueriesContext(connections['default']) as default_queries, \
+                CaptureQueriesContext(connections['replica']) as replica_queries:
+            stats = StatsService(user).get_daily_stats(timezone.now().date())
+        assert stats['cantidad_consumos'] == 0
+        # Consumos del día y días compactados
+        assert len(replica_queries) == 2
+        assert len(default_queries) == 0
+
+    def test_decorador_sin_usuario(self):
+        """Test: use_replica funciona en funciones sin usuario."""
+        @use_replica
+        def leer():
+            return Consumo.objects.all().db
+
+        assert leer() == 'replica'
+
+
+class TestReplicaPinningMiddleware:
+    """Tests del middleware de pinning."""
+
+    @pytest.mark.django_db
+    def test_escritura_exitosa_fija_al_usuario(self, user):
+        """Test: Un POST con éxito fija al usuario; un GET o un error no."""
+        factory = RequestFactory()
+
+        def respond(status):
+            return ReplicaPinningMiddleware(lambda request: HttpResponse(status=status))
+
+        request = factory.get('/')
+        request.user = user
+        respond(200)(request)
+        assert not is_pinned(user.pk)
+
+        request = factory.post('/')
+        request.user = user
+        respond(400)(request)
+        assert not is_pinned(user.pk)
+
+        respond(201)(request)
+        assert is_pinned(user.pk)
+
+    @pytest.mark.django_db
+    def test_jwt_fija_al_usuario_tras_crear(self, authenticated_client, user):
+        """Test: Con JWT el usuario autenticado por DRF queda fijado."""
+        response = authenticated_client.post('/api/actividades/', {
+            'tipo_actividad': 'correr',
+            'duracion_minutos': 30,
+            'intensidad': 'media',
+            'fecha_hora': timezone.now().isoformat(),
+        }, format='json')
+        assert response.status_code == 201
+        assert is_pinned(user.pk)
@@ -0,0 +1,75 @@
+"""
+Tests para el resolvedor de entitlements por petición.
+"""
+import pytest
+from datetime import timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIRequestFactory
+
+from consumos.models import Bebida, Consumo, Recipiente, Recordatorio
+from consumos.permissions import IsPremiumUser
+from consumos.services.entitlements import Entitlements, get_entitlements
+
+
+@pytest.mark.django_db
+class TestEntitlements:
+    """Tests de Entitlements y get_entitlements."""
+
+    def _request(self, user):
+        request = APIRequestFactory().get('/')
+        request.user = user
+        return request
+
+    def test_memoizado_por_peticion(self, user):
+        """Test: La misma petición reutiliza el mismo objeto."""
+        request = self._request(user)
+        assert get_entitlements(request) is get_entitlements(request)
+
+    def test_premium_vencido_no_es_premium(self, premium_user):
+        """Test: Un premium con fecha de fin pasada no pasa los gates."""
+        premium_user.subscription_end_date = timezone.now().date() - timedelta(days=1)
+        assert not Entitlements(premium_user).is_premium
+        assert not IsPremiumUser().has_permission(self._request(premium_user), None)
+
+    def test_contadores_una_consulta(self, user):
+        """Test: Los contadores se leen con una consulta por clave primaria."""
+        Recordatorio.objects.create(usuario=user, hora='09:00', dias_semana=[0])
+        Recipiente.objects.create(usuario=user, nombre='Taza', cantidad_ml=300)
+        bebida, _ = Bebida.objects.get_or_create(
+            nombre='Agua Test Entitlements', defaults={'factor_hidratacion': 1.0, 'es_agua': True}
+        )
+        Consumo.objects.create(
+            usuario=user, bebida=bebida, cantidad_ml=250, fecha_hora=timezone.now()
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            counters = Entitlements(user).counters
+        assert len(queries) == 1
+        assert counters == {'recordatorios': 1, 'recipientes': 1, 'consumos_hoy': 1}
+
+    def test_contadores_siguen_las_escrituras(self, user):
+        """Test: Un alta se refleja en los contadores."""
+        assert Entitlements(user).recipientes_count == 0
+        Recipiente.objects.create(usuario=user, nombre='Taza', cantidad_ml=300)
+        assert Entitlements(user).recipientes_count == 1
+
+    def test_limite_recipientes_free(self, authenticated_client, user):
+        """Test: El límite de recipientes free usa los contadores."""
+        for cantidad in (250, 500):
+            Recipiente.objects.create(usuario=user, nombre=f'R{cantidad}', cantidad_ml=cantidad)
+        response = authenticated_client.post(
+            '/api/recipientes/', {'nombre': 'Otro', 'cantidad_ml': 750}, format='json'
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_usage_limits_sin_conteos_duplicados(self, authenticated_client, user):
+        """Test: La segunda consulta de límites no vuelve a contar filas."""
+        authenticated_client.get('/api/monetization/limits/')
+        with CaptureQueriesContext(connection) as queries:
+            response = authenticated_client.get('/api/monetization/limits/')
+        assert response.status_code == status.HTTP_200_OK
+        assert not any('COUNT' in query['sql'].upper() for query in queries.captured_queries)
+        assert response.json()['reminders']['current'] == 0
@@ -0,0 +1,111 @@
+"""
+Tests para los serializers rápidos de solo lectura.
+La salida debe coincidir con la del serializer DRF equivalente.
+"""
+import pytest
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIRequestFactory
+from rest_framework.request import Request
+
+from actividades.models import Actividad
+from actividades.serializers import ActividadSerializer, ActividadFastSerializer
+from consumos.models import Bebida, Consumo, Recipiente
+from consumos.serializers import (
+    ConsumoSerializer, ConsumoFastSerializer, ConsumoHistorySerializer,
+    ConsumoHistoryFastSerializer
+)
+
+User = get_user_model()
+
+
+def _request(query=''):
+    return Request(APIRequestFactory().get(f'/api/consumos/{query}'))
+
+
+@pytest.mark.django_db
+class TestFastSerializers:
+    """Tests de equivalencia con los serializers DRF."""
+
+    @pytest.fixture
+    def bebida(self, db):
+        bebida, _ = Bebida.objects.get_or_create(
+            nombre='Té Test Fast',
+            defaults={'factor_hidratacion': 0.9, 'es_agua': False}
+        )
+        return bebida
+
+    @pytest.fixture
+    def consumos(self, user, bebida):
+        recipiente = Recipiente.objects.create(usuario=user, nombre='Taza ñ', cantidad_ml=300)
+        ahora = timezone.now().replace(microsecond=123456)
+        return [
+            Consumo.objects.create(
+                usuario=user, bebida=bebida, recipiente=recipiente, cantidad_ml=300,
+                fecha_hora=ahora - timedelta(hours=5), nivel_sed=3,
+                estado_animo='bueno', notas='con limón', ubicacion='Casa'
+            ),
+            Consumo.objects.create(
+                usuario=user, bebida=bebida, cantidad_ml=150,
+                fecha_hora=ahora.replace(microsecond=0) - timedelta(days=1)
+            ),
+        ]
+
+    def _queryset(self, user):
+        return Consumo.objects.filter(usuario=user).order_by('-fecha_hora')
+
+    @pytest.mark.parametrize('query', ['', '?tz=America/Argentina/Buenos_Aires', '?tz=UTC', '?tz=Invalida/Zona'])
+    def test_consumo_igual_a_drf(self, user, consumos, query):
+        """Test: ConsumoFastSerializer produce la misma salida que ConsumoSerializer."""
+        context = {'request': _request(query)}
+        queryset = self._queryset(user)
+        esperado = ConsumoSerializer(queryset, many=True, context=context).data
+        obtenido = ConsumoFastSerializer(context=context).serialize_queryset(queryset)
+        assert obtenido == [dict(item) for item in esperado]
+
+    def test_consumo_sin_recipiente_omite_nombre(self, user, consumos):
+        """Test: Sin recipiente, recipiente_nombre se omite como en DRF."""
+        obtenido = ConsumoFastSerializer().serialize_queryset(self._queryset(user))
+        assert 'recipiente_nombre' not in obtenido[1]
+        assert obtenido[1]['recipiente'] is None
+
+    def test_historial_igual_a_drf(self, user, consumos):
+        """Test: El historial rápido coincide con ConsumoHistorySerializer."""
+        fast = ConsumoHistoryFastSerializer()
+        obtenido = fast.serialize_queryset(self._queryset(user))
+        filas = [
+            dict(zip([spec[0] for spec in fast.fields], fila))
+            for fila in fast.values(self._queryset(user))
+        ]
+        esperado = ConsumoHistorySerializer(filas, many=True).data
+        assert obtenido == [dict(item) for item in esperado]
+
+    def test_actividad_igual_a_drf(self, user):
+        """Test: ActividadFastSerializer coincide con ActividadSerializer."""
+        Actividad.objects.create(
+            usuario=user, tipo_actividad='natacion', duracion_minutos=30,
+            intensidad='alta', pse_calculado=480
+        )
+        queryset = Actividad.objects.filter(usuario=user)
+        esperado = ActividadSerializer(queryset, many=True).data
+        obtenido = ActividadFastSerializer().serialize_queryset(queryset)
+        assert obtenido == [dict(item) for item in esperado]
+
+    def test_list_endpoint_paginado(self, authenticated_client, consumos):
+        """Test: El endpoint de lista sigue paginando con la ruta rápida."""
+        response = authenticated_client.get('/api/consumos/?tz=UTC')
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        assert body['count'] == 2
+        assert body['results'][0]['bebida_nombre'] == 'Té Test Fast'
+        assert body['results'][0]['notas'] == 'con limón'
+
+    def test_historial_endpoint(self, user, consumos, authenticated_client):
+        """Test: El historial premium responde con las filas rápidas."""
+        user.es_premium = True
+        user.save()
+        response = authenticated_client.get('/api/premium/stats/history/')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['results'][0]['estado_animo'] == 'bueno'
@@ -0,0 +1,150 @@
+"""
+Tests para la meta de hidratación memoizada y su versión por lotes.
+"""
+from datetime import date
+
+import pytest
+from django.core.management import call_command
+
+from consumos.utils.cache_utils import ResourceVersion
+from users import goals
+from users.goals import GOAL_FIELDS, meta_hidratacion, metas_hidratacion
+from users.models import User
+from users.services import recalculate_goals
+
+HOY = date(2026, 6, 15)
+
+PERFILES = [
+    # peso, fecha_nacimiento, edad, fragil, meta_diaria_ml
+    (8, date(2025, 1, 1), None, False, 2000),
+    (15, date(2022, 1, 1), None, False, 2000),
+    (35, date(2016, 6, 16), None, False, 2000),
+    (70, date(1996, 6, 15), None, False, 2000),
+    (80, date(1970, 1, 1), None, False, 2000),
+    (60, date(1950, 1, 1), None, True, 2000),
+    (60, date(1950, 1, 1), None, False, 2000),
+    (300, date(1990, 1, 1), None, False, 2000),
+    (10, None, 30, False, 2000),
+    (None, date(1990, 1, 1), None, False, 1800),
+    (70, None, None, False, None),
+]
+
+
+def _meta_original(peso, fecha_nacimiento, edad, fragil, meta_almacenada):
+    """Fórmula previa de User.calcular_meta_hidratacion, como referencia."""
+    if not peso or peso <= 0:
+        return meta_almacenada or 2000
+    if fecha_nacimiento:
+        edad = HOY.year - fecha_nacimiento.year
+        if (HOY.month, HOY.day) < (fecha_nacimiento.month, fecha_nacimiento.day):
+            edad -= 1
+    if not edad or edad <= 0:
+        return meta_almacenada or 2000
+    if edad <= 13:
+        ml_por_kg = 100 if peso <= 10 else 50 if peso <= 20 else 20
+    elif edad <= 65:
+        ml_por_kg = 32.5 if edad <= 50 else 27.5
+    else:
+        ml_por_kg = 20 if fragil else 25
+    meta = int(int(peso * ml_por_kg) * 0.80)
+    return max(500, min(meta, 10000)) or meta_almacenada or 2000
+
+
+class TestMetaHidratacion:
+    """Tests de users.goals."""
+
+    def test_misma_meta_que_la_formula_original(self):
+        """Test: La versión memoizada y la vectorizada coinciden con la fórmula previa."""
+        esperadas = [_meta_original(*perfil) for perfil in PERFILES]
+        assert [meta_hidratacion(*perfil, HOY) for perfil in PERFILES] == esperadas
+        assert metas_hidratacion(PERFILES, HOY) == esperadas
+
+    def test_sin_numpy_usa_la_version_memoizada(self, monkeypatch):
+        """Test: Sin numpy el lote se calcula perfil a perfil con el mismo resultado."""
+        monkeypatch.setattr(goals, 'np', None)
+        assert metas_hidratacion(PERFILES, HOY) == [_meta_original(*perfil) for perfil in PERFILES]
+
+
+@pytest.mark.django_db
+class TestMetaUsuario:
+    """Tests de User.calcular_meta_hidratacion con la memoización."""
+
+    def test_se_calcula_una_vez_por_perfil(self, user):
+        """Test: Las llamadas repetidas con el mismo perfil usan la caché."""
+        user.refresh_from_db()
+        meta_hidratacion.cache_clear()
+        meta = user.calcular_meta_hidratacion()
+        for _ in range(3):
+            assert user.calcular_meta_hidratacion() == meta
+        info = meta_hidratacion.cache_info()
+        assert (info.misses, info.hits) == (1, 3)
+
+    def test_cambio_de_perfil_cambia_la_meta(self, user):
+        """Test: Cambiar el peso o la fragilidad da otra clave y otra meta."""
+        user.refresh_from_db()
+        meta = user.calcular_meta_hidratacion()
+        user.peso = user.peso + 10
+        assert user.calcular_meta_hidratacion() > meta
+
+        user.fecha_nacimiento = date(1940, 1, 1)
+        saludable = user.calcular_meta_hidratacion()
+        user.es_fragil_o_insuficiencia_cardiaca = True
+        assert user.calcular_meta_hidratacion() < saludable
+
+    def test_fecha_local_y_no_del_sistema(self, user, monkeypatch):
+        """Test: Sin fecha se usa el día local (TIME_ZONE), también en el lote."""
+        # Cumple 51 años el día local: pasa de 32.5 a 27.5 ml/kg
+        user.peso, user.fecha_nacimiento = 80, date(1975, 6, 15)
+        monkeypatch.setattr('django.utils.timezone.localdate', lambda *args, **kwargs: HOY)
+        assert user.calcular_meta_hidratacion() == 1760
+        assert metas_hidratacion([(80, date(1975, 6, 15), None, False, None)]) == [1760]
+
+    def test_lote_desde_values_list(self, user):
+        """Test: metas_hidratacion acepta directamente values_list(*GOAL_FIELDS)."""
+        user.refresh_from_db()
+        perfiles = User.objects.filter(pk=user.pk).values_list(*GOAL_FIELDS)
+        assert metas_hidratacion(perfiles) == [user.calcular_meta_hidratacion()]
+
+
+@pytest.mark.django_db
+class TestRecalculateGoals:
+    """Tests del recálculo de metas por lotes."""
+
+    def _usuarios(self):
+        usuarios = [
+            User.objects.create_user(
+                username=f'meta{i}', email=f'meta{i}@example.com', password='testpass123',
+                peso=50 + i * 10, fecha_nacimiento=date(1990, 1, 1),
+            )
+            for i in range(5)
+        ]
+        for usuario in usuarios:
+            usuario.actualizar_meta_hidratacion()
+        # Metas desactualizadas, como tras un cambio de fórmula
+        User.objects.filter(pk__in=[u.pk for u in usuarios[:3]]).update(meta_diaria_ml=1234)
+        return usuarios
+
+    def test_actualiza_solo_las_metas_que_cambian(self):
+        """Test: Se reescriben las metas desactualizadas en bloques y se invalida el perfil."""
+        usuarios = self._usuarios()
+        version = ResourceVersion.get_many(['perfil'], usuarios[0].pk)['perfil']
+
+        resultado = recalculate_goals(chunk_size=2)
+
+        assert resultado == {'usuarios': 5, 'actualizados': 3, 'ultimo_usuario_id': usuarios[-1].pk}
+        for usuario in usuarios:
+            usuario.refresh_from_db()
+            assert usuario.meta_diaria_ml == usuario.calcular_meta_hidratacion()
+        assert ResourceVersion.get_many(['perfil'], usuarios[0].pk)['perfil'] != version
+        assert recalculate_goals()['actualizados'] == 0
+
+    def test_comando_dry_run_y_start_after(self):
+        """Test: --dry-run no escribe y --start-after retoma desde un id."""
+        usuarios = self._usuarios()
+        call_command('recalculate_goals', '--dry-run')
+        assert User.objects.filter(meta_diaria_ml=1234).count() == 3
+
+        call_command('recalculate_goals', '--start-after', usuarios[1].pk)
+        assert list(
+            User.objects.filter(meta_diaria_ml=1234).order_by('pk').values_list('pk', flat=True)
+        ) == [usuarios[0].pk, usuarios[1].pk]
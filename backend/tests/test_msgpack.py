@@ -0,0 +1,87 @@
+"""
+Tests para la negociación MessagePack y la proyección de campos.
+"""
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+from rest_framework import status
+
+from actividades.models import Actividad
+from consumos.config.constants import ESTADO_ANIMO_CODES, TIPO_ACTIVIDAD_CODES
+from consumos.models import Bebida, Consumo
+
+msgpack = pytest.importorskip('msgpack')
+
+MSGPACK = 'application/msgpack'
+
+
+@pytest.mark.django_db
+class TestMessagePack:
+    """Tests del renderer MessagePack compacto."""
+
+    @pytest.fixture
+    def consumo(self, user):
+        bebida, _ = Bebida.objects.get_or_create(
+            nombre='Agua Test Msgpack', defaults={'factor_hidratacion': 1.0, 'es_agua': True}
+        )
+        return Consumo.objects.create(
+            usuario=user, bebida=bebida, cantidad_ml=250,
+            fecha_hora=timezone.now() - timedelta(minutes=5),
+            nivel_sed=4, estado_animo='malo'
+        )
+
+    def test_json_sigue_siendo_default(self, authenticated_client, consumo):
+        """Test: Sin Accept explícito se responde JSON."""
+        response = authenticated_client.get('/api/consumos/')
+        assert response['Content-Type'].startswith('application/json')
+        assert isinstance(response.json()['results'][0]['fecha_hora'], str)
+
+    def test_lista_compacta(self, authenticated_client, consumo):
+        """Test: Con Accept msgpack se usan enteros para enums y fechas."""
+        response = authenticated_client.get('/api/consumos/', HTTP_ACCEPT=MSGPACK)
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == MSGPACK
+        body = msgpack.unpackb(response.content)
+        item = body['results'][0]
+        assert item['estado_animo'] == ESTADO_ANIMO_CODES['malo']
+        assert item['nivel_sed'] == 4
+        assert item['fecha_hora'] == int(consumo.fecha_hora.timestamp())
+        assert 'fecha_formateada' not in item
+
+    def test_proyeccion_de_campos(self, authenticated_client, consumo):
+        """Test: ?fields= limita los campos de la respuesta."""
+        response = authenticated_client.get(
+            '/api/consumos/?fields=id,cantidad_ml,fecha_hora', HTTP_ACCEPT=MSGPACK
+        )
+        item = msgpack.unpackb(response.content)['results'][0]
+        assert set(item) == {'id', 'cantidad_ml', 'fecha_hora'}
+
+    def test_proyeccion_en_json(self, authenticated_client, consumo):
+        """Test: La proyección también aplica al JSON."""
+        response = authenticated_client.get('/api/consumos/?fields=id,hora_formateada')
+        assert set(response.json()['results'][0]) == {'id', 'hora_formateada'}
+
+    def test_actividades_compactas(self, authenticated_client, user):
+        """Test: tipo_actividad se codifica con su código entero."""
+        Actividad.objects.create(
+            usuario=user, tipo_actividad='ciclismo', duracion_minutos=45,
+            intensidad='media', pse_calculado=820
+        )
+        response = authenticated_client.get('/api/actividades/', HTTP_ACCEPT=MSGPACK)
+        item = msgpack.unpackb(response.content)['results'][0]
+        assert item['tipo_actividad'] == TIPO_ACTIVIDAD_CODES['ciclismo']
+        assert 'tipo_actividad_display' not in item
+
+    def test_otras_vistas_msgpack_generico(self, authenticated_client, consumo):
+        """Test: Las vistas sin ruta rápida también se pueden pedir en msgpack."""
+        response = authenticated_client.get('/api/consumos/daily_summary/', HTTP_ACCEPT=MSGPACK)
+        assert response.status_code == status.HTTP_200_OK
+        assert 'cantidad_consumos' in msgpack.unpackb(response.content)
+
+    def test_etag_distinto_por_formato(self, authenticated_client, consumo):
+        """Test: JSON y msgpack no comparten ETag."""
+        etag = authenticated_client.get('/api/consumos/')['ETag']
+        response = authenticated_client.get(
+            '/api/consumos/', HTTP_ACCEPT=MSGPACK, HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == status.HTTP_200_OK
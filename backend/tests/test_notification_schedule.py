@@ -0,0 +1,159 @@
+"""
+Tests para la compilación de ventanas de notificación a bitmaps.
+"""
+import pytest
+from datetime import datetime, time
+from types import SimpleNamespace
+from django.core.cache import caches
+from django.db import connection
+from django_redis.serializers.json import JSONSerializer
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from consumos.models import Recordatorio
+from consumos.services import notification_schedule
+from consumos.services.notification_schedule import (
+    BITMAP_BYTES, NotificationScheduleCompiler, ScheduleIndex, compile_schedule, slot_for
+)
+
+
+def _user(**kwargs):
+    defaults = {
+        'recordar_notificaciones': True, 'hora_inicio': time(8, 0),
+        'hora_fin': time(22, 0), 'intervalo_notificaciones': 60,
+    }
+    defaults.update(kwargs)
+    return SimpleNamespace(**defaults)
+
+
+class JSONCache:
+    """Caché que serializa como django_redis con JSONSerializer (producción)."""
+
+    def __init__(self):
+        self.cache = caches['default']
+        self.serializer = JSONSerializer({})
+
+    def get_many(self, keys):
+        return {key: self.serializer.loads(value) for key, value in self.cache.get_many(keys).items()}
+
+    def set_many(self, data, timeout=None):
+        self.cache.set_many({key: self.serializer.dumps(value) for key, value in data.items()}, timeout)
+
+
+def _slots(bitmap):
+    return [i for i in range(len(bitmap) * 8) if bitmap[i >> 3] & (1 << (i & 7))]
+
+
+class TestCompileSchedule:
+    """Tests de compile_schedule."""
+
+    def test_ventana_con_intervalo(self):
+        """Test: 08:00-22:00 cada 60 minutos son 15 avisos por día."""
+        bitmap = compile_schedule(_user())
+        assert len(bitmap) == BITMAP_BYTES
+        slots = _slots(bitmap)
+        assert len(slots) == 15 * 7
+        assert slot_for(2, 8 * 60) in slots
+        assert slot_for(2, 22 * 60) in slots
+        assert slot_for(2, 8 * 60 + 30) not in slots
+
+    def test_ventana_nocturna(self):
+        """Test: Una ventana que cruza la medianoche sigue en el día siguiente."""
+        slots = _slots(compile_schedule(_user(
+            hora_inicio=time(23, 0), hora_fin=time(1, 0), intervalo_notificaciones=60
+        )))
+        assert slot_for(0, 23 * 60) in slots
+        assert slot_for(1, 0) in slots
+        assert slot_for(1, 60) in slots
+        # El domingo continúa el lunes
+        assert slot_for(0, 60) in slots
+
+    def test_recordatorios_por_dia(self):
+        """Test: Los recordatorios marcan solo sus días."""
+        slots = _slots(compile_schedule(
+            _user(hora_inicio=time(9, 0), hora_fin=time(9, 0)),
+            [(time(7, 15), [5, 6])]
+        ))
+        assert slot_for(5, 7 * 60 + 15) in slots
+        assert slot_for(0, 7 * 60 + 15) not in slots
+
+    def test_desactivado(self):
+        """Test: Sin recordar_notificaciones el bitmap queda vacío."""
+        assert _slots(compile_schedule(_user(recordar_notificaciones=False), [(time(7, 0), [])])) == []
+
+
+@pytest.mark.django_db
+class TestNotificationScheduleCompiler:
+    """Tests del compilador con caché."""
+
+    def test_cache_reutiliza_bitmap(self, user):
+        """Test: Sin cambios de configuración no se vuelve a consultar la base."""
+        compiler = NotificationScheduleCompiler()
+        primero = compiler.get_schedule(user.id)
+        with CaptureQueriesContext(connection) as ctx:
+            assert compiler.get_schedule(user.id) == primero
+        assert len(ctx.captured_queries) == 0
+
+    def test_cache_con_serializador_json(self, user, monkeypatch):
+        """Test: Los bitmaps sobreviven al serializador JSON de django_redis."""
+        caches['default'].clear()
+        user.refresh_from_db()
+        compiler = NotificationScheduleCompiler()
+        monkeypatch.setattr(compiler, '_get_cache', JSONCache)
+        primero = compiler.get_schedule(user.id)
+        assert primero == compile_schedule(user) and len(primero) == BITMAP_BYTES
+        with CaptureQueriesContext(connection) as ctx:
+            assert compiler.get_schedule(user.id) == primero
+        assert len(ctx.captured_queries) == 0
+
+    def test_cambio_de_perfil_recompila(self, user):
+        """Test: Cambiar la ventana invalida el bitmap."""
+        compiler = NotificationScheduleCompiler()
+        antes = compiler.get_schedule(user.id)
+        user.intervalo_notificaciones = 120
+        user.save()
+        assert compiler.get_schedule(user.id) != antes
+
+    def test_nuevo_recordatorio_recompila(self, user):
+        """Test: Crear un recordatorio invalida el bitmap."""
+        compiler = NotificationScheduleCompiler()
+        compiler.get_schedule(user.id)
+        Recordatorio.objects.create(usuario=user, hora='06:45', mensaje='Temprano')
+        assert slot_for(3, 6 * 60 + 45) in _slots(compiler.get_schedule(user.id))
+
+    def test_lote_con_dos_consultas(self, user, premium_user):
+        """Test: Compilar muchos usuarios usa dos consultas."""
+        with CaptureQueriesContext(connection) as ctx:
+            schedules = NotificationScheduleCompiler().get_schedules([user.id, premium_user.id])
+        assert set(schedules) == {user.id, premium_user.id}
+        assert len(ctx.captured_queries) == 2
+
+
+class TestScheduleIndex:
+    """Tests de la consulta vectorizada."""
+
+    @pytest.fixture(params=['numpy', 'python'])
+    def backend(self, request, monkeypatch):
+        if request.param == 'numpy':
+            if notification_schedule.np is None:
+                pytest.skip('numpy no está instalado')
+        else:
+            monkeypatch.setattr(notification_schedule, 'np', None)
+        return request.param
+
+    def test_usuarios_en_un_minuto(self, backend):
+        """Test: due_at devuelve los usuarios con aviso en ese minuto."""
+        index = ScheduleIndex({
+            1: compile_schedule(_user()),
+            2: compile_schedule(_user(hora_inicio=time(8, 30), hora_fin=time(8, 30))),
+            3: compile_schedule(_user(recordar_notificaciones=False)),
+        })
+        lunes_8 = timezone.make_aware(datetime(2026, 3, 2, 8, 0))
+        lunes_830 = timezone.make_aware(datetime(2026, 3, 2, 8, 30))
+        assert index.due_at(lunes_8) == [1]
+        assert index.due_at(lunes_830) == [2]
+        assert index.due_at_slot(slot_for(0, 3)) == []
+
+    def test_indice_vacio(self, backend):
+        """Test: Un índice sin usuarios no falla."""
+        assert ScheduleIndex({}).due_at() == []
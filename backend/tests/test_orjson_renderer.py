@@ -0,0 +1,128 @@
+"""
+Tests para el renderer y el parser basados en orjson.
+La salida debe ser idéntica byte a byte a la del JSONRenderer de DRF.
+"""
+import io
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+
+import pytest
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from consumos.models import Bebida, Consumo
+from hydrotracker.parsers import ORJSONParser
+from hydrotracker.renderers import ORJSONRenderer
+
+
+class _Iterable:
+    """Tipo desconocido para orjson que el encoder de DRF convierte en lista."""
+
+    def __iter__(self):
+        return iter([1, 2])
+
+
+def _assert_same_bytes(data, **kwargs):
+    assert ORJSONRenderer().render(data, **kwargs) == JSONRenderer().render(data, **kwargs)
+
+
+class TestORJSONRenderer:
+    """Tests de compatibilidad del renderer."""
+
+    @pytest.mark.parametrize('value', [
+        datetime(2026, 3, 1, 12, 30, tzinfo=dt_timezone.utc),
+        datetime(2026, 3, 1, 12, 30, 0, 123456, tzinfo=dt_timezone.utc),
+        datetime(2026, 1, 1, 9, 0, tzinfo=ZoneInfo('Europe/London')),
+        datetime(2026, 7, 1, 9, 0, tzinfo=ZoneInfo('America/Argentina/Buenos_Aires')),
+        datetime(2026, 7, 1, 9, 0),
+        date(2026, 7, 1),
+        time(8, 15, 30, 250),
+        timedelta(hours=1, seconds=3),
+        Decimal('12.50'),
+        uuid.UUID(int=42),
+        gettext_lazy('Agua'),
+        'ñandú café 💧',
+        'separadores   y  ',
+        {1: 'clave entera', 'b': None},
+        OrderedDict([('z', 1), ('a', [1.5, 0.1, 250.0])]),
+        _Iterable(),
+        (1, 2, 3),
+    ])
+    def test_mismos_bytes(self, value):
+        """Test: Tipos comunes producen los mismos bytes que DRF."""
+        _assert_same_bytes({'valor': value, 'lista': [value]})
+
+    def test_none_es_cuerpo_vacio(self):
+        """Test: None se codifica como cuerpo vacío."""
+        assert ORJSONRenderer().render(None) == b''
+
+    def test_indentacion_usa_drf(self):
+        """Test: Con indentación se delega en DRF."""
+        _assert_same_bytes({'a': [1, 2]}, accepted_media_type='application/json; indent=4')
+
+    def test_entero_grande_usa_drf(self):
+        """Test: Enteros de más de 64 bits se delegan en DRF."""
+        _assert_same_bytes({'n': 2 ** 70})
+
+    def test_tipo_no_serializable_falla_como_drf(self):
+        """Test: Un tipo que DRF tampoco sabe codificar produce TypeError."""
+        with pytest.raises(TypeError):
+            ORJSONRenderer().render({'x': object()})
+
+    @pytest.mark.django_db
+    def test_respuestas_reales(self, authenticated_client, user):
+        """Test: Respuestas reales de la API coinciden byte a byte."""
+        bebida, _ = Bebida.objects.get_or_create(
+            nombre='Café con leche', defaults={'factor_hidratacion': 0.85}
+        )
+        Consumo.objects.create(
+            usuario=user, bebida=bebida, cantidad_ml=333, fecha_hora=timezone.now(),
+            notas='después del almuerzo'
+        )
+        for url in ['/api/consumos/', '/api/consumos/daily_summary/', '/api/bebidas/',
+                    '/api/recipientes/', '/api/consumos/trends/?tz=UTC']:
+            response = authenticated_client.get(url)
+            assert response.status_code == status.HTTP_200_OK
+            assert response.content == JSONRenderer().render(response.data)
+
+
+class TestORJSONParser:
+    """Tests del parser."""
+
+    @pytest.mark.parametrize('body', [
+        b'{"cantidad_ml": 250, "notas": "caf\\u00e9", "lista": [1, 2.5, null, true]}',
+        '{"notas": "ñandú 💧"}'.encode(),
+        b'[]',
+    ])
+    def test_mismo_resultado(self, body):
+        """Test: El resultado coincide con el JSONParser de DRF."""
+        assert ORJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(io.BytesIO(body))
+
+    @pytest.mark.parametrize('body', [b'{"a": ', b'[NaN]', b'{"a": Infinity}'])
+    def test_json_invalido(self, body):
+        """Test: JSON inválido o no estricto produce ParseError."""
+        with pytest.raises(ParseError):
+            ORJSONParser().parse(io.BytesIO(body))
+
+    def test_surrogate_suelto_como_drf(self):
+        """Test: Lo que orjson rechaza pero DRF acepta se sigue aceptando."""
+        body = b'{"a": "\\ud800"}'
+        assert ORJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(io.BytesIO(body))
+
+    @pytest.mark.django_db
+    def test_post_json(self, authenticated_client):
+        """Test: Las peticiones JSON se siguen procesando."""
+        response = authenticated_client.post(
+            '/api/recordatorios/',
+            data='{"hora": "08:30", "mensaje": "Tomar agua 💧", "dias_semana": [0, 1, 2]}',
+            content_type='application/json'
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json()['mensaje'] == 'Tomar agua 💧'
@@ -0,0 +1,31 @@
+"""
+Tests para el bucle común de los workers periódicos.
+"""
+import threading
+
+from hydrotracker.periodic import run_periodic
+
+
+class TestRunPeriodic:
+    """Tests de run_periodic."""
+
+    def test_un_error_no_detiene_el_bucle(self, caplog):
+        """Test: Tras un fallo la tarea se vuelve a ejecutar hasta stop_event."""
+        stop_event = threading.Event()
+        llamadas = []
+
+        def tarea():
+            llamadas.append(1)
+            if len(llamadas) == 1:
+                raise RuntimeError('fallo')
+            stop_event.set()
+
+        run_periodic(tarea, 0, 'Error en la tarea', stop_event)
+        assert len(llamadas) == 2
+        assert 'Error en la tarea: fallo' in caplog.text
+
+    def test_stop_event_activo(self):
+        """Test: Con stop_event ya activo no se ejecuta la tarea."""
+        stop_event = threading.Event()
+        stop_event.set()
+        run_periodic(lambda: 1 / 0, 0, 'Error', stop_event)
@@ -0,0 +1,136 @@
+"""
+Tests para los snapshots de métricas de la plataforma.
+"""
+import pytest
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from consumos.models import Bebida, Consumo, MetricaPlataforma
+from consumos.services.platform_metrics import refresh_platform_metrics
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestPlatformMetrics:
+    """Tests de refresh_platform_metrics y MonetizationStatsView."""
+
+    @pytest.fixture
+    def bebida(self):
+        bebida, _ = Bebida.objects.get_or_create(
+            nombre='Agua Test Metricas', defaults={'factor_hidratacion': 1.0, 'es_agua': True}
+        )
+        return bebida
+
+    @pytest.fixture
+    def admin_client(self, api_client):
+        admin = User.objects.create_user(
+            username='adminmetricas', email='admin@example.com', password='testpass123',
+            peso=70.0, fecha_nacimiento='1990-01-01', is_staff=True
+        )
+        refresh = RefreshToken.for_user(admin)
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        return api_client
+
+    def _consumos(self, user, bebida, cantidad, fecha_hora=None):
+        for _ in range(cantidad):
+            Consumo.objects.create(
+                usuario=user, bebida=bebida, cantidad_ml=250,
+                fecha_hora=fecha_hora or timezone.now()
+            )
+
+    def test_snapshot_completo_e_incremental(self, user, premium_user, bebida):
+        """Test: El segundo snapshot solo suma los consumos nuevos."""
+        self._consumos(user, bebida, 2)
+        self._consumos(user, bebida, 1, timezone.now() - timedelta(days=45))
+        primero = refresh_platform_metrics()
+        assert primero.completo
+        assert primero.total_consumos == 3
+        assert primero.consumos_30d == 2
+        assert primero.usuarios_premium == 1
+
+        self._consumos(premium_user, bebida, 2)
+        User.objects.create_user(
+            username='nuevo', email='nuevo@example.com', password='testpass123',
+            peso=60.0, fecha_nacimiento='2000-01-01'
+        )
+        segundo = refresh_platform_metrics()
+        assert not segundo.completo
+        assert segundo.total_consumos == 5
+        assert segundo.consumos_30d == 4
+        assert segundo.nuevos_usuarios == 1
+        assert segundo.ultimo_consumo_id == Consumo.objects.latest('id').id
+
+    def test_ventana_descarta_dias_antiguos(self, user, bebida):
+        """Test: Los días que salen de la ventana dejan de contar."""
+        self._consumos(user, bebida, 2, timezone.now() - timedelta(days=20))
+        refresh_platform_metrics()
+        snapshot = refresh_platform_metrics(now=timezone.now() + timedelta(days=15))
+        assert snapshot.consumos_30d == 0
+        assert snapshot.total_consumos == 2
+
+    def test_borrados_en_la_ventana(self, user, bebida):
+        """Test: El refresco incremental descuenta los borrados recientes; full=True todos."""
+        self._consumos(user, bebida, 3)
+        self._consumos(user, bebida, 2, timezone.now() - timedelta(days=45))
+        refresh_platform_metrics()
+        Consumo.objects.filter(usuario=user, fecha_hora__gte=timezone.now() - timedelta(days=1)).first().delete()
+        snapshot = refresh_platform_metrics()
+        assert (snapshot.total_consumos, snapshot.consumos_30d) == (4, 2)
+
+        Consumo.objects.filter(usuario=user).order_by('fecha_hora').first().delete()
+        assert refresh_platform_metrics().total_consumos == 4
+        assert refresh_platform_metrics(full=True).total_consumos == 3
+
+    def test_confirmados_tarde_con_id_menor(self, user, bebida):
+        """Test: Un consumo con id menor que el último visto se cuenta en el siguiente refresco."""
+        self._consumos(user, bebida, 3)
+        # Como si el consumo del medio aún no estuviera confirmado al refrescar
+        tardio = Consumo.objects.order_by('id')[1]
+        Consumo.objects.filter(pk=tardio.pk).delete()
+        primero = refresh_platform_metrics()
+        assert primero.total_consumos == 2
+
+        tardio.save(force_insert=True)
+        assert tardio.pk < primero.ultimo_consumo_id
+        segundo = refresh_platform_metrics()
+        assert (segundo.total_consumos, segundo.consumos_30d) == (3, 3)
+
+    def test_nuevos_con_fecha_anterior_a_la_ventana(self, user, bebida):
+        """Test: Un consumo nuevo fechado antes de la ventana suma al total."""
+        self._consumos(user, bebida, 1)
+        refresh_platform_metrics()
+        self._consumos(user, bebida, 1, timezone.now() - timedelta(days=60))
+        snapshot = refresh_platform_metrics()
+        assert (snapshot.total_consumos, snapshot.consumos_30d) == (2, 1)
+
+    def test_vista_lee_snapshot(self, admin_client, user, bebida):
+        """Test: La vista lee el último snapshot sin contar consumos."""
+        self._consumos(user, bebida, 2)
+        refresh_platform_metrics()
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.get('/api/monetization/stats/')
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['actividad']['consumos_totales'] == 2
+        assert not any('consumos_consumo' in query['sql'] for query in queries.captured_queries)
+
+    def test_vista_historial(self, admin_client, user, bebida):
+        """Test: ?history=N devuelve la serie de snapshots."""
+        refresh_platform_metrics()
+        self._consumos(user, bebida, 1)
+        refresh_platform_metrics()
+        response = admin_client.get('/api/monetization/stats/?history=5')
+        historial = response.json()['historial']
+        assert [punto['consumos_totales'] for punto in historial] == [1, 0]
+        assert admin_client.get('/api/monetization/stats/?history=x').status_code == 400
+
+    def test_vista_sin_snapshot(self, admin_client):
+        """Test: Sin snapshots previos la vista genera uno."""
+        response = admin_client.get('/api/monetization/stats/')
+        assert response.status_code == status.HTTP_200_OK
+        assert MetricaPlataforma.objects.count() == 1
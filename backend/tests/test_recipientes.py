@@ -0,0 +1,95 @@
+"""
+Tests para el listado de recipientes sin escrituras.
+"""
+import importlib
+
+import pytest
+from django.apps import apps
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from consumos.models import Recipiente
+from users.utils import asegurar_recipientes_por_defecto, crear_recipientes_por_defecto
+
+URL = '/api/recipientes/'
+
+
+@pytest.fixture(autouse=True)
+def cache_vacia():
+    """Sin marcas ni listados de otros tests (los ids se reutilizan)."""
+    caches['default'].clear()
+
+
+def _nombres(user):
+    return sorted(Recipiente.objects.filter(usuario=user).values_list('nombre', flat=True))
+
+
+@pytest.mark.django_db
+class TestRecipientesPorDefecto:
+    """Tests de crear_recipientes_por_defecto y la marca en caché."""
+
+    def test_crear_es_idempotente(self, user):
+        """Test: Solo se crean los recipientes por defecto que faltan."""
+        Recipiente.objects.create(usuario=user, nombre='Vaso', cantidad_ml=250)
+        assert [r.nombre for r in crear_recipientes_por_defecto(user)] == ['Botella']
+        assert crear_recipientes_por_defecto(user) == []
+        assert _nombres(user) == ['Botella', 'Vaso']
+
+    def test_marca_en_cache(self, user):
+        """Test: Con la marca no se consulta la base; al borrar uno se vuelve a comprobar."""
+        crear_recipientes_por_defecto(user)
+        with CaptureQueriesContext(connection) as queries:
+            assert asegurar_recipientes_por_defecto(user) == []
+        assert len(queries) == 0
+
+        Recipiente.objects.filter(usuario=user, nombre='Vaso').get().delete()
+        assert [r.nombre for r in asegurar_recipientes_por_defecto(user)] == ['Vaso']
+
+    def test_migracion_renombra_nombres_antiguos(self, user):
+        """Test: La migración de datos renombra Taza/Vaso y Botella/Termo pequeño."""
+        Recipiente.objects.create(usuario=user, nombre='Taza/Vaso', cantidad_ml=250)
+        Recipiente.objects.create(usuario=user, nombre='Botella/Termo pequeño', cantidad_ml=500)
+        migracion = importlib.import_module('consumos.migrations.0010_recipientes_nombres')
+        migracion.renombrar_recipientes(apps, None)
+        assert _nombres(user) == ['Botella', 'Vaso']
+
+    def test_migracion_con_nombre_nuevo_existente(self, user, premium_user):
+        """Test: Si el usuario ya tiene el nombre nuevo, conserva el antiguo sin romper la migración."""
+        Recipiente.objects.create(usuario=user, nombre='Vaso', cantidad_ml=300)
+        Recipiente.objects.create(usuario=user, nombre='Taza/Vaso', cantidad_ml=250)
+        Recipiente.objects.create(usuario=user, nombre='Botella/Termo pequeño', cantidad_ml=500)
+        Recipiente.objects.create(usuario=premium_user, nombre='Taza/Vaso', cantidad_ml=250)
+        migracion = importlib.import_module('consumos.migrations.0010_recipientes_nombres')
+        migracion.renombrar_recipientes(apps, None)
+        assert _nombres(user) == ['Botella', 'Taza/Vaso', 'Vaso']
+        assert _nombres(premium_user) == ['Vaso']
+
+
+@pytest.mark.django_db
+class TestRecipienteList:
+    """Tests de RecipienteViewSet.list."""
+
+    def test_listado_sin_escrituras_y_en_cache(self, authenticated_client, user):
+        """Test: El primer listado crea los por defecto; los siguientes no consultan la base."""
+        response = authenticated_client.get(URL)
+        assert response.status_code == status.HTTP_200_OK
+        assert _nombres(user) == ['Botella', 'Vaso']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = authenticated_client.get(URL)
+        assert response.status_code == status.HTTP_200_OK
+        assert not [q for q in queries if not q['sql'].startswith('SELECT')]
+        assert not [q for q in queries if 'consumos_recipiente' in q['sql']]
+        assert response['ETag']
+
+    def test_escritura_invalida_el_listado(self, authenticated_client, premium_user):
+        """Test: Un recipiente nuevo aparece en el siguiente listado."""
+        authenticated_client.force_authenticate(premium_user)
+        etag = authenticated_client.get(URL)['ETag']
+        Recipiente.objects.create(usuario=premium_user, nombre='Jarra', cantidad_ml=750)
+
+        response = authenticated_client.get(URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert 'Jarra' in str(response.content, 'utf-8')
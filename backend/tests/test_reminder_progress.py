@@ -0,0 +1,119 @@
+"""
+Tests para la supresión de recordatorios según el progreso del día.
+"""
+import pytest
+from datetime import datetime, time, timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from actividades.models import Actividad
+from consumos.models import Bebida, Consumo, Recordatorio
+from consumos.services.reminder_progress import DailyProgressLookup, window_fraction
+from consumos.services.reminder_scheduler import ReminderScheduler
+
+
+class RecordingSender:
+    """Sender de prueba que guarda los ids enviados."""
+
+    def __init__(self):
+        self.enviados = []
+
+    def send_batch(self, recordatorios):
+        self.enviados.extend(r.id for r in recordatorios)
+        return recordatorios
+
+
+def _hoy_a_las(hora):
+    return timezone.make_aware(datetime.combine(timezone.localdate(), hora))
+
+
+class TestWindowFraction:
+    """Tests de window_fraction."""
+
+    @pytest.mark.parametrize('ahora, esperado', [
+        (time(7, 0), 0.0),
+        (time(8, 0), 0.0),
+        (time(15, 0), 0.5),
+        (time(22, 0), 1.0),
+        (time(23, 30), 1.0),
+    ])
+    def test_fraccion(self, ahora, esperado):
+        """Test: Fracción transcurrida de la ventana 08:00-22:00."""
+        now_local = datetime.combine(datetime(2026, 3, 2), ahora)
+        assert window_fraction(time(8, 0), time(22, 0), now_local) == pytest.approx(esperado)
+
+    def test_ventana_nocturna(self):
+        """Test: Una ventana que cruza la medianoche se mide hasta el día siguiente."""
+        now_local = datetime(2026, 3, 2, 23, 0)
+        assert window_fraction(time(22, 0), time(2, 0), now_local) == pytest.approx(0.25)
+
+
+@pytest.mark.django_db
+class TestDailyProgress:
+    """Tests del progreso por lotes."""
+
+    @pytest.fixture
+    def ahora(self):
+        return _hoy_a_las(time(15, 0))
+
+    @pytest.fixture
+    def agua(self, db):
+        bebida, _ = Bebida.objects.get_or_create(
+            nombre='Agua Test Progreso', defaults={'factor_hidratacion': 1.0, 'es_agua': True}
+        )
+        return bebida
+
+    def _consumo(self, usuario, bebida, ml, fecha_hora):
+        Consumo.objects.create(usuario=usuario, bebida=bebida, cantidad_ml=ml, fecha_hora=fecha_hora)
+
+    def test_una_consulta_para_todos(self, user, premium_user, agua, ahora):
+        """Test: El progreso de varios usuarios se obtiene con una consulta."""
+        self._consumo(user, agua, 1000, ahora - timedelta(hours=1))
+        with CaptureQueriesContext(connection) as ctx:
+            progreso = DailyProgressLookup(ahora).get_progress([user.id, premium_user.id])
+        assert len(ctx.captured_queries) == 1
+        # 70 kg, 28 años: 70 * 32.5 * 0.8 = 1820 ml; a las 15:00 va la mitad
+        assert progreso[user.id] == (1000, 1820, pytest.approx(910))
+        assert progreso[premium_user.id][0] == 0
+
+    def test_pse_suma_a_la_meta(self, user, agua, ahora):
+        """Test: Las actividades del día elevan la meta como en el resumen diario."""
+        Actividad.objects.create(
+            usuario=user, tipo_actividad='correr', duracion_minutos=30,
+            intensidad='alta', pse_calculado=400, fecha_hora=ahora - timedelta(hours=2)
+        )
+        hidratacion, meta, _ = DailyProgressLookup(ahora).get_progress([user.id])[user.id]
+        assert meta == 1820 + 400
+
+    def test_consumos_de_ayer_no_cuentan(self, user, agua, ahora):
+        """Test: Solo cuenta el día local actual."""
+        self._consumo(user, agua, 3000, ahora - timedelta(days=1))
+        assert DailyProgressLookup(ahora).on_track_users([user.id]) == set()
+
+    def test_scheduler_suprime_usuarios_al_dia(self, user, premium_user, agua, ahora):
+        """Test: Solo se suprimen agua/meta de quien va al día."""
+        self._consumo(user, agua, 1000, ahora - timedelta(hours=1))
+        al_dia = Recordatorio.objects.create(usuario=user, hora='14:00', tipo_recordatorio='agua')
+        personalizado = Recordatorio.objects.create(
+            usuario=user, hora='14:00', tipo_recordatorio='personalizado'
+        )
+        atrasado = Recordatorio.objects.create(usuario=premium_user, hora='14:00', tipo_recordatorio='meta')
+        Recordatorio.objects.update(next_fire_at=ahora - timedelta(minutes=1))
+
+        sender = RecordingSender()
+        assert ReminderScheduler(sender=sender, skip_on_track=True).tick(now=ahora) == 3
+
+        assert sorted(sender.enviados) == sorted([personalizado.id, atrasado.id])
+        al_dia.refresh_from_db()
+        assert al_dia.ultimo_enviado is None
+        assert al_dia.next_fire_at > ahora
+
+    def test_desactivado_envia_todo(self, user, agua, ahora):
+        """Test: Con skip_on_track=False no se consulta el progreso."""
+        self._consumo(user, agua, 5000, ahora - timedelta(hours=1))
+        Recordatorio.objects.create(usuario=user, hora='14:00', tipo_recordatorio='agua')
+        Recordatorio.objects.update(next_fire_at=ahora - timedelta(minutes=1))
+        sender = RecordingSender()
+        ReminderScheduler(sender=sender, skip_on_track=False).tick(now=ahora)
+        assert len(sender.enviados) == 1
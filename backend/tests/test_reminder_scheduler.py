@@ -0,0 +1,179 @@
+"""
+Tests para el despacho de recordatorios (ReminderScheduler).
+"""
+import importlib
+
+import pytest
+from datetime import datetime, time, timedelta
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from consumos.models import Recordatorio
+from consumos.services.reminder_scheduler import ReminderScheduler
+from consumos.utils.date_utils import DateUtils
+
+
+class RecordingSender:
+    """Sender de prueba que guarda los ids enviados."""
+    enviados = []
+
+    def send_batch(self, recordatorios):
+        RecordingSender.enviados.extend(r.id for r in recordatorios)
+        return recordatorios
+
+
+def _aware(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+class TestNextOccurrence:
+    """Tests de DateUtils.get_next_occurrence."""
+
+    def test_hoy_si_no_paso(self):
+        """Test: Si la hora no pasó, el próximo envío es hoy."""
+        desde = _aware(2026, 3, 2, 7, 0)  # lunes
+        assert DateUtils.get_next_occurrence(time(8, 0), [], desde) == _aware(2026, 3, 2, 8, 0)
+
+    def test_manana_si_ya_paso(self):
+        """Test: Si la hora ya pasó, el próximo envío es mañana."""
+        desde = _aware(2026, 3, 2, 8, 0)
+        assert DateUtils.get_next_occurrence(time(8, 0), None, desde) == _aware(2026, 3, 3, 8, 0)
+
+    def test_salta_a_dia_valido(self):
+        """Test: Solo fines de semana desde un lunes cae en sábado."""
+        desde = _aware(2026, 3, 2, 9, 0)
+        assert DateUtils.get_next_occurrence(time(8, 0), [5, 6], desde) == _aware(2026, 3, 7, 8, 0)
+
+    def test_mismo_dia_la_semana_siguiente(self):
+        """Test: Un único día ya pasado se programa para la semana siguiente."""
+        desde = _aware(2026, 3, 2, 9, 0)
+        assert DateUtils.get_next_occurrence(time(8, 0), [0], desde) == _aware(2026, 3, 9, 8, 0)
+
+    def test_sin_dias_validos(self):
+        """Test: Días fuera de rango no producen envío."""
+        assert DateUtils.get_next_occurrence(time(8, 0), [9]) is None
+
+    @pytest.mark.parametrize('hora,dias', [
+        (time(8, 0), []), (time(10, 0), None), (time(8, 0), [5, 6]), (time(8, 0), [0]), (time(8, 0), [9]),
+    ])
+    def test_copia_de_la_migracion(self, hora, dias):
+        """Test: La copia congelada en 0005_recordatorio_next_fire_at coincide con DateUtils."""
+        migracion = importlib.import_module('consumos.migrations.0005_recordatorio_next_fire_at')
+        desde = _aware(2026, 3, 2, 9, 0)
+        assert migracion.proxima_ocurrencia(hora, dias, desde) == DateUtils.get_next_occurrence(hora, dias, desde)
+
+
+@pytest.mark.django_db
+class TestReminderScheduler:
+    """Tests del scheduler."""
+
+    @pytest.fixture(autouse=True)
+    def limpiar_sender(self):
+        RecordingSender.enviados = []
+
+    def _recordatorio(self, user, hora='08:00', **kwargs):
+        return Recordatorio.objects.create(usuario=user, hora=hora, mensaje='Agua', **kwargs)
+
+    def test_save_calcula_next_fire_at(self, user):
+        """Test: Al guardar se precalcula el próximo envío."""
+        recordatorio = self._recordatorio(user)
+        assert recordatorio.next_fire_at == recordatorio.get_proximo_envio()
+        assert recordatorio.next_fire_at > timezone.now()
+
+    def test_inactivo_sin_next_fire_at(self, user):
+        """Test: Desactivar un recordatorio lo saca del índice."""
+        recordatorio = self._recordatorio(user)
+        recordatorio.activo = False
+        recordatorio.save(update_fields=['activo'])
+        recordatorio.refresh_from_db()
+        assert recordatorio.next_fire_at is None
+
+    def test_tick_despacha_solo_vencidos(self, user):
+        """Test: Solo se envían los vencidos y se adelanta su próximo envío."""
+        vencido = self._recordatorio(user, hora='08:00')
+        futuro = self._recordatorio(user, hora='09:00')
+        ahora = timezone.now()
+        Recordatorio.objects.filter(id=vencido.id).update(next_fire_at=ahora - timedelta(minutes=1))
+        Recordatorio.objects.filter(id=futuro.id).update(next_fire_at=ahora + timedelta(hours=1))
+
+        procesados = ReminderScheduler(sender=RecordingSender()).tick(now=ahora)
+
+        assert procesados == 1
+        assert RecordingSender.enviados == [vencido.id]
+        vencido.refresh_from_db()
+        assert vencido.ultimo_enviado == ahora
+        assert vencido.next_fire_at > ahora
+
+    def test_tick_en_lotes(self, user):
+        """Test: Los vencidos se procesan en varios lotes."""
+        ahora = timezone.now()
+        for minuto in range(5):
+            self._recordatorio(user, hora=f'08:0{minuto}')
+        Recordatorio.objects.update(next_fire_at=ahora - timedelta(minutes=1))
+
+        procesados = ReminderScheduler(sender=RecordingSender(), batch_size=2).tick(now=ahora)
+
+        assert procesados == 5
+        assert len(set(RecordingSender.enviados)) == 5
+        assert not Recordatorio.objects.filter(next_fire_at__lte=ahora).exists()
+
+    def test_consultas_no_dependen_del_total(self, user):
+        """Test: Un tick sin vencidos no recorre la tabla."""
+        for minuto in range(30):
+            self._recordatorio(user, hora=f'10:{minuto:02d}')
+        with CaptureQueriesContext(connection) as ctx:
+            procesados = ReminderScheduler(sender=RecordingSender()).tick(now=_aware(2000, 1, 1, 0, 0))
+        assert procesados == 0
+        selects = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('SELECT')]
+        assert len(selects) == 1
+        assert 'next_fire_at' in selects[0]
+
+    def test_fallo_del_sender_no_marca_enviado(self, user):
+        """Test: Si el sender falla se adelanta el envío pero sin ultimo_enviado."""
+        class FailingSender:
+            def send_batch(self, recordatorios):
+                raise ConnectionError('sin red')
+
+        recordatorio = self._recordatorio(user)
+        ahora = timezone.now()
+        Recordatorio.objects.update(next_fire_at=ahora - timedelta(minutes=1))
+        assert ReminderScheduler(sender=FailingSender()).tick(now=ahora) == 1
+        recordatorio.refresh_from_db()
+        assert recordatorio.ultimo_enviado is None
+        assert recordatorio.next_fire_at > ahora
+
+    def test_fallo_del_sender_reintenta(self, user):
+        """Test: Los no enviados se reintentan tras el retraso; los enviados avanzan."""
+        class PartialSender:
+            def send_batch(self, recordatorios):
+                return [r for r in recordatorios if r.id == enviado.id]
+
+        enviado = self._recordatorio(user, hora='08:00')
+        fallido = self._recordatorio(user, hora='08:01')
+        ahora = timezone.now()
+        Recordatorio.objects.update(next_fire_at=ahora - timedelta(minutes=1))
+        scheduler = ReminderScheduler(sender=PartialSender(), skip_on_track=False, retry_seconds=60)
+        assert scheduler.tick(now=ahora) == 2
+
+        fallido.refresh_from_db()
+        assert fallido.ultimo_enviado is None
+        assert fallido.next_fire_at == min(ahora + timedelta(seconds=60), fallido.get_proximo_envio(desde=ahora))
+        enviado.refresh_from_db()
+        assert enviado.ultimo_enviado == ahora
+        assert enviado.next_fire_at == enviado.get_proximo_envio(desde=ahora)
+
+        # En el siguiente tick tras el retraso vuelve a intentarse
+        RecordingSender.enviados = []
+        ReminderScheduler(sender=RecordingSender(), skip_on_track=False).tick(now=ahora + timedelta(seconds=61))
+        assert fallido.id in RecordingSender.enviados
+
+    @override_settings(REMINDER_SENDER='tests.test_reminder_scheduler.RecordingSender')
+    def test_comando(self, user):
+        """Test: El comando usa el sender configurado."""
+        recordatorio = self._recordatorio(user)
+        Recordatorio.objects.update(next_fire_at=timezone.now() - timedelta(minutes=1))
+        call_command('dispatch_reminders')
+        assert RecordingSender.enviados == [recordatorio.id]
@@ -0,0 +1,82 @@
+"""
+Tests para el dimensionado de gunicorn (hydrotracker.server_tuning).
+"""
+import gc
+
+from hydrotracker.server_tuning import cgroup_cpu_quota, cpu_limit, memory_limit_mb, plan
+from hydrotracker.warmup import warm_shared, warm_worker
+
+
+class TestPlan:
+    """Tests del cálculo de workers e hilos."""
+
+    def test_gthread_por_defecto(self):
+        """Test: Sin variables se usan hilos y CPU + 1 workers."""
+        result = plan(env={}, cpus=4, memory_mb=8192)
+        assert result['mode'] == 'wsgi'
+        assert result['worker_class'] == 'gthread'
+        assert result['workers'] == 5
+        assert result['threads'] == 4
+
+    def test_sync_y_asgi(self):
+        """Test: sync usa 2 * CPU + 1 workers y asgi uno por CPU."""
+        sync = plan(env={'GUNICORN_THREADS': '1'}, cpus=4, memory_mb=8192)
+        assert (sync['worker_class'], sync['workers'], sync['threads']) == ('sync', 9, 1)
+
+        asgi = plan(env={'SERVER_MODE': 'asgi'}, cpus=4, memory_mb=8192)
+        assert (asgi['worker_class'], asgi['workers'], asgi['threads']) == ('uvicorn_worker.UvicornWorker', 4, 1)
+
+    def test_memoria_acota_workers(self):
+        """Test: Los workers no superan el presupuesto de memoria (mínimo 1)."""
+        assert plan(env={'GUNICORN_THREADS': '1'}, cpus=8, memory_mb=1024)['workers'] == 5
+        assert plan(env={}, cpus=8, memory_mb=100)['workers'] == 1
+
+    def test_web_concurrency_anula_el_calculo(self):
+        """Test: WEB_CONCURRENCY fija los workers aunque no entren en memoria."""
+        assert plan(env={'WEB_CONCURRENCY': '6'}, cpus=1, memory_mb=256)['workers'] == 6
+
+
+class TestLimites:
+    """Tests de lectura de límites del cgroup."""
+
+    def test_cgroup_v2(self, tmp_path):
+        """Test: Se leen cpu.max y memory.max."""
+        (tmp_path / 'cpu.max').write_text('150000 100000\n')
+        (tmp_path / 'memory.max').write_text(str(512 * 1024 * 1024))
+        meminfo = tmp_path / 'meminfo'
+        meminfo.write_text('MemTotal: 16384000 kB\nMemAvailable: 8192000 kB\n')
+
+        assert cgroup_cpu_quota(str(tmp_path)) == 1.5
+        assert cpu_limit(str(tmp_path)) <= 2
+        assert memory_limit_mb(str(tmp_path), str(meminfo)) == 512
+
+    def test_cgroup_v1_sin_limite(self, tmp_path):
+        """Test: En cgroup v1 sin límite se usa MemAvailable."""
+        (tmp_path / 'cpu').mkdir()
+        (tmp_path / 'cpu' / 'cpu.cfs_quota_us').write_text('-1')
+        (tmp_path / 'cpu' / 'cpu.cfs_period_us').write_text('100000')
+        (tmp_path / 'memory').mkdir()
+        (tmp_path / 'memory' / 'memory.limit_in_bytes').write_text(str(1 << 62))
+        meminfo = tmp_path / 'meminfo'
+        meminfo.write_text('MemAvailable: 2048000 kB\n')
+
+        assert cgroup_cpu_quota(str(tmp_path)) is None
+        assert memory_limit_mb(str(tmp_path), str(meminfo)) == 2000
+
+
+class TestWarmup:
+    """Tests de los hooks de precalentamiento."""
+
+    def test_warm_shared_y_worker(self, db, monkeypatch):
+        """Test: Los hooks cargan la aplicación y el worker no abre conexiones en su hilo."""
+        from django.db.backends.base.base import BaseDatabaseWrapper
+
+        try:
+            warm_shared()
+            assert gc.get_freeze_count() > 0
+        finally:
+            gc.unfreeze()
+        abiertas = []
+        monkeypatch.setattr(BaseDatabaseWrapper, 'ensure_connection', lambda self: abiertas.append(self.alias))
+        warm_worker()
+        assert abiertas == []
@@ -0,0 +1,87 @@
+"""
+Tests para la proyección ?fields= en las lecturas DRF.
+"""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+
+from actividades.models import Actividad
+from consumos.models import Bebida, Consumo, Recipiente
+
+
+def _consumo_selects(ctx):
+    return [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('SELECT') and 'consumos_consumo' in q['sql']]
+
+
+@pytest.mark.django_db
+class TestSparseFields:
+    """Tests de SparseFieldsMixin."""
+
+    @pytest.fixture
+    def consumo(self, user):
+        bebida, _ = Bebida.objects.get_or_create(
+            nombre='Agua Test Sparse', defaults={'factor_hidratacion': 1.0, 'es_agua': True}
+        )
+        recipiente = Recipiente.objects.create(usuario=user, nombre='Jarra', cantidad_ml=750)
+        return Consumo.objects.create(
+            usuario=user, bebida=bebida, recipiente=recipiente, cantidad_ml=250,
+            fecha_hora=timezone.now(), notas='nota larga'
+        )
+
+    def test_retrieve_proyectado(self, authenticated_client, consumo):
+        """Test: El detalle solo devuelve y consulta los campos pedidos."""
+        with CaptureQueriesContext(connection) as ctx:
+            response = authenticated_client.get(
+                f'/api/consumos/{consumo.id}/?fields=id,cantidad_ml,hora_formateada'
+            )
+        assert response.status_code == status.HTTP_200_OK
+        assert set(response.json()) == {'id', 'cantidad_ml', 'hora_formateada'}
+        sql = _consumo_selects(ctx)[-1]
+        assert '"notas"' not in sql
+        assert 'JOIN' not in sql
+
+    def test_retrieve_con_relacion(self, authenticated_client, consumo):
+        """Test: Los campos de relaciones solo unen la tabla necesaria."""
+        with CaptureQueriesContext(connection) as ctx:
+            response = authenticated_client.get(
+                f'/api/consumos/{consumo.id}/?fields=bebida_nombre,recipiente_nombre'
+            )
+        assert response.json() == {'bebida_nombre': 'Agua Test Sparse', 'recipiente_nombre': 'Jarra'}
+        sql = _consumo_selects(ctx)[-1]
+        assert 'consumos_bebida' in sql
+        assert 'users_user' not in sql
+        assert '"factor_hidratacion"' not in sql
+
+    def test_sin_fields_respuesta_completa(self, authenticated_client, consumo):
+        """Test: Sin ?fields= la respuesta no cambia y no se une usuario."""
+        with CaptureQueriesContext(connection) as ctx:
+            response = authenticated_client.get(f'/api/consumos/{consumo.id}/')
+        assert response.json()['notas'] == 'nota larga'
+        assert 'recipiente_nombre' in response.json()
+        assert 'users_user' not in _consumo_selects(ctx)[-1]
+
+    def test_campos_desconocidos_se_ignoran(self, authenticated_client, consumo):
+        """Test: Si ningún campo existe se devuelve la representación completa."""
+        response = authenticated_client.get(f'/api/consumos/{consumo.id}/?fields=inexistente')
+        assert 'cantidad_ml' in response.json()
+
+    def test_lista_recipientes(self, authenticated_client, consumo):
+        """Test: La lista de recipientes también admite proyección."""
+        response = authenticated_client.get('/api/recipientes/?fields=nombre,hidratacion_efectiva_ml')
+        assert response.status_code == status.HTTP_200_OK
+        for item in response.json()['results']:
+            assert set(item) == {'nombre', 'hidratacion_efectiva_ml'}
+
+    def test_retrieve_actividad(self, authenticated_client, user):
+        """Test: Los displays se resuelven a su columna."""
+        actividad = Actividad.objects.create(
+            usuario=user, tipo_actividad='correr', duracion_minutos=30,
+            intensidad='alta', pse_calculado=600
+        )
+        response = authenticated_client.get(
+            f'/api/actividades/{actividad.id}/?fields=tipo_actividad_display,usuario'
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {'tipo_actividad_display': actividad.get_tipo_actividad_display(), 'usuario': user.id}
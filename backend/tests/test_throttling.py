@@ -0,0 +1,73 @@
+"""
+Tests para el throttling por token bucket.
+"""
+import pytest
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from hydrotracker import throttling
+from hydrotracker.throttling import LocalTokenBuckets
+
+LOGIN_URL = '/api/users/login/'
+
+
+class TestLocalTokenBuckets:
+    """Tests del bucket en memoria."""
+
+    def test_rafaga_y_recarga(self, monkeypatch):
+        """Test: Se permiten `capacidad` peticiones seguidas y luego una por intervalo."""
+        ahora = [1000.0]
+        monkeypatch.setattr(throttling.time, 'monotonic', lambda: ahora[0])
+        buckets = LocalTokenBuckets()
+
+        assert [buckets.consume('k', 3, 0.1)[0] for _ in range(4)] == [True, True, True, False]
+        allowed, wait = buckets.consume('k', 3, 0.1)
+        assert not allowed and wait == pytest.approx(10)
+
+        ahora[0] += 10
+        assert buckets.consume('k', 3, 0.1)[0]
+        assert not buckets.consume('k', 3, 0.1)[0]
+        # Otra clave tiene su propio bucket
+        assert buckets.consume('otra', 3, 0.1)[0]
+
+    def test_memoria_acotada(self):
+        """Test: Con el máximo de claves se descartan las menos usadas."""
+        buckets = LocalTokenBuckets(max_keys=2)
+        for key in ('a', 'b', 'c'):
+            buckets.consume(key, 1, 1)
+        assert list(buckets._buckets) == ['b', 'c']
+
+
+@pytest.mark.django_db
+class TestTokenBucketThrottles:
+    """Tests de los throttles en las vistas."""
+
+    def test_login_limita_la_rafaga(self, api_client, user):
+        """Test: El scope login corta tras la ráfaga configurada con Retry-After."""
+        data = {'email': user.email, 'password': 'incorrecta'}
+        codes = [api_client.post(LOGIN_URL, data, format='json').status_code for _ in range(6)]
+        assert status.HTTP_429_TOO_MANY_REQUESTS not in codes[:5]
+        assert codes[5] == status.HTTP_429_TOO_MANY_REQUESTS
+
+        response = api_client.post(LOGIN_URL, data, format='json')
+        assert int(response['Retry-After']) > 0
+
+    def test_export_por_plan(self, authenticated_client, premium_user, settings):
+        """Test: El scope de exportación depende del plan del usuario."""
+        settings.THROTTLE_BURSTS = {'export': 1, 'export_premium': 2}
+        url = '/api/export/?format=json'
+        assert authenticated_client.get(url).status_code == status.HTTP_200_OK
+        assert authenticated_client.get(url).status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+        premium_client = APIClient()
+        premium_client.force_authenticate(premium_user)
+        codes = [premium_client.get(url).status_code for _ in range(3)]
+        assert codes == [status.HTTP_200_OK, status.HTTP_200_OK, status.HTTP_429_TOO_MANY_REQUESTS]
+
+    def test_redis_caido_usa_buckets_locales(self, authenticated_client, settings):
+        """Test: Si Redis no responde el throttling sigue funcionando en memoria."""
+        settings.USE_REDIS = True
+        settings.THROTTLE_BURSTS = {'export': 1}
+        url = '/api/export/?format=json'
+        assert authenticated_client.get(url).status_code == status.HTTP_200_OK
+        assert authenticated_client.get(url).status_code == status.HTTP_429_TOO_MANY_REQUESTS
@@ -0,0 +1,107 @@
+"""
+Tests para el timing wheel y el motor de recordatorios en memoria.
+"""
+import random
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.utils import timezone
+
+from consumos.models import Recordatorio
+from consumos.services.timing_wheel import ReminderEntry, ReminderWheelEngine, TimingWheel
+
+
+class RecordingSender:
+    """Sender de prueba que guarda los ids enviados."""
+
+    def __init__(self):
+        self.enviados = []
+
+    def send_batch(self, recordatorios):
+        self.enviados.extend(r.id for r in recordatorios)
+        return recordatorios
+
+
+class TestTimingWheel:
+    """Tests de la estructura del wheel."""
+
+    def test_vence_en_su_tick(self):
+        """Test: Una entrada vence al llegar su tick y no antes."""
+        wheel = TimingWheel(tick=0.1, start=1000.0)
+        wheel.add(ReminderEntry(1000.55, 1, 1, ''))
+        assert wheel.advance(1000.4) == []
+        assert [e.id for e in wheel.advance(1000.6)] == [1]
+        assert len(wheel) == 0
+
+    def test_entrada_vencida_sale_en_el_proximo_advance(self):
+        """Test: Una entrada en el pasado se entrega de inmediato."""
+        wheel = TimingWheel(tick=0.1, start=1000.0)
+        wheel.add(ReminderEntry(990.0, 1, 1, ''))
+        assert [e.id for e in wheel.advance(1000.0)] == [1]
+
+    def test_cascada_entre_niveles(self):
+        """Test: Entradas lejanas (horas, desborde) bajan de nivel y vencen a tiempo."""
+        tick = 0.1
+        start = 1_000_000.0
+        wheel = TimingWheel(tick=tick, slots=(10, 6, 4), start=start)
+        rng = random.Random(7)
+        fire_times = {i: start + rng.uniform(0, 50) for i in range(500)}
+        for i, fire_at in fire_times.items():
+            wheel.add(ReminderEntry(fire_at, i, i, ''))
+
+        vencidas = {}
+        now = start
+        while now < start + 51:
+            now += tick
+            for entry in wheel.advance(now):
+                vencidas[entry.id] = now
+        assert set(vencidas) == set(fire_times)
+        for i, momento in vencidas.items():
+            assert fire_times[i] <= momento + 1e-6 < fire_times[i] + 2 * tick
+        assert len(wheel) == 0
+
+
+@pytest.mark.django_db
+class TestReminderWheelEngine:
+    """Tests del motor con la base de datos."""
+
+    def _recordatorios(self, user, cantidad, fire_at):
+        for minuto in range(cantidad):
+            Recordatorio.objects.create(usuario=user, hora=f'07:{minuto:02d}', mensaje=f'R{minuto}')
+        Recordatorio.objects.update(next_fire_at=fire_at)
+
+    def test_carga_reclama_y_despacha(self, user):
+        """Test: Se cargan los del horizonte, se adelanta next_fire_at y se envían."""
+        ahora = timezone.now()
+        self._recordatorios(user, 3, ahora + timedelta(seconds=10))
+        lejano = Recordatorio.objects.create(usuario=user, hora='23:59', mensaje='Lejano')
+        Recordatorio.objects.filter(id=lejano.id).update(next_fire_at=ahora + timedelta(hours=2))
+
+        sender = RecordingSender()
+        engine = ReminderWheelEngine(sender=sender, jitter=5.0, now=ahora)
+        assert engine.load(ahora) == 3
+        # Checkpoint: lo cargado ya no está vencido en la base
+        assert not Recordatorio.objects.filter(next_fire_at__lte=ahora + timedelta(minutes=2)).exists()
+
+        assert engine.run_pending(ahora + timedelta(seconds=5)) == 0
+        assert engine.run_pending(ahora + timedelta(seconds=16)) == 3
+        assert len(sender.enviados) == 3
+        assert Recordatorio.objects.filter(ultimo_enviado__isnull=False).count() == 3
+
+    def test_reinicio_no_reenvia(self, user):
+        """Test: Un segundo motor no vuelve a cargar lo reclamado por el primero."""
+        ahora = timezone.now()
+        self._recordatorios(user, 2, ahora)
+        ReminderWheelEngine(sender=RecordingSender(), now=ahora).load(ahora)
+        assert ReminderWheelEngine(sender=RecordingSender(), now=ahora).load(ahora) == 0
+
+    def test_concurrencia_acotada(self, user):
+        """Test: Los lotes se envían a través del executor."""
+        ahora = timezone.now()
+        self._recordatorios(user, 5, ahora)
+        sender = RecordingSender()
+        engine = ReminderWheelEngine(sender=sender, jitter=0, batch_size=2, now=ahora)
+        engine.load(ahora)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            assert engine.run_pending(ahora + timedelta(seconds=1), executor) == 5
+        assert sorted(sender.enviados) == sorted(Recordatorio.objects.values_list('id', flat=True))
@@ -0,0 +1,112 @@
+"""
+Tests para los contadores de uso desnormalizados (ContadorUso).
+"""
+import pytest
+from datetime import timedelta
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from consumos.models import Bebida, Consumo, ContadorUso, Recipiente, Recordatorio
+from consumos.services import usage_counters
+
+
+@pytest.mark.django_db
+class TestUsageCounters:
+    """Tests del mantenimiento y la reconciliación de ContadorUso."""
+
+    @pytest.fixture
+    def bebida(self):
+        bebida, _ = Bebida.objects.get_or_create(
+            nombre='Agua Test Contadores', defaults={'factor_hidratacion': 1.0, 'es_agua': True}
+        )
+        return bebida
+
+    def _consumo(self, user, bebida, fecha_hora=None):
+        return Consumo.objects.create(
+            usuario=user, bebida=bebida, cantidad_ml=250,
+            fecha_hora=fecha_hora or timezone.now()
+        )
+
+    def test_altas_y_bajas_ajustan_totales(self, user):
+        """Test: Crear y borrar recordatorios y recipientes ajusta los totales."""
+        recordatorio = Recordatorio.objects.create(usuario=user, hora='09:00', dias_semana=[0])
+        Recordatorio.objects.create(usuario=user, hora='10:00', dias_semana=[0])
+        Recipiente.objects.create(usuario=user, nombre='Taza', cantidad_ml=300)
+        recordatorio.delete()
+
+        contador = ContadorUso.objects.get(pk=user.pk)
+        assert contador.recordatorios == 1
+        assert contador.recipientes == 1
+
+    def test_consumos_del_dia(self, user, bebida):
+        """Test: consumos_hoy cuenta solo el día local y los borrados descuentan."""
+        consumo = self._consumo(user, bebida)
+        self._consumo(user, bebida)
+        self._consumo(user, bebida, timezone.now() - timedelta(days=3))
+        assert usage_counters.get_counters(user.pk)['consumos_hoy'] == 2
+
+        consumo.delete()
+        assert usage_counters.get_counters(user.pk)['consumos_hoy'] == 1
+
+    def test_nuevo_dia_reinicia(self, user, bebida):
+        """Test: El primer consumo de un día nuevo reinicia el contador."""
+        ayer = timezone.now() - timedelta(days=1)
+        self._consumo(user, bebida, ayer)
+        self._consumo(user, bebida, ayer)
+        assert usage_counters.get_counters(user.pk)['consumos_hoy'] == 0
+
+        self._consumo(user, bebida)
+        assert usage_counters.get_counters(user.pk)['consumos_hoy'] == 1
+
+    def test_reconcile_corrige_desajustes(self, user, bebida):
+        """Test: reconcile recupera lo que no pasó por señales."""
+        Recordatorio.objects.create(usuario=user, hora='09:00', dias_semana=[0])
+        Consumo.objects.bulk_create([
+            Consumo(
+                usuario=user, bebida=bebida, cantidad_ml=250,
+                cantidad_hidratacion_efectiva=250, fecha_hora=timezone.now()
+            )
+            for _ in range(3)
+        ])
+        assert usage_counters.get_counters(user.pk)['consumos_hoy'] == 0
+
+        assert usage_counters.reconcile([user.pk]) == 1
+        assert usage_counters.get_counters(user.pk) == {
+            'recordatorios': 1, 'recipientes': 0, 'consumos_hoy': 3
+        }
+        assert usage_counters.reconcile([user.pk]) == 0
+
+    def test_sin_fila_se_recuenta_sin_escribir(self, user, bebida):
+        """Test: Leer sin contador recuenta sin crear la fila; el siguiente alta la crea."""
+        Recordatorio.objects.create(usuario=user, hora='09:00', dias_semana=[0])
+        self._consumo(user, bebida)
+        ContadorUso.objects.filter(pk=user.pk).delete()
+        with CaptureQueriesContext(connection) as queries:
+            assert usage_counters.get_counters(user.pk) == {
+                'recordatorios': 1, 'recipientes': 0, 'consumos_hoy': 1
+            }
+        assert all(q['sql'].startswith('SELECT') for q in queries.captured_queries)
+        assert not ContadorUso.objects.filter(pk=user.pk).exists()
+
+        Recordatorio.objects.create(usuario=user, hora='10:00', dias_semana=[0])
+        assert ContadorUso.objects.get(pk=user.pk).recordatorios == 2
+
+    def test_borrar_usuario(self, user):
+        """Test: El borrado en cascada no deja contadores huérfanos."""
+        Recordatorio.objects.create(usuario=user, hora='09:00', dias_semana=[0])
+        user_id = user.pk
+        user.delete()
+        assert not ContadorUso.objects.filter(pk=user_id).exists()
+
+    def test_comando(self, user, bebida):
+        """Test: reconcile_usage_counters recorre todos los usuarios."""
+        Consumo.objects.bulk_create([
+            Consumo(
+                usuario=user, bebida=bebida, cantidad_ml=250,
+                cantidad_hidratacion_efectiva=250, fecha_hora=timezone.now()
+            )
+        ])
+        call_command('reconcile_usage_counters', chunk_size=1)
+        assert ContadorUso.objects.get(pk=user.pk).consumos_hoy == 1
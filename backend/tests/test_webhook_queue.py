@@ -0,0 +1,173 @@
+"""
+Tests para la cola de webhooks de Mercado Pago, contra un servidor falso.
+"""
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework import status
+
+from api.models import EventoWebhook
+from api.services import WebhookWorker, enqueue_webhook
+from users.models import User
+from tests.fake_mercadopago import FakeMercadoPago
+
+WEBHOOK_URL = '/api/webhooks/mercadopago/'
+
+
+@pytest.fixture
+def fake_mp(settings):
+    server = FakeMercadoPago().start()
+    settings.MP_API_BASE_URL = server.url
+    settings.MP_ACCESS_TOKEN = 'TEST-token'
+    yield server
+    server.stop()
+
+
+@pytest.mark.django_db
+class TestWebhookQueue:
+    """Tests de la recepción y el procesamiento de webhooks."""
+
+    def _preapproval(self, fake_mp, user, preapproval_id='pre-1', estado='authorized', **data):
+        fake_mp.add_preapproval(
+            preapproval_id, status=estado, external_reference=str(user.id),
+            auto_recurring={'frequency': 1, 'frequency_type': 'months'}, **data
+        )
+
+    def test_recepcion_solo_encola(self, api_client, fake_mp, user):
+        """Test: El webhook responde 200 sin consultar Mercado Pago."""
+        self._preapproval(fake_mp, user)
+        response = api_client.post(
+            f'{WEBHOOK_URL}?type=preapproval&data.id=pre-1', {}, format='json'
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()['status'] == 'queued'
+        assert fake_mp.requests == []
+        user.refresh_from_db()
+        assert not user.es_premium
+
+    def test_duplicados_se_deduplican(self, api_client, fake_mp, user):
+        """Test: Los reenvíos del mismo recurso no crean eventos nuevos."""
+        for _ in range(3):
+            api_client.post(WEBHOOK_URL, {'type': 'subscription_preapproval', 'data': {'id': 'pre-1'}}, format='json')
+        api_client.post(f'{WEBHOOK_URL}?type=preapproval&data.id=pre-1', {}, format='json')
+        evento = EventoWebhook.objects.get()
+        assert evento.topic == 'preapproval'
+        assert evento.recibido_veces == 4
+
+        self._preapproval(fake_mp, user)
+        assert WebhookWorker().drain() == 1
+        assert fake_mp.count('/preapproval/pre-1') == 1
+
+    def test_worker_activa_premium(self, fake_mp, user):
+        """Test: El worker consulta el preapproval y activa el premium."""
+        self._preapproval(fake_mp, user)
+        enqueue_webhook('preapproval', 'pre-1')
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            WebhookWorker().drain(executor=executor)
+
+        user.refresh_from_db()
+        assert user.es_premium
+        assert user.plan_type == 'monthly'
+        assert user.preapproval_id == 'pre-1'
+        evento = EventoWebhook.objects.get()
+        assert evento.estado == EventoWebhook.ESTADO_PROCESADO
+        assert evento.resultado == 'activado'
+
+    def test_reproceso_idempotente(self, fake_mp, user):
+        """Test: Una notificación repetida con el mismo recurso no escribe el usuario."""
+        self._preapproval(fake_mp, user, next_payment_date='2030-01-15T10:00:00.000-04:00')
+        enqueue_webhook('preapproval', 'pre-1')
+        WebhookWorker().drain()
+        user.refresh_from_db()
+        assert user.subscription_end_date == date(2030, 1, 15)
+
+        evento, creado = enqueue_webhook('preapproval', 'pre-1')
+        assert not creado and evento.estado == EventoWebhook.ESTADO_PENDIENTE
+        WebhookWorker().drain(now=timezone.now() + timedelta(days=3))
+        user.refresh_from_db()
+        assert user.subscription_end_date == date(2030, 1, 15)
+        assert EventoWebhook.objects.get().resultado == 'ya_activo'
+
+    def test_renovacion_extiende_la_suscripcion(self, fake_mp, user):
+        """Test: Una renovación (nuevo next_payment_date) mueve la fecha de fin."""
+        self._preapproval(fake_mp, user, next_payment_date='2030-01-15T10:00:00.000-04:00')
+        enqueue_webhook('preapproval', 'pre-1')
+        WebhookWorker().drain()
+
+        self._preapproval(fake_mp, user, next_payment_date='2030-02-15T10:00:00.000-04:00')
+        enqueue_webhook('preapproval', 'pre-1')
+        WebhookWorker().drain(now=timezone.now() + timedelta(days=3))
+        user.refresh_from_db()
+        assert user.subscription_end_date == date(2030, 2, 15)
+        assert EventoWebhook.objects.get().resultado == 'renovado'
+
+    def test_sin_fechas_usa_el_ultimo_cobro(self, fake_mp, user):
+        """Test: Sin next_payment_date la fecha de fin es el último cobro más el periodo."""
+        self._preapproval(fake_mp, user, summarized={'last_charged_date': '2030-01-10T09:00:00.000-04:00'})
+        enqueue_webhook('preapproval', 'pre-1')
+        WebhookWorker().drain()
+        user.refresh_from_db()
+        assert user.subscription_end_date == date(2030, 2, 9)
+
+    def test_reautorizar_tras_cancelar_reactiva_renovacion(self, fake_mp, user):
+        """Test: Un preapproval autorizado tras una cancelación vuelve a poner auto_renewal."""
+        self._preapproval(fake_mp, user, next_payment_date='2030-01-15T10:00:00.000-04:00')
+        enqueue_webhook('preapproval', 'pre-1')
+        WebhookWorker().drain()
+        User.objects.filter(pk=user.pk).update(auto_renewal=False)
+
+        enqueue_webhook('preapproval', 'pre-1')
+        WebhookWorker().drain(now=timezone.now() + timedelta(days=3))
+        user.refresh_from_db()
+        assert user.auto_renewal
+        assert user.subscription_end_date == date(2030, 1, 15)
+
+    def test_reintento_con_backoff(self, fake_mp, user):
+        """Test: Un 5xx deja el evento pendiente con backoff hasta que responde."""
+        self._preapproval(fake_mp, user)
+        fake_mp.fail('/preapproval/pre-1', times=1, status=503)
+        enqueue_webhook('preapproval', 'pre-1')
+
+        WebhookWorker().drain()
+        evento = EventoWebhook.objects.get()
+        assert evento.estado == EventoWebhook.ESTADO_PENDIENTE
+        assert evento.intentos == 1
+        assert evento.proximo_intento > timezone.now()
+
+        WebhookWorker().drain(now=evento.proximo_intento)
+        evento.refresh_from_db()
+        assert evento.estado == EventoWebhook.ESTADO_PROCESADO
+        user.refresh_from_db()
+        assert user.es_premium
+
+    def test_maximo_de_intentos(self, fake_mp, user):
+        """Test: Tras el máximo de intentos el evento queda en error."""
+        fake_mp.fail('/v1/payments/pay-1', times=5, status=500)
+        enqueue_webhook('payment', 'pay-1')
+        worker = WebhookWorker(max_attempts=2)
+        worker.drain()
+        worker.drain(now=timezone.now() + timedelta(days=1))
+        assert EventoWebhook.objects.get().estado == EventoWebhook.ESTADO_ERROR
+
+    def test_pago_lifetime_y_cancelacion(self, fake_mp, user):
+        """Test: Pago aprobado activa lifetime; preapproval cancelado quita la renovación."""
+        fake_mp.add_payment('pay-1', status='approved', external_reference=str(user.id))
+        self._preapproval(fake_mp, user, 'pre-2', estado='cancelled')
+        enqueue_webhook('payment', 'pay-1')
+        enqueue_webhook('preapproval', 'pre-2')
+        call_command('process_webhooks')
+
+        user.refresh_from_db()
+        assert user.es_premium
+        assert user.plan_type == 'lifetime'
+        assert not user.auto_renewal
+
+    def test_pago_inexistente(self, fake_mp, user):
+        """Test: Un pago 404 se da por procesado sin reintentos."""
+        enqueue_webhook('payment', 'pay-404')
+        WebhookWorker().drain()
+        evento = EventoWebhook.objects.get()
+        assert evento.estado == EventoWebhook.ESTADO_PROCESADO
+        assert evento.resultado == 'pago_no_encontrado'
@@ -0,0 +1,113 @@
+"""
+Autenticación JWT con el usuario en caché.
+
+JWTAuthentication consulta la fila del usuario en cada petición. Para los
+accesos autenticados CachedJWTAuthentication la reconstruye desde una
+instantánea compacta en caché (id, estado premium, datos para la meta y la
+meta calculada), validada contra la versión 'perfil' del usuario: cualquier
+cambio del perfil (post_save/post_delete o los update() que la actualizan a
+mano) la invalida. La versión y la instantánea se leen en una sola
+operación de caché.
+
+El usuario devuelto es un CachedUser con el resto de campos diferidos: la
+primera vista que necesite otro campo carga el modelo completo con una
+consulta.
+"""
+import logging
+from datetime import date
+
+from django.utils import timezone
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from consumos.utils.cache_utils import CacheManager, ResourceVersion
+from .models import CachedUser, User
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FIELDS = frozenset({
+    'id', 'username', 'email', 'is_active', 'es_premium', 'subscription_end_date',
+    'peso', 'edad', 'fecha_nacimiento', 'es_fragil_o_insuficiencia_cardiaca', 'meta_diaria_ml',
+})
+# En el orden de los campos del modelo, como espera Model.from_db
+_FIELDS = [field for field in User._meta.concrete_fields if field.attname in SNAPSHOT_FIELDS]
+SNAPSHOT_TIMEOUT = 3600
+
+
+def snapshot_key(user_id):
+    return CacheManager.get_cache_key('user_snapshot', user_id)
+
+
+def build_snapshot(user, version):
+    """
+    Instantánea serializable (también con el serializer JSON de Redis).
+    """
+    values = []
+    for field in _FIELDS:
+        value = field.value_from_object(user)
+        values.append(value.isoformat() if isinstance(value, date) else value)
+    return {
+        'version': version,
+        'values': values,
+        'meta': [timezone.localdate().isoformat(), user.calcular_meta_hidratacion()],
+    }
+
+
+def load_cached_user(user_id):
+    """
+    CachedUser de la instantánea vigente, o None si no hay o está vencida.
+    """
+    version_key = ResourceVersion.get_key('perfil', user_id)
+    key = snapshot_key(user_id)
+    try:
+        found = ResourceVersion.get_cache().get_many([version_key, key])
+    except Exception as e:
+        logger.error(f'Error leyendo instantánea del usuario {user_id}: {e}')
+        return None
+    snapshot = found.get(key)
+    if not snapshot or found.get(version_key) is None or snapshot['version'] != found[version_key]:
+        return None
+    user = CachedUser.from_db(
+        'default',
+        [field.attname for field in _FIELDS],
+        [None if value is None else field.to_python(value) for field, value in zip(_FIELDS, snapshot['values'])],
+    )
+    user._meta_hoy = (date.fromisoformat(snapshot['meta'][0]), snapshot['meta'][1])
+    return user
+
+
+def store_snapshot(user, version):
+    try:
+        ResourceVersion.get_cache().set(
+            snapshot_key(user.pk), build_snapshot(user, version), timeout=SNAPSHOT_TIMEOUT
+        )
+    except Exception as e:
+        logger.error(f'Error guardando instantánea del usuario {user.pk}: {e}')
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication que toma el usuario de la instantánea en caché.
+    """
+
+    def get_user(self, validated_token):
+        # La revocación por cambio de contraseña necesita el hash de la fila
+        if jwt_settings.CHECK_REVOKE_TOKEN:
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+
+        user = load_cached_user(user_id)
+        if user is not None:
+            if not user.is_active:
+                raise AuthenticationFailed('User is inactive', code='user_inactive')
+            return user
+
+        # Versión leída antes que la fila: un cambio intermedio deja la instantánea vencida
+        version = ResourceVersion.get_many(['perfil'], user_id)['perfil']
+        user = super().get_user(validated_token)
+        store_snapshot(user, version)
+        return user
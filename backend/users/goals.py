@@ -0,0 +1,121 @@
+"""
+Meta de hidratación diaria (fórmula de User.calcular_meta_hidratacion).
+
+La meta solo depende del perfil (peso, fecha de nacimiento o edad guardada,
+fragilidad y la meta almacenada como respaldo) y de la fecha, por la edad.
+meta_hidratacion la memoiza con esa clave: se calcula una vez por perfil y
+día aunque la pidan el serializer, las vistas y los servicios en la misma
+petición, y un cambio de perfil produce otra clave sin invalidar nada.
+
+metas_hidratacion calcula la meta de muchos usuarios a la vez para los jobs
+(numpy si está instalado, la función memoizada si no).
+"""
+from functools import lru_cache
+
+from django.utils import timezone
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy es opcional
+    np = None
+
+META_POR_DEFECTO = 2000
+META_MINIMA = 500
+META_MAXIMA = 10000
+# El 20% del agua se obtiene de los alimentos
+FACTOR_BEBIDA = 0.80
+
+# Campos del usuario que usa la fórmula
+GOAL_FIELDS = ('peso', 'fecha_nacimiento', 'edad', 'es_fragil_o_insuficiencia_cardiaca', 'meta_diaria_ml')
+
+
+def edad_en(fecha_nacimiento, fecha):
+    """
+    Años cumplidos en ``fecha``.
+    """
+    edad = fecha.year - fecha_nacimiento.year
+    if (fecha.month, fecha.day) < (fecha_nacimiento.month, fecha_nacimiento.day):
+        edad -= 1
+    return edad
+
+
+def _ml_por_kg(peso_kg, edad, es_fragil):
+    # NIÑOS Y BEBES (0-13 años)
+    if edad <= 13:
+        if peso_kg <= 10:
+            return 100
+        if peso_kg <= 20:
+            return 50
+        return 20
+    # ADOLESCENTES Y ADULTOS (14-65 años): 14-50 promedio 32.5, 51-65 promedio 27.5
+    if edad <= 65:
+        return 32.5 if edad <= 50 else 27.5
+    # ADULTOS MAYORES (>65 años): frágil o con insuficiencia cardíaca 20, saludable 25
+    return 20 if es_fragil else 25
+
+
+@lru_cache(maxsize=8192)
+def meta_hidratacion(peso, fecha_nacimiento, edad, es_fragil, meta_almacenada, fecha):
+    """
+    Meta en ml para un perfil en una fecha. ``edad`` es la edad guardada,
+    que solo se usa sin fecha de nacimiento (datos antiguos).
+    """
+    respaldo = meta_almacenada or META_POR_DEFECTO
+    if not peso or peso <= 0:
+        return respaldo
+    edad_actual = edad_en(fecha_nacimiento, fecha) if fecha_nacimiento else edad
+    if not edad_actual or edad_actual <= 0:
+        return respaldo
+
+    meta = int(peso * _ml_por_kg(peso, edad_actual, es_fragil))
+    meta = int(meta * FACTOR_BEBIDA)
+    meta = max(META_MINIMA, min(meta, META_MAXIMA))
+    return meta or respaldo
+
+
+def meta_para_usuario(user, fecha=None):
+    """
+    Meta del usuario para ``fecha`` (por defecto hoy en TIME_ZONE, no la
+    fecha del sistema operativo).
+    """
+    return meta_hidratacion(
+        user.peso,
+        user.fecha_nacimiento,
+        user.edad,
+        bool(user.es_fragil_o_insuficiencia_cardiaca),
+        user.meta_diaria_ml,
+        fecha or timezone.localdate(),
+    )
+
+
+def metas_hidratacion(perfiles, fecha=None):
+    """
+    Metas de varios perfiles, en el mismo orden. ``perfiles`` son tuplas con
+    los valores de GOAL_FIELDS (por ejemplo de ``values_list(*GOAL_FIELDS)``).
+    """
+    fecha = fecha or timezone.localdate()
+    perfiles = list(perfiles)
+    if np is None or not perfiles:
+        return [
+            meta_hidratacion(peso, nacimiento, edad, bool(fragil), almacenada, fecha)
+            for peso, nacimiento, edad, fragil, almacenada in perfiles
+        ]
+
+    peso = np.array([p[0] or 0 for p in perfiles], dtype=float)
+    edad = np.array(
+        [edad_en(p[1], fecha) if p[1] else (p[2] or 0) for p in perfiles], dtype=float
+    )
+    fragil = np.array([bool(p[3]) for p in perfiles])
+    respaldo = np.array([p[4] or META_POR_DEFECTO for p in perfiles], dtype=np.int64)
+
+    ninos = edad <= 13
+    ml_por_kg = np.select(
+        [ninos & (peso <= 10), ninos & (peso <= 20), ninos, edad <= 50, edad <= 65, fragil],
+        [100, 50, 20, 32.5, 27.5, 20],
+        default=25,
+    )
+    meta = np.trunc(peso * ml_por_kg)
+    meta = np.trunc(meta * FACTOR_BEBIDA).astype(np.int64)
+    meta = np.clip(meta, META_MINIMA, META_MAXIMA)
+    meta = np.where((peso <= 0) | (edad <= 0), respaldo, meta)
+    return meta.tolist()
@@ -1,10 +1,12 @@
 """
 Comando de Django para verificar y desactivar suscripciones premium expiradas.
-Este comando debe ejecutarse periódicamente (ej: con cron o Celery) para limpiar usuarios vencidos.
+Este comando debe ejecutarse periódicamente (ej: con cron o Celery) para limpiar usuarios vencidos,
+o de forma continua con --loop como worker.
 """
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from users.models import User
+from users.services import expire_subscriptions, run_expiry_worker
 
 
 class Command(BaseCommand):
@@ -16,10 +18,32 @@ class Command(BaseCommand):
             action='store_true',
             help='Ejecuta el comando sin hacer cambios reales (solo muestra qué haría)',
         )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Usuarios desactivados por UPDATE',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Ejecutar de forma continua (worker)',
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=300,
+            help='Segundos entre ejecuciones con --loop',
+        )
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
         now = timezone.now().date()
+
+        if options['loop'] and not dry_run:
+            self.stdout.write('Worker de expiración de suscripciones iniciado')
+            run_expiry_worker(interval=options['interval'], chunk_size=options['chunk_size'])
+            return
         
         # Buscar usuarios premium con subscription_end_date vencida
         expired_users = User.objects.filter(
@@ -29,42 +53,34 @@ class Command(BaseCommand):
             subscription_end_date__isnull=True
         )
         
-        count = expired_users.count()
-        
-        if count == 0:
-            self.stdout.write(
-                self.style.SUCCESS('No se encontraron usuarios con suscripciones expiradas.')
-            )
-            return
-        
         if dry_run:
+            count = expired_users.count()
+            if count == 0:
+                self.stdout.write(
+                    self.style.SUCCESS('No se encontraron usuarios con suscripciones expiradas.')
+                )
+                return
             self.stdout.write(
                 self.style.WARNING(
                     f'[DRY RUN] Se encontrarían {count} usuario(s) con suscripción expirada:'
                 )
             )
-            for user in expired_users:
+            for user in expired_users.only('username', 'email', 'subscription_end_date'):
                 self.stdout.write(
                     f'  - {user.username} ({user.email}) - Expiró: {user.subscription_end_date}'
                 )
             return
-        
-        # Desactivar usuarios expirados
-        updated_count = 0
-        for user in expired_users:
-            user.es_premium = False
-            user.preapproval_id = None
-            user.save(update_fields=['es_premium', 'preapproval_id'])
-            updated_count += 1
+
+        # Desactivación por lotes con UPDATE ... RETURNING (sin save() por fila)
+        expired_ids = expire_subscriptions(today=now, chunk_size=options['chunk_size'])
+        if not expired_ids:
             self.stdout.write(
-                self.style.SUCCESS(
-                    f'Usuario "{user.username}" ({user.email}) desactivado. '
-                    f'Fecha de expiración: {user.subscription_end_date}'
-                )
+                self.style.SUCCESS('No se encontraron usuarios con suscripciones expiradas.')
             )
-        
+            return
+
         self.stdout.write(
             self.style.SUCCESS(
-                f'\n✅ Proceso completado: {updated_count} usuario(s) desactivado(s).'
+                f'\n✅ Proceso completado: {len(expired_ids)} usuario(s) desactivado(s).'
             )
         )
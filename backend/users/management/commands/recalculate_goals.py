@@ -0,0 +1,45 @@
+"""
+Comando de Django para recalcular la meta diaria (meta_diaria_ml) de todos
+los usuarios. Debe ejecutarse tras desplegar un cambio en la fórmula de
+users.goals, en lugar de una migración de datos con save() por usuario.
+"""
+from django.core.management.base import BaseCommand
+
+from users.services import recalculate_goals
+
+
+class Command(BaseCommand):
+    help = 'Recalcula por lotes la meta de hidratación de todos los usuarios'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Ejecuta el comando sin hacer cambios reales (solo cuenta las metas que cambiarían)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help='Usuarios por bloque',
+        )
+        parser.add_argument(
+            '--start-after',
+            type=int,
+            default=0,
+            help='Retomar a partir del usuario con id mayor que este',
+        )
+
+    def handle(self, *args, **options):
+        resultado = recalculate_goals(
+            chunk_size=options['chunk_size'],
+            start_after=options['start_after'],
+            dry_run=options['dry_run'],
+        )
+        prefijo = '[DRY RUN] ' if options['dry_run'] else ''
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{prefijo}Metas actualizadas: {resultado["actualizados"]} de {resultado["usuarios"]} '
+                f'usuarios (último usuario {resultado["ultimo_usuario_id"]}).'
+            )
+        )
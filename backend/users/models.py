@@ -1,10 +1,13 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 from datetime import date
 import secrets
 import string
 
+from .goals import meta_para_usuario
+
 
 class User(AbstractUser):
     """
@@ -218,6 +221,20 @@ class User(AbstractUser):
         """Verifica si el usuario tiene una recompensa disponible (3 referidos verificados)."""
         return self.obtener_referidos_pendientes() >= 3
 
+    def tiene_premium_vigente(self, fecha=None):
+        """
+        Indica si el premium sigue vigente en la fecha dada (por defecto hoy),
+        sin escribir en la base. Los usuarios vencidos los desactiva el job
+        de expiración (users.services.expire_subscriptions).
+        """
+        from django.utils import timezone
+
+        if not self.es_premium:
+            return False
+        if self.subscription_end_date is None:
+            return True
+        return self.subscription_end_date >= (fecha or timezone.now().date())
+
     @property
     def edad_calculada(self):
         """
@@ -250,57 +267,11 @@ class User(AbstractUser):
         ADULTOS MAYORES (>65 años):
         - Saludable: 25 ml/kg
         - Frágil o con insuficiencia cardíaca: 20 ml/kg
-        """
-        # Fallback defensivo: si falta peso, devolver el valor almacenado
-        # o un valor seguro por defecto para evitar metas en cero.
-        if not self.peso or self.peso <= 0:
-            return self.meta_diaria_ml or 2000
 
-        edad_actual = self.edad_calculada
-        if not edad_actual or edad_actual <= 0:
-            # Si no hay edad, usar valor almacenado o un valor seguro
-            return self.meta_diaria_ml or 2000
-
-        peso_kg = self.peso
-        ml_por_kg = 0
-
-        # NIÑOS Y BEBES (0-13 años)
-        if edad_actual <= 13:
-            if peso_kg <= 10:
-                ml_por_kg = 100
-            elif peso_kg <= 20:
-                ml_por_kg = 50
-            else:
-                ml_por_kg = 20
-        
-        # ADOLESCENTES Y ADULTOS (14-65 años)
-        elif edad_actual <= 65:
-            if edad_actual <= 50:
-                # 14-50 años: 30-35 ml/kg (promedio 32.5)
-                ml_por_kg = 32.5
-            else:
-                # 51-65 años: 25-30 ml/kg (promedio 27.5)
-                ml_por_kg = 27.5
-        
-        # ADULTOS MAYORES (>65 años)
-        else:
-            if self.es_fragil_o_insuficiencia_cardiaca:
-                # Frágil o con insuficiencia cardíaca: 20 ml/kg
-                ml_por_kg = 20
-            else:
-                # Saludable: 25 ml/kg
-                ml_por_kg = 25
-
-        meta_calculada = int(peso_kg * ml_por_kg)
-        
-        # Ajustar meta: restar 20% porque el 20% se obtiene de los alimentos
-        meta_calculada = int(meta_calculada * 0.80)
-        
-        # Asegurar que esté dentro de límites razonables y consistentes con el modelo
-        meta_calculada = max(500, min(meta_calculada, 10000))
-        
-        # Último fallback por si algo resulta en cero
-        return meta_calculada or self.meta_diaria_ml or 2000
+        La fórmula está en users.goals y se memoiza por (perfil, fecha): las
+        llamadas repetidas en la misma petición o el mismo día no la recalculan.
+        """
+        return meta_para_usuario(self)
 
     def actualizar_meta_hidratacion(self):
         """Actualiza la meta de hidratación basada en los datos del usuario."""
@@ -351,6 +322,30 @@ class User(AbstractUser):
         return self.ultimo_acceso and self.ultimo_acceso.date() == hoy
 
 
+class CachedUser(User):
+    """
+    Usuario reconstruido desde la instantánea en caché de la autenticación
+    JWT (users.authentication). Trae solo los campos de la instantánea; el
+    primer acceso a cualquier otro carga de una vez todos los que faltan.
+    """
+
+    class Meta:
+        proxy = True
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred:
+            fields = set(fields) | deferred
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+
+    def calcular_meta_hidratacion(self):
+        """Meta de la instantánea si se calculó hoy (la edad cambia por fecha)."""
+        meta_hoy = getattr(self, '_meta_hoy', None)
+        if meta_hoy and meta_hoy[0] == timezone.localdate():
+            return meta_hoy[1]
+        return super().calcular_meta_hidratacion()
+
+
 class Sugerencia(models.Model):
     """
     Modelo para almacenar sugerencias de bebidas y actividades de usuarios premium.
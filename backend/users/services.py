@@ -0,0 +1,140 @@
+"""
+Servicios de la aplicación de usuarios.
+"""
+
+import logging
+from functools import partial
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from hydrotracker.periodic import run_periodic
+from consumos.utils.cache_utils import ResourceVersion
+from .goals import GOAL_FIELDS, metas_hidratacion
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+
+def _expire_chunk(today, chunk_size):
+    """
+    Desactiva hasta ``chunk_size`` suscripciones vencidas con un único
+    UPDATE ... RETURNING y retorna los ids afectados.
+    """
+    opts = User._meta
+    qn = connection.ops.quote_name
+    table = qn(opts.db_table)
+    es_premium = qn(opts.get_field('es_premium').column)
+    preapproval_id = qn(opts.get_field('preapproval_id').column)
+    end_date = qn(opts.get_field('subscription_end_date').column)
+    pk = qn(opts.pk.column)
+    # Con varios workers, cada uno toma filas distintas
+    lock = ' FOR UPDATE SKIP LOCKED' if connection.features.has_select_for_update_skip_locked else ''
+    sql = (
+        f'UPDATE {table} SET {es_premium} = %s, {preapproval_id} = NULL '
+        f'WHERE {pk} IN ('
+        f'SELECT {pk} FROM {table} WHERE {es_premium} = %s AND {end_date} < %s '
+        f'ORDER BY {pk} LIMIT %s{lock}'
+        f') RETURNING {pk}'
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(sql, [False, True, today, chunk_size])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def expire_subscriptions(today=None, chunk_size=1000):
+    """
+    Desactiva las suscripciones premium vencidas (subscription_end_date < hoy)
+    en lotes y actualiza la versión 'perfil' de los usuarios afectados.
+    Retorna la lista de ids desactivados.
+    """
+    today = today or timezone.now().date()
+    expired = []
+    while True:
+        ids = _expire_chunk(today, chunk_size)
+        if ids:
+            # update() no dispara señales: invalidar a mano
+            ResourceVersion.bump_many('perfil', ids)
+            expired.extend(ids)
+        if len(ids) < chunk_size:
+            break
+    if expired:
+        logger.info(f'{len(expired)} suscripción(es) premium expirada(s) desactivada(s)')
+    return expired
+
+
+def run_expiry_worker(interval=300, chunk_size=1000, stop_event=None):
+    """
+    Ejecuta expire_subscriptions cada ``interval`` segundos hasta que se
+    active ``stop_event`` (o indefinidamente).
+    """
+    run_periodic(
+        partial(expire_subscriptions, chunk_size=chunk_size), interval,
+        'Error desactivando suscripciones expiradas', stop_event, logger
+    )
+
+
+def _write_goals(cambios):
+    """
+    Escribe las metas [(id, meta)]: en PostgreSQL con un único
+    UPDATE ... FROM (VALUES ...), en otros motores con bulk_update.
+    """
+    if connection.vendor != 'postgresql':
+        User.objects.bulk_update(
+            [User(pk=pk, meta_diaria_ml=meta) for pk, meta in cambios], ['meta_diaria_ml']
+        )
+        return
+    opts = User._meta
+    qn = connection.ops.quote_name
+    table = qn(opts.db_table)
+    meta_col = qn(opts.get_field('meta_diaria_ml').column)
+    pk = qn(opts.pk.column)
+    values = ', '.join(['(%s, %s)'] * len(cambios))
+    sql = (
+        f'UPDATE {table} SET {meta_col} = v.meta FROM (VALUES {values}) AS v(id, meta) '
+        f'WHERE {table}.{pk} = v.id'
+    )
+    params = [value for cambio in cambios for value in cambio]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def recalculate_goals(chunk_size=5000, start_after=0, dry_run=False, fecha=None):
+    """
+    Recalcula meta_diaria_ml (meta base, como actualizar_meta_hidratacion)
+    para todos los usuarios tras un cambio de fórmula. Recorre los usuarios
+    por id en bloques de ``chunk_size``, calcula las metas del bloque con
+    metas_hidratacion y escribe solo las que cambian.
+
+    Retorna {'usuarios', 'actualizados', 'ultimo_usuario_id'}; con
+    ``start_after`` se retoma una ejecución interrumpida.
+    """
+    resultado = {'usuarios': 0, 'actualizados': 0, 'ultimo_usuario_id': start_after}
+    ultimo = start_after
+    while True:
+        filas = list(
+            User.objects.filter(pk__gt=ultimo).order_by('pk')
+            .values_list('pk', *GOAL_FIELDS)[:chunk_size]
+        )
+        if not filas:
+            break
+        metas = metas_hidratacion([fila[1:] for fila in filas], fecha)
+        # La última columna de GOAL_FIELDS es la meta almacenada
+        cambios = [(fila[0], meta) for fila, meta in zip(filas, metas) if meta != fila[-1]]
+        if cambios and not dry_run:
+            with transaction.atomic():
+                _write_goals(cambios)
+            # update() no dispara señales: invalidar a mano
+            ResourceVersion.bump_many('perfil', [pk for pk, _ in cambios])
+
+        ultimo = filas[-1][0]
+        resultado['usuarios'] += len(filas)
+        resultado['actualizados'] += len(cambios)
+        resultado['ultimo_usuario_id'] = ultimo
+        if len(filas) < chunk_size:
+            break
+    logger.info(
+        f'Metas recalculadas: {resultado["actualizados"]} de {resultado["usuarios"]} usuarios'
+        f'{" (dry run)" if dry_run else ""}'
+    )
+    return resultado
@@ -3,11 +3,13 @@ Tests para verificar el sistema de degradación automática de usuarios premium
 """
 from django.test import TestCase
 from django.utils import timezone
-from datetime import timedelta
+from datetime import date, timedelta
 from django.core.management import call_command
 from io import StringIO
+from consumos.utils.cache_utils import ResourceVersion
 from users.models import User
 from users.serializers import UserSerializer
+from users.services import expire_subscriptions
 
 
 class ExpiredSubscriptionsTestCase(TestCase):
@@ -20,6 +22,8 @@ class ExpiredSubscriptionsTestCase(TestCase):
             username='expired_user',
             email='expired@test.com',
             password='testpass123',
+            peso=70.0,
+            fecha_nacimiento=date(1998, 1, 1),
             es_premium=True,
             plan_type='monthly',
             subscription_end_date=timezone.now().date() - timedelta(days=5),  # Expiró hace 5 días
@@ -32,6 +36,8 @@ class ExpiredSubscriptionsTestCase(TestCase):
             username='active_user',
             email='active@test.com',
             password='testpass123',
+            peso=70.0,
+            fecha_nacimiento=date(1998, 1, 1),
             es_premium=True,
             plan_type='monthly',
             subscription_end_date=timezone.now().date() + timedelta(days=30),  # Válida por 30 días más
@@ -44,6 +50,8 @@ class ExpiredSubscriptionsTestCase(TestCase):
             username='lifetime_user',
             email='lifetime@test.com',
             password='testpass123',
+            peso=70.0,
+            fecha_nacimiento=date(1998, 1, 1),
             es_premium=True,
             plan_type='lifetime',
             subscription_end_date=None,
@@ -96,24 +104,22 @@ class ExpiredSubscriptionsTestCase(TestCase):
         self.assertIn('expired_user', output)
     
     def test_serializer_just_in_time_verification(self):
-        """Verifica que el serializer desactiva usuarios expirados just-in-time."""
+        """Verifica que el serializer informa el premium vencido sin escribir en la base."""
         # Verificar que el usuario expirado es premium antes de serializar
         self.assertTrue(self.expired_user.es_premium)
         self.assertIsNotNone(self.expired_user.preapproval_id)
         
-        # Serializar el usuario (esto debería desactivarlo automáticamente)
-        serializer = UserSerializer(self.expired_user)
-        data = serializer.data
+        # Serializar el usuario (verificación en lectura, sin save())
+        with self.assertNumQueries(0):
+            data = UserSerializer(self.expired_user).data
         
-        # Recargar el usuario desde la base de datos
-        self.expired_user.refresh_from_db()
-        
-        # Verificar que fue desactivado automáticamente
-        self.assertFalse(self.expired_user.es_premium)
-        self.assertIsNone(self.expired_user.preapproval_id)
-        
-        # Verificar que los datos serializados reflejan el estado desactivado
+        # Los datos serializados reflejan el estado vencido
         self.assertFalse(data['es_premium'])
+        
+        # La desactivación en la base queda para el job de expiración
+        self.expired_user.refresh_from_db()
+        self.assertTrue(self.expired_user.es_premium)
+        self.assertIsNotNone(self.expired_user.preapproval_id)
     
     def test_serializer_no_afecta_usuarios_activos(self):
         """Verifica que el serializer no afecta usuarios con suscripción activa."""
@@ -160,3 +166,35 @@ class ExpiredSubscriptionsTestCase(TestCase):
         
         # Verificar que no fue afectado
         self.assertEqual(self.lifetime_user.es_premium, initial_premium_status)
+    
+    def test_expire_subscriptions_por_lotes(self):
+        """Verifica que el job desactiva por lotes y retorna los ids afectados."""
+        otros = [
+            User.objects.create_user(
+                username=f'expired_{i}', email=f'expired_{i}@test.com', password='testpass123',
+                peso=70.0, fecha_nacimiento=date(1998, 1, 1), es_premium=True, preapproval_id=f'pre_{i}',
+                subscription_end_date=timezone.now().date() - timedelta(days=1)
+            )
+            for i in range(4)
+        ]
+        
+        expirados = expire_subscriptions(chunk_size=2)
+        
+        self.assertEqual(sorted(expirados), sorted([self.expired_user.id] + [u.id for u in otros]))
+        self.assertFalse(User.objects.filter(id__in=expirados, es_premium=True).exists())
+        self.assertFalse(User.objects.filter(id__in=expirados, preapproval_id__isnull=False).exists())
+        self.active_user.refresh_from_db()
+        self.assertTrue(self.active_user.es_premium)
+        
+        # Una segunda pasada no encuentra nada
+        self.assertEqual(expire_subscriptions(), [])
+    
+    def test_expire_subscriptions_invalida_perfil(self):
+        """Verifica que el job actualiza la versión de caché 'perfil' de los afectados."""
+        antes = ResourceVersion.get_many(['perfil'], self.expired_user.id)['perfil']
+        activo_antes = ResourceVersion.get_many(['perfil'], self.active_user.id)['perfil']
+        
+        expire_subscriptions()
+        
+        self.assertNotEqual(ResourceVersion.get_many(['perfil'], self.expired_user.id)['perfil'], antes)
+        self.assertEqual(ResourceVersion.get_many(['perfil'], self.active_user.id)['perfil'], activo_antes)
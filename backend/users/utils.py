@@ -5,23 +5,50 @@ Este módulo contiene funciones auxiliares para operaciones comunes
 relacionadas con usuarios, como la creación de recipientes por defecto.
 """
 
-from consumos.models import Recipiente
+import logging
 from typing import List
 
+from consumos.models import Recipiente
+from consumos.utils.cache_utils import CacheManager, ResourceVersion
+
+logger = logging.getLogger(__name__)
+
+RECIPIENTES_POR_DEFECTO = [
+    {
+        'nombre': 'Vaso',
+        'cantidad_ml': 250,
+        'color': '#3B82F6',
+        'icono': 'cup',
+        'es_favorito': True
+    },
+    {
+        'nombre': 'Botella',
+        'cantidad_ml': 500,
+        'color': '#10B981',
+        'icono': 'bottle',
+        'es_favorito': True
+    }
+]
+
+
+def _flag_key(user_id):
+    return CacheManager.get_cache_key('recipientes_por_defecto', user_id)
+
 
 def crear_recipientes_por_defecto(usuario) -> List[Recipiente]:
     """
-    Crea los recipientes por defecto para un nuevo usuario.
+    Crea los recipientes por defecto que le falten al usuario.
     
     Cuando un usuario se registra, se le asignan automáticamente dos
-    recipientes estándar: una taza/vaso de 250ml y una botella/termo
-    pequeño de 500ml. Ambos se marcan como favoritos.
+    recipientes estándar: un vaso de 250ml y una botella de 500ml.
+    Ambos se marcan como favoritos. Es idempotente: solo crea los que
+    no existen, y deja marcado en caché que el usuario ya los tiene.
     
     Args:
         usuario: Instancia del modelo User para el cual crear los recipientes
         
     Returns:
-        List[Recipiente]: Lista de recipientes creados (normalmente 2)
+        List[Recipiente]: Lista de recipientes creados (2 para un usuario nuevo)
         
     Example:
         >>> user = User.objects.create_user(...)
@@ -29,30 +56,49 @@ def crear_recipientes_por_defecto(usuario) -> List[Recipiente]:
         >>> len(recipientes)
         2
     """
-    recipientes_por_defecto = [
-        {
-            'nombre': 'Vaso',
-            'cantidad_ml': 250,
-            'color': '#3B82F6',
-            'icono': 'cup',
-            'es_favorito': True
-        },
-        {
-            'nombre': 'Botella',
-            'cantidad_ml': 500,
-            'color': '#10B981',
-            'icono': 'bottle',
-            'es_favorito': True
-        }
-    ]
+    existentes = set(
+        Recipiente.objects.filter(
+            usuario=usuario,
+            nombre__in=[data['nombre'] for data in RECIPIENTES_POR_DEFECTO]
+        ).values_list('nombre', flat=True)
+    )
     
     recipientes_creados = []
-    for recipiente_data in recipientes_por_defecto:
+    for recipiente_data in RECIPIENTES_POR_DEFECTO:
+        if recipiente_data['nombre'] in existentes:
+            continue
         recipiente = Recipiente.objects.create(
             usuario=usuario,
             **recipiente_data
         )
         recipientes_creados.append(recipiente)
     
+    try:
+        ResourceVersion.get_cache().set(_flag_key(usuario.pk), True, timeout=None)
+    except Exception as e:
+        logger.error(f'Error marcando recipientes por defecto del usuario {usuario.pk}: {e}')
     return recipientes_creados
 
+
+def asegurar_recipientes_por_defecto(usuario) -> List[Recipiente]:
+    """
+    Garantiza los recipientes por defecto sin tocar la base si la caché
+    indica que ya se crearon (el caso normal tras el registro). Retorna
+    los recipientes que hubo que crear.
+    """
+    try:
+        if ResourceVersion.get_cache().get(_flag_key(usuario.pk)):
+            return []
+    except Exception as e:
+        logger.error(f'Error leyendo recipientes por defecto del usuario {usuario.pk}: {e}')
+    return crear_recipientes_por_defecto(usuario)
+
+
+def olvidar_recipientes_por_defecto(user_id):
+    """
+    Borra la marca de caché (p. ej. al eliminar un recipiente por defecto).
+    """
+    try:
+        ResourceVersion.get_cache().delete(_flag_key(user_id))
+    except Exception as e:
+        logger.error(f'Error borrando marca de recipientes del usuario {user_id}: {e}')
@@ -5,7 +5,7 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.utils import timezone
-from rest_framework.throttling import ScopedRateThrottle
+from hydrotracker.throttling import ScopedTokenBucketThrottle
 import json
 import base64
 import logging
@@ -111,7 +111,7 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     """
     serializer_class = CustomTokenObtainPairSerializer
     permission_classes = [AllowAny]
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [ScopedTokenBucketThrottle]
     throttle_scope = 'login'
 
     def post(self, request, *args, **kwargs):
@@ -162,7 +162,7 @@ class LogoutView(APIView):
     Vista para cerrar sesión (invalidar token de refresh).
     """
     permission_classes = [IsAuthenticated]
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [ScopedTokenBucketThrottle]
     throttle_scope = 'login'
 
     def post(self, request):
@@ -255,7 +255,7 @@ class ChangePasswordView(APIView):
     Vista para cambiar la contraseña del usuario autenticado.
     """
     permission_classes = [IsAuthenticated]
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [ScopedTokenBucketThrottle]
     throttle_scope = 'login'  # Usar mismo rate limit que login
 
     def post(self, request):